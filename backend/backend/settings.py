@@ -43,7 +43,133 @@ CSRF_TRUSTED_ORIGINS = [
 
 
 DATA_UPLOAD_MAX_MEMORY_SIZE = 200 * 1024 * 1024  # 200 Mo
-FILE_UPLOAD_MAX_MEMORY_SIZE = 200 * 1024 * 1024  # 200 Mo
+# Bodies above this size are spooled to disk instead of RAM (the ASGI handler
+# buffers the whole request body with this limit before the view runs).
+FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5 Mo
+
+# Photo uploads are streamed to S3 as multipart parts while the body is parsed.
+# Memory per upload stays around (PHOTO_UPLOAD_MAX_INFLIGHT_PARTS + 1) parts.
+PHOTO_UPLOAD_PART_SIZE = int(os.getenv("PHOTO_UPLOAD_PART_SIZE", 8 * 1024 * 1024))
+PHOTO_UPLOAD_MAX_INFLIGHT_PARTS = int(os.getenv("PHOTO_UPLOAD_MAX_INFLIGHT_PARTS", 2))
+
+# Direct-to-storage uploads (presigned POST, then confirm)
+PHOTO_UPLOAD_MAX_SIZE = int(os.getenv("PHOTO_UPLOAD_MAX_SIZE", 1000 * 1024 * 1024))
+PHOTO_UPLOAD_ALLOWED_CONTENT_TYPES = [
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+    "image/heic",
+    "image/heif",
+    "video/mp4",
+    "video/quicktime",
+]
+PHOTO_PRESIGNED_UPLOAD_EXPIRES = 15 * 60  # seconds
+
+# Shared S3 client (one per process, reused by every daphne worker thread).
+# The pool must cover concurrent batch uploads and multipart parts.
+AWS_S3_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_S3_MAX_POOL_CONNECTIONS", 32))
+AWS_S3_CONNECT_TIMEOUT = 5  # seconds
+AWS_S3_READ_TIMEOUT = 60  # seconds
+AWS_S3_MAX_ATTEMPTS = 5
+
+# S3 multipart transfers: boto3 upload_fileobj and the parallel UploadPartCopy
+# copy. "default" applies to every operation, "upload" and "copy" override
+# it. Throughput per operation and size class is logged and served by
+# /api/metrics/transfers/.
+AWS_S3_TRANSFER = {
+    "default": {
+        "multipart_threshold": int(
+            os.getenv("AWS_S3_MULTIPART_THRESHOLD", 16 * 1024 * 1024)
+        ),
+        "multipart_chunksize": int(
+            os.getenv("AWS_S3_MULTIPART_CHUNKSIZE", 16 * 1024 * 1024)
+        ),
+        "max_concurrency": int(os.getenv("AWS_S3_MAX_CONCURRENCY", 8)),
+        "use_threads": True,
+    },
+    "upload": {},
+    "copy": {
+        # Server-side parts cost no bandwidth here, bigger parts mean fewer calls
+        "multipart_chunksize": int(
+            os.getenv("AWS_S3_COPY_MULTIPART_CHUNKSIZE", 64 * 1024 * 1024)
+        ),
+    },
+}
+
+# Attempts per part of a multipart copy, on top of the client retries
+AWS_S3_COPY_PART_ATTEMPTS = int(os.getenv("AWS_S3_COPY_PART_ATTEMPTS", 3))
+
+# Concurrent S3 requests for batch calls without a bulk API (copy, HEAD)
+AWS_S3_BATCH_WORKERS = int(os.getenv("AWS_S3_BATCH_WORKERS", 8))
+
+# Concurrent storage uploads per batch request (files per request are capped
+# by DATA_UPLOAD_MAX_NUMBER_FILES)
+PHOTO_BATCH_UPLOAD_WORKERS = int(os.getenv("PHOTO_BATCH_UPLOAD_WORKERS", 4))
+
+# Orphaned storage files younger than this (seconds) are never collected, so
+# uploads whose Photo row is not committed yet survive. Never shorter than the
+# lifetime of a presigned upload token.
+STORAGE_GC_GRACE_PERIOD = int(os.getenv("STORAGE_GC_GRACE_PERIOD", 24 * 3600))
+
+# Responsive derivatives generated for every photo and album cover: one file
+# per width and format, stored next to the original. Widths wider than the
+# original are not upscaled; AVIF/WebP are skipped if Pillow lacks the codec.
+PHOTO_DERIVATIVE_WIDTHS = [
+    int(width)
+    for width in os.getenv("PHOTO_DERIVATIVE_WIDTHS", "320,640,1280,1920").split(",")
+]
+PHOTO_DERIVATIVE_FORMATS = os.getenv(
+    "PHOTO_DERIVATIVE_FORMATS", "avif,webp,jpeg"
+).split(",")
+PHOTO_DERIVATIVE_QUALITY = {"avif": 55, "webp": 75, "jpeg": 80}
+
+# Photos whose perceptual hashes differ by at most this many bits (out of 64)
+# are reported as near-duplicates
+PHOTO_DUPLICATE_DISTANCE = int(os.getenv("PHOTO_DUPLICATE_DISTANCE", 6))
+
+# On-demand renders (GET /api/photos/<album_id>/<photo_id>/render?w=&fmt=),
+# at most PHOTO_RENDER_MAX_WIDTH pixels wide, cached on the local disk in
+# PHOTO_RENDER_CACHE_DIR up to PHOTO_RENDER_CACHE_MAX_BYTES, least recently
+# used first out. Images are resized in a pool of IMAGE_WORKER_PROCESSES_PER_CPU
+# processes per CPU, as in the image worker.
+PHOTO_RENDER_MAX_WIDTH = int(os.getenv("PHOTO_RENDER_MAX_WIDTH", 4096))
+PHOTO_RENDER_CACHE_DIR = os.getenv(
+    "PHOTO_RENDER_CACHE_DIR", str(BASE_DIR / "render-cache")
+)
+PHOTO_RENDER_CACHE_MAX_BYTES = int(
+    os.getenv("PHOTO_RENDER_CACHE_MAX_BYTES", 1024 * 1024 * 1024)
+)
+
+# Album ZIP exports read this many photo files ahead of the one being sent
+ALBUM_EXPORT_PREFETCH = int(os.getenv("ALBUM_EXPORT_PREFETCH", 3))
+
+# Image worker (manage.py process_image_jobs) rendering the queued derivative
+# jobs in IMAGE_WORKER_PROCESSES_PER_CPU processes per CPU, at least one.
+# Failed jobs are retried IMAGE_JOB_MAX_ATTEMPTS times, waiting
+# IMAGE_JOB_RETRY_DELAY seconds, doubled on each attempt. Jobs running for
+# more than IMAGE_JOB_TIMEOUT seconds belong to a dead worker and are claimed
+# again.
+IMAGE_WORKER_PROCESSES_PER_CPU = float(os.getenv("IMAGE_WORKER_PROCESSES_PER_CPU", 1))
+IMAGE_WORKER_POLL_INTERVAL = float(os.getenv("IMAGE_WORKER_POLL_INTERVAL", 2))
+IMAGE_JOB_MAX_ATTEMPTS = int(os.getenv("IMAGE_JOB_MAX_ATTEMPTS", 5))
+IMAGE_JOB_RETRY_DELAY = int(os.getenv("IMAGE_JOB_RETRY_DELAY", 30))
+IMAGE_JOB_TIMEOUT = int(os.getenv("IMAGE_JOB_TIMEOUT", 600))
+
+# In-process worker threads running work after the response (storage deletes
+# of removed albums and blobs). Eager mode runs tasks inline.
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", 2))
+BACKGROUND_TASKS_EAGER = os.getenv("BACKGROUND_TASKS_EAGER", "False") == "True"
+
+# Local filesystem storage (PHOTO_STORAGE_TYPE=LOCAL). Stored URLs are
+# PHOTO_LOCAL_BASE_URL + key and are served by LocalMediaView. When
+# PHOTO_LOCAL_ACCEL_REDIRECT is set, the view only answers with an
+# X-Accel-Redirect to that internal nginx location and nginx sends the file.
+PHOTO_LOCAL_ROOT = os.getenv("PHOTO_LOCAL_ROOT", str(BASE_DIR / "media"))
+PHOTO_LOCAL_BASE_URL = (
+    os.getenv("PHOTO_LOCAL_BASE_URL") or "http://localhost:8000/api/media/"
+)
+PHOTO_LOCAL_ACCEL_REDIRECT = os.getenv("PHOTO_LOCAL_ACCEL_REDIRECT", "")
 
 
 # CORS_ALLOWED_ORIGINS = ALLOWED_CORS
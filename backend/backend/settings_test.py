@@ -27,6 +27,8 @@ SECRET_KEY = "test-secret-key-not-for-production"
 
 DEBUG = False
 
+BACKGROUND_TASKS_EAGER = True
+
 ALLOWED_HOSTS = ["*"]
 
 CORS_ALLOW_ALL_ORIGINS = True
@@ -2,3 +2,6 @@ from .message import MessageAdmin
 from .bucketpoint import BucketPointAdmin
 from .album import AlbumAdmin
 from .photo import PhotoAdmin
+from .photo_blob import PhotoBlobAdmin
+from .image_job import ImageJobAdmin
+from .backfill_checkpoint import BackfillCheckpointAdmin
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from ..models import BackfillCheckpoint
+
+
+class BackfillCheckpointAdmin(admin.ModelAdmin):
+    list_display = ("task", "last_id", "processed", "failed", "finished_at")
+    ordering = ("task",)
+
+
+admin.site.register(BackfillCheckpoint, BackfillCheckpointAdmin)
@@ -0,0 +1,12 @@
+from django.contrib import admin
+from ..models import ImageJob
+
+
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "source_url", "status", "attempts", "available_at")
+    list_filter = ("status",)
+    search_fields = ("source_url",)
+    ordering = ("available_at",)
+
+
+admin.site.register(ImageJob, ImageJobAdmin)
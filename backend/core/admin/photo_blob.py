@@ -0,0 +1,11 @@
+from django.contrib import admin
+from ..models import PhotoBlob
+
+
+class PhotoBlobAdmin(admin.ModelAdmin):
+    list_display = ("id", "sha256", "url", "size", "ref_count", "created_at")
+    search_fields = ("sha256", "url")
+    ordering = ("-created_at",)
+
+
+admin.site.register(PhotoBlob, PhotoBlobAdmin)
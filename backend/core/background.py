@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BACKGROUND_WORKERS,
+                thread_name_prefix="background",
+            )
+        return _executor
+
+
+def _run(function, args, kwargs):
+    try:
+        function(*args, **kwargs)
+    except Exception:
+        logger.exception(f"Background task {function.__qualname__} failed")
+    finally:
+        # Worker threads outlive requests: drop their stale DB connections
+        close_old_connections()
+
+
+def submit(function, *args, **kwargs) -> None:
+    """Run ``function`` after the response, in a process-wide worker pool.
+
+    Meant for slow cleanup that must not delay the request (storage
+    deletes). Tasks are lost if the process stops; whatever they leave
+    behind is picked up by the storage garbage collection. With
+    ``BACKGROUND_TASKS_EAGER`` the task runs inline, as in the tests.
+    """
+    if settings.BACKGROUND_TASKS_EAGER:
+        _run(function, args, kwargs)
+        return
+    _get_executor().submit(_run, function, args, kwargs)
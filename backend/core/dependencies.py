@@ -1,4 +1,6 @@
 from core.interface.aws import AwsPhotoSaver
+from core.interface.local import LocalPhotoSaver
+from django.core.exceptions import ImproperlyConfigured
 import os
 from dotenv import load_dotenv, find_dotenv
 
@@ -8,7 +10,7 @@ environment = os.getenv("PHOTO_STORAGE_TYPE", "AWS")
 
 if environment == "AWS":
     photo_repository = AwsPhotoSaver()
+elif environment == "LOCAL":
+    photo_repository = LocalPhotoSaver()
 else:
-    # photo_repository = LocalPhotoSaver()
-    # if we want to change later
-    pass
+    raise ImproperlyConfigured(f"Unknown PHOTO_STORAGE_TYPE: {environment}")
@@ -12,3 +12,7 @@ class CloudUploadError(BusinessError):
 
 class InsufficientRights(BusinessError):
     pass
+
+
+class StorageOperationNotSupported(BusinessError):
+    pass
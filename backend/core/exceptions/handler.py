@@ -1,7 +1,12 @@
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
 from rest_framework import status
-from core.exceptions import ResourceNotFound, CloudUploadError, InsufficientRights
+from core.exceptions import (
+    ResourceNotFound,
+    CloudUploadError,
+    InsufficientRights,
+    StorageOperationNotSupported,
+)
 from django.core.exceptions import ObjectDoesNotExist
 
 
@@ -31,4 +36,10 @@ def custom_exception_handler(exc, context):
             status=status.HTTP_503_SERVICE_UNAVAILABLE,
         )
 
+    if isinstance(exc, StorageOperationNotSupported):
+        return Response(
+            {"detail": str(exc), "code": "NOT_SUPPORTED"},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
     return None
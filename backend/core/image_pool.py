@@ -0,0 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from django.conf import settings
+import multiprocessing
+import os
+import threading
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def default_processes() -> int:
+    cpus = os.cpu_count() or 1
+    return max(1, int(cpus * settings.IMAGE_WORKER_PROCESSES_PER_CPU))
+
+
+def create(processes: int) -> ProcessPoolExecutor:
+    """A pool of ``processes`` rendering images.
+
+    Spawned, not forked: the parent runs threads. Children only import
+    core.imaging, which needs no Django setup.
+    """
+    return ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = create(default_processes())
+        return _pool
+
+
+def run(function, *args):
+    """Run ``function`` in the process-wide image pool and return its result.
+
+    Decoding and resizing hold the GIL: in the pool they leave the threads
+    of the web server free. With ``BACKGROUND_TASKS_EAGER`` the function
+    runs inline, as in the tests.
+    """
+    global _pool
+    if settings.BACKGROUND_TASKS_EAGER:
+        return function(*args)
+    pool = _get_pool()
+    try:
+        return pool.submit(function, *args).result()
+    except BrokenProcessPool:
+        # A dead process breaks the whole pool: the next call starts another
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        raise
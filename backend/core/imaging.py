@@ -0,0 +1,255 @@
+from datetime import datetime
+from django.conf import settings
+from django.utils import timezone
+from PIL import ExifTags, Image, ImageOps, features
+import base64
+import io
+import math
+import re
+
+# Image rendering and parsing. Kept free of Django models so the image worker
+# processes can import it without setting up the Django apps.
+
+FORMATS = {
+    # format: (Pillow format, file extension)
+    "avif": ("AVIF", "avif"),
+    "webp": ("WEBP", "webp"),
+    "jpeg": ("JPEG", "jpg"),
+}
+
+# EXIF orientations swapping width and height
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+EXIF_ORIENTATION = 0x0112
+
+# Bytes read from the start of a file to parse its metadata. The EXIF block of
+# a JPEG (APP1 segment, at most 64 KiB) comes before the pixels.
+METADATA_HEADER_SIZE = 128 * 1024
+
+EXIF_DATETIME_FORMAT = "%Y:%m:%d %H:%M:%S"
+
+# Side of the perceptual hash grid: HASH_SIZE² bits
+HASH_SIZE = 8
+
+# Low-quality image placeholder: the picture fitted in a PLACEHOLDER_SIZE
+# square, a few hundred bytes once base64-encoded, blurred by the client
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+
+# Storage name of a derivative, next to its original:
+# "<folder>/_w<width>_<source name>.<extension>". Stored originals are named
+# "<uuid>_<file name>", so no upload can take the name of a derivative
+DERIVATIVE_NAME = re.compile(r"^_w\d+_(?P<source>.+)\.(avif|webp|jpg)$")
+
+
+def derivative_key(key: str, width: int, format: str) -> str:
+    """Key (or URL) of a derivative of the file at ``key`` (or URL)."""
+    folder, slash, name = key.rpartition("/")
+    return f"{folder}{slash}_w{width}_{name}.{FORMATS[format][1]}"
+
+
+def source_url_of(url: str) -> str:
+    """Return the URL of the original a derivative was made from (or ``url``)."""
+    folder, slash, name = url.rpartition("/")
+    match = DERIVATIVE_NAME.match(name)
+    return f"{folder}{slash}{match['source']}" if match else url
+
+
+def _available_formats() -> list:
+    return [
+        format
+        for format in settings.PHOTO_DERIVATIVE_FORMATS
+        if format == "jpeg" or features.check(format)
+    ]
+
+
+def _prepare(image: Image.Image) -> Image.Image:
+    """Apply the EXIF orientation and normalise the pixel mode."""
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    return image
+
+
+def _encode(image: Image.Image, format: str, icc_profile) -> bytes:
+    if format == "jpeg" and image.mode == "RGBA":
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    # Only the colour profile is kept: EXIF, XMP and comments are dropped
+    image.save(
+        buffer,
+        FORMATS[format][0],
+        quality=settings.PHOTO_DERIVATIVE_QUALITY[format],
+        icc_profile=icc_profile,
+    )
+    return buffer.getvalue()
+
+
+def render_derivatives(data: bytes):
+    """Yield ``(configured width, actual width, format, bytes)`` per variant.
+
+    Originals are never upscaled: the first configured width reaching the
+    original width is rendered at the original size, larger ones skipped.
+    """
+    widths = sorted(settings.PHOTO_DERIVATIVE_WIDTHS)
+    formats = _available_formats()
+
+    with Image.open(io.BytesIO(data)) as original:
+        icc_profile = original.info.get("icc_profile")
+        # JPEG can decode at 1/2, 1/4 or 1/8 scale, much faster, as long as
+        # the displayed width stays above the largest derivative
+        if original.getexif().get(EXIF_ORIENTATION) in TRANSPOSED_ORIENTATIONS:
+            original.draft("RGB", (1, widths[-1]))
+        else:
+            original.draft("RGB", (widths[-1], 1))
+        image = _prepare(original)
+
+        for width in widths:
+            if width < image.width:
+                height = max(round(image.height * width / image.width), 1)
+                resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            else:
+                resized = image
+            for format in formats:
+                yield width, resized.width, format, _encode(
+                    resized, format, icc_profile
+                )
+            if width >= image.width:
+                break
+
+
+def render_width(data: bytes, width: int, format: str) -> bytes:
+    """Render one variant of an image, ``width`` pixels wide at most."""
+    with Image.open(io.BytesIO(data)) as original:
+        icc_profile = original.info.get("icc_profile")
+        if original.getexif().get(EXIF_ORIENTATION) in TRANSPOSED_ORIENTATIONS:
+            original.draft("RGB", (1, width))
+        else:
+            original.draft("RGB", (width, 1))
+        image = _prepare(original)
+        if width < image.width:
+            height = max(round(image.height * width / image.width), 1)
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+        return _encode(image, format, icc_profile)
+
+
+def render_all(data: bytes) -> list:
+    """``render_derivatives`` as a list, to run in another process."""
+    return list(render_derivatives(data))
+
+
+def perceptual_hash(data: bytes) -> int:
+    """64-bit difference hash (dHash) of an image, as a signed 64-bit integer.
+
+    Each bit tells whether a pixel of the 9x8 grayscale thumbnail is
+    brighter than its right neighbour, so resized or re-encoded copies of a
+    picture differ by a few bits only. Signed to fit a ``BigIntegerField``.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        # JPEG decodes at reduced scale, keeping enough pixels to average
+        image.draft("L", (HASH_SIZE * 8, HASH_SIZE * 8))
+        # One byte per pixel, row by row
+        pixels = (
+            ImageOps.exif_transpose(image)
+            .convert("L")
+            .resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS)
+            .tobytes()
+        )
+
+    value = 0
+    for row in range(HASH_SIZE):
+        for column in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + column]
+            value = value << 1 | (left > pixels[row * (HASH_SIZE + 1) + column + 1])
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def placeholder(data: bytes) -> str:
+    """Tiny preview of an image as a ``data:`` URI, shown while it loads."""
+    format = "webp" if features.check("webp") else "jpeg"
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("RGB", (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+        image = _prepare(image)
+        image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.LANCZOS)
+        if format == "jpeg" and image.mode == "RGBA":
+            image = image.convert("RGB")
+        buffer = io.BytesIO()
+        image.save(buffer, FORMATS[format][0], quality=PLACEHOLDER_QUALITY)
+
+    encoded = base64.b64encode(buffer.getvalue()).decode()
+    return f"data:image/{format};base64,{encoded}"
+
+
+def _exif_datetime(value, offset):
+    """Parse an EXIF date; without offset it is taken in the local timezone."""
+    try:
+        taken_at = datetime.strptime(str(value).strip("\x00 "), EXIF_DATETIME_FORMAT)
+    except (TypeError, ValueError):
+        return None
+    if offset:
+        try:
+            return taken_at.replace(tzinfo=datetime.strptime(offset, "%z").tzinfo)
+        except ValueError:
+            pass
+    return timezone.make_aware(taken_at)
+
+
+def _gps_degrees(value, ref, negative_ref: str, limit: int):
+    """Convert EXIF (degrees, minutes, seconds) to signed decimal degrees."""
+    try:
+        degrees, minutes, seconds = (float(part) for part in value)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    decimal = degrees + minutes / 60 + seconds / 3600
+    if not math.isfinite(decimal) or decimal > limit:
+        return None
+    return -decimal if ref == negative_ref else decimal
+
+
+def read_metadata(header: bytes) -> dict:
+    """Dimensions, capture time and position from the first bytes of a file.
+
+    Only the headers are parsed, pixels are never decoded, so ``header``
+    needs only the first ``METADATA_HEADER_SIZE`` bytes. Dimensions are the
+    displayed ones, after the EXIF orientation. Returns an empty dict for
+    files Pillow cannot identify from their header (videos, WebP, ...).
+    """
+    try:
+        with Image.open(io.BytesIO(header)) as image:
+            width, height = image.size
+            mime = image.get_format_mimetype()
+            exif = Image.Exif()
+            # getexif() would load the pixels of some formats (PNG)
+            if image.info.get("exif"):
+                exif.load(image.info["exif"])
+    except Exception:
+        # Unknown or truncated format
+        return {}
+
+    if exif.get(EXIF_ORIENTATION) in TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+
+    details = exif.get_ifd(ExifTags.IFD.Exif)
+    gps = exif.get_ifd(ExifTags.IFD.GPSInfo)
+    return {
+        "width": width,
+        "height": height,
+        "mime": mime,
+        "taken_at": _exif_datetime(
+            details.get(ExifTags.Base.DateTimeOriginal)
+            or exif.get(ExifTags.Base.DateTime),
+            details.get(ExifTags.Base.OffsetTimeOriginal),
+        ),
+        "lat": _gps_degrees(
+            gps.get(ExifTags.GPS.GPSLatitude),
+            gps.get(ExifTags.GPS.GPSLatitudeRef),
+            "S",
+            90,
+        ),
+        "lon": _gps_degrees(
+            gps.get(ExifTags.GPS.GPSLongitude),
+            gps.get(ExifTags.GPS.GPSLongitudeRef),
+            "W",
+            180,
+        ),
+    }
@@ -1,9 +1,19 @@
-from core.exceptions.exceptions import CloudUploadError
-from core.interface.photo_saver_repository import PhotoSaverRepository
+from core.exceptions.exceptions import CloudUploadError, ResourceNotFound
+from core.imaging import derivative_key
+from core.interface.photo_saver_repository import PhotoSaverRepository, UploadStream
+from core.interface.transfer_metrics import ByteCounter, transfer_metrics
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import NoCredentialsError, ClientError, BotoCoreError
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
 import os
 import mimetypes
+import posixpath
+import threading
+import time
 from uuid import uuid4
 from dotenv import load_dotenv, find_dotenv
 
@@ -13,23 +23,336 @@ AWS_ACCESS_KEY = os.getenv("AWS_ACCESS_KEY")
 AWS_SECRET_KEY = os.getenv("AWS_ACCESS_SECRET")
 AWS_BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+# Optional, to target an S3-compatible server (MinIO, local stand-in, ...)
+AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL") or None
 
 DEBUG = os.getenv("DEBUG", "False") == "True"
 
+# S3 rejects multipart parts smaller than 5 MiB (except the last one).
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+# Maximum number of keys accepted by a single DeleteObjects request
+S3_DELETE_BATCH_SIZE = 1000
+
+# CopyObject refuses sources above 5 GiB; a multipart upload has at most
+# 10 000 parts.
+S3_MAX_COPY_OBJECT_SIZE = 5 * 1024 * 1024 * 1024
+S3_MAX_PARTS = 10000
+
+# First wait (seconds) before retrying a failed part copy, doubled each time
+COPY_PART_RETRY_DELAY = 0.5
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Tell whether a failed S3 call may succeed if sent again."""
+    if isinstance(error, ClientError):
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        code = error.response.get("Error", {}).get("Code")
+        return (status or 0) >= 500 or code in ("SlowDown", "RequestTimeout")
+    return isinstance(error, BotoCoreError)
+
+
+class S3MultipartUploadStream(UploadStream):
+    """Upload a file to S3 part by part as its chunks arrive.
+
+    Only ``max_inflight`` parts are in flight at any time, so memory stays
+    bounded to roughly ``(max_inflight + 1) * part_size`` whatever the file
+    size. Files smaller than one part are sent with a single ``put_object``.
+    """
+
+    def __init__(self, s3, file_key: str, file_url: str, content_type: str):
+        self.s3 = s3
+        self.file_key = file_key
+        self.file_url = file_url
+        self.content_type = content_type
+        self.part_size = max(settings.PHOTO_UPLOAD_PART_SIZE, S3_MIN_PART_SIZE)
+        self.max_inflight = max(settings.PHOTO_UPLOAD_MAX_INFLIGHT_PARTS, 1)
+        self.upload_id = None
+        self._buffer = bytearray()
+        self._next_part_number = 1
+        self._pending = deque()
+        self._parts = []
+        self._executor = None
+        self._closed = False
+        self._bytes_written = 0
+        self._started_at = time.perf_counter()
+
+    def _start_multipart_upload(self):
+        response = self.s3.create_multipart_upload(
+            Bucket=AWS_BUCKET_NAME,
+            Key=self.file_key,
+            ContentType=self.content_type,
+            ContentDisposition="inline",
+        )
+        self.upload_id = response["UploadId"]
+        self._executor = ThreadPoolExecutor(max_workers=self.max_inflight)
+
+    def _upload_part(self, part_number: int, body: bytes) -> dict:
+        response = self.s3.upload_part(
+            Bucket=AWS_BUCKET_NAME,
+            Key=self.file_key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=body,
+        )
+        return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+    def _wait_oldest_part(self):
+        self._parts.append(self._pending.popleft().result())
+
+    def _submit_part(self, body: bytes):
+        if self.upload_id is None:
+            self._start_multipart_upload()
+
+        # Back-pressure: never keep more than max_inflight parts in memory
+        while len(self._pending) >= self.max_inflight:
+            self._wait_oldest_part()
+
+        future = self._executor.submit(self._upload_part, self._next_part_number, body)
+        self._pending.append(future)
+        self._next_part_number += 1
+
+    def write(self, chunk: bytes) -> None:
+        try:
+            self._bytes_written += len(chunk)
+            self._buffer.extend(chunk)
+            while len(self._buffer) >= self.part_size:
+                body = bytes(self._buffer[: self.part_size])
+                del self._buffer[: self.part_size]
+                self._submit_part(body)
+        except (NoCredentialsError, ClientError, BotoCoreError) as e:
+            print(f"Erreur Upload S3: {e}")
+            self.abort()
+            raise CloudUploadError("Échec de l'upload vers S3")
+
+    def complete(self) -> str:
+        try:
+            if self.upload_id is None:
+                self.s3.put_object(
+                    Bucket=AWS_BUCKET_NAME,
+                    Key=self.file_key,
+                    Body=bytes(self._buffer),
+                    ContentType=self.content_type,
+                    ContentDisposition="inline",
+                )
+            else:
+                if self._buffer:
+                    self._submit_part(bytes(self._buffer))
+                while self._pending:
+                    self._wait_oldest_part()
+                self.s3.complete_multipart_upload(
+                    Bucket=AWS_BUCKET_NAME,
+                    Key=self.file_key,
+                    UploadId=self.upload_id,
+                    MultipartUpload={"Parts": self._parts},
+                )
+        except (NoCredentialsError, ClientError, BotoCoreError) as e:
+            print(f"Erreur Upload S3: {e}")
+            self.abort()
+            raise CloudUploadError("Échec de l'upload vers S3")
+
+        transfer_metrics.record(
+            "stream_upload",
+            self._bytes_written,
+            time.perf_counter() - self._started_at,
+        )
+        self._close()
+        return self.file_url
+
+    def abort(self) -> None:
+        if self._closed:
+            return
+
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+
+        if self.upload_id is not None:
+            try:
+                self.s3.abort_multipart_upload(
+                    Bucket=AWS_BUCKET_NAME,
+                    Key=self.file_key,
+                    UploadId=self.upload_id,
+                )
+            except (ClientError, BotoCoreError) as e:
+                print(f"Erreur annulation upload S3: {e}")
+
+        self._close()
+
+    def _close(self):
+        self._closed = True
+        self._buffer = bytearray()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class S3MultipartCopy:
+    """Server-side copy of one object, in parallel parts when it is large.
+
+    Objects up to the ``multipart_threshold`` of ``config`` are copied with a
+    single ``copy_object``. Larger ones are split into ``UploadPartCopy``
+    calls, ``max_concurrency`` at a time, and each part is retried on its
+    own so a transient error does not restart the whole copy. Throughput is
+    recorded as ``copy`` or ``multipart_copy``.
+    """
+
+    def __init__(
+        self,
+        s3,
+        source_key: str,
+        target_key: str,
+        content_type: str,
+        config: TransferConfig,
+    ):
+        self.s3 = s3
+        self.source_key = source_key
+        self.target_key = target_key
+        self.content_type = content_type
+        self.threshold = min(config.multipart_threshold, S3_MAX_COPY_OBJECT_SIZE)
+        self.part_size = max(config.multipart_chunksize, S3_MIN_PART_SIZE)
+        self.max_concurrency = max(config.max_request_concurrency, 1)
+        self.max_attempts = max(settings.AWS_S3_COPY_PART_ATTEMPTS, 1)
+
+    def run(self) -> None:
+        size = self.s3.head_object(Bucket=AWS_BUCKET_NAME, Key=self.source_key)[
+            "ContentLength"
+        ]
+        if size <= self.threshold:
+            with transfer_metrics.measure("copy", ByteCounter()) as counter:
+                # Metadata is set again, as for the multipart path
+                self.s3.copy_object(
+                    Bucket=AWS_BUCKET_NAME,
+                    Key=self.target_key,
+                    CopySource={"Bucket": AWS_BUCKET_NAME, "Key": self.source_key},
+                    ContentType=self.content_type,
+                    ContentDisposition="inline",
+                    MetadataDirective="REPLACE",
+                )
+                counter(size)
+            return
+
+        with transfer_metrics.measure("multipart_copy", ByteCounter()) as counter:
+            self._copy_parts(size, counter)
+
+    def _part_ranges(self, size: int) -> list:
+        part_size = max(self.part_size, -(-size // S3_MAX_PARTS))
+        return [
+            (number, start, min(start + part_size, size) - 1)
+            for number, start in enumerate(range(0, size, part_size), start=1)
+        ]
+
+    def _copy_parts(self, size: int, counter: ByteCounter) -> None:
+        upload_id = self.s3.create_multipart_upload(
+            Bucket=AWS_BUCKET_NAME,
+            Key=self.target_key,
+            ContentType=self.content_type,
+            ContentDisposition="inline",
+        )["UploadId"]
+
+        ranges = self._part_ranges(size)
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_concurrency, len(ranges))
+        )
+        try:
+            futures = [
+                executor.submit(self._copy_part, upload_id, *part, counter)
+                for part in ranges
+            ]
+            parts = [future.result() for future in futures]
+            self.s3.complete_multipart_upload(
+                Bucket=AWS_BUCKET_NAME,
+                Key=self.target_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            executor.shutdown(cancel_futures=True)
+            try:
+                self.s3.abort_multipart_upload(
+                    Bucket=AWS_BUCKET_NAME, Key=self.target_key, UploadId=upload_id
+                )
+            except (ClientError, BotoCoreError) as e:
+                print(f"Erreur annulation copie S3: {e}")
+            raise
+        finally:
+            executor.shutdown()
+
+    def _copy_part(
+        self, upload_id: str, part_number: int, first: int, last: int, counter
+    ) -> dict:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                response = self.s3.upload_part_copy(
+                    Bucket=AWS_BUCKET_NAME,
+                    Key=self.target_key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    CopySource={"Bucket": AWS_BUCKET_NAME, "Key": self.source_key},
+                    CopySourceRange=f"bytes={first}-{last}",
+                )
+            except (ClientError, BotoCoreError) as e:
+                if attempt == self.max_attempts or not _is_retryable(e):
+                    raise
+                print(f"Erreur copie S3 partie {part_number} ({attempt}): {e}")
+                time.sleep(COPY_PART_RETRY_DELAY * 2 ** (attempt - 1))
+                continue
+
+            counter(last - first + 1)
+            return {
+                "PartNumber": part_number,
+                "ETag": response["CopyPartResult"]["ETag"],
+            }
+
 
 class AwsPhotoSaver(PhotoSaverRepository):
 
+    def __init__(self):
+        self._s3_client = None
+        self._s3_client_lock = threading.Lock()
+
     def _generate_unique_name(self, file_name: str):
-        return f"{uuid4()}_{file_name}"
+        # Always "<uuid>_<name>" in the folder: see core.imaging.DERIVATIVE_NAME
+        return f"{uuid4()}_{posixpath.basename(file_name)}"
 
-    def _get_s3_client(self):
-        s3 = boto3.client(
-            "s3",
-            aws_access_key_id=AWS_ACCESS_KEY,
-            aws_secret_access_key=AWS_SECRET_KEY,
-            region_name=AWS_REGION,
+    def _get_client_config(self) -> Config:
+        return Config(
+            max_pool_connections=settings.AWS_S3_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            connect_timeout=settings.AWS_S3_CONNECT_TIMEOUT,
+            read_timeout=settings.AWS_S3_READ_TIMEOUT,
+            retries={
+                "mode": "adaptive",
+                "max_attempts": settings.AWS_S3_MAX_ATTEMPTS,
+            },
         )
-        return s3
+
+    def _get_transfer_config(self, operation: str) -> TransferConfig:
+        """Build the TransferConfig of an operation ("upload" or "copy").
+
+        Values come from ``settings.AWS_S3_TRANSFER["default"]``, overridden
+        by the operation's own entry.
+        """
+        options = {
+            **settings.AWS_S3_TRANSFER["default"],
+            **settings.AWS_S3_TRANSFER.get(operation, {}),
+        }
+        return TransferConfig(**options)
+
+    def _get_s3_client(self):
+        # One client per saver (the app uses a single process-wide saver).
+        # Clients are thread-safe once built, but building one is not.
+        if self._s3_client is None:
+            with self._s3_client_lock:
+                if self._s3_client is None:
+                    self._s3_client = boto3.client(
+                        "s3",
+                        aws_access_key_id=AWS_ACCESS_KEY,
+                        aws_secret_access_key=AWS_SECRET_KEY,
+                        region_name=AWS_REGION,
+                        endpoint_url=AWS_S3_ENDPOINT_URL,
+                        config=self._get_client_config(),
+                    )
+        return self._s3_client
 
     def _get_content_type(self, file_name: str):
         content_type, _ = mimetypes.guess_type(file_name)
@@ -42,15 +365,18 @@ class AwsPhotoSaver(PhotoSaverRepository):
     def _upload_to_s3(self, file, file_key):
         s3 = self._get_s3_client()
         try:
-            s3.upload_fileobj(
-                file,
-                AWS_BUCKET_NAME,
-                file_key,
-                ExtraArgs={
-                    "ContentType": self._get_content_type(file.name),
-                    "ContentDisposition": "inline",
-                },
-            )
+            with transfer_metrics.measure("upload", ByteCounter()) as counter:
+                s3.upload_fileobj(
+                    file,
+                    AWS_BUCKET_NAME,
+                    file_key,
+                    ExtraArgs={
+                        "ContentType": self._get_content_type(file.name),
+                        "ContentDisposition": "inline",
+                    },
+                    Callback=counter,
+                    Config=self._get_transfer_config("upload"),
+                )
         except (NoCredentialsError, ClientError, BotoCoreError) as e:
             print(f"Erreur Upload S3: {e}")
             raise CloudUploadError("Échec de l'upload vers S3")
@@ -64,17 +390,41 @@ class AwsPhotoSaver(PhotoSaverRepository):
             print(f"Erreur Upload S3: {e}")
             raise CloudUploadError("Échec de la suppression depuis S3")
 
-    def save_within_folder(self, file, folder_album_id) -> str:
-        file_name = self._generate_unique_name(file.name)
-
-        file_key = f"{folder_album_id}/{file_name}"
+    def _build_folder_key(self, file_name: str, folder_album_id) -> str:
+        file_key = f"{folder_album_id}/{self._generate_unique_name(file_name)}"
 
         if DEBUG:
             file_key = f"debug_{file_key}"
 
+        return file_key
+
+    def folder_prefix(self, folder_album_id) -> str:
+        prefix = f"{folder_album_id}/"
+        return f"debug_{prefix}" if DEBUG else prefix
+
+    def save_within_folder(self, file, folder_album_id) -> str:
+        file_key = self._build_folder_key(file.name, folder_album_id)
+
+        self._upload_to_s3(file, file_key)
+        return self._get_s3_resource_url(file_key)
+
+    def save_derivative(self, file, source_url: str, width: int, format: str) -> str:
+        file_key = derivative_key(self._extract_key_from_url(source_url), width, format)
+
         self._upload_to_s3(file, file_key)
         return self._get_s3_resource_url(file_key)
 
+    def open_upload_stream(
+        self, file_name: str, folder_album_id, content_type: str = None
+    ) -> S3MultipartUploadStream:
+        file_key = self._build_folder_key(file_name, folder_album_id)
+        return S3MultipartUploadStream(
+            self._get_s3_client(),
+            file_key,
+            self._get_s3_resource_url(file_key),
+            content_type or self._get_content_type(file_name),
+        )
+
     def save(self, file) -> str:
         file_key = self._generate_unique_name(file.name)
 
@@ -85,6 +435,54 @@ class AwsPhotoSaver(PhotoSaverRepository):
 
         return self._get_s3_resource_url(file_key)
 
+    def create_presigned_upload(
+        self, file_name: str, folder_album_id, content_type: str, max_size: int
+    ) -> dict:
+        file_key = self._build_folder_key(file_name, folder_album_id)
+
+        s3 = self._get_s3_client()
+        try:
+            presigned = s3.generate_presigned_post(
+                Bucket=AWS_BUCKET_NAME,
+                Key=file_key,
+                Fields={"Content-Type": content_type, "Content-Disposition": "inline"},
+                Conditions=[
+                    {"Content-Type": content_type},
+                    {"Content-Disposition": "inline"},
+                    ["content-length-range", 1, max_size],
+                ],
+                ExpiresIn=settings.PHOTO_PRESIGNED_UPLOAD_EXPIRES,
+            )
+        except (NoCredentialsError, ClientError, BotoCoreError) as e:
+            print(f"Erreur presign S3: {e}")
+            raise CloudUploadError("Échec de la génération de l'URL d'upload S3")
+
+        return {
+            "url": presigned["url"],
+            "fields": presigned["fields"],
+            "image_url": self._get_s3_resource_url(file_key),
+        }
+
+    def stat(self, file_url: str):
+        file_key = self._extract_key_from_url(file_url)
+
+        s3 = self._get_s3_client()
+        try:
+            response = s3.head_object(Bucket=AWS_BUCKET_NAME, Key=file_key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return None
+            print(f"Erreur HEAD S3: {e}")
+            raise CloudUploadError("Échec de la lecture des métadonnées S3")
+        except (NoCredentialsError, BotoCoreError) as e:
+            print(f"Erreur HEAD S3: {e}")
+            raise CloudUploadError("Échec de la lecture des métadonnées S3")
+
+        return {
+            "size": response["ContentLength"],
+            "content_type": response.get("ContentType"),
+        }
+
     def _extract_key_from_url(self, file_url: str) -> str:
         prefix = f"https://{AWS_BUCKET_NAME}.s3.{AWS_REGION}.amazonaws.com/"
         if file_url.startswith(prefix):
@@ -115,15 +513,110 @@ class AwsPhotoSaver(PhotoSaverRepository):
         if DEBUG:
             new_key = f"debug_{new_key}"
 
-        s3 = self._get_s3_client()
         try:
-            s3.copy_object(
-                Bucket=AWS_BUCKET_NAME,
-                CopySource={"Bucket": AWS_BUCKET_NAME, "Key": source_key},
-                Key=new_key,
-            )
+            S3MultipartCopy(
+                self._get_s3_client(),
+                source_key,
+                new_key,
+                self._get_content_type(original_filename),
+                self._get_transfer_config("copy"),
+            ).run()
         except (NoCredentialsError, ClientError, BotoCoreError) as e:
             print(f"Erreur copie S3: {e}")
             raise CloudUploadError("Échec de la copie S3")
 
         return self._get_s3_resource_url(new_key)
+
+    def delete_many(self, file_urls: list) -> list:
+        keys = {}
+        for file_url in file_urls:
+            if file_url:
+                keys.setdefault(self._extract_key_from_url(file_url), file_url)
+
+        s3 = self._get_s3_client()
+        failed = []
+        key_list = list(keys)
+        for i in range(0, len(key_list), S3_DELETE_BATCH_SIZE):
+            chunk = key_list[i : i + S3_DELETE_BATCH_SIZE]
+            try:
+                response = s3.delete_objects(
+                    Bucket=AWS_BUCKET_NAME,
+                    Delete={
+                        "Objects": [{"Key": key} for key in chunk],
+                        "Quiet": True,
+                    },
+                )
+            except (NoCredentialsError, ClientError, BotoCoreError) as e:
+                print(f"Erreur suppression S3: {e}")
+                failed.extend(keys[key] for key in chunk)
+                continue
+
+            for error in response.get("Errors", []):
+                print(f"Erreur suppression S3: {error.get('Key')} {error.get('Code')}")
+                failed.append(keys[error["Key"]])
+
+        return failed
+
+    def _map_concurrently(self, function, items: list) -> list:
+        """Run a blocking S3 call per item on the shared, pooled client."""
+        if len(items) <= 1:
+            return [function(item) for item in items]
+        workers = min(settings.AWS_S3_BATCH_WORKERS, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(function, items))
+
+    def copy_many(self, source_urls: list, target_album_id) -> list:
+        def copy(source_url):
+            try:
+                return self.copy_file(source_url, target_album_id)
+            except CloudUploadError:
+                return None
+
+        return self._map_concurrently(copy, source_urls)
+
+    def exists_many(self, file_urls: list) -> dict:
+        # S3 has no batch HEAD: issue the requests concurrently instead
+        found = self._map_concurrently(self.stat, file_urls)
+        return {url: info is not None for url, info in zip(file_urls, found)}
+
+    def open_stream(self, file_url: str, start: int = 0, end: int = None):
+        params = {
+            "Bucket": AWS_BUCKET_NAME,
+            "Key": self._extract_key_from_url(file_url),
+        }
+        if start or end is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end}"
+
+        s3 = self._get_s3_client()
+        try:
+            return s3.get_object(**params)["Body"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                raise ResourceNotFound("File not found in storage")
+            print(f"Erreur lecture S3: {e}")
+            raise CloudUploadError("Échec de la lecture depuis S3")
+        except (NoCredentialsError, BotoCoreError) as e:
+            print(f"Erreur lecture S3: {e}")
+            raise CloudUploadError("Échec de la lecture depuis S3")
+
+    def list_prefix(self, prefix: str, page_size: int = 1000):
+        s3 = self._get_s3_client()
+        pages = s3.get_paginator("list_objects_v2").paginate(
+            Bucket=AWS_BUCKET_NAME,
+            Prefix=prefix,
+            PaginationConfig={"PageSize": page_size},
+        )
+        try:
+            for page in pages:
+                yield [
+                    {
+                        "key": item["Key"],
+                        "url": self._get_s3_resource_url(item["Key"]),
+                        "size": item["Size"],
+                        "last_modified": item["LastModified"],
+                    }
+                    for item in page.get("Contents", [])
+                ]
+        except (NoCredentialsError, ClientError, BotoCoreError) as e:
+            print(f"Erreur listage S3: {e}")
+            raise CloudUploadError("Échec du listage S3")
@@ -0,0 +1,307 @@
+from core.exceptions.exceptions import (
+    CloudUploadError,
+    ResourceNotFound,
+    StorageOperationNotSupported,
+)
+from core.imaging import derivative_key
+from core.interface.photo_saver_repository import PhotoSaverRepository, UploadStream
+from datetime import datetime, timezone
+from django.conf import settings
+from hashlib import sha256
+from pathlib import Path
+from urllib.parse import urlparse
+from uuid import uuid4
+import errno
+import fcntl
+import io
+import mimetypes
+import os
+import posixpath
+import shutil
+import tempfile
+
+# ioctl request cloning a file's extents (btrfs, XFS, overlayfs on top of them)
+FICLONE = 0x40049409
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Folder used on disk for keys saved without an album folder (album covers)
+ROOT_FOLDER = "_root"
+
+
+def _fsync_directory(directory: Path):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class LocalUploadStream(UploadStream):
+    """Write chunks to a temporary file renamed into place on completion."""
+
+    def __init__(self, path: Path, file_url: str):
+        self.path = path
+        self.file_url = file_url
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = tempfile.NamedTemporaryFile(
+            dir=self.path.parent, prefix=".upload-", delete=False
+        )
+
+    def write(self, chunk: bytes) -> None:
+        self._tmp.write(chunk)
+
+    def complete(self) -> str:
+        try:
+            self._tmp.flush()
+            os.fsync(self._tmp.fileno())
+            self._tmp.close()
+            os.replace(self._tmp.name, self.path)
+            _fsync_directory(self.path.parent)
+        except OSError as e:
+            print(f"Erreur écriture locale: {e}")
+            self.abort()
+            raise CloudUploadError("Échec de l'écriture du fichier")
+        return self.file_url
+
+    def abort(self) -> None:
+        self._tmp.close()
+        try:
+            os.unlink(self._tmp.name)
+        except FileNotFoundError:
+            pass
+
+
+class LocalPhotoSaver(PhotoSaverRepository):
+    """Store photos on the local filesystem under ``PHOTO_LOCAL_ROOT``.
+
+    Keys keep the S3 layout (``<album_id>/<uuid>_<name>``). On disk each
+    album folder is sharded by a hash of the file name,
+    ``<root>/<album_id>/ab/cd/<uuid>_<name>``, so no directory grows past a
+    few thousand entries. Files are served by ``LocalMediaView``.
+    """
+
+    def _generate_unique_name(self, file_name: str):
+        # Always "<uuid>_<name>" in the folder: see core.imaging.DERIVATIVE_NAME
+        return f"{uuid4()}_{posixpath.basename(file_name)}"
+
+    def _get_content_type(self, file_name: str):
+        content_type, _ = mimetypes.guess_type(file_name)
+        return content_type or "application/octet-stream"
+
+    def _root(self) -> Path:
+        return Path(settings.PHOTO_LOCAL_ROOT)
+
+    def _get_resource_url(self, file_key: str) -> str:
+        return f"{settings.PHOTO_LOCAL_BASE_URL}{file_key}"
+
+    def _extract_key_from_url(self, file_url: str) -> str:
+        prefix = settings.PHOTO_LOCAL_BASE_URL
+        if file_url.startswith(prefix):
+            return file_url[len(prefix) :]
+        # Fallback: take everything after the media path
+        path = urlparse(file_url).path
+        media_path = urlparse(prefix).path
+        return path[len(media_path) :] if path.startswith(media_path) else path
+
+    def relative_path_for_key(self, file_key: str) -> Path:
+        folder, _, name = file_key.rpartition("/")
+        parts = [folder or ROOT_FOLDER, name]
+        if any(part in ("", ".", "..") or "/" in part for part in parts):
+            raise ValueError(f"Invalid storage key: {file_key}")
+
+        digest = sha256(name.encode()).hexdigest()
+        return Path(parts[0], digest[:2], digest[2:4], name)
+
+    def path_of(self, relative_path: Path) -> Path:
+        """Absolute path of ``relative_path``, which must stay under the root."""
+        root = self._root().resolve()
+        path = (root / relative_path).resolve()
+        if not path.is_relative_to(root):
+            raise ValueError(f"Path outside the storage root: {relative_path}")
+        return path
+
+    def _path_for_key(self, file_key: str) -> Path:
+        return self.path_of(self.relative_path_for_key(file_key))
+
+    def _write_file(self, file, file_key: str):
+        stream = LocalUploadStream(
+            self._path_for_key(file_key), self._get_resource_url(file_key)
+        )
+        chunks = (
+            file.chunks()
+            if hasattr(file, "chunks")
+            else iter(lambda: file.read(COPY_CHUNK_SIZE), b"")
+        )
+        try:
+            for chunk in chunks:
+                stream.write(chunk)
+        except OSError as e:
+            print(f"Erreur écriture locale: {e}")
+            stream.abort()
+            raise CloudUploadError("Échec de l'écriture du fichier")
+        return stream.complete()
+
+    def save_within_folder(self, file, folder_album_id) -> str:
+        file_key = f"{folder_album_id}/{self._generate_unique_name(file.name)}"
+        return self._write_file(file, file_key)
+
+    def save(self, file) -> str:
+        return self._write_file(file, self._generate_unique_name(file.name))
+
+    def save_derivative(self, file, source_url: str, width: int, format: str) -> str:
+        file_key = derivative_key(self._extract_key_from_url(source_url), width, format)
+        return self._write_file(file, file_key)
+
+    def delete(self, file_url: str) -> bool:
+        if file_url is None or file_url == "":
+            return True
+
+        try:
+            os.unlink(self._path_for_key(self._extract_key_from_url(file_url)))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Erreur suppression locale: {e}")
+            raise CloudUploadError("Échec de la suppression du fichier")
+        return True
+
+    def _clone_file(self, source: Path, target: Path):
+        """Share the source blocks: hard link, else reflink, else plain copy."""
+        try:
+            os.link(source, target)
+            return
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+
+        with (
+            open(source, "rb") as src,
+            tempfile.NamedTemporaryFile(
+                dir=target.parent, prefix=".copy-", delete=False
+            ) as tmp,
+        ):
+            try:
+                try:
+                    fcntl.ioctl(tmp.fileno(), FICLONE, src.fileno())
+                except OSError:
+                    shutil.copyfileobj(src, tmp, COPY_CHUNK_SIZE)
+            except OSError:
+                os.unlink(tmp.name)
+                raise
+        os.replace(tmp.name, target)
+
+    def copy_file(self, source_url: str, target_album_id) -> str:
+        source_key = self._extract_key_from_url(source_url)
+        original_filename = source_key.split("/")[-1]
+        new_key = f"{target_album_id}/{self._generate_unique_name(original_filename)}"
+
+        target = self._path_for_key(new_key)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            self._clone_file(self._path_for_key(source_key), target)
+        except (OSError, ValueError) as e:
+            print(f"Erreur copie locale: {e}")
+            raise CloudUploadError("Échec de la copie du fichier")
+
+        return self._get_resource_url(new_key)
+
+    def open_upload_stream(
+        self, file_name: str, folder_album_id, content_type: str = None
+    ) -> LocalUploadStream:
+        file_key = f"{folder_album_id}/{self._generate_unique_name(file_name)}"
+        return LocalUploadStream(
+            self._path_for_key(file_key), self._get_resource_url(file_key)
+        )
+
+    def create_presigned_upload(
+        self, file_name: str, folder_album_id, content_type: str, max_size: int
+    ) -> dict:
+        raise StorageOperationNotSupported(
+            "Le stockage local ne gère pas l'upload direct."
+        )
+
+    def stat(self, file_url: str):
+        try:
+            key = self._extract_key_from_url(file_url)
+            size = self._path_for_key(key).stat().st_size
+        except (FileNotFoundError, ValueError):
+            return None
+
+        return {"size": size, "content_type": self._get_content_type(key)}
+
+    def open_stream(self, file_url: str, start: int = 0, end: int = None):
+        try:
+            file = open(self._path_for_key(self._extract_key_from_url(file_url)), "rb")
+        except (FileNotFoundError, ValueError):
+            raise ResourceNotFound("File not found in storage")
+
+        file.seek(start)
+        if end is None:
+            return file
+        return _BoundedReader(file, end - start + 1)
+
+    def _iter_keys(self, prefix: str):
+        folder, slash, _ = prefix.partition("/")
+        if slash:
+            # Keys of one folder only live under that folder on disk
+            folders = [self._root() / folder]
+        else:
+            folders = sorted(self._root().glob("*"))
+
+        for folder_path in folders:
+            for path in sorted(folder_path.glob("??/??/*")):
+                if path.name.startswith("."):
+                    continue  # temporary file of an ongoing write
+                if folder_path.name == ROOT_FOLDER:
+                    key = path.name
+                else:
+                    key = f"{folder_path.name}/{path.name}"
+                if key.startswith(prefix):
+                    yield key, path
+
+    def list_prefix(self, prefix: str, page_size: int = 1000):
+        page = []
+        for key, path in self._iter_keys(prefix):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            page.append(
+                {
+                    "key": key,
+                    "url": self._get_resource_url(key),
+                    "size": stat.st_size,
+                    "last_modified": datetime.fromtimestamp(
+                        stat.st_mtime, tz=timezone.utc
+                    ),
+                }
+            )
+            if len(page) == page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+
+class _BoundedReader(io.RawIOBase):
+    """Read at most ``length`` bytes of ``file``, then behave as at EOF."""
+
+    def __init__(self, file, length: int):
+        self._file = file
+        self._remaining = length
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(buffer)[: self._remaining]
+        read = self._file.readinto(view)
+        self._remaining -= read
+        return read
+
+    def close(self):
+        self._file.close()
+        super().close()
@@ -1,8 +1,32 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from asgiref.sync import sync_to_async
+from typing import Any, AsyncIterator, BinaryIO, Iterator, Optional
+
+
+class UploadStream(ABC):
+    """Incremental upload of a single file, fed chunk by chunk."""
+
+    @abstractmethod
+    def write(self, chunk: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def complete(self) -> str:
+        pass
+
+    @abstractmethod
+    def abort(self) -> None:
+        pass
 
 
 class PhotoSaverRepository(ABC):
+    """Photo storage.
+
+    Batch operations default to one call per item; implementations override
+    them when the backend has a cheaper bulk call. Every ``a``-prefixed
+    method is the async variant of its blocking counterpart and runs it in a
+    worker thread, outside the event loop.
+    """
 
     @abstractmethod
     def save_within_folder(self, file: Any, folder_album_id) -> str:
@@ -19,3 +43,131 @@ class PhotoSaverRepository(ABC):
     @abstractmethod
     def copy_file(self, source_url: str, target_album_id) -> str:
         pass
+
+    @abstractmethod
+    def create_presigned_upload(
+        self, file_name: str, folder_album_id, content_type: str, max_size: int
+    ) -> dict:
+        pass
+
+    @abstractmethod
+    def stat(self, file_url: str) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def open_upload_stream(
+        self, file_name: str, folder_album_id, content_type: str = None
+    ) -> UploadStream:
+        pass
+
+    @abstractmethod
+    def open_stream(self, file_url: str, start: int = 0, end: int = None) -> BinaryIO:
+        """Open the stored file for reading, optionally bytes start..end only.
+
+        ``end`` is inclusive, as in an HTTP Range header. The caller closes
+        the returned stream.
+        """
+        pass
+
+    @abstractmethod
+    def list_prefix(self, prefix: str, page_size: int = 1000) -> Iterator[list]:
+        """Yield pages of the files whose key starts with ``prefix``.
+
+        Each item is a dict with ``key``, ``url``, ``size`` and
+        ``last_modified``.
+        """
+        pass
+
+    @abstractmethod
+    def save_derivative(
+        self, file: Any, source_url: str, width: int, format: str
+    ) -> str:
+        """Store a file derived from ``source_url`` next to it.
+
+        Its key is ``core.imaging.derivative_key`` of the source key, so the
+        derivatives of a file can be found again from the file URL alone.
+        """
+        pass
+
+    def folder_prefix(self, folder_album_id) -> str:
+        """Key prefix of the files saved with ``save_within_folder``."""
+        return f"{folder_album_id}/"
+
+    def delete_many(self, file_urls: list) -> list:
+        """Delete files, return the URLs that could not be deleted."""
+        failed = []
+        for file_url in file_urls:
+            try:
+                self.delete(file_url)
+            except Exception:
+                failed.append(file_url)
+        return failed
+
+    def copy_many(self, source_urls: list, target_album_id) -> list:
+        """Copy files to an album, return the new URLs (None on failure)."""
+        new_urls = []
+        for source_url in source_urls:
+            try:
+                new_urls.append(self.copy_file(source_url, target_album_id))
+            except Exception:
+                new_urls.append(None)
+        return new_urls
+
+    def exists_many(self, file_urls: list) -> dict:
+        """Map each URL to whether the file is stored."""
+        return {file_url: self.stat(file_url) is not None for file_url in file_urls}
+
+    async def asave_within_folder(self, file: Any, folder_album_id) -> str:
+        return await sync_to_async(self.save_within_folder, thread_sensitive=False)(
+            file, folder_album_id
+        )
+
+    async def asave(self, file: Any) -> str:
+        return await sync_to_async(self.save, thread_sensitive=False)(file)
+
+    async def asave_derivative(
+        self, file: Any, source_url: str, width: int, format: str
+    ) -> str:
+        return await sync_to_async(self.save_derivative, thread_sensitive=False)(
+            file, source_url, width, format
+        )
+
+    async def adelete(self, file_url: str) -> bool:
+        return await sync_to_async(self.delete, thread_sensitive=False)(file_url)
+
+    async def acopy_file(self, source_url: str, target_album_id) -> str:
+        return await sync_to_async(self.copy_file, thread_sensitive=False)(
+            source_url, target_album_id
+        )
+
+    async def astat(self, file_url: str) -> Optional[dict]:
+        return await sync_to_async(self.stat, thread_sensitive=False)(file_url)
+
+    async def aopen_stream(
+        self, file_url: str, start: int = 0, end: int = None
+    ) -> BinaryIO:
+        return await sync_to_async(self.open_stream, thread_sensitive=False)(
+            file_url, start, end
+        )
+
+    async def adelete_many(self, file_urls: list) -> list:
+        return await sync_to_async(self.delete_many, thread_sensitive=False)(file_urls)
+
+    async def acopy_many(self, source_urls: list, target_album_id) -> list:
+        return await sync_to_async(self.copy_many, thread_sensitive=False)(
+            source_urls, target_album_id
+        )
+
+    async def aexists_many(self, file_urls: list) -> dict:
+        return await sync_to_async(self.exists_many, thread_sensitive=False)(file_urls)
+
+    async def alist_prefix(
+        self, prefix: str, page_size: int = 1000
+    ) -> AsyncIterator[list]:
+        pages = self.list_prefix(prefix, page_size)
+        next_page = sync_to_async(next, thread_sensitive=False)
+        while True:
+            page = await next_page(pages, None)
+            if page is None:
+                return
+            yield page
@@ -0,0 +1,96 @@
+from contextlib import contextmanager
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Size classes used to compare throughput of small photos and large media
+SIZE_CLASSES = [
+    ("<1MB", 1 * MB),
+    ("1-10MB", 10 * MB),
+    ("10-100MB", 100 * MB),
+    (">=100MB", None),
+]
+
+
+def _size_class(nbytes: int) -> str:
+    for label, upper_bound in SIZE_CLASSES:
+        if upper_bound is None or nbytes < upper_bound:
+            return label
+
+
+class ByteCounter:
+    """boto3 transfer ``Callback`` summing the bytes actually transferred."""
+
+    def __init__(self):
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, nbytes: int):
+        with self._lock:
+            self.bytes += nbytes
+
+
+class TransferMetrics:
+    """Thread-safe, in-process aggregate of storage transfer throughput.
+
+    Transfers are grouped by operation and size class so the multipart
+    settings can be tuned from real measurements.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, operation: str, nbytes: int, seconds: float, success=True):
+        key = (operation, _size_class(nbytes))
+        with self._lock:
+            stats = self._stats.setdefault(
+                key, {"count": 0, "failures": 0, "bytes": 0, "seconds": 0.0}
+            )
+            stats["count"] += 1
+            if success:
+                stats["bytes"] += nbytes
+                stats["seconds"] += seconds
+            else:
+                stats["failures"] += 1
+
+        if success and seconds > 0:
+            logger.info(
+                f"Transfer {operation}: {nbytes} bytes in {seconds:.3f}s "
+                f"({nbytes / MB / seconds:.2f} MB/s)"
+            )
+
+    @contextmanager
+    def measure(self, operation: str, counter: ByteCounter):
+        """Time the enclosed transfer and record the bytes seen by ``counter``."""
+        start = time.perf_counter()
+        try:
+            yield counter
+        except Exception:
+            self.record(operation, counter.bytes, time.perf_counter() - start, False)
+            raise
+        self.record(operation, counter.bytes, time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            items = [(key, dict(stats)) for key, stats in self._stats.items()]
+
+        snapshot = {}
+        for (operation, size_class), stats in sorted(items):
+            seconds = stats["seconds"]
+            stats["throughput_mb_s"] = (
+                round(stats["bytes"] / MB / seconds, 2) if seconds else None
+            )
+            snapshot.setdefault(operation, {})[size_class] = stats
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+
+transfer_metrics = TransferMetrics()
@@ -0,0 +1,108 @@
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+from core.imaging import METADATA_HEADER_SIZE
+from core.interface.photo_saver_repository import PhotoSaverRepository
+from hashlib import sha256
+
+
+class StreamedUploadedFile(UploadedFile):
+    """An uploaded file whose bytes already live in the photo storage.
+
+    ``url`` is the storage URL returned by the upload stream, the same value
+    ``save_within_folder`` would have returned. ``sha256`` is the hex digest
+    of the content, computed while streaming. ``header`` keeps the first
+    bytes of the content, enough to read the image metadata.
+    """
+
+    def __init__(
+        self,
+        url,
+        name,
+        size,
+        content_type,
+        charset=None,
+        sha256=None,
+        header=b"",
+    ):
+        super().__init__(None, name, content_type, size, charset)
+        self.url = url
+        self.sha256 = sha256
+        self.header = header
+
+    def open(self, mode=None):
+        raise ValueError("Streamed uploads are stored remotely and cannot be read.")
+
+
+class StreamingUploadHandler(FileUploadHandler):
+    """Forward incoming file chunks to the photo storage as they arrive.
+
+    Only the ``field_name`` file field is intercepted; other fields fall
+    through to Django's default handlers. The upload stream is aborted if the
+    request is interrupted before the file is complete.
+    """
+
+    def __init__(
+        self,
+        request=None,
+        repository: PhotoSaverRepository = None,
+        folder_album_id=None,
+        field_name: str = "image",
+    ):
+        super().__init__(request)
+        self.repository = repository
+        self.folder_album_id = folder_album_id
+        self.target_field_name = field_name
+        self.stream = None
+        self.hasher = None
+        self.header = None
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        if field_name != self.target_field_name:
+            return
+
+        self.stream = self.repository.open_upload_stream(
+            file_name, self.folder_album_id, content_type=self.content_type
+        )
+        self.hasher = sha256()
+        self.header = bytearray()
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.stream is None:
+            return raw_data
+
+        self.hasher.update(raw_data)
+        missing = METADATA_HEADER_SIZE - len(self.header)
+        if missing > 0:
+            self.header += raw_data[:missing]
+        self.stream.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.stream is None:
+            return None
+
+        url = self.stream.complete()
+        self.stream = None
+        return StreamedUploadedFile(
+            url,
+            self.file_name,
+            file_size,
+            self.content_type,
+            self.charset,
+            sha256=self.hasher.hexdigest(),
+            header=bytes(self.header),
+        )
+
+    def abort(self):
+        if self.stream is not None:
+            self.stream.abort()
+            self.stream = None
+
+    def upload_interrupted(self):
+        self.abort()
+
+    def upload_complete(self):
+        # A stream still open here never reached file_complete()
+        self.abort()
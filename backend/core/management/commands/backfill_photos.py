@@ -0,0 +1,56 @@
+from core.services.backfill_service import BACKFILL_TASKS, BackfillService
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill a derived field on the existing photos or album covers, in "
+        "parallel. Progress is saved after each batch: an interrupted run "
+        "resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("task", choices=sorted(BACKFILL_TASKS))
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Rows loaded and saved per batch (default: 200).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Files processed concurrently (default: 8).",
+        )
+        parser.add_argument(
+            "--rate-limit",
+            type=float,
+            default=None,
+            help="Files processed per second at most (default: no limit).",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Start over from the first row instead of the checkpoint.",
+        )
+
+    def handle(self, *args, **options):
+        def progress(checkpoint):
+            self.stdout.write(
+                f"{checkpoint.processed} rows processed, "
+                f"{checkpoint.failed} failed (up to id {checkpoint.last_id})"
+            )
+
+        checkpoint = BackfillService.run(
+            options["task"],
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            rate_limit=options["rate_limit"],
+            restart=options["restart"],
+            progress=progress,
+        )
+        self.stdout.write(
+            f"{options['task']}: {checkpoint.processed} rows processed, "
+            f"{checkpoint.updated} updated, {checkpoint.failed} failed"
+        )
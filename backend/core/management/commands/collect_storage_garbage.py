@@ -0,0 +1,61 @@
+from core.services.storage_gc_service import StorageGcService
+from django.core.management.base import BaseCommand
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete stored photo files that no Photo, blob or album cover "
+        "references. Scans every album folder by default."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prefix",
+            action="append",
+            dest="prefixes",
+            help="Only scan keys starting with this prefix (repeatable).",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Scan the whole storage, including album covers and the "
+            "folders of deleted albums.",
+        )
+        parser.add_argument(
+            "--grace-period",
+            type=int,
+            help="Keep files modified less than this many seconds ago "
+            "(default: STORAGE_GC_GRACE_PERIOD).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report orphans without deleting them.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Run forever, waiting this many seconds between runs.",
+        )
+
+    def handle(self, *args, **options):
+        prefixes = [""] if options["all"] else options["prefixes"]
+
+        while True:
+            stats = StorageGcService.collect(
+                prefixes=prefixes,
+                grace_period=options["grace_period"],
+                dry_run=options["dry_run"],
+            )
+            action = "would delete" if options["dry_run"] else "deleted"
+            count = stats["orphans"] if options["dry_run"] else stats["deleted"]
+            self.stdout.write(
+                f"{stats['scanned']} files scanned, {stats['orphans']} orphans, "
+                f"{action} {count}, {stats['failed']} failed"
+            )
+
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
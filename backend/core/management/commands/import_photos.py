@@ -0,0 +1,70 @@
+from core.services.photo_import_service import PhotoImportService
+from django.core.management.base import BaseCommand, CommandError
+from datetime import timedelta
+from rest_framework.exceptions import APIException
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a photo library from a directory or a ZIP archive (Google "
+        "Takeout exports included): every folder becomes an album. Contents an "
+        "album already holds are skipped, so an interrupted import resumes when "
+        "run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", help="Directory or ZIP archive to import.")
+        parser.add_argument(
+            "--album",
+            type=int,
+            default=None,
+            help="Import every photo into this album instead of one per folder.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Photos uploaded and inserted per batch (default: 100).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=8,
+            help="Files read and uploaded concurrently (default: 8).",
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+
+        def progress(stats):
+            elapsed = max(time.monotonic() - started, 1e-6)
+            rate = stats["processed_bytes"] / elapsed
+            left = stats["bytes"] - stats["processed_bytes"]
+            eta = timedelta(seconds=round(left / rate)) if rate else "?"
+            self.stdout.write(
+                f"{stats['processed']}/{stats['files']} files, "
+                f"{stats['processed'] / elapsed:.1f} files/s, "
+                f"{rate / 1e6:.1f} MB/s, ETA {eta}"
+            )
+
+        try:
+            stats = PhotoImportService.run(
+                options["source"],
+                album_id=options["album"],
+                batch_size=options["batch_size"],
+                workers=options["workers"],
+                progress=progress,
+            )
+        except APIException as e:
+            detail = e.detail
+            if isinstance(detail, dict):
+                detail = " ".join(str(m) for errors in detail.values() for m in errors)
+            raise CommandError(detail)
+
+        elapsed = timedelta(seconds=round(time.monotonic() - started))
+        self.stdout.write(
+            f"{stats['files']} files in {elapsed}: {stats['imported']} imported, "
+            f"{stats['skipped']} skipped, {stats['failed']} failed "
+            f"({len(stats['album_ids'])} albums)"
+        )
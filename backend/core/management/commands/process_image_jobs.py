@@ -0,0 +1,97 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from core.image_pool import create, default_processes
+from core.imaging import render_all
+from core.services.image_job_service import ImageJobService
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+import threading
+import time
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the queued photo derivatives. Images are rendered in a pool "
+        "of worker processes, so transcoding never runs in the web server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Rendering processes (default: IMAGE_WORKER_PROCESSES_PER_CPU "
+            "per CPU).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            help="Seconds between queue polls when idle (default: "
+            "IMAGE_WORKER_POLL_INTERVAL).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no job is due instead of waiting for new ones.",
+        )
+
+    def handle(self, *args, **options):
+        processes = options["processes"] or default_processes()
+        poll_interval = options["poll_interval"] or settings.IMAGE_WORKER_POLL_INTERVAL
+        self.stdout.write(f"Image worker started with {processes} processes")
+
+        with (
+            create(processes) as pool,
+            ThreadPoolExecutor(
+                max_workers=processes, thread_name_prefix="image-job"
+            ) as threads,
+        ):
+            done, failed = self._process(
+                pool, threads, processes, poll_interval, options["once"]
+            )
+
+        self.stdout.write(f"{done} jobs done, {failed} failed")
+
+    def _process(self, pool, threads, processes, poll_interval, once):
+        broken = threading.Event()
+
+        def render(data: bytes) -> list:
+            # Storage and database work stays in the threads of this process
+            try:
+                return pool.submit(render_all, data).result()
+            except BrokenProcessPool:
+                broken.set()
+                raise
+
+        running = set()
+        done = failed = 0
+        while True:
+            if len(running) < processes:
+                for job in ImageJobService.claim(processes - len(running)):
+                    running.add(threads.submit(self._run, job, render))
+
+            if not running:
+                if once:
+                    return done, failed
+                time.sleep(poll_interval)
+                continue
+
+            finished, running = wait(
+                running, timeout=poll_interval, return_when=FIRST_COMPLETED
+            )
+            for future in finished:
+                if future.result() is None:
+                    failed += 1
+                else:
+                    done += 1
+
+            if broken.is_set():
+                # Jobs of the dead processes are retried by the next worker
+                raise CommandError("An image worker process died, exiting.")
+
+    @staticmethod
+    def _run(job, render):
+        try:
+            return ImageJobService.run(job, render)
+        finally:
+            close_old_connections()
@@ -0,0 +1,24 @@
+from core.services.album_stats_service import AlbumStatsService
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the photo count, total bytes and latest photo date of every "
+        "album from a single grouped query over the photos, and fix the albums "
+        "whose stored values drifted. Best run while no photos are written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Albums updated per query (default: 500).",
+        )
+
+    def handle(self, *args, **options):
+        stats = AlbumStatsService.repair(batch_size=options["batch_size"])
+        self.stdout.write(
+            f"{stats['albums']} albums checked, {stats['repaired']} repaired"
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_photoblob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="album",
+            name="cover_derivatives",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name="photo",
+            name="derivatives",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
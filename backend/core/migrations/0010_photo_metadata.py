@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_imagejob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="photo",
+            name="bytes",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="photo",
+            name="height",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="photo",
+            name="lat",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="photo",
+            name="lon",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="photo",
+            name="mime",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name="photo",
+            name="taken_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="photo",
+            name="width",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="photo",
+            index=models.Index(
+                fields=["taken_at"], name="core_photo_taken_a_05e554_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="photo",
+            index=models.Index(fields=["lat", "lon"], name="core_photo_lat_83e3cb_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="photo",
+            index=models.Index(
+                fields=["width", "height"], name="core_photo_width_3e0f20_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="photo",
+            index=models.Index(fields=["bytes"], name="core_photo_bytes_57ef68_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="photo",
+            index=models.Index(fields=["mime"], name="core_photo_mime_a8538c_idx"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_photo_metadata"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="photo",
+            name="phash",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
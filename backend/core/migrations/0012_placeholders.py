@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_photo_phash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="album",
+            name="cover_placeholder",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="photo",
+            name="placeholder",
+            field=models.TextField(blank=True, default=""),
+        ),
+    ]
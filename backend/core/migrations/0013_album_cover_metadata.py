@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_placeholders"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="album",
+            name="cover_bytes",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="album",
+            name="cover_height",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="album",
+            name="cover_mime",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name="album",
+            name="cover_width",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
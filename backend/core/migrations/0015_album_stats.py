@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:24
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def fill_album_stats(apps, schema_editor):
+    Album = apps.get_model("core", "Album")
+    Photo = apps.get_model("core", "Photo")
+    stats = (
+        Photo.objects.order_by()
+        .values("album_id")
+        .annotate(count=Count("id"), bytes=Sum("bytes"), last=Max("created_at"))
+    )
+    albums = []
+    for row in stats:
+        album = Album(pk=row["album_id"])
+        album.photo_count = row["count"]
+        album.total_bytes = row["bytes"] or 0
+        album.last_photo_at = row["last"]
+        albums.append(album)
+    Album.objects.bulk_update(
+        albums, ["photo_count", "total_bytes", "last_photo_at"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_backfillcheckpoint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="album",
+            name="last_photo_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="album",
+            name="photo_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="album",
+            name="total_bytes",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_album_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0015_album_stats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="album",
+            index=models.Index(
+                fields=["created_at", "id"], name="core_album_created_84349d_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bucketpoint",
+            index=models.Index(
+                fields=["created_at", "id"], name="core_bucket_created_995d84_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["created_at", "id"], name="core_messag_created_d22abb_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="photo",
+            index=models.Index(
+                fields=["album", "created_at", "id"],
+                name="core_photo_album_i_e10348_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:57
+
+from django.db import migrations, models
+
+
+def copy_blob_derivatives(apps, schema_editor):
+    # Derivatives were recorded on the photos sharing the blob only
+    PhotoBlob = apps.get_model("core", "PhotoBlob")
+    Photo = apps.get_model("core", "Photo")
+    blobs = []
+    rows = (
+        Photo.objects.filter(blob__isnull=False)
+        .exclude(derivatives=[])
+        .order_by("blob_id")
+        .values_list("blob_id", "derivatives")
+    )
+    for blob_id, derivatives in rows.iterator():
+        if not blobs or blobs[-1].pk != blob_id:
+            blob = PhotoBlob(pk=blob_id)
+            blob.derivatives = derivatives
+            blobs.append(blob)
+    PhotoBlob.objects.bulk_update(blobs, ["derivatives"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0016_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="photoblob",
+            name="derivatives",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(copy_blob_derivatives, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
 from .message import Message
 from .bucketpoint import BucketPoint
 from .album import Album
+from .photo_blob import PhotoBlob
 from .photo import Photo
+from .image_job import ImageJob
+from .backfill_checkpoint import BackfillCheckpoint
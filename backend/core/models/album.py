@@ -7,6 +7,23 @@ class Album(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     cover_image = models.URLField(max_length=200, blank=True, null=True)
+    # Resized copies of the cover: [{"url", "width", "format"}, ...]
+    cover_derivatives = models.JSONField(default=list, blank=True)
+    # Tiny preview of the cover (data: URI), shown while it loads
+    cover_placeholder = models.TextField(blank=True, default="")
+    # Read from the cover file headers at upload; null when unknown
+    cover_width = models.PositiveIntegerField(blank=True, null=True)
+    cover_height = models.PositiveIntegerField(blank=True, null=True)
+    cover_bytes = models.BigIntegerField(blank=True, null=True)
+    cover_mime = models.CharField(max_length=100, blank=True, null=True)
+    # Kept up to date by the photo write paths, see AlbumStatsService
+    photo_count = models.PositiveIntegerField(default=0)
+    total_bytes = models.BigIntegerField(default=0)
+    last_photo_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        # Keyset pagination, see core.pagination
+        indexes = [models.Index(fields=["created_at", "id"])]
 
     def __str__(self):
         return self.title
@@ -0,0 +1,19 @@
+from django.db import models
+
+
+class BackfillCheckpoint(models.Model):
+    """Progress of a photo backfill task, saved after each batch."""
+
+    task = models.CharField(max_length=50, unique=True)
+    # Photos are walked by id: the next batch starts after this one
+    last_id = models.BigIntegerField(default=0)
+    processed = models.BigIntegerField(default=0)
+    updated = models.BigIntegerField(default=0)
+    failed = models.BigIntegerField(default=0)
+    started_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Set once every photo was visited; the next run starts over
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Backfill {self.task} at photo {self.last_id}"
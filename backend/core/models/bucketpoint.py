@@ -7,5 +7,9 @@ class BucketPoint(models.Model):
     completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Keyset pagination, see core.pagination
+        indexes = [models.Index(fields=["created_at", "id"])]
+
     def __str__(self):
         return self.title
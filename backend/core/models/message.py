@@ -8,5 +8,9 @@ class Message(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.BooleanField(default=False)
 
+    class Meta:
+        # Keyset pagination, see core.pagination
+        indexes = [models.Index(fields=["created_at", "id"])]
+
     def __str__(self):
         return f"Message from {self.user.username} at {self.created_at}"
@@ -1,5 +1,6 @@
 from django.db import models
 from .album import Album
+from .photo_blob import PhotoBlob
 
 
 class Photo(models.Model):
@@ -9,6 +10,39 @@ class Photo(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     location = models.CharField(max_length=255, blank=True, null=True)
+    # Null for photos stored before content deduplication
+    blob = models.ForeignKey(
+        PhotoBlob,
+        on_delete=models.PROTECT,
+        related_name="photos",
+        blank=True,
+        null=True,
+    )
+    # Resized copies of the image: [{"url", "width", "format"}, ...]
+    derivatives = models.JSONField(default=list, blank=True)
+    # Tiny preview of the image (data: URI), shown while it loads
+    placeholder = models.TextField(blank=True, default="")
+    # Read from the file headers at upload; null when unknown
+    taken_at = models.DateTimeField(blank=True, null=True)
+    lat = models.FloatField(blank=True, null=True)
+    lon = models.FloatField(blank=True, null=True)
+    width = models.PositiveIntegerField(blank=True, null=True)
+    height = models.PositiveIntegerField(blank=True, null=True)
+    bytes = models.BigIntegerField(blank=True, null=True)
+    mime = models.CharField(max_length=100, blank=True, null=True)
+    # 64-bit perceptual hash (signed), set with the derivatives
+    phash = models.BigIntegerField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["taken_at"]),
+            models.Index(fields=["lat", "lon"]),
+            models.Index(fields=["width", "height"]),
+            models.Index(fields=["bytes"]),
+            models.Index(fields=["mime"]),
+            # Keyset pagination of an album, see core.pagination
+            models.Index(fields=["album", "created_at", "id"]),
+        ]
 
     def __str__(self):
         return f"Photo in {self.album.title} - {self.caption or 'No Caption'}"
@@ -0,0 +1,16 @@
+from django.db import models
+
+
+class PhotoBlob(models.Model):
+    """A stored file shared by every Photo with the same content."""
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    url = models.URLField(max_length=200)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    # Derivatives of the file, deleted with it
+    derivatives = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Blob {self.sha256[:12]} ({self.ref_count} refs)"
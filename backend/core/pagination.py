@@ -0,0 +1,158 @@
+from datetime import datetime, time
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from urllib import parse
+import base64
+import binascii
+
+# Newest first, the id breaking ties between rows created at the same instant
+ORDERING = ("-created_at", "-pk")
+REVERSE_ORDERING = ("created_at", "pk")
+
+
+class KeysetPagination(BasePagination):
+    """Pages of rows ordered by ``(created_at, id)``, newest first.
+
+    A cursor holds the position of the row a page starts after, so every
+    page is an index range scan of ``page_size`` rows, however deep: no
+    ``COUNT(*)``, no ``OFFSET``. Cursors go both ways: ``next`` to older
+    rows, ``previous`` to newer ones. ``at`` (a date or a datetime) jumps
+    to the first page of rows created at or before it. Models need an index
+    on ``(created_at, id)``, prefixed by the columns they are filtered on.
+    """
+
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    date_query_param = "at"
+    invalid_cursor_message = "Invalid cursor"
+
+    def requested(self, request) -> bool:
+        """Whether the request asks for a page rather than every row."""
+        return any(
+            param in request.query_params
+            for param in (
+                self.cursor_query_param,
+                self.page_size_query_param,
+                self.date_query_param,
+            )
+        )
+
+    def get_page_size(self, request) -> int:
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def decode_cursor(self, request):
+        """``((created_at, id), reverse)`` of the cursor, None without one."""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            query = parse.parse_qs(base64.urlsafe_b64decode(token.encode()).decode())
+            created_at = parse_datetime(query["p"][0])
+            pk = int(query["i"][0])
+            reverse = query.get("r", ["0"])[0] == "1"
+        except (KeyError, ValueError, binascii.Error, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return (created_at, pk), reverse
+
+    def encode_cursor(self, position: tuple, reverse: bool) -> str:
+        created_at, pk = position
+        query = {"p": created_at.isoformat(), "i": pk}
+        if reverse:
+            query["r"] = 1
+        token = base64.urlsafe_b64encode(parse.urlencode(query).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_date(self, request):
+        """The ``at`` anchor; a date stands for the end of that day."""
+        value = request.query_params.get(self.date_query_param)
+        if not value:
+            return None
+        try:
+            day = parse_date(value)
+            if day is not None:
+                anchor = datetime.combine(day, time.max)
+            else:
+                anchor = parse_datetime(value)
+        except ValueError:
+            anchor = None
+        if anchor is None:
+            raise ValidationError({self.date_query_param: "Date invalide."})
+        if timezone.is_naive(anchor):
+            anchor = timezone.make_aware(anchor)
+        return anchor
+
+    @staticmethod
+    def _position(row) -> tuple:
+        return row.created_at, row.pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        size = self.get_page_size(request)
+        # Links carry the cursor, never the anchor it came from
+        self.base_url = remove_query_param(
+            request.build_absolute_uri(), self.date_query_param
+        )
+        self.next = self.previous = None
+
+        cursor = self.decode_cursor(request)
+        anchor = None if cursor else self.decode_date(request)
+        if cursor is None:
+            position, reverse = None, False
+            page = queryset
+            if anchor is not None:
+                page = queryset.filter(created_at__lte=anchor)
+        else:
+            (created_at, pk), reverse = cursor
+            position = (created_at, pk)
+            if reverse:
+                page = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+                )
+            else:
+                page = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+                )
+
+        rows = list(
+            page.order_by(*(REVERSE_ORDERING if reverse else ORDERING))[: size + 1]
+        )
+        more = len(rows) > size
+        rows = rows[:size]
+
+        if reverse and not more:
+            # Back at the newest rows: that is the first page
+            rows = list(queryset.order_by(*ORDERING)[: size + 1])
+            more = len(rows) > size
+            rows = rows[:size]
+            reverse, position, anchor = False, None, None
+        elif reverse:
+            rows.reverse()
+            self.next = self.encode_cursor(self._position(rows[-1]), False)
+            self.previous = self.encode_cursor(self._position(rows[0]), True)
+            return rows
+
+        if more:
+            self.next = self.encode_cursor(self._position(rows[-1]), False)
+        if rows and (position or anchor):
+            self.previous = self.encode_cursor(self._position(rows[0]), True)
+        elif position:
+            self.previous = self.encode_cursor(position, True)
+        elif anchor:
+            # Nothing at or before the anchor: newer rows come after it
+            self.previous = self.encode_cursor((anchor, 0), True)
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.next, "previous": self.previous, "results": data})
@@ -1,5 +1,15 @@
 from .message import MessageSerializer
 from .bucketpoint import BucketPointSerializer
 from .album import AlbumSerializer
-from .photo import PhotoSerializer, TargetAlbumSerializer
+from .photo import (
+    PhotoSerializer,
+    TargetAlbumSerializer,
+    BulkTargetAlbumSerializer,
+    PresignedUploadSerializer,
+    ConfirmUploadSerializer,
+    PhotoMetadataSerializer,
+    BlobCheckSerializer,
+    DuplicateQuerySerializer,
+    RenderQuerySerializer,
+)
 from .user import UserSerializer
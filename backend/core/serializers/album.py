@@ -1,10 +1,12 @@
 from rest_framework import serializers
 from ..models.album import Album
-from ..models.photo import Photo
+from .fields import SrcsetField
 
 
 class AlbumSerializer(serializers.ModelSerializer):
-    nb_photos = serializers.SerializerMethodField()
+    # Maintained on the album, never counted per request
+    nb_photos = serializers.IntegerField(source="photo_count", read_only=True)
+    cover_srcset = SrcsetField(source="cover_derivatives")
 
     class Meta:
         model = Album
@@ -15,12 +17,27 @@ class AlbumSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
             "cover_image",
+            "cover_srcset",
+            "cover_placeholder",
+            "cover_width",
+            "cover_height",
+            "cover_bytes",
+            "cover_mime",
             "nb_photos",
+            "total_bytes",
+            "last_photo_at",
+        ]
+        read_only_fields = [
+            "created_at",
+            "updated_at",
+            "cover_placeholder",
+            "cover_width",
+            "cover_height",
+            "cover_bytes",
+            "cover_mime",
+            "total_bytes",
+            "last_photo_at",
         ]
-        read_only_fields = ["created_at", "updated_at"]
-
-    def get_nb_photos(self, album):
-        return Photo.objects.filter(album=album).count()
 
     def create(self, validated_data):
         request = self.context.get("request")
@@ -0,0 +1,24 @@
+from rest_framework import serializers
+
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+class SrcsetField(serializers.ReadOnlyField):
+    """Render stored derivatives as one ``srcset`` string per MIME type.
+
+    ``{"image/webp": "<url> 320w, <url> 640w", ...}``, ready for the
+    ``<source type srcset>`` elements of a ``<picture>``. Formats are listed
+    from the most to the least efficient.
+    """
+
+    def to_representation(self, derivatives):
+        srcset = {}
+        for derivative in sorted(derivatives or [], key=lambda d: d["width"]):
+            srcset.setdefault(derivative["format"], []).append(
+                f"{derivative['url']} {derivative['width']}w"
+            )
+        return {
+            MIME_TYPES[format]: ", ".join(srcset[format])
+            for format in MIME_TYPES
+            if format in srcset
+        }
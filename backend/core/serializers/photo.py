@@ -1,10 +1,13 @@
+from django.conf import settings
 from rest_framework import serializers
 from ..models.photo import Photo
 from .album import AlbumSerializer
+from .fields import SrcsetField
 
 
 class PhotoSerializer(serializers.ModelSerializer):
     album = AlbumSerializer(read_only=True)
+    srcset = SrcsetField(source="derivatives")
 
     class Meta:
         model = Photo
@@ -12,12 +15,32 @@ class PhotoSerializer(serializers.ModelSerializer):
             "id",
             "album",
             "image_url",
+            "srcset",
+            "placeholder",
             "caption",
             "created_at",
             "updated_at",
             "location",
+            "taken_at",
+            "lat",
+            "lon",
+            "width",
+            "height",
+            "bytes",
+            "mime",
+        ]
+        read_only_fields = [
+            "placeholder",
+            "created_at",
+            "updated_at",
+            "taken_at",
+            "lat",
+            "lon",
+            "width",
+            "height",
+            "bytes",
+            "mime",
         ]
-        read_only_fields = ["created_at", "updated_at"]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -29,12 +52,73 @@ class PhotoSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         if request and not request.user.is_authenticated:
             return None
-        album = self.context.get("album")
+        album = validated_data.pop("album", None) or self.context.get("album")
         if not album:
             raise serializers.ValidationError({"album": "Album manquant"})
 
+        blob = self.context.get("blob")
+        if blob is not None:
+            validated_data["blob"] = blob
+        validated_data.update(self.context.get("metadata") or {})
+
         return Photo.objects.create(album=album, **validated_data)
 
 
 class TargetAlbumSerializer(serializers.Serializer):
     target_album_id = serializers.IntegerField()
+
+
+class BulkTargetAlbumSerializer(TargetAlbumSerializer):
+    photo_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=1000,
+    )
+
+
+class PresignedUploadSerializer(serializers.Serializer):
+    file_name = serializers.CharField(max_length=150)
+    content_type = serializers.ChoiceField(
+        choices=settings.PHOTO_UPLOAD_ALLOWED_CONTENT_TYPES
+    )
+
+
+class PhotoMetadataSerializer(serializers.Serializer):
+    caption = serializers.CharField(
+        max_length=255, required=False, allow_blank=True, allow_null=True
+    )
+    location = serializers.CharField(
+        max_length=255, required=False, allow_blank=True, allow_null=True
+    )
+
+
+class ConfirmUploadSerializer(PhotoMetadataSerializer):
+    upload_token = serializers.CharField()
+
+
+class DuplicateQuerySerializer(serializers.Serializer):
+    # Bits two perceptual hashes may differ by (default:
+    # PHOTO_DUPLICATE_DISTANCE)
+    distance = serializers.IntegerField(min_value=0, max_value=32, required=False)
+
+
+class RenderQuerySerializer(serializers.Serializer):
+    w = serializers.IntegerField(min_value=1)
+    # Negotiated from the Accept header when missing
+    fmt = serializers.ChoiceField(choices=["avif", "webp", "jpeg"], required=False)
+
+    def validate_w(self, value):
+        maximum = settings.PHOTO_RENDER_MAX_WIDTH
+        if value > maximum:
+            raise serializers.ValidationError(
+                f"La largeur ne peut pas dépasser {maximum} px."
+            )
+        return value
+
+
+class BlobCheckSerializer(serializers.Serializer):
+    hashes = serializers.ListField(
+        child=serializers.RegexField(r"^[0-9a-f]{64}$"),
+        allow_empty=False,
+        max_length=1000,
+    )
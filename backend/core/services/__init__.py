@@ -2,4 +2,7 @@ from .message_service import MessageService
 from .album_service import AlbumService
 from .bucketpoints_service import BucketPointService
 from .photo_service import PhotoService
+from .duplicate_service import DuplicateService
+from .render_service import RenderService
+from .album_export_service import AlbumExportService
 from .user_service import UserService
@@ -0,0 +1,239 @@
+from asgiref.sync import sync_to_async
+from core.dependencies import photo_repository
+from core.models import Album, Photo
+from core.zipstream import ZipEntry, ZipLayout
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.text import slugify
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from rest_framework.exceptions import NotFound
+import logging
+import queue
+import re
+import threading
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Storage reads are consumed in chunks of this size; each object read ahead
+# buffers EXPORT_QUEUE_CHUNKS of them at most
+EXPORT_CHUNK_SIZE = 256 * 1024
+EXPORT_QUEUE_CHUNKS = 8
+
+# Single range only: "bytes=start-end", "bytes=start-" or "bytes=-suffix"
+BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _Prefetcher:
+    """Read data ranges in order, ``depth`` storage objects ahead.
+
+    Each object is read by a thread into a bounded queue of chunks, so at
+    most ``depth + 1`` objects of ``EXPORT_QUEUE_CHUNKS`` chunks are held in
+    memory whatever the size of the album.
+    """
+
+    def __init__(self, ranges: list, depth: int):
+        self._ranges = iter(ranges)
+        self._pending = deque()
+        self._closed = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=depth + 1)
+        for _ in range(depth + 1):
+            self._start_next()
+
+    def _start_next(self) -> None:
+        item = next(self._ranges, None)
+        if item is None:
+            return
+        entry, first, last = item
+        chunks = queue.Queue(maxsize=EXPORT_QUEUE_CHUNKS)
+        self._pending.append((entry, chunks))
+        self._executor.submit(self._read, chunks, entry.source, first, last)
+
+    def _put(self, chunks: queue.Queue, item) -> bool:
+        while not self._closed.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _read(self, chunks: queue.Queue, url: str, first: int, last: int) -> None:
+        try:
+            with photo_repository.open_stream(url, first, last) as stream:
+                for chunk in iter(lambda: stream.read(EXPORT_CHUNK_SIZE), b""):
+                    if not self._put(chunks, chunk):
+                        return
+        except Exception as e:
+            self._put(chunks, e)
+            return
+        self._put(chunks, None)
+
+    def chunks(self, entry: ZipEntry):
+        """Yield the data of ``entry``, the next range in order."""
+        pending, chunks = self._pending.popleft()
+        if pending is not entry:
+            raise RuntimeError("Export data read out of order")
+        self._start_next()
+        while True:
+            try:
+                item = chunks.get(timeout=0.1)
+            except queue.Empty:
+                # Closed: the reader stopped without a word
+                if self._closed.is_set():
+                    return
+                continue
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def close(self) -> None:
+        self._closed.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AlbumExportService:
+    """Albums as ZIP archives of their photo files, streamed.
+
+    Entries are stored, not deflated: photos are already compressed, and
+    stored entries make the archive layout and size known before any file
+    is read. Any byte range of the archive can then be produced, to resume
+    an interrupted download. CRC-32s, needed after each file, are kept in
+    the cache so a resumed download does not read the skipped files again.
+    """
+
+    @staticmethod
+    def _entries(album_id: int) -> list:
+        entries = []
+        names = set()
+        photos = (
+            Photo.objects.filter(album_id=album_id)
+            .select_related("blob")
+            .order_by("pk")
+        )
+        for photo in photos.iterator():
+            size = photo.bytes
+            if size is None and photo.blob is not None:
+                size = photo.blob.size
+            if size is None:
+                info = photo_repository.stat(photo.image_url)
+                if info is None:
+                    logger.warning(f"Photo {photo.pk} missing from the export")
+                    continue
+                size = info["size"]
+
+            # Stored keys are "<album_id>/<uuid>_<original name>"
+            name = photo.image_url.rsplit("/", 1)[-1].split("_", 1)[-1]
+            if name in names:
+                name = f"{photo.pk}_{name}"
+            names.add(name)
+            entries.append(
+                ZipEntry(
+                    name, size, photo.taken_at or photo.created_at, photo.image_url
+                )
+            )
+        return entries
+
+    @classmethod
+    def layout(cls, album_id: int) -> dict:
+        """Layout, name and strong ETag of the archive of an album."""
+        title = Album.objects.filter(pk=album_id).values_list("title", flat=True)
+        if not title:
+            raise NotFound(f"Album with id {album_id} not found")
+
+        entries = cls._entries(album_id)
+        # Stored files never change content, so names and URLs identify it
+        digest = sha256()
+        for entry in entries:
+            digest.update(
+                b"%s\n%s\n%d\n" % (entry.name, entry.source.encode(), entry.size)
+            )
+        return {
+            "layout": ZipLayout(entries),
+            "filename": f"{slugify(title[0]) or f'album-{album_id}'}.zip",
+            "etag": f'"{digest.hexdigest()[:32]}"',
+        }
+
+    @staticmethod
+    def parse_range(header: str, size: int):
+        """``(start, end)`` of a single byte range, None to send everything.
+
+        An unsatisfiable range starts at ``size``.
+        """
+        match = BYTE_RANGE.match(header.strip())
+        if match is None or match.groups() == ("", ""):
+            return None
+        first, last = match.groups()
+        if not first:
+            suffix = int(last)
+            return (max(size - suffix, 0) if suffix else size), size - 1
+        if last and int(last) < int(first):
+            return None
+        return int(first), (min(int(last), size - 1) if last else size - 1)
+
+    @staticmethod
+    def _crc_key(url: str) -> str:
+        return f"album-export:crc32:{sha256(url.encode()).hexdigest()}"
+
+    @classmethod
+    def _crc_of(cls, entry: ZipEntry) -> int:
+        crc = cache.get(cls._crc_key(entry.source))
+        if crc is None:
+            crc = 0
+            with photo_repository.open_stream(entry.source) as stream:
+                for chunk in iter(lambda: stream.read(EXPORT_CHUNK_SIZE), b""):
+                    crc = zlib.crc32(chunk, crc)
+            cache.set(cls._crc_key(entry.source), crc, None)
+        return crc
+
+    @classmethod
+    def stream(cls, layout: ZipLayout, start: int, end: int):
+        """Yield the archive bytes ``start`` to ``end`` (inclusive)."""
+        prefetcher = _Prefetcher(
+            layout.data_ranges(start, end), settings.ALBUM_EXPORT_PREFETCH
+        )
+        try:
+            yield from cls._iter_bytes(layout, start, end, prefetcher)
+        finally:
+            prefetcher.close()
+
+    @classmethod
+    async def astream(cls, layout: ZipLayout, start: int, end: int):
+        """``stream`` for ASGI servers, as an async generator.
+
+        Django reads a sync iterator whole before sending the first byte of
+        an ASGI response; chunks are pulled here one at a time instead, in a
+        worker thread. The prefetcher is closed however the response ends,
+        client disconnections included.
+        """
+        prefetcher = _Prefetcher(
+            layout.data_ranges(start, end), settings.ALBUM_EXPORT_PREFETCH
+        )
+        chunks = cls._iter_bytes(layout, start, end, prefetcher)
+        pull = sync_to_async(next, thread_sensitive=False)
+        try:
+            while (chunk := await pull(chunks, None)) is not None:
+                yield chunk
+        finally:
+            # Also ends a pull still waiting on the storage
+            prefetcher.close()
+
+    @classmethod
+    def _iter_bytes(cls, layout: ZipLayout, start: int, end: int, prefetcher):
+        def read_data(entry, first, last):
+            if first or last < entry.size - 1:
+                yield from prefetcher.chunks(entry)
+                return
+            # Whole file sent: its CRC-32 comes for free
+            crc = 0
+            for chunk in prefetcher.chunks(entry):
+                crc = zlib.crc32(chunk, crc)
+                yield chunk
+            entry.crc = crc
+            cache.set(cls._crc_key(entry.source), crc, None)
+
+        return layout.iter_bytes(start, end, read_data, cls._crc_of)
@@ -1,8 +1,20 @@
-from ..models import Album
+from ..models import Album, Photo
 from ..serializers import AlbumSerializer
+from core import background
 from core.dependencies import photo_repository
+from core.services.derivative_service import DerivativeService
+from core.services.photo_blob_service import PhotoBlobService
+from core.services.photo_metadata_service import PhotoMetadataService
+from core.websocket.utils import send_ws_message_to_user
+from core.websocket.messages import WebSocketMessageType
 from rest_framework.exceptions import NotFound, ValidationError
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count
 from django.shortcuts import get_object_or_404
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class AlbumService:
@@ -15,7 +27,9 @@ class AlbumService:
     @staticmethod
     def createAlbum(raw_data, file):
         data = raw_data.copy()
+        cover = {}
         if "image" in file and file["image"]:
+            cover = PhotoMetadataService.for_cover(file["image"])
             link = photo_repository.save(file["image"])
             data["cover_image"] = link
 
@@ -24,15 +38,23 @@ class AlbumService:
         if not serializer.is_valid():
             raise ValidationError(serializer.errors)
 
-        serializer.save()
+        serializer.save(**cover)
+        DerivativeService.schedule([serializer.instance.cover_image])
         return serializer.data
 
     @staticmethod
     def _replace_cover_image(data, album, file):
         if album.cover_image and album.cover_image != "":
             photo_repository.delete(album.cover_image)
+            photo_repository.delete_many(
+                DerivativeService.derivative_urls(album.cover_derivatives)
+            )
+            for field, value in PhotoMetadataService.for_cover(file["image"]).items():
+                setattr(album, field, value)
             link = photo_repository.save(file["image"])
             data["cover_image"] = link
+            album.cover_derivatives = []
+            album.cover_placeholder = ""
         return data
 
     @classmethod
@@ -50,5 +72,58 @@ class AlbumService:
             raise ValidationError(serializer.errors)
 
         serializer.save()
+        DerivativeService.schedule([album.cover_image])
         # TODO: Use websockets to notify other users about the new album
         return serializer.data
+
+    @classmethod
+    def deleteAlbum(cls, id):
+        """Delete an album and its photos.
+
+        Rows go in one transaction; the cover and the photo files are removed
+        from the storage in the background, with batched deletes, once it
+        commits.
+        """
+        with transaction.atomic():
+            album = get_object_or_404(Album.objects.select_for_update(), pk=id)
+            photos = Photo.objects.filter(album_id=id)
+            # Photos without a blob own their file; blob files are shared
+            files = list(
+                photos.filter(blob__isnull=True).values_list("image_url", "derivatives")
+            )
+            blob_counts = dict(
+                photos.filter(blob__isnull=False)
+                .values("blob_id")
+                .annotate(photos=Count("id"))
+                .values_list("blob_id", "photos")
+            )
+            if album.cover_image:
+                files.append((album.cover_image, album.cover_derivatives))
+
+            album.delete()
+            if blob_counts:
+                PhotoBlobService.release_many(blob_counts)
+            if files:
+                transaction.on_commit(
+                    lambda: background.submit(cls._delete_files, id, files)
+                )
+
+        logger.info(f"Album {id} deleted with {len(files)} own files")
+        cls._broadcast_change(WebSocketMessageType.ALBUM_DELETED, {"id": id})
+
+    @staticmethod
+    def _delete_files(album_id, files: list) -> None:
+        failed = photo_repository.delete_many(DerivativeService.with_derivatives(files))
+        if failed:
+            # Left for the orphan garbage collection
+            logger.warning(
+                f"Album {album_id}: {len(failed)} files could not be deleted"
+            )
+
+    @staticmethod
+    def _broadcast_change(message_type: WebSocketMessageType, message_data: dict):
+        """Broadcast an album change to all authenticated users."""
+        recipients = User.objects.all().values_list("id", flat=True)
+
+        for uid in recipients:
+            send_ws_message_to_user(uid, message_type, message_data)
@@ -0,0 +1,140 @@
+from core.models import Album, Photo
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    Max,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATS_FIELDS = ["photo_count", "total_bytes", "last_photo_at"]
+
+
+def _subtract(field: str, amount: int) -> Case:
+    """``field - amount``, or 0 if it would go below zero.
+
+    The condition is tested before subtracting: the columns are unsigned on
+    MySQL, where a negative intermediate result is an error.
+    """
+    return Case(
+        When(**{f"{field}__gte": amount}, then=F(field) - amount),
+        default=Value(0),
+    )
+
+
+class AlbumStatsService:
+    """Photo count, total bytes and latest photo date stored on albums.
+
+    Every path creating, deleting or moving photos updates the albums it
+    touches with ``F()`` expressions, in one UPDATE per album, so concurrent
+    writes never lose an increment. The latest date cannot be decremented:
+    an album losing photos takes it again from its remaining ones, in the
+    same UPDATE. ``repair`` recomputes everything should they drift.
+    """
+
+    @staticmethod
+    def _by_album(photos, album_id: int = None) -> dict:
+        grouped = {}
+        for photo in photos:
+            stats = grouped.setdefault(
+                album_id or photo.album_id, {"count": 0, "bytes": 0, "last": None}
+            )
+            stats["count"] += 1
+            stats["bytes"] += photo.bytes or 0
+            if stats["last"] is None or photo.created_at > stats["last"]:
+                stats["last"] = photo.created_at
+        return grouped
+
+    @classmethod
+    def add(cls, photos, album_id: int = None) -> None:
+        """Count ``photos`` in their album, or in ``album_id`` if given."""
+        for album_id, stats in cls._by_album(photos, album_id).items():
+            Album.objects.filter(pk=album_id).update(
+                photo_count=F("photo_count") + stats["count"],
+                total_bytes=F("total_bytes") + stats["bytes"],
+                last_photo_at=Greatest(
+                    Coalesce(F("last_photo_at"), Value(stats["last"])),
+                    Value(stats["last"]),
+                ),
+            )
+
+    @classmethod
+    def remove(cls, photos, album_id: int = None) -> None:
+        """Stop counting ``photos``, gone from their album or ``album_id``."""
+        for album_id, stats in cls._by_album(photos, album_id).items():
+            Album.objects.filter(pk=album_id).update(
+                # Never below zero, even if they drifted: repair fixes them
+                photo_count=_subtract("photo_count", stats["count"]),
+                total_bytes=_subtract("total_bytes", stats["bytes"]),
+                last_photo_at=Subquery(
+                    Photo.objects.filter(album_id=OuterRef("pk"))
+                    .order_by("-created_at")
+                    .values("created_at")[:1]
+                ),
+            )
+
+    @classmethod
+    def move(cls, photos, target_album_id: int, source_album_id: int = None) -> None:
+        """Move the counts of ``photos`` from their album to the target.
+
+        ``source_album_id`` is their album, for photos already changed.
+        """
+        photos = list(photos)
+        cls.remove(photos, source_album_id)
+        cls.add(photos, target_album_id)
+
+    @staticmethod
+    def resize(changes) -> None:
+        """Count the new size of photos whose ``bytes`` changed in place.
+
+        ``changes`` are ``(photo, previous bytes)`` pairs, such as the photos
+        a metadata backfill just measured.
+        """
+        deltas = {}
+        for photo, previous in changes:
+            delta = (photo.bytes or 0) - (previous or 0)
+            deltas[photo.album_id] = deltas.get(photo.album_id, 0) + delta
+        for album_id, delta in deltas.items():
+            if delta > 0:
+                total_bytes = F("total_bytes") + delta
+            elif delta < 0:
+                total_bytes = _subtract("total_bytes", -delta)
+            else:
+                continue
+            Album.objects.filter(pk=album_id).update(total_bytes=total_bytes)
+
+    @staticmethod
+    def repair(batch_size: int = 500) -> dict:
+        """Recompute the statistics of every album; return how many drifted.
+
+        All of them come from a single grouped query over the photos.
+        """
+        computed = {
+            row["album_id"]: (row["count"], row["bytes"] or 0, row["last"])
+            for row in Photo.objects.order_by()
+            .values("album_id")
+            .annotate(count=Count("id"), bytes=Sum("bytes"), last=Max("created_at"))
+        }
+        stats = {"albums": 0, "repaired": 0}
+        drifted = []
+        for album in Album.objects.only(*STATS_FIELDS).iterator():
+            stats["albums"] += 1
+            expected = computed.get(album.pk, (0, 0, None))
+            if (album.photo_count, album.total_bytes, album.last_photo_at) != expected:
+                logger.warning(f"Statistics of album {album.pk} repaired")
+                album.photo_count, album.total_bytes, album.last_photo_at = expected
+                drifted.append(album)
+
+        with transaction.atomic():
+            Album.objects.bulk_update(drifted, STATS_FIELDS, batch_size=batch_size)
+        stats["repaired"] = len(drifted)
+        return stats
@@ -0,0 +1,223 @@
+from core.dependencies import photo_repository
+from core.models import Album, BackfillCheckpoint, Photo
+from core.services.album_stats_service import AlbumStatsService
+from core.services.derivative_service import DerivativeService
+from core.services.photo_metadata_service import (
+    COVER_FIELDS,
+    METADATA_FIELDS,
+    PhotoMetadataService,
+)
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillTask:
+    """A field derived from a stored file, to fill on old rows.
+
+    ``pending`` selects the rows of ``model`` lacking it, whose file URL is
+    ``url_field``. ``compute`` gets one of them and returns the values of
+    ``fields``, or None when they could not be computed; it runs in a worker
+    thread and must not use the database, beyond the ``related`` rows
+    loaded along.
+    """
+
+    def __init__(
+        self,
+        pending: Q,
+        compute,
+        fields,
+        model=Photo,
+        url_field: str = "image_url",
+        related=(),
+    ):
+        self.pending = pending
+        self.compute = compute
+        self.fields = fields
+        self.model = model
+        self.url_field = url_field
+        self.related = related
+
+
+def _metadata(photo: Photo):
+    return PhotoMetadataService.from_storage(
+        photo.image_url, photo.blob.size if photo.blob else None
+    )
+
+
+def _cover_metadata(album: Album):
+    metadata = PhotoMetadataService.from_storage(album.cover_image)
+    return {f"cover_{field}": metadata[field] for field in COVER_FIELDS}
+
+
+def _previews(photo: Photo):
+    previews = DerivativeService.stored_previews(photo.image_url, photo.derivatives)
+    return previews if previews["placeholder"] else None
+
+
+def _cover_previews(album: Album):
+    previews = DerivativeService.stored_previews(
+        album.cover_image, album.cover_derivatives
+    )
+    placeholder = previews["placeholder"]
+    return {"cover_placeholder": placeholder} if placeholder else None
+
+
+def _phash(photo: Photo):
+    if photo.derivatives:
+        previews = DerivativeService.stored_previews(photo.image_url, photo.derivatives)
+    else:
+        # Not processed yet: hashed from the original
+        with photo_repository.open_stream(photo.image_url) as stream:
+            previews = DerivativeService.previews(stream.read(), photo.image_url)
+    return previews if previews["phash"] is not None else None
+
+
+HAS_COVER = ~Q(cover_image__isnull=True) & ~Q(cover_image="")
+MAY_BE_IMAGE = Q(mime__isnull=True) | Q(mime__startswith="image/")
+
+# New derived fields register their task here
+BACKFILL_TASKS = {
+    "metadata": BackfillTask(
+        Q(mime__isnull=True), _metadata, METADATA_FIELDS, related=["blob"]
+    ),
+    "cover_metadata": BackfillTask(
+        Q(cover_mime__isnull=True) & HAS_COVER,
+        _cover_metadata,
+        [f"cover_{field}" for field in COVER_FIELDS],
+        model=Album,
+        url_field="cover_image",
+    ),
+    "previews": BackfillTask(
+        Q(placeholder="") & ~Q(derivatives=[]), _previews, ["phash", "placeholder"]
+    ),
+    "cover_previews": BackfillTask(
+        Q(cover_placeholder="") & ~Q(cover_derivatives=[]) & HAS_COVER,
+        _cover_previews,
+        ["cover_placeholder"],
+        model=Album,
+        url_field="cover_image",
+    ),
+    "phash": BackfillTask(Q(phash__isnull=True) & MAY_BE_IMAGE, _phash, ["phash"]),
+}
+
+
+class RateLimiter:
+    """Space calls to ``wait`` out to at most ``rate`` per second."""
+
+    def __init__(self, rate: float = None, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1 / rate if rate else 0
+        self._clock = clock
+        self._sleep = sleep
+        self._next = clock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        now = self._clock()
+        if self._next > now:
+            self._sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+class BackfillService:
+    """Resumable, parallel fill of fields derived from photo and cover files.
+
+    Rows are walked by id, one batch at a time; the files of a batch are
+    processed by a pool of threads, each file once however many rows share
+    it. A batch is saved in the same transaction as the checkpoint
+    recording it, so a run stopped at any point resumes after the last
+    saved batch. Rows that failed stay pending for the next full run.
+    """
+
+    @staticmethod
+    def _checkpoint(name: str, restart: bool) -> BackfillCheckpoint:
+        checkpoint, _ = BackfillCheckpoint.objects.get_or_create(task=name)
+        if restart or checkpoint.finished_at or not checkpoint.started_at:
+            checkpoint.last_id = 0
+            checkpoint.processed = checkpoint.updated = checkpoint.failed = 0
+            checkpoint.started_at = timezone.now()
+            checkpoint.finished_at = None
+            checkpoint.save()
+        return checkpoint
+
+    @staticmethod
+    def _compute(task: BackfillTask, row):
+        try:
+            return task.compute(row)
+        except Exception as e:
+            logger.warning(f"Backfill of {task.model.__name__} {row.pk} failed: {e}")
+            return None
+
+    @classmethod
+    def run(
+        cls,
+        name: str,
+        batch_size: int = 200,
+        workers: int = 8,
+        rate_limit: float = None,
+        restart: bool = False,
+        progress=None,
+    ) -> BackfillCheckpoint:
+        """Run the ``name`` task from its checkpoint to the last row.
+
+        ``rate_limit`` caps the files processed per second; ``progress`` is
+        called with the checkpoint after each batch.
+        """
+        task = BACKFILL_TASKS[name]
+        checkpoint = cls._checkpoint(name, restart)
+        limiter = RateLimiter(rate_limit)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                rows = task.model.objects.filter(
+                    task.pending, pk__gt=checkpoint.last_id
+                ).order_by("pk")
+                if task.related:
+                    rows = rows.select_related(*task.related)
+                rows = list(rows[:batch_size])
+                if not rows:
+                    checkpoint.finished_at = timezone.now()
+                    checkpoint.save()
+                    return checkpoint
+
+                futures = {}
+                for row in rows:
+                    url = getattr(row, task.url_field)
+                    if url not in futures:
+                        limiter.wait()
+                        futures[url] = executor.submit(cls._compute, task, row)
+
+                updated = []
+                sizes = []
+                for row in rows:
+                    values = futures[getattr(row, task.url_field)].result()
+                    if values is None:
+                        checkpoint.failed += 1
+                        continue
+                    if task.model is Photo and "bytes" in task.fields:
+                        sizes.append((row, row.bytes))
+                    for field in task.fields:
+                        setattr(row, field, values[field])
+                    # bulk_update() skips auto_now
+                    row.updated_at = timezone.now()
+                    updated.append(row)
+
+                checkpoint.last_id = rows[-1].pk
+                checkpoint.processed += len(rows)
+                checkpoint.updated += len(updated)
+                with transaction.atomic():
+                    task.model.objects.bulk_update(
+                        updated, [*task.fields, "updated_at"]
+                    )
+                    # Album totals count the sizes measured now
+                    AlbumStatsService.resize(sizes)
+                    checkpoint.save()
+                if progress is not None:
+                    progress(checkpoint)
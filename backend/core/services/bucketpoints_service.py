@@ -8,6 +8,10 @@ from rest_framework.exceptions import ValidationError, NotFound
 
 class BucketPointService:
 
+    @staticmethod
+    def get_queryset():
+        return BucketPoint.objects.all()
+
     @staticmethod
     def get_all() -> list:
         bucket_points = BucketPoint.objects.all()
@@ -0,0 +1,166 @@
+from core.dependencies import photo_repository
+from core.imaging import (
+    derivative_key,
+    perceptual_hash,
+    placeholder,
+    render_all,
+    source_url_of,
+)
+from core.models import Album, ImageJob, Photo, PhotoBlob
+from django.core.files.base import ContentFile
+from django.utils import timezone
+import logging
+import mimetypes
+
+logger = logging.getLogger(__name__)
+
+
+class DerivativeService:
+    """Resized copies of photos and album covers, for responsive images.
+
+    Derivatives are keyed by the URL of the original, so photos sharing a
+    stored file (deduplicated or copied) share its derivatives too.
+    """
+
+    @staticmethod
+    def derivative_urls(derivatives: list) -> list:
+        """URLs of the stored ``derivatives``, for deletions."""
+        return [derivative["url"] for derivative in derivatives]
+
+    @classmethod
+    def with_derivatives(cls, files: list) -> list:
+        """URLs of ``files``, ``(url, derivatives)`` pairs, and of their derivatives."""
+        expanded = []
+        for url, derivatives in files:
+            if url:
+                expanded.append(url)
+                expanded.extend(cls.derivative_urls(derivatives))
+        return expanded
+
+    @staticmethod
+    def schedule(urls: list) -> None:
+        """Queue the derivatives of ``urls`` for the image worker.
+
+        Jobs are stored in the database, so they survive restarts. Callers
+        schedule once the rows using the files are committed.
+        """
+        urls = [url for url in dict.fromkeys(urls) if url]
+        queued = set(
+            ImageJob.objects.filter(
+                source_url__in=urls, status=ImageJob.PENDING
+            ).values_list("source_url", flat=True)
+        )
+        ImageJob.objects.bulk_create(
+            [ImageJob(source_url=url) for url in urls if url not in queued]
+        )
+
+    @staticmethod
+    def _known(url: str) -> list:
+        photo = Photo.objects.filter(image_url=url).exclude(derivatives=[]).first()
+        if photo is not None:
+            return photo.derivatives
+        album = (
+            Album.objects.filter(cover_image=url).exclude(cover_derivatives=[]).first()
+        )
+        return album.cover_derivatives if album is not None else []
+
+    @staticmethod
+    def _known_previews(url: str):
+        """Hash and placeholder already computed for ``url``, None if missing."""
+        photos = Photo.objects.filter(image_url=url)
+        if photos.exists():
+            return (
+                photos.filter(phash__isnull=False)
+                .exclude(placeholder="")
+                .values("phash", "placeholder")
+                .first()
+            )
+        # Album covers have no hash
+        placeholder = (
+            Album.objects.filter(cover_image=url)
+            .exclude(cover_placeholder="")
+            .values_list("cover_placeholder", flat=True)
+            .first()
+        )
+        return {"phash": None, "placeholder": placeholder} if placeholder else None
+
+    @staticmethod
+    def previews(data: bytes, url: str) -> dict:
+        """Perceptual hash and placeholder of an image, None/"" on failure."""
+        previews = {"phash": None, "placeholder": ""}
+        try:
+            previews["phash"] = perceptual_hash(data)
+            previews["placeholder"] = placeholder(data)
+        except Exception as e:
+            logger.warning(f"Previews of {url} could not be computed: {e}")
+        return previews
+
+    @classmethod
+    def stored_previews(cls, url: str, derivatives: list) -> dict:
+        """Previews from the smallest stored derivative: no more is needed."""
+        smallest = min(derivatives, key=lambda derivative: derivative["width"])
+        try:
+            with photo_repository.open_stream(smallest["url"]) as stream:
+                data = stream.read()
+        except Exception as e:
+            logger.warning(f"Previews of {url} could not be computed: {e}")
+            return {"phash": None, "placeholder": ""}
+        return cls.previews(data, url)
+
+    @staticmethod
+    def _assign(url: str, derivatives: list, previews: dict = None) -> None:
+        previews = previews or {}
+        photo_changes = {"derivatives": derivatives}
+        album_changes = {"cover_derivatives": derivatives}
+        if previews.get("phash") is not None:
+            photo_changes["phash"] = previews["phash"]
+            # update() skips auto_now: the duplicate trees check updated_at
+            photo_changes["updated_at"] = timezone.now()
+        if previews.get("placeholder"):
+            photo_changes["placeholder"] = previews["placeholder"]
+            album_changes["cover_placeholder"] = previews["placeholder"]
+        Photo.objects.filter(image_url=url).update(**photo_changes)
+        Album.objects.filter(cover_image=url).update(**album_changes)
+        PhotoBlob.objects.filter(url=url).update(derivatives=derivatives)
+
+    @classmethod
+    def generate(cls, url: str, render=render_all) -> list:
+        """Store the derivatives of the image at ``url`` and record them.
+
+        Files already processed (another photo with the same URL) are not
+        rendered again. Non-image files, such as videos, are left alone.
+        The perceptual hash and the placeholder are recorded along.
+        ``render`` turns the original bytes into the ``render_derivatives``
+        variants; the image worker runs it in a process pool.
+        """
+        derivatives = cls._known(url)
+        if derivatives:
+            previews = cls._known_previews(url)
+            if previews is None:
+                previews = cls.stored_previews(url, derivatives)
+            cls._assign(url, derivatives, previews)
+            return derivatives
+
+        content_type, _ = mimetypes.guess_type(source_url_of(url))
+        if not content_type or not content_type.startswith("image/"):
+            return []
+
+        with photo_repository.open_stream(url) as stream:
+            data = stream.read()
+
+        variants = render(data)
+        derivatives = []
+        for width, actual_width, format, content in variants:
+            link = photo_repository.save_derivative(
+                ContentFile(content, name=derivative_key("derivative", width, format)),
+                url,
+                width,
+                format,
+            )
+            derivatives.append({"url": link, "width": actual_width, "format": format})
+
+        # The smallest variant is enough for the previews, and quick to decode
+        previews = cls.previews(variants[0][3], url) if variants else None
+        cls._assign(url, derivatives, previews)
+        logger.info(f"{len(derivatives)} derivatives generated for {url}")
+        return derivatives
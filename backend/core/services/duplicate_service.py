@@ -0,0 +1,157 @@
+from core.models import Album, Photo
+from core.serializers import PhotoSerializer
+from collections import OrderedDict
+from django.db.models import Count, Max, Sum
+from rest_framework.exceptions import NotFound
+import threading
+
+HASH_MASK = (1 << 64) - 1
+# Albums whose BK-tree is kept, the least recently used dropped first
+CACHED_TREES = 32
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two 64-bit hashes (signed or not)."""
+    return ((a ^ b) & HASH_MASK).bit_count()
+
+
+class BKTree:
+    """Burkhard-Keller tree of 64-bit hashes under the Hamming distance.
+
+    Children are keyed by their distance to the parent, so a radius query
+    only descends into children whose key is within ``radius`` of the
+    query's distance to the node (triangle inequality), visiting a small
+    part of the tree instead of every hash.
+    """
+
+    def __init__(self):
+        self._root = None
+        self.size = 0
+
+    def add(self, value: int, item) -> None:
+        self.size += 1
+        # Node: [hash, items with this hash, {distance: child}]
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> list:
+        """Return the items whose hash is within ``radius`` bits of ``value``."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                found.extend(node[1])
+            for key, child in node[2].items():
+                if distance - radius <= key <= distance + radius:
+                    stack.append(child)
+        return found
+
+
+class DuplicateService:
+    """Near-duplicate photos of an album, by perceptual hash.
+
+    One BK-tree per album is kept in memory, for the ``CACHED_TREES`` most
+    recently used albums, and rebuilt lazily when the hashed photos of the
+    album changed since it was built. The check is a single aggregate query
+    on the album photos: their count and ids tell photos added or removed,
+    their latest ``updated_at`` a hash written again, as every hash writer
+    sets it.
+    """
+
+    _trees = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _hashed_photos(album_id: int):
+        return Photo.objects.filter(album_id=album_id, phash__isnull=False)
+
+    @classmethod
+    def _tree(cls, album_id: int) -> tuple:
+        """Return the BK-tree of the album and its photo hashes by id."""
+        version = tuple(
+            cls._hashed_photos(album_id)
+            .aggregate(count=Count("id"), ids=Sum("id"), updated=Max("updated_at"))
+            .values()
+        )
+        with cls._lock:
+            cached = cls._trees.get(album_id)
+            if cached is not None and cached[0] == version:
+                cls._trees.move_to_end(album_id)
+                return cached[1], cached[2]
+
+        hashes = dict(cls._hashed_photos(album_id).values_list("id", "phash"))
+        tree = BKTree()
+        for photo_id, phash in hashes.items():
+            tree.add(phash, photo_id)
+        with cls._lock:
+            cls._trees[album_id] = (version, tree, hashes)
+            cls._trees.move_to_end(album_id)
+            while len(cls._trees) > CACHED_TREES:
+                cls._trees.popitem(last=False)
+        return tree, hashes
+
+    @classmethod
+    def find_clusters(cls, album_id: int, distance: int) -> list:
+        """Group photos differing by at most ``distance`` bits.
+
+        Clusters are connected components: two photos are in the same
+        cluster if a chain of close photos links them. Returns lists of
+        photo ids, largest clusters first.
+        """
+        tree, hashes = cls._tree(album_id)
+
+        parents = {}
+
+        def root(photo_id):
+            while parents.get(photo_id, photo_id) != photo_id:
+                photo_id = parents[photo_id]
+            return photo_id
+
+        for photo_id, phash in hashes.items():
+            for other_id in tree.search(phash, distance):
+                a, b = root(photo_id), root(other_id)
+                if a != b:
+                    parents[max(a, b)] = min(a, b)
+
+        clusters = {}
+        for photo_id in sorted(hashes):
+            clusters.setdefault(root(photo_id), []).append(photo_id)
+        return sorted(
+            (cluster for cluster in clusters.values() if len(cluster) > 1),
+            key=lambda cluster: (-len(cluster), cluster[0]),
+        )
+
+    @classmethod
+    def get_duplicates(cls, album_id: int, distance: int) -> dict:
+        if not Album.objects.filter(pk=album_id).exists():
+            raise NotFound(f"Album with id {album_id} not found")
+
+        clusters = cls.find_clusters(album_id, distance)
+        photos = Photo.objects.select_related("album").in_bulk(
+            [photo_id for cluster in clusters for photo_id in cluster]
+        )
+        return {
+            "album_id": album_id,
+            "distance": distance,
+            "clusters": [
+                PhotoSerializer(
+                    [photos[photo_id] for photo_id in cluster], many=True
+                ).data
+                for cluster in clusters
+            ],
+        }
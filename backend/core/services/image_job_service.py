@@ -0,0 +1,101 @@
+from core.imaging import render_all
+from core.models import Album, ImageJob, Photo
+from core.serializers.fields import SrcsetField
+from core.services.derivative_service import DerivativeService
+from core.websocket.utils import send_ws_message_to_user
+from core.websocket.messages import WebSocketMessageType
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ImageJobService:
+    """Claim and run the derivative jobs queued by ``DerivativeService``.
+
+    Jobs are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``, so several
+    workers can share the queue. Done jobs are deleted; jobs failing
+    ``IMAGE_JOB_MAX_ATTEMPTS`` times are kept as failed for inspection.
+    """
+
+    @staticmethod
+    def claim(limit: int) -> list:
+        """Mark up to ``limit`` due jobs as running and return them."""
+        now = timezone.now()
+        abandoned = now - timedelta(seconds=settings.IMAGE_JOB_TIMEOUT)
+        with transaction.atomic():
+            jobs = list(
+                ImageJob.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=ImageJob.PENDING, available_at__lte=now)
+                    | Q(status=ImageJob.RUNNING, locked_at__lt=abandoned)
+                )
+                .order_by("available_at", "id")[:limit]
+            )
+            ImageJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+                status=ImageJob.RUNNING, locked_at=now, attempts=F("attempts") + 1
+            )
+
+        for job in jobs:
+            job.status = ImageJob.RUNNING
+            job.locked_at = now
+            job.attempts += 1
+        return jobs
+
+    @classmethod
+    def run(cls, job: ImageJob, render=render_all):
+        """Generate the derivatives of a claimed job, None if it failed."""
+        try:
+            derivatives = DerivativeService.generate(job.source_url, render)
+        except Exception as e:
+            cls._fail(job, e)
+            return None
+
+        ImageJob.objects.filter(pk=job.pk).delete()
+        if derivatives:
+            cls._announce(job.source_url, derivatives)
+        return derivatives
+
+    @staticmethod
+    def _fail(job: ImageJob, error: Exception) -> None:
+        logger.exception(f"Derivatives of {job.source_url} could not be generated")
+        if job.attempts >= settings.IMAGE_JOB_MAX_ATTEMPTS:
+            changes = {"status": ImageJob.FAILED}
+        else:
+            delay = settings.IMAGE_JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            changes = {
+                "status": ImageJob.PENDING,
+                "available_at": timezone.now() + timedelta(seconds=delay),
+            }
+        ImageJob.objects.filter(pk=job.pk).update(
+            locked_at=None, last_error=str(error), **changes
+        )
+
+    @classmethod
+    def _announce(cls, url: str, derivatives: list) -> None:
+        cls._broadcast_change(
+            WebSocketMessageType.PHOTO_DERIVATIVES_READY,
+            {
+                "image_url": url,
+                "srcset": SrcsetField().to_representation(derivatives),
+                "photo_ids": list(
+                    Photo.objects.filter(image_url=url).values_list("id", flat=True)
+                ),
+                "album_ids": list(
+                    Album.objects.filter(cover_image=url).values_list("id", flat=True)
+                ),
+            },
+        )
+
+    @staticmethod
+    def _broadcast_change(message_type: WebSocketMessageType, message_data: dict):
+        """Broadcast the new derivatives to all authenticated users."""
+        recipients = User.objects.all().values_list("id", flat=True)
+
+        for uid in recipients:
+            send_ws_message_to_user(uid, message_type, message_data)
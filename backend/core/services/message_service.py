@@ -53,7 +53,7 @@ class MessageService:
 
     @staticmethod
     def getAll():
-        return Message.objects.all().order_by("-created_at")
+        return Message.objects.select_related("user").order_by("-created_at")
 
     @classmethod
     def delete(cls, pk, user):
@@ -0,0 +1,140 @@
+from core import background
+from core.models import Photo, PhotoBlob
+from core.dependencies import photo_repository
+from core.services.derivative_service import DerivativeService
+from django.db import transaction
+from django.db.models import Count, F
+from hashlib import sha256
+import logging
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class PhotoBlobService:
+    """Reference-counted storage objects shared by identical photos.
+
+    Every Photo holding a blob owns one reference. The storage object is
+    deleted once the last reference is released.
+    """
+
+    @staticmethod
+    def hash_file(file) -> tuple[str, int]:
+        """Return the SHA-256 hex digest and size of an uploaded file."""
+        digest = sha256()
+        size = 0
+        if hasattr(file, "chunks"):
+            chunks = file.chunks(HASH_CHUNK_SIZE)
+        else:
+            chunks = iter(lambda: file.read(HASH_CHUNK_SIZE), b"")
+        for chunk in chunks:
+            digest.update(chunk)
+            size += len(chunk)
+        # The storage upload reads the file again from its current position
+        file.seek(0)
+        return digest.hexdigest(), size
+
+    @staticmethod
+    def find_existing(digests) -> list[str]:
+        """Return the digests, among ``digests``, already stored."""
+        return list(
+            PhotoBlob.objects.filter(sha256__in=set(digests)).values_list(
+                "sha256", flat=True
+            )
+        )
+
+    @staticmethod
+    def add_reference(digest: str, count: int = 1):
+        """Add references to the blob with this content, None if unknown."""
+        with transaction.atomic():
+            blob = PhotoBlob.objects.select_for_update().filter(sha256=digest).first()
+            if blob is None:
+                return None
+            PhotoBlob.objects.filter(pk=blob.pk).update(
+                ref_count=F("ref_count") + count
+            )
+        return blob
+
+    @staticmethod
+    def add_reference_by_id(blob_id: int, count: int = 1) -> None:
+        PhotoBlob.objects.filter(pk=blob_id).update(ref_count=F("ref_count") + count)
+
+    @staticmethod
+    def acquire(digest: str, url: str, size: int, count: int = 1) -> PhotoBlob:
+        """Register a freshly stored object and take ``count`` references.
+
+        If the same content was stored meanwhile, the existing blob is kept
+        and the new object, a duplicate, is removed from the storage.
+        """
+        with transaction.atomic():
+            blob, created = PhotoBlob.objects.select_for_update().get_or_create(
+                sha256=digest,
+                defaults={"url": url, "size": size, "ref_count": count},
+            )
+            if not created:
+                PhotoBlob.objects.filter(pk=blob.pk).update(
+                    ref_count=F("ref_count") + count
+                )
+
+        if blob.url != url:
+            photo_repository.delete(url)
+        return blob
+
+    @classmethod
+    def release(cls, blob_id: int, count: int = 1) -> None:
+        """Drop references; delete the blob and its object once unused."""
+        cls.release_many({blob_id: count})
+
+    @staticmethod
+    def release_many(counts: dict) -> None:
+        """Drop ``counts[blob_id]`` references from each blob.
+
+        Blobs left unused are deleted, and their objects removed from the
+        storage in one batch call, in the background, once the transaction
+        commits.
+        """
+        with transaction.atomic():
+            blobs = list(PhotoBlob.objects.select_for_update().filter(pk__in=counts))
+            emptied = [blob.pk for blob in blobs if blob.ref_count <= counts[blob.pk]]
+            remaining = dict(
+                Photo.objects.filter(blob_id__in=emptied)
+                .values("blob_id")
+                .annotate(photos=Count("id"))
+                .values_list("blob_id", "photos")
+            )
+
+            decrements = {}
+            unused = []
+            for blob in blobs:
+                if blob.ref_count > counts[blob.pk]:
+                    decrements.setdefault(counts[blob.pk], []).append(blob.pk)
+                elif remaining.get(blob.pk):
+                    # The counter drifted: trust the actual references
+                    logger.warning(
+                        f"Blob {blob.pk} ref_count fixed to {remaining[blob.pk]}"
+                    )
+                    PhotoBlob.objects.filter(pk=blob.pk).update(
+                        ref_count=remaining[blob.pk]
+                    )
+                else:
+                    unused.append(blob)
+
+            for count, blob_ids in decrements.items():
+                PhotoBlob.objects.filter(pk__in=blob_ids).update(
+                    ref_count=F("ref_count") - count
+                )
+
+            if unused:
+                PhotoBlob.objects.filter(pk__in=[blob.pk for blob in unused]).delete()
+                files = [(blob.url, blob.derivatives) for blob in unused]
+                transaction.on_commit(
+                    lambda: background.submit(PhotoBlobService._delete_objects, files)
+                )
+
+    @staticmethod
+    def _delete_objects(files: list) -> None:
+        failed = photo_repository.delete_many(DerivativeService.with_derivatives(files))
+        if failed:
+            # Left for the orphan garbage collection
+            logger.warning(f"{len(failed)} unused blob objects could not be deleted")
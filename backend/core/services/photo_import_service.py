@@ -0,0 +1,352 @@
+from core.dependencies import photo_repository
+from core.imaging import METADATA_HEADER_SIZE
+from core.models import Album, Photo
+from core.services.album_stats_service import AlbumStatsService
+from core.services.derivative_service import DerivativeService
+from core.services.photo_blob_service import PhotoBlobService
+from core.services.photo_metadata_service import PhotoMetadataService
+from core.websocket.utils import send_ws_message_to_user
+from core.websocket.messages import WebSocketMessageType
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.base import File
+from django.db import transaction
+from rest_framework.exceptions import NotFound, ValidationError
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+import json
+import logging
+import mimetypes
+import os
+import posixpath
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+# Google Takeout describes "<name>" in "<name>.json", or in
+# "<name>.supplemental-metadata.json" in recent exports
+SIDECAR_SUFFIXES = (".json", ".supplemental-metadata.json")
+
+ALBUM_TITLE_MAX_LENGTH = Album._meta.get_field("title").max_length
+CAPTION_MAX_LENGTH = Photo._meta.get_field("caption").max_length
+
+
+class _DirectorySource:
+    """Files of a local directory, by path relative to it."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.name = path.name
+
+    def files(self):
+        for root, dirs, names in os.walk(self.path):
+            dirs.sort()
+            for name in sorted(names):
+                path = Path(root, name)
+                yield path.relative_to(self.path).as_posix(), path.stat().st_size
+
+    def open(self, path: str):
+        return open(self.path / path, "rb")
+
+    def close(self) -> None:
+        pass
+
+
+class _ArchiveSource:
+    """Members of a ZIP archive, such as a Google Takeout export.
+
+    Members are read concurrently: ``ZipFile`` serializes the reads of the
+    underlying file itself.
+    """
+
+    def __init__(self, path: Path):
+        self.archive = zipfile.ZipFile(path)
+        self.name = path.stem
+
+    def files(self):
+        for info in self.archive.infolist():
+            if not info.is_dir():
+                yield info.filename, info.file_size
+
+    def open(self, path: str):
+        return self.archive.open(path)
+
+    def close(self) -> None:
+        self.archive.close()
+
+
+class ImportFile:
+    """A photo of the source, imported into the album titled ``album``."""
+
+    def __init__(self, path: str, size: int, album: str, sidecar: str = None):
+        self.path = path
+        self.name = posixpath.basename(path)
+        self.size = size
+        self.album = album
+        self.sidecar = sidecar
+
+
+class PhotoImportService:
+    """Bulk import of a photo library into albums, for migrations.
+
+    The source is a directory or a ZIP archive (Google Takeout exports
+    included); every folder holding photos becomes an album, found by title
+    or created. Files are handled in batches: hashed and read concurrently,
+    uploaded concurrently, each content once, and inserted in one query.
+    Contents an album already holds are skipped, so an interrupted import
+    is resumed by running it again. No event is broadcast per photo, a
+    single ``PHOTOS_IMPORTED`` summarizes the whole import.
+    """
+
+    @staticmethod
+    def open_source(source: str):
+        path = Path(source)
+        if path.is_dir():
+            return _DirectorySource(path)
+        if zipfile.is_zipfile(path):
+            return _ArchiveSource(path)
+        raise ValidationError(
+            {"source": "La source doit être un dossier ou une archive ZIP."}
+        )
+
+    @staticmethod
+    def scan(source, album_title: str = None) -> list:
+        """The photos of ``source``, with the Takeout sidecar of each one."""
+        files = dict(source.files())
+        allowed = set(settings.PHOTO_UPLOAD_ALLOWED_CONTENT_TYPES)
+        photos = []
+        for path, size in files.items():
+            content_type, _ = mimetypes.guess_type(path)
+            if content_type not in allowed:
+                continue
+            sidecar = next(
+                (
+                    path + suffix
+                    for suffix in SIDECAR_SUFFIXES
+                    if path + suffix in files
+                ),
+                None,
+            )
+            folder = posixpath.basename(posixpath.dirname(path)) or source.name
+            title = (album_title or folder)[:ALBUM_TITLE_MAX_LENGTH]
+            photos.append(ImportFile(path, size, title, sidecar))
+        return photos
+
+    @staticmethod
+    def _albums(titles) -> dict:
+        """Album id for each title, creating the albums missing."""
+        albums = {}
+        for title in sorted(set(titles)):
+            album = Album.objects.filter(title=title).order_by("pk").first()
+            if album is None:
+                album = Album.objects.create(title=title)
+                logger.info(f"Album {album.pk} created for the import of {title}")
+            albums[title] = album.pk
+        return albums
+
+    @staticmethod
+    def read_sidecar(data: bytes) -> dict:
+        """Photo columns described by a Takeout JSON sidecar."""
+        info = json.loads(data)
+        values = {}
+        timestamp = (info.get("photoTakenTime") or {}).get("timestamp")
+        if timestamp:
+            values["taken_at"] = datetime.fromtimestamp(int(timestamp), timezone.utc)
+        geo = info.get("geoData") or {}
+        # Takeout writes 0.0 for both when the place is unknown
+        if geo.get("latitude") or geo.get("longitude"):
+            values["lat"] = geo["latitude"]
+            values["lon"] = geo["longitude"]
+        if info.get("description"):
+            values["caption"] = info["description"][:CAPTION_MAX_LENGTH]
+        return values
+
+    @classmethod
+    def _prepare(cls, source, item: ImportFile):
+        """Digest and Photo columns of a file, None if it cannot be read."""
+        try:
+            with source.open(item.path) as raw:
+                digest, size = PhotoBlobService.hash_file(File(raw, name=item.name))
+                header = raw.read(METADATA_HEADER_SIZE)
+        except Exception as e:
+            logger.warning(f"Import of {item.path} failed: {e}")
+            return None
+
+        try:
+            columns = PhotoMetadataService.from_header(header, size, item.name)
+        except Exception as e:
+            logger.warning(f"Photo metadata could not be read: {e}")
+            columns = {}
+        if item.sidecar is not None:
+            try:
+                with source.open(item.sidecar) as raw:
+                    described = cls.read_sidecar(raw.read())
+            except Exception as e:
+                logger.warning(f"Sidecar {item.sidecar} could not be read: {e}")
+                described = {}
+            # The file headers win, the sidecar fills what they lack
+            for field, value in described.items():
+                if columns.get(field) is None:
+                    columns[field] = value
+        return digest, size, columns
+
+    @staticmethod
+    def _upload(source, item: ImportFile, album_id: int) -> str:
+        with source.open(item.path) as raw:
+            return photo_repository.save_within_folder(
+                File(raw, name=item.name), folder_album_id=album_id
+            )
+
+    @classmethod
+    def _import_batch(cls, source, batch: list, albums: dict, executor) -> dict:
+        stats = {"imported": 0, "skipped": 0, "failed": 0}
+
+        # One row per content and album: duplicates within the batch and
+        # contents the album already holds are skipped
+        groups = {}
+        for item, prepared in zip(
+            batch, executor.map(lambda item: cls._prepare(source, item), batch)
+        ):
+            if prepared is None:
+                stats["failed"] += 1
+                continue
+            digest, size, columns = prepared
+            group = groups.setdefault(digest, {"size": size, "rows": {}})
+            album_id = albums[item.album]
+            if album_id in group["rows"]:
+                stats["skipped"] += 1
+            else:
+                group["rows"][album_id] = (item, columns)
+
+        held = Photo.objects.filter(
+            album_id__in={
+                album_id for group in groups.values() for album_id in group["rows"]
+            },
+            blob__sha256__in=groups,
+        ).values_list("blob__sha256", "album_id")
+        for digest, album_id in held:
+            if groups[digest]["rows"].pop(album_id, None) is not None:
+                stats["skipped"] += 1
+        groups = {digest: group for digest, group in groups.items() if group["rows"]}
+
+        blobs = {}
+        for digest in PhotoBlobService.find_existing(groups):
+            blob = PhotoBlobService.add_reference(digest, len(groups[digest]["rows"]))
+            if blob is not None:
+                blobs[digest] = blob
+
+        futures = {}
+        for digest, group in groups.items():
+            if digest not in blobs:
+                album_id, (item, _) = next(iter(group["rows"].items()))
+                futures[digest] = executor.submit(cls._upload, source, item, album_id)
+        for digest, future in futures.items():
+            rows = groups[digest]["rows"]
+            try:
+                link = future.result()
+            except Exception as e:
+                for item, _ in rows.values():
+                    logger.warning(f"Import of {item.path} failed: {e}")
+                stats["failed"] += len(rows)
+                continue
+            blobs[digest] = PhotoBlobService.acquire(
+                digest, link, groups[digest]["size"], len(rows)
+            )
+
+        photos = [
+            Photo(album_id=album_id, image_url=blob.url, blob=blob, **columns)
+            for digest, blob in blobs.items()
+            for album_id, (_, columns) in groups[digest]["rows"].items()
+        ]
+        try:
+            with transaction.atomic():
+                Photo.objects.bulk_create(photos)
+                AlbumStatsService.add(photos)
+                DerivativeService.schedule([blob.url for blob in blobs.values()])
+        except Exception:
+            PhotoBlobService.release_many(
+                {blob.id: len(groups[digest]["rows"]) for digest, blob in blobs.items()}
+            )
+            raise
+        stats["imported"] += len(photos)
+        return stats
+
+    @classmethod
+    def run(
+        cls,
+        source: str,
+        album_id: int = None,
+        batch_size: int = 100,
+        workers: int = 8,
+        progress=None,
+    ) -> dict:
+        """Import every photo of ``source``, into ``album_id`` if given.
+
+        ``progress`` is called with the running totals after each batch.
+        """
+        album_title = None
+        if album_id is not None:
+            album_title = (
+                Album.objects.filter(pk=album_id)
+                .values_list("title", flat=True)
+                .first()
+            )
+            if album_title is None:
+                raise NotFound(f"Album with id {album_id} not found")
+
+        source = cls.open_source(source)
+        try:
+            files = cls.scan(source, album_title)
+            if album_id is not None:
+                albums = {album_title: album_id}
+            else:
+                albums = cls._albums(item.album for item in files)
+            stats = {
+                "files": len(files),
+                "bytes": sum(item.size for item in files),
+                "processed": 0,
+                "processed_bytes": 0,
+                "imported": 0,
+                "skipped": 0,
+                "failed": 0,
+            }
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for start in range(0, len(files), batch_size):
+                    batch = files[start : start + batch_size]
+                    for key, count in cls._import_batch(
+                        source, batch, albums, executor
+                    ).items():
+                        stats[key] += count
+                    stats["processed"] += len(batch)
+                    stats["processed_bytes"] += sum(item.size for item in batch)
+                    if progress is not None:
+                        progress(stats)
+        finally:
+            source.close()
+
+        stats["album_ids"] = sorted(set(albums.values()))
+        logger.info(
+            f"Import of {stats['files']} files: {stats['imported']} imported, "
+            f"{stats['skipped']} skipped, {stats['failed']} failed"
+        )
+        if stats["imported"]:
+            cls._broadcast_change(
+                WebSocketMessageType.PHOTOS_IMPORTED,
+                {
+                    "album_ids": stats["album_ids"],
+                    "imported": stats["imported"],
+                    "skipped": stats["skipped"],
+                    "failed": stats["failed"],
+                },
+            )
+        return stats
+
+    @staticmethod
+    def _broadcast_change(message_type: WebSocketMessageType, message_data: dict):
+        """Broadcast an import to all authenticated users."""
+        recipients = User.objects.all().values_list("id", flat=True)
+
+        for uid in recipients:
+            send_ws_message_to_user(uid, message_type, message_data)
@@ -0,0 +1,80 @@
+from core.dependencies import photo_repository
+from core.imaging import METADATA_HEADER_SIZE, read_metadata
+from core.interface.upload_handler import StreamedUploadedFile
+from core.models import Photo
+import logging
+import mimetypes
+
+logger = logging.getLogger(__name__)
+
+METADATA_FIELDS = ("taken_at", "lat", "lon", "width", "height", "bytes", "mime")
+
+# Album covers only keep the layout and size ones, as ``cover_<field>``
+COVER_FIELDS = ("width", "height", "bytes", "mime")
+
+DEFAULT_MIME = "application/octet-stream"
+
+
+class PhotoMetadataService:
+    """Capture time, position, dimensions, size and type of photo files.
+
+    Everything comes from the first ``METADATA_HEADER_SIZE`` bytes of the
+    file: the upload keeps them while streaming, stored files are read with
+    a ranged request. Pixels are never decoded.
+    """
+
+    @staticmethod
+    def from_header(header: bytes, size, name: str) -> dict:
+        metadata = dict.fromkeys(METADATA_FIELDS)
+        metadata.update(read_metadata(header))
+        metadata["bytes"] = size
+        metadata["mime"] = (
+            metadata["mime"] or mimetypes.guess_type(name)[0] or DEFAULT_MIME
+        )
+        return metadata
+
+    @classmethod
+    def from_upload(cls, file) -> dict:
+        """Metadata of an uploaded file, left at its start for the storage."""
+        if isinstance(file, StreamedUploadedFile):
+            header = file.header
+        else:
+            file.seek(0)
+            header = file.read(METADATA_HEADER_SIZE)
+            file.seek(0)
+        return cls.from_header(header, file.size, file.name)
+
+    @classmethod
+    def from_storage(cls, url: str, size: int = None) -> dict:
+        """Metadata of a stored file, reading only its first bytes."""
+        with photo_repository.open_stream(url, 0, METADATA_HEADER_SIZE - 1) as stream:
+            header = stream.read()
+        if size is None:
+            info = photo_repository.stat(url)
+            size = info["size"] if info is not None else None
+        return cls.from_header(header, size, url)
+
+    @classmethod
+    def for_blob(cls, blob) -> dict:
+        """Metadata of a blob, copied from a photo already holding it."""
+        known = (
+            Photo.objects.filter(blob=blob, mime__isnull=False)
+            .values(*METADATA_FIELDS)
+            .first()
+        )
+        return known or cls.from_storage(blob.url, blob.size)
+
+    @classmethod
+    def for_cover(cls, file) -> dict:
+        """``cover_*`` fields of an album cover upload, empty if unreadable."""
+        try:
+            metadata = cls.from_upload(file)
+        except Exception as e:
+            logger.warning(f"Cover metadata could not be read: {e}")
+            return {}
+        return {f"cover_{field}": metadata[field] for field in COVER_FIELDS}
+
+    @staticmethod
+    def of(photo: Photo) -> dict:
+        """The metadata columns of ``photo``, for copies of its file."""
+        return {field: getattr(photo, field) for field in METADATA_FIELDS}
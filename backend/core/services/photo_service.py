@@ -1,14 +1,31 @@
 from core.models import Album, Photo
-from core.serializers import PhotoSerializer
+from core.serializers import (
+    PhotoSerializer,
+    PresignedUploadSerializer,
+    ConfirmUploadSerializer,
+    PhotoMetadataSerializer,
+    BlobCheckSerializer,
+)
 from core.dependencies import photo_repository
+from core.services.album_stats_service import STATS_FIELDS, AlbumStatsService
+from core.services.photo_blob_service import PhotoBlobService
+from core.services.derivative_service import DerivativeService
+from core.services.photo_metadata_service import PhotoMetadataService
+from core.interface.upload_handler import StreamedUploadedFile, StreamingUploadHandler
 from core.websocket.utils import send_ws_message_to_user
 from core.websocket.messages import WebSocketMessageType
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core import signing
+from django.db import transaction
 from rest_framework.exceptions import NotFound, ValidationError
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 logger = logging.getLogger(__name__)
 
+UPLOAD_TOKEN_SALT = "core.photo.upload"
+
 
 def _sanitize_for_log(value):
     """
@@ -28,34 +45,112 @@ class PhotoService:
         return text.replace("\r", "").replace("\n", "")
 
     @staticmethod
-    def get_photos_by_album_id(album_id):
-        photos = Photo.objects.filter(album_id=album_id)
+    def get_photos_queryset(album_id):
+        # Each photo nests its album, statistics included: join it
+        return Photo.objects.filter(album_id=album_id).select_related("album")
+
+    @classmethod
+    def get_photos_by_album_id(cls, album_id):
+        photos = cls.get_photos_queryset(album_id)
         photos = PhotoSerializer(photos, many=True).data
         return photos
 
+    @staticmethod
+    def _stream_upload_to_storage(request, album_id):
+        """Send the image straight to the storage while the body is parsed."""
+        request.upload_handlers.insert(
+            0,
+            StreamingUploadHandler(
+                request, repository=photo_repository, folder_album_id=album_id
+            ),
+        )
+
     @classmethod
     def save_photo(cls, album_id, request):
         """Save a photo and broadcast the upload event."""
-        data = request.data.copy()
-        file = request.FILES
-
         try:
             album = Album.objects.get(pk=album_id)
         except Album.DoesNotExist:
             raise NotFound(f"Album with id {album_id} not found")
 
+        cls._stream_upload_to_storage(request, album_id)
+        data = request.data.copy()
+        file = request.FILES
+
+        blob = None
+        metadata = None
         if "image" in file and file["image"]:
-            link = photo_repository.save_within_folder(
-                file["image"], folder_album_id=album_id
+            metadata = cls._read_metadata(
+                PhotoMetadataService.from_upload, file["image"]
             )
-            data["image_url"] = link
+            blob = cls._store_blob(file["image"], album_id)
+        elif data.get("sha256"):
+            # The client checked the hash first and skipped sending the bytes
+            blob = PhotoBlobService.add_reference(data["sha256"])
+            if blob is None:
+                raise ValidationError(
+                    {"sha256": "Aucun fichier connu pour cette empreinte."}
+                )
+            metadata = cls._read_metadata(PhotoMetadataService.for_blob, blob)
+        if blob is not None:
+            data["image_url"] = blob.url
+
+        return cls._create_photo(album, data, request, blob=blob, metadata=metadata)
+
+    @staticmethod
+    def _read_metadata(read, *args) -> dict:
+        """Run a ``PhotoMetadataService`` reader; a failure never fails the upload."""
+        try:
+            return read(*args)
+        except Exception as e:
+            logger.warning(f"Photo metadata could not be read: {e}")
+            return {}
+
+    @staticmethod
+    def _store_blob(image, album_id):
+        """Return the blob holding ``image``, uploading only unseen content."""
+        if isinstance(image, StreamedUploadedFile):
+            return PhotoBlobService.acquire(image.sha256, image.url, image.size)
+
+        digest, size = PhotoBlobService.hash_file(image)
+        blob = PhotoBlobService.add_reference(digest)
+        if blob is None:
+            link = photo_repository.save_within_folder(image, folder_album_id=album_id)
+            blob = PhotoBlobService.acquire(digest, link, size)
+        return blob
+
+    @classmethod
+    def _create_photo(cls, album, data, request, blob=None, metadata=None) -> dict:
+        """Create the Photo row for an uploaded file and broadcast it.
+
+        ``blob`` carries a reference already taken for this photo; it is
+        released if the photo cannot be created. ``metadata`` holds the
+        columns read from the file by ``PhotoMetadataService``.
+        """
+        album_id = album.id
         data["album"] = album_id
 
         serializer = PhotoSerializer(
-            data=data, context={"request": request, "album": album}
+            data=data,
+            context={
+                "request": request,
+                "album": album,
+                "blob": blob,
+                "metadata": metadata,
+            },
         )
-        serializer.is_valid(raise_exception=True)
-        photo = serializer.save(album=album)
+        try:
+            serializer.is_valid(raise_exception=True)
+            with transaction.atomic():
+                photo = serializer.save(album=album)
+                AlbumStatsService.add([photo])
+        except Exception:
+            if blob is not None:
+                PhotoBlobService.release(blob.id)
+            raise
+        # The statistics changed in the database only; the photo nests them
+        album.refresh_from_db(fields=STATS_FIELDS)
+        DerivativeService.schedule([photo.image_url])
         photo_data = PhotoSerializer(photo).data
 
         safe_album_id = cls._sanitize_for_log(album_id)
@@ -70,6 +165,219 @@ class PhotoService:
 
         return photo_data
 
+    @classmethod
+    def save_photos_batch(cls, album_id, request) -> dict:
+        """Upload several photos concurrently and insert them in one query.
+
+        Each file is reported as ``uploaded`` or ``failed``; a single
+        ``PHOTOS_UPLOADED`` event is broadcast for the whole batch.
+        """
+        try:
+            album = Album.objects.get(pk=album_id)
+        except Album.DoesNotExist:
+            raise NotFound(f"Album with id {album_id} not found")
+
+        files = request.FILES.getlist("images")
+        if not files:
+            raise ValidationError({"images": "Aucune image fournie."})
+
+        metadata = PhotoMetadataSerializer(data=request.data)
+        metadata.is_valid(raise_exception=True)
+
+        results = [{"file_name": file.name} for file in files]
+        with ThreadPoolExecutor(
+            max_workers=settings.PHOTO_BATCH_UPLOAD_WORKERS
+        ) as executor:
+            # Identical files share one upload; known content is not re-sent
+            groups = {}
+            hashes = executor.map(PhotoBlobService.hash_file, files)
+            for result, file, (digest, size) in zip(results, files, hashes):
+                # Read before the uploads below start reading the files
+                result["metadata"] = cls._read_metadata(
+                    PhotoMetadataService.from_upload, file
+                )
+                groups.setdefault(digest, []).append((result, file, size))
+
+            blobs = {}
+            for digest in PhotoBlobService.find_existing(groups):
+                blob = PhotoBlobService.add_reference(digest, len(groups[digest]))
+                if blob is not None:
+                    blobs[digest] = blob
+
+            futures = {
+                digest: executor.submit(
+                    photo_repository.save_within_folder,
+                    group[0][1],
+                    folder_album_id=album_id,
+                )
+                for digest, group in groups.items()
+                if digest not in blobs
+            }
+            for digest, future in futures.items():
+                group = groups[digest]
+                try:
+                    link = future.result()
+                except Exception as e:
+                    for result, _, _ in group:
+                        safe_name = cls._sanitize_for_log(result["file_name"])
+                        logger.warning(f"Batch upload failed for {safe_name}: {e}")
+                        result["status"] = "failed"
+                        result["error"] = "Échec de l'upload vers le stockage."
+                    continue
+                blobs[digest] = PhotoBlobService.acquire(
+                    digest, link, group[0][2], len(group)
+                )
+
+        for digest, blob in blobs.items():
+            for result, _, _ in groups[digest]:
+                result["status"] = "uploaded"
+                result["blob"] = blob
+
+        uploaded = [result for result in results if result["status"] == "uploaded"]
+        try:
+            with transaction.atomic():
+                photos = Photo.objects.bulk_create(
+                    [
+                        Photo(
+                            album=album,
+                            image_url=result["blob"].url,
+                            blob=result["blob"],
+                            **metadata.validated_data,
+                            **result["metadata"],
+                        )
+                        for result in uploaded
+                    ]
+                )
+                AlbumStatsService.add(photos)
+        except Exception:
+            PhotoBlobService.release_many(
+                {blob.id: len(groups[digest]) for digest, blob in blobs.items()}
+            )
+            raise
+        album.refresh_from_db(fields=STATS_FIELDS)
+
+        photos = cls._reload_created(album, photos)
+        DerivativeService.schedule([photo.image_url for photo in photos])
+        photos_data = PhotoSerializer(photos, many=True).data
+        for result in results:
+            result.pop("blob", None)
+            del result["metadata"]
+        for result, photo_data in zip(uploaded, photos_data):
+            result["photo"] = photo_data
+
+        safe_album_id = cls._sanitize_for_log(album_id)
+        logger.info(
+            f"Batch upload to album {safe_album_id}: "
+            f"{len(uploaded)}/{len(results)} photos"
+        )
+
+        if photos_data:
+            cls._broadcast_change(
+                WebSocketMessageType.PHOTOS_UPLOADED,
+                {"data": photos_data, "album_id": album_id},
+            )
+
+        return {
+            "album_id": album_id,
+            "uploaded": len(uploaded),
+            "failed": len(results) - len(uploaded),
+            "results": results,
+        }
+
+    @staticmethod
+    def _reload_created(album, photos: list) -> list:
+        """Return ``photos`` freshly bulk-created in ``album`` with their pks.
+
+        Backends without RETURNING support (MySQL) leave pks unset.
+        Deduplicated photos share a URL: take the newest rows per URL.
+        """
+        if not photos or photos[0].pk is not None:
+            return photos
+
+        by_url = {}
+        for photo in Photo.objects.filter(
+            album=album, image_url__in={photo.image_url for photo in photos}
+        ).order_by("-id"):
+            by_url.setdefault(photo.image_url, []).append(photo)
+        photos = [by_url[photo.image_url].pop(0) for photo in reversed(photos)]
+        photos.reverse()
+        return photos
+
+    @staticmethod
+    def create_presigned_upload(album_id: int, data: dict) -> dict:
+        """Return a presigned POST so the client uploads straight to storage.
+
+        The response carries a signed ``upload_token`` binding the future
+        object to this album; it must be sent back to ``confirm_upload``.
+        """
+        serializer = PresignedUploadSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+
+        if not Album.objects.filter(pk=album_id).exists():
+            raise NotFound(f"Album with id {album_id} not found")
+
+        presigned = photo_repository.create_presigned_upload(
+            serializer.validated_data["file_name"],
+            folder_album_id=album_id,
+            content_type=serializer.validated_data["content_type"],
+            max_size=settings.PHOTO_UPLOAD_MAX_SIZE,
+        )
+        upload_token = signing.dumps(
+            {"album_id": album_id, "image_url": presigned["image_url"]},
+            salt=UPLOAD_TOKEN_SALT,
+        )
+        return {
+            "url": presigned["url"],
+            "fields": presigned["fields"],
+            "upload_token": upload_token,
+            "max_size": settings.PHOTO_UPLOAD_MAX_SIZE,
+        }
+
+    @classmethod
+    def confirm_upload(cls, album_id: int, request) -> dict:
+        """Register a photo uploaded through a presigned POST."""
+        serializer = ConfirmUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = dict(serializer.validated_data)
+
+        try:
+            token = signing.loads(
+                data.pop("upload_token"),
+                salt=UPLOAD_TOKEN_SALT,
+                max_age=settings.PHOTO_PRESIGNED_UPLOAD_EXPIRES * 2,
+            )
+        except signing.BadSignature:
+            raise ValidationError({"upload_token": "Jeton d'upload invalide."})
+
+        if token["album_id"] != album_id:
+            raise ValidationError(
+                {"upload_token": "Ce jeton ne correspond pas à cet album."}
+            )
+
+        try:
+            album = Album.objects.get(pk=album_id)
+        except Album.DoesNotExist:
+            raise NotFound(f"Album with id {album_id} not found")
+
+        image_url = token["image_url"]
+        existing = Photo.objects.filter(image_url=image_url).first()
+        if existing is not None:
+            # Confirm is idempotent: a retried request returns the same photo
+            return PhotoSerializer(existing).data
+
+        info = photo_repository.stat(image_url)
+        if info is None:
+            raise ValidationError({"upload_token": "Le fichier n'a pas été reçu."})
+        if info["size"] > settings.PHOTO_UPLOAD_MAX_SIZE:
+            photo_repository.delete(image_url)
+            raise ValidationError({"upload_token": "Le fichier est trop volumineux."})
+
+        data["image_url"] = image_url
+        metadata = cls._read_metadata(
+            PhotoMetadataService.from_storage, image_url, info["size"]
+        )
+        return cls._create_photo(album, data, request, metadata=metadata)
+
     @classmethod
     def delete_photo(cls, photo_id: int, album_id: int) -> None:
         """Delete a photo and broadcast the deletion event."""
@@ -79,7 +387,11 @@ class PhotoService:
             raise NotFound(f"Photo with id {photo_id} not found in album {album_id}")
 
         deleted_id = photo.id
-        photo.delete()
+        with transaction.atomic():
+            photo.delete()
+            AlbumStatsService.remove([photo])
+        if photo.blob_id is not None:
+            PhotoBlobService.release(photo.blob_id)
 
         safe_album_id = cls._sanitize_for_log(album_id)
         safe_deleted_id = cls._sanitize_for_log(deleted_id)
@@ -112,7 +424,10 @@ class PhotoService:
                 except Album.DoesNotExist:
                     raise NotFound(f"Album with id {target_album_id} not found")
                 photo.album = target_album
-                photo.save(update_fields=["album_id", "updated_at"])
+                with transaction.atomic():
+                    photo.save(update_fields=["album_id", "updated_at"])
+                    AlbumStatsService.move([photo], target_album_id, album_id)
+                target_album.refresh_from_db(fields=STATS_FIELDS)
 
         # Update text metadata (caption, location) via serializer
         if data:
@@ -153,7 +468,10 @@ class PhotoService:
             raise ValidationError("La photo est déjà dans cet album.")
 
         photo.album = target_album
-        photo.save()
+        with transaction.atomic():
+            photo.save()
+            AlbumStatsService.move([photo], target_album_id, source_album_id)
+        target_album.refresh_from_db(fields=STATS_FIELDS)
 
         photo_data = PhotoSerializer(photo).data
 
@@ -172,9 +490,28 @@ class PhotoService:
 
         return photo_data
 
+    @staticmethod
+    def _file_columns(photo: Photo) -> dict:
+        """Columns computed from the file, for a copy of ``photo``.
+
+        Only a copy sharing the file shares them; a copied file gets its
+        own from the image job it schedules.
+        """
+        if photo.blob_id is None:
+            return {"derivatives": []}
+        return {
+            "derivatives": photo.derivatives,
+            "placeholder": photo.placeholder,
+            "phash": photo.phash,
+        }
+
     @classmethod
     def copy_photo_to_album(cls, photo_id: int, target_album_id: int, user) -> dict:
-        """Copy a photo to another album with S3 server-side copy."""
+        """Copy a photo to another album.
+
+        Deduplicated photos only gain a reference on their blob; older photos
+        are copied with an S3 server-side copy.
+        """
         try:
             photo = Photo.objects.get(pk=photo_id)
         except Photo.DoesNotExist:
@@ -188,16 +525,28 @@ class PhotoService:
         if photo.album_id == target_album_id:
             raise ValidationError("La photo est déjà dans cet album.")
 
-        # S3 server-side copy to a new key
-        new_url = photo_repository.copy_file(photo.image_url, target_album_id)
+        if photo.blob_id is not None:
+            PhotoBlobService.add_reference_by_id(photo.blob_id)
+            new_url = photo.image_url
+        else:
+            # S3 server-side copy to a new key
+            new_url = photo_repository.copy_file(photo.image_url, target_album_id)
 
         # Create a new Photo entry pointing to the copied file
-        new_photo = Photo.objects.create(
-            album=target_album,
-            image_url=new_url,
-            caption=photo.caption,
-            location=photo.location,
-        )
+        with transaction.atomic():
+            new_photo = Photo.objects.create(
+                album=target_album,
+                image_url=new_url,
+                blob_id=photo.blob_id,
+                caption=photo.caption,
+                location=photo.location,
+                **cls._file_columns(photo),
+                **PhotoMetadataService.of(photo),
+            )
+            AlbumStatsService.add([new_photo])
+        target_album.refresh_from_db(fields=STATS_FIELDS)
+        if not new_photo.derivatives:
+            DerivativeService.schedule([new_url])
 
         photo_data = PhotoSerializer(new_photo).data
 
@@ -212,6 +561,192 @@ class PhotoService:
 
         return photo_data
 
+    @staticmethod
+    def _select_for_transfer(photo_ids: list, target_album_id: int):
+        """Load the photos to move or copy and pre-fill per-item results.
+
+        Returns the target album, the results in request order (duplicate ids
+        collapsed) and the transferable photos by id. Missing photos and
+        photos already in the target album are reported as failed.
+        """
+        try:
+            target_album = Album.objects.get(pk=target_album_id)
+        except Album.DoesNotExist:
+            raise NotFound(f"Album with id {target_album_id} not found")
+
+        photo_ids = list(dict.fromkeys(photo_ids))
+        photos = Photo.objects.in_bulk(photo_ids)
+
+        results = []
+        transferable = {}
+        for photo_id in photo_ids:
+            result = {"photo_id": photo_id}
+            results.append(result)
+            photo = photos.get(photo_id)
+            if photo is None:
+                result["status"] = "failed"
+                result["error"] = "Photo introuvable."
+            elif photo.album_id == target_album_id:
+                result["status"] = "failed"
+                result["error"] = "La photo est déjà dans cet album."
+            else:
+                transferable[photo_id] = photo
+        return target_album, results, transferable
+
+    @classmethod
+    def move_photos_to_album(cls, photo_ids: list, target_album_id: int, user) -> dict:
+        """Move several photos to another album with a single UPDATE.
+
+        Each photo is reported as ``moved`` or ``failed``; a single
+        ``PHOTOS_MOVED`` event is broadcast for the whole request.
+        """
+        _, results, movable = cls._select_for_transfer(photo_ids, target_album_id)
+
+        if movable:
+            with transaction.atomic():
+                Photo.objects.filter(pk__in=movable).update(album_id=target_album_id)
+                AlbumStatsService.move(movable.values(), target_album_id)
+
+        moved = Photo.objects.filter(pk__in=movable).select_related("album")
+        photos_data = {
+            photo_data["id"]: photo_data
+            for photo_data in PhotoSerializer(moved, many=True).data
+        }
+        for result in results:
+            if result["photo_id"] in movable:
+                result["status"] = "moved"
+                result["photo"] = photos_data[result["photo_id"]]
+
+        safe_target = cls._sanitize_for_log(target_album_id)
+        logger.info(
+            f"Bulk move to album {safe_target}: {len(movable)}/{len(results)} photos"
+        )
+
+        if movable:
+            cls._broadcast_change(
+                WebSocketMessageType.PHOTOS_MOVED,
+                {
+                    "data": list(photos_data.values()),
+                    "source_album_ids": sorted(
+                        {photo.album_id for photo in movable.values()}
+                    ),
+                    "target_album_id": target_album_id,
+                },
+            )
+
+        return {
+            "target_album_id": target_album_id,
+            "moved": len(movable),
+            "failed": len(results) - len(movable),
+            "results": results,
+        }
+
+    @classmethod
+    def copy_photos_to_album(cls, photo_ids: list, target_album_id: int, user) -> dict:
+        """Copy several photos to another album and insert them in one query.
+
+        Deduplicated photos only gain references on their blobs; older
+        photos are copied with concurrent server-side copies. Each photo is
+        reported as ``copied`` or ``failed``; a single ``PHOTOS_COPIED``
+        event is broadcast for the whole request.
+        """
+        target_album, results, copyable = cls._select_for_transfer(
+            photo_ids, target_album_id
+        )
+
+        new_urls = {}
+        blob_counts = {}
+        legacy = []
+        for photo_id, photo in copyable.items():
+            if photo.blob_id is not None:
+                new_urls[photo_id] = photo.image_url
+                blob_counts[photo.blob_id] = blob_counts.get(photo.blob_id, 0) + 1
+            else:
+                legacy.append(photo)
+
+        copied_urls = photo_repository.copy_many(
+            [photo.image_url for photo in legacy], target_album_id
+        )
+        for photo, new_url in zip(legacy, copied_urls):
+            if new_url is not None:
+                new_urls[photo.pk] = new_url
+        for blob_id, count in blob_counts.items():
+            PhotoBlobService.add_reference_by_id(blob_id, count)
+
+        copied = [result for result in results if result["photo_id"] in new_urls]
+        try:
+            with transaction.atomic():
+                photos = Photo.objects.bulk_create(
+                    [
+                        Photo(
+                            album=target_album,
+                            image_url=new_urls[result["photo_id"]],
+                            blob_id=copyable[result["photo_id"]].blob_id,
+                            caption=copyable[result["photo_id"]].caption,
+                            location=copyable[result["photo_id"]].location,
+                            **cls._file_columns(copyable[result["photo_id"]]),
+                            **PhotoMetadataService.of(copyable[result["photo_id"]]),
+                        )
+                        for result in copied
+                    ]
+                )
+                AlbumStatsService.add(photos)
+        except Exception:
+            PhotoBlobService.release_many(blob_counts)
+            photo_repository.delete_many(
+                [url for url in copied_urls if url is not None]
+            )
+            raise
+        target_album.refresh_from_db(fields=STATS_FIELDS)
+
+        photos = cls._reload_created(target_album, photos)
+        DerivativeService.schedule(
+            [photo.image_url for photo in photos if not photo.derivatives]
+        )
+        photos_data = PhotoSerializer(photos, many=True).data
+        for result in results:
+            if "status" not in result and result["photo_id"] not in new_urls:
+                result["status"] = "failed"
+                result["error"] = "Échec de la copie du fichier."
+        for result, photo_data in zip(copied, photos_data):
+            result["status"] = "copied"
+            result["photo"] = photo_data
+
+        safe_target = cls._sanitize_for_log(target_album_id)
+        logger.info(
+            f"Bulk copy to album {safe_target}: {len(copied)}/{len(results)} photos"
+        )
+
+        if photos_data:
+            cls._broadcast_change(
+                WebSocketMessageType.PHOTOS_COPIED,
+                {"data": photos_data, "album_id": target_album_id},
+            )
+
+        return {
+            "target_album_id": target_album_id,
+            "copied": len(copied),
+            "failed": len(results) - len(copied),
+            "results": results,
+        }
+
+    @staticmethod
+    def check_hashes(data: dict) -> dict:
+        """Tell which contents the storage already holds.
+
+        Photos whose hash is ``existing`` can be created by sending the
+        ``sha256`` instead of the image.
+        """
+        serializer = BlobCheckSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        hashes = serializer.validated_data["hashes"]
+
+        existing = set(PhotoBlobService.find_existing(hashes))
+        return {
+            "existing": [digest for digest in hashes if digest in existing],
+            "missing": [digest for digest in hashes if digest not in existing],
+        }
+
     @staticmethod
     def _broadcast_change(message_type: WebSocketMessageType, message_data: dict):
         """Broadcast a photo change to all authenticated users."""
@@ -0,0 +1,215 @@
+from core import image_pool
+from core.dependencies import photo_repository
+from core.imaging import FORMATS, render_width, source_url_of
+from core.models import Photo
+from django.conf import settings
+from concurrent.futures import Future
+from hashlib import sha256
+from pathlib import Path
+from PIL import UnidentifiedImageError, features
+from rest_framework.exceptions import NotFound, ValidationError
+import io
+import logging
+import mimetypes
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Formats served to browsers listing them in their Accept header, best first
+NEGOTIATED_FORMATS = ("avif", "webp")
+
+# A sweep deletes the least recently used files down to this share of the
+# cache size, so that it does not run again on the next write
+SWEEP_TARGET = 0.9
+
+
+class RenderCache:
+    """Rendered images on the local disk, ``max_bytes`` in total at most.
+
+    Least recently used files are evicted first: reading a file touches its
+    modification time, and once the bytes on disk may exceed the bound a
+    sweep lists the directory and deletes the oldest files. The directory is
+    the only state shared between processes, so the bound holds across them
+    up to what the others wrote since their last sweep.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        # Bytes on disk at the last sweep plus the ones written since
+        self._size = None
+        self._lock = threading.Lock()
+
+    def path(self, key: str, extension: str) -> Path:
+        return self.directory / key[:2] / f"{key}.{extension}"
+
+    def open(self, path: Path):
+        """Open a cached file and mark it as recently used."""
+        file = open(path, "rb")
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted meanwhile: the open file stays readable
+        return file
+
+    def put(self, path: Path, content: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=path.parent, prefix=".render-", delete=False
+        ) as tmp:
+            tmp.write(content)
+        os.replace(tmp.name, path)
+
+        with self._lock:
+            if self._size is not None:
+                self._size += len(content)
+            if self._size is None or self._size > self.max_bytes:
+                self._size = self._sweep()
+
+    def _sweep(self) -> int:
+        """Evict the least recently used files; return the bytes left."""
+        files = []
+        for path in self.directory.glob("*/*"):
+            if path.name.startswith("."):
+                continue  # temporary file of an ongoing write
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return total
+
+        files.sort()
+        target = self.max_bytes * SWEEP_TARGET
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+
+class RenderService:
+    """Photos resized on request, for sizes no derivative covers.
+
+    Variants are rendered from the original on the first request and kept
+    in a ``RenderCache``. A variant depends only on the stored file (whose
+    URL never changes content), the width, the format and its quality, so
+    the hash of those is both its cache key and its strong ETag. Concurrent
+    requests for a variant being rendered wait for that rendering.
+    """
+
+    _caches = {}
+    _inflight = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def _cache(cls) -> RenderCache:
+        config = (
+            settings.PHOTO_RENDER_CACHE_DIR,
+            settings.PHOTO_RENDER_CACHE_MAX_BYTES,
+        )
+        with cls._lock:
+            if config not in cls._caches:
+                cls._caches[config] = RenderCache(*config)
+            return cls._caches[config]
+
+    @staticmethod
+    def negotiate(accept: str, requested: str = None) -> str:
+        """The format to render: ``requested``, else the best one accepted."""
+        if requested:
+            if requested != "jpeg" and not features.check(requested):
+                raise ValidationError({"fmt": "Format non disponible."})
+            return requested
+
+        accepted = {media.split(";")[0].strip() for media in accept.split(",")}
+        for format in NEGOTIATED_FORMATS:
+            if f"image/{format}" in accepted and features.check(format):
+                return format
+        return "jpeg"
+
+    @staticmethod
+    def variant(album_id: int, photo_id: int, width: int, format: str) -> dict:
+        """Describe a variant of a photo, without rendering it."""
+        photo = (
+            Photo.objects.filter(pk=photo_id, album_id=album_id)
+            .values("image_url", "width")
+            .first()
+        )
+        if photo is None:
+            raise NotFound(f"Photo with id {photo_id} not found in album {album_id}")
+
+        url = photo["image_url"]
+        content_type, _ = mimetypes.guess_type(source_url_of(url))
+        if not content_type or not content_type.startswith("image/"):
+            raise ValidationError({"photo": "Ce fichier n'est pas une image."})
+
+        # Never upscaled: wider requests share the original size variant
+        if photo["width"]:
+            width = min(width, photo["width"])
+        quality = settings.PHOTO_DERIVATIVE_QUALITY[format]
+        key = sha256(f"{url}\n{width}\n{format}\n{quality}".encode()).hexdigest()
+        return {
+            "source_url": url,
+            "width": width,
+            "format": format,
+            "key": key,
+            "etag": f'"{key[:32]}"',
+            "content_type": f"image/{format}",
+        }
+
+    @classmethod
+    def open(cls, variant: dict):
+        """A file object with the variant, rendered if not cached."""
+        cache = cls._cache()
+        path = cache.path(variant["key"], FORMATS[variant["format"]][1])
+        try:
+            return cache.open(path)
+        except FileNotFoundError:
+            return io.BytesIO(cls._render_once(cache, path, variant))
+
+    @classmethod
+    def _render_once(cls, cache: RenderCache, path: Path, variant: dict) -> bytes:
+        with cls._lock:
+            future = cls._inflight.get(variant["key"])
+            if future is not None:
+                leader = False
+            else:
+                leader = True
+                future = cls._inflight[variant["key"]] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            content = cls._render(variant)
+            try:
+                cache.put(path, content)
+            except OSError as e:
+                logger.warning(f"Render of {variant['source_url']} not cached: {e}")
+            future.set_result(content)
+            return content
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with cls._lock:
+                del cls._inflight[variant["key"]]
+
+    @staticmethod
+    def _render(variant: dict) -> bytes:
+        with photo_repository.open_stream(variant["source_url"]) as stream:
+            data = stream.read()
+        try:
+            return image_pool.run(
+                render_width, data, variant["width"], variant["format"]
+            )
+        except UnidentifiedImageError:
+            raise ValidationError({"photo": "Cette image ne peut pas être lue."})
@@ -0,0 +1,101 @@
+from core.models import Album, Photo, PhotoBlob
+from core.dependencies import photo_repository
+from core.imaging import source_url_of
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StorageGcService:
+    """Delete stored files that no photo, blob or album cover references.
+
+    The storage is listed page by page and each page is checked against the
+    database on its own, so memory stays bounded by the page size whatever
+    the bucket size.
+    """
+
+    @staticmethod
+    def album_prefixes() -> list:
+        return [
+            photo_repository.folder_prefix(album_id)
+            for album_id in Album.objects.values_list("id", flat=True)
+        ]
+
+    @staticmethod
+    def _referenced(urls: list) -> set:
+        # A file is kept if it is referenced itself, or if it is a derivative
+        # of a referenced original: it lives as long as the original does.
+        sources = {url: {url, source_url_of(url)} for url in urls}
+        source_urls = set().union(*sources.values())
+
+        referenced = set(
+            Photo.objects.filter(image_url__in=source_urls).values_list(
+                "image_url", flat=True
+            )
+        )
+        referenced.update(
+            Album.objects.filter(cover_image__in=source_urls).values_list(
+                "cover_image", flat=True
+            )
+        )
+        # A blob may be stored before the photo pointing to it is committed
+        referenced.update(
+            PhotoBlob.objects.filter(url__in=source_urls).values_list("url", flat=True)
+        )
+        return {url for url, candidates in sources.items() if candidates & referenced}
+
+    @classmethod
+    def collect(
+        cls,
+        prefixes=None,
+        grace_period: int = None,
+        dry_run: bool = False,
+        page_size: int = 1000,
+    ) -> dict:
+        """Delete orphaned files under ``prefixes`` (every album by default).
+
+        Files modified less than ``grace_period`` seconds ago are kept.
+        """
+        if prefixes is None:
+            prefixes = cls.album_prefixes()
+        if grace_period is None:
+            grace_period = settings.STORAGE_GC_GRACE_PERIOD
+        # A presigned upload can be confirmed until its token expires
+        grace_period = max(grace_period, settings.PHOTO_PRESIGNED_UPLOAD_EXPIRES * 2)
+        cutoff = timezone.now() - timedelta(seconds=grace_period)
+
+        stats = {"scanned": 0, "orphans": 0, "deleted": 0, "failed": 0}
+        orphans = []
+
+        def flush():
+            if orphans and not dry_run:
+                failed = photo_repository.delete_many(list(orphans))
+                stats["failed"] += len(failed)
+                stats["deleted"] += len(orphans) - len(failed)
+            orphans.clear()
+
+        for prefix in prefixes:
+            for page in photo_repository.list_prefix(prefix, page_size):
+                stats["scanned"] += len(page)
+                candidates = [
+                    item["url"] for item in page if item["last_modified"] < cutoff
+                ]
+                if not candidates:
+                    continue
+
+                referenced = cls._referenced(candidates)
+                page_orphans = [url for url in candidates if url not in referenced]
+                stats["orphans"] += len(page_orphans)
+                orphans.extend(page_orphans)
+                if len(orphans) >= page_size:
+                    flush()
+        flush()
+
+        logger.info(
+            f"Storage GC: {stats['scanned']} scanned, {stats['orphans']} orphans, "
+            f"{stats['deleted']} deleted, {stats['failed']} failed"
+        )
+        return stats
@@ -221,7 +221,11 @@ def patch_photo_repository(mock_photo_repository):
             with patch(
                 "core.services.photo_service.photo_repository", mock_photo_repository
             ):
-                yield mock_photo_repository
+                with patch(
+                    "core.services.photo_blob_service.photo_repository",
+                    mock_photo_repository,
+                ):
+                    yield mock_photo_repository
 
 
 @pytest.fixture
@@ -1,7 +1,12 @@
 from django.test import TestCase, RequestFactory
 from rest_framework import status
 from core.exceptions.handler import custom_exception_handler
-from core.exceptions import ResourceNotFound, InsufficientRights, CloudUploadError
+from core.exceptions import (
+    ResourceNotFound,
+    InsufficientRights,
+    CloudUploadError,
+    StorageOperationNotSupported,
+)
 from django.core.exceptions import ObjectDoesNotExist
 
 
@@ -38,6 +43,13 @@ class TestExceptionHandler(TestCase):
         self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
         self.assertEqual(response.data["code"], "CLOUD_ERROR")
 
+    def test_storage_operation_not_supported(self):
+        exc = StorageOperationNotSupported("Not supported")
+        response = custom_exception_handler(exc, {"request": self.request})
+        self.assertIsNotNone(response)
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+        self.assertEqual(response.data["code"], "NOT_SUPPORTED")
+
     def test_unhandled_exception(self):
         exc = Exception("Unhandled")
         response = custom_exception_handler(exc, {"request": self.request})
@@ -1,7 +1,17 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock, patch
-from core.interface.aws import AwsPhotoSaver
-from core.exceptions.exceptions import CloudUploadError
+from django.test import SimpleTestCase, override_settings
+from core.interface.aws import (
+    AwsPhotoSaver,
+    S3MultipartCopy,
+    S3MultipartUploadStream,
+    S3_MIN_PART_SIZE,
+)
+from core.interface.transfer_metrics import transfer_metrics
+from boto3.s3.transfer import TransferConfig
+from core.exceptions.exceptions import CloudUploadError, ResourceNotFound
+from asgiref.sync import async_to_sync
 from botocore.exceptions import ClientError
 
 TEST_AWS_BUCKET_NAME = "testing_bucket_name"
@@ -169,6 +179,468 @@ class TestAwsPhotoSaver(unittest.TestCase):
         with self.assertRaises(CloudUploadError):
             self.aws_saver.delete(TEST_EXPECTED_URL)
 
+    @patch("core.interface.aws.boto3")
+    def test_givenCopyOverride_whenCopyFile_thenShouldUseCopyTransferConfig(
+        self, mock_boto3
+    ):
+        mock_s3_client = MagicMock()
+        mock_s3_client.head_object.return_value = {"ContentLength": 12 * 1024**2}
+        mock_s3_client.create_multipart_upload.return_value = {"UploadId": "u"}
+        mock_s3_client.upload_part_copy.return_value = {
+            "CopyPartResult": {"ETag": "etag"}
+        }
+        mock_boto3.client.return_value = mock_s3_client
+        transfer = {
+            "default": {"multipart_threshold": 8 * 1024 * 1024, "max_concurrency": 4},
+            "copy": {"multipart_chunksize": 5 * 1024 * 1024},
+        }
+
+        with override_settings(AWS_S3_TRANSFER=transfer):
+            self.aws_saver.copy_file(TEST_EXPECTED_URL, TEST_ALBUM_FOLDER_ID)
+
+        self.assertEqual(mock_s3_client.upload_part_copy.call_count, 3)
+        kwargs = mock_s3_client.create_multipart_upload.call_args[1]
+        self.assertEqual(kwargs["ContentType"], "image/jpeg")
+
+    @patch("core.interface.aws.boto3")
+    @patch("core.interface.aws.DEBUG", False)
+    def test_givenUploadOverride_whenSave_thenShouldUseUploadTransferConfig(
+        self, mock_boto3
+    ):
+        mock_s3_client = MagicMock()
+        mock_boto3.client.return_value = mock_s3_client
+        transfer = {
+            "default": {"multipart_chunksize": 8 * 1024 * 1024},
+            "upload": {"multipart_chunksize": 32 * 1024 * 1024},
+        }
+
+        with override_settings(AWS_S3_TRANSFER=transfer):
+            self.aws_saver.save(self.mock_file)
+
+        config = mock_s3_client.upload_fileobj.call_args[1]["Config"]
+        self.assertEqual(config.multipart_chunksize, 32 * 1024 * 1024)
+
+    @patch("core.interface.aws.boto3")
+    def test_givenSeveralOperations_whenCalled_thenShouldReuseOneClient(
+        self, mock_boto3
+    ):
+        mock_boto3.client.return_value = MagicMock()
+        mock_boto3.client.return_value.head_object.return_value = {"ContentLength": 1}
+
+        self.aws_saver.save(self.mock_file)
+        self.aws_saver.delete(TEST_EXPECTED_URL)
+        self.aws_saver.copy_file(TEST_EXPECTED_URL, TEST_ALBUM_FOLDER_ID)
+
+        mock_boto3.client.assert_called_once()
+
+    @patch("core.interface.aws.boto3")
+    def test_givenNewClient_whenCreated_thenShouldUsePooledAdaptiveConfig(
+        self, mock_boto3
+    ):
+        self.aws_saver._get_s3_client()
+
+        config = mock_boto3.client.call_args[1]["config"]
+        self.assertEqual(config.max_pool_connections, 32)
+        self.assertTrue(config.tcp_keepalive)
+        self.assertEqual(config.retries["mode"], "adaptive")
+
+    @patch("core.interface.aws.boto3")
+    def test_givenConcurrentThreads_whenGetClient_thenShouldBuildClientOnce(
+        self, mock_boto3
+    ):
+        mock_boto3.client.side_effect = lambda *args, **kwargs: MagicMock()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(
+                executor.map(lambda _: self.aws_saver._get_s3_client(), range(32))
+            )
+
+        mock_boto3.client.assert_called_once()
+        self.assertTrue(all(client is clients[0] for client in clients))
+
+    @patch("core.interface.aws.boto3")
+    @patch("core.interface.aws.uuid4")
+    @patch("core.interface.aws.AWS_BUCKET_NAME", TEST_AWS_BUCKET_NAME)
+    @patch("core.interface.aws.AWS_REGION", TEST_AWS_REGION)
+    @patch("core.interface.aws.DEBUG", False)
+    def test_givenAFolder_whenCreatePresignedUpload_thenShouldLimitSizeAndType(
+        self, mock_uuid, mock_boto3
+    ):
+        mock_uuid.return_value = TEST_GENERATED_UUID
+        mock_s3_client = MagicMock()
+        mock_boto3.client.return_value = mock_s3_client
+        mock_s3_client.generate_presigned_post.return_value = {
+            "url": "https://upload",
+            "fields": {"key": TEST_S3_KEY_FOLDER},
+        }
+
+        result = self.aws_saver.create_presigned_upload(
+            TEST_FILE_NAME, TEST_ALBUM_FOLDER_ID, "image/jpeg", 1024
+        )
+
+        kwargs = mock_s3_client.generate_presigned_post.call_args[1]
+        self.assertEqual(kwargs["Key"], TEST_S3_KEY_FOLDER)
+        self.assertIn(["content-length-range", 1, 1024], kwargs["Conditions"])
+        self.assertIn({"Content-Type": "image/jpeg"}, kwargs["Conditions"])
+        self.assertEqual(result["image_url"], TEST_EXPECTED_URL_FOLDER)
+
+    @patch("core.interface.aws.boto3")
+    @patch("core.interface.aws.AWS_BUCKET_NAME", TEST_AWS_BUCKET_NAME)
+    @patch("core.interface.aws.AWS_REGION", TEST_AWS_REGION)
+    def test_givenExistingObject_whenStat_thenShouldReturnSizeAndType(self, mock_boto3):
+        mock_s3_client = MagicMock()
+        mock_boto3.client.return_value = mock_s3_client
+        mock_s3_client.head_object.return_value = {
+            "ContentLength": 2048,
+            "ContentType": "image/jpeg",
+        }
+
+        result = self.aws_saver.stat(TEST_EXPECTED_URL)
+
+        mock_s3_client.head_object.assert_called_once_with(
+            Bucket=TEST_AWS_BUCKET_NAME, Key=TEST_S3_KEY
+        )
+        self.assertEqual(result, {"size": 2048, "content_type": "image/jpeg"})
+
+    @patch("core.interface.aws.boto3")
+    def test_givenMissingObject_whenStat_thenShouldReturnNone(self, mock_boto3):
+        mock_s3_client = MagicMock()
+        mock_boto3.client.return_value = mock_s3_client
+        mock_s3_client.head_object.side_effect = ClientError(
+            {"Error": {"Code": "404"}}, "head_object"
+        )
+
+        self.assertIsNone(self.aws_saver.stat(TEST_EXPECTED_URL))
+
+
+@override_settings(
+    PHOTO_UPLOAD_PART_SIZE=S3_MIN_PART_SIZE, PHOTO_UPLOAD_MAX_INFLIGHT_PARTS=2
+)
+class TestS3MultipartUploadStream(SimpleTestCase):
+
+    def setUp(self):
+        self.mock_s3 = MagicMock()
+        self.mock_s3.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+        self.mock_s3.upload_part.side_effect = lambda **kwargs: {
+            "ETag": f"etag-{kwargs['PartNumber']}"
+        }
+
+    def _stream(self):
+        return S3MultipartUploadStream(
+            self.mock_s3, TEST_S3_KEY, TEST_EXPECTED_URL, "image/jpeg"
+        )
+
+    @patch("core.interface.aws.AWS_BUCKET_NAME", TEST_AWS_BUCKET_NAME)
+    def test_givenFileSmallerThanAPart_whenComplete_thenShouldPutSingleObject(self):
+        stream = self._stream()
+
+        stream.write(b"small photo")
+        result = stream.complete()
+
+        self.assertEqual(result, TEST_EXPECTED_URL)
+        self.mock_s3.put_object.assert_called_once()
+        self.assertEqual(self.mock_s3.put_object.call_args[1]["Body"], b"small photo")
+        self.mock_s3.create_multipart_upload.assert_not_called()
+
+    @patch("core.interface.aws.AWS_BUCKET_NAME", TEST_AWS_BUCKET_NAME)
+    def test_givenFileLargerThanAPart_whenComplete_thenShouldUploadOrderedParts(self):
+        stream = self._stream()
+
+        for _ in range(5):
+            stream.write(b"x" * (S3_MIN_PART_SIZE // 2 + 1))
+        stream.complete()
+
+        self.assertEqual(self.mock_s3.upload_part.call_count, 3)
+        parts = self.mock_s3.complete_multipart_upload.call_args[1]["MultipartUpload"][
+            "Parts"
+        ]
+        self.assertEqual([p["PartNumber"] for p in parts], [1, 2, 3])
+        self.assertEqual(parts[0]["ETag"], "etag-1")
+
+    def test_givenManyParts_whenWrite_thenShouldBoundPartsInMemory(self):
+        stream = self._stream()
+
+        for _ in range(6):
+            stream.write(b"x" * S3_MIN_PART_SIZE)
+            self.assertLessEqual(len(stream._pending), 2)
+            self.assertLess(len(stream._buffer), S3_MIN_PART_SIZE)
+        stream.abort()
+
+    def test_givenStartedMultipartUpload_whenAbort_thenShouldAbortOnS3(self):
+        stream = self._stream()
+        stream.write(b"x" * S3_MIN_PART_SIZE)
+
+        stream.abort()
+        stream.abort()
+
+        self.mock_s3.abort_multipart_upload.assert_called_once()
+
+    def test_givenPartUploadFails_whenComplete_thenShouldAbortAndRaise(self):
+        self.mock_s3.upload_part.side_effect = ClientError(
+            {"Error": {"Code": "500"}}, "upload_part"
+        )
+        stream = self._stream()
+        stream.write(b"x" * S3_MIN_PART_SIZE)
+
+        with self.assertRaises(CloudUploadError):
+            stream.complete()
+
+        self.mock_s3.abort_multipart_upload.assert_called_once()
+        self.mock_s3.complete_multipart_upload.assert_not_called()
+
+
+@override_settings(AWS_S3_COPY_PART_ATTEMPTS=3)
+@patch("core.interface.aws.time.sleep")
+class TestS3MultipartCopy(SimpleTestCase):
+
+    def setUp(self):
+        self.mock_s3 = MagicMock()
+        self.mock_s3.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+        self.mock_s3.upload_part_copy.side_effect = lambda **kwargs: {
+            "CopyPartResult": {"ETag": f"etag-{kwargs['PartNumber']}"}
+        }
+        self.config = TransferConfig(
+            multipart_threshold=2 * S3_MIN_PART_SIZE,
+            multipart_chunksize=S3_MIN_PART_SIZE,
+            max_concurrency=4,
+        )
+        transfer_metrics.reset()
+
+    def _copy(self, size):
+        self.mock_s3.head_object.return_value = {"ContentLength": size}
+        S3MultipartCopy(
+            self.mock_s3, "1/a.mp4", "2/a.mp4", "video/mp4", self.config
+        ).run()
+
+    def test_givenSmallObject_whenRun_thenShouldCopyInOneCall(self, mock_sleep):
+        self._copy(S3_MIN_PART_SIZE)
+
+        self.mock_s3.copy_object.assert_called_once()
+        kwargs = self.mock_s3.copy_object.call_args[1]
+        self.assertEqual(kwargs["MetadataDirective"], "REPLACE")
+        self.assertEqual(kwargs["ContentType"], "video/mp4")
+        self.mock_s3.create_multipart_upload.assert_not_called()
+        self.assertIn("copy", transfer_metrics.snapshot())
+
+    def test_givenLargeObject_whenRun_thenShouldCopyRangesInParallel(self, mock_sleep):
+        size = 2 * S3_MIN_PART_SIZE + 10
+
+        self._copy(size)
+
+        self.mock_s3.copy_object.assert_not_called()
+        ranges = sorted(
+            (call[1]["PartNumber"], call[1]["CopySourceRange"])
+            for call in self.mock_s3.upload_part_copy.call_args_list
+        )
+        self.assertEqual(
+            ranges,
+            [
+                (1, f"bytes=0-{S3_MIN_PART_SIZE - 1}"),
+                (2, f"bytes={S3_MIN_PART_SIZE}-{2 * S3_MIN_PART_SIZE - 1}"),
+                (3, f"bytes={2 * S3_MIN_PART_SIZE}-{size - 1}"),
+            ],
+        )
+        parts = self.mock_s3.complete_multipart_upload.call_args[1]["MultipartUpload"][
+            "Parts"
+        ]
+        self.assertEqual([p["ETag"] for p in parts], ["etag-1", "etag-2", "etag-3"])
+        stats = transfer_metrics.snapshot()["multipart_copy"]["10-100MB"]
+        self.assertEqual(stats["bytes"], size)
+
+    def test_givenTransientPartError_whenRun_thenShouldRetryOnlyThatPart(
+        self, mock_sleep
+    ):
+        failures = []
+
+        def upload_part_copy(**kwargs):
+            if kwargs["PartNumber"] == 2 and not failures:
+                failures.append(kwargs["PartNumber"])
+                raise ClientError(
+                    {
+                        "Error": {"Code": "InternalError"},
+                        "ResponseMetadata": {"HTTPStatusCode": 500},
+                    },
+                    "upload_part_copy",
+                )
+            return {"CopyPartResult": {"ETag": f"etag-{kwargs['PartNumber']}"}}
+
+        self.mock_s3.upload_part_copy.side_effect = upload_part_copy
+
+        self._copy(3 * S3_MIN_PART_SIZE)
+
+        self.assertEqual(self.mock_s3.upload_part_copy.call_count, 4)
+        mock_sleep.assert_called_once()
+        self.mock_s3.complete_multipart_upload.assert_called_once()
+        self.mock_s3.abort_multipart_upload.assert_not_called()
+
+    def test_givenPersistentPartError_whenRun_thenShouldAbortAndRaise(self, mock_sleep):
+        self.mock_s3.upload_part_copy.side_effect = ClientError(
+            {"Error": {"Code": "SlowDown"}}, "upload_part_copy"
+        )
+
+        with self.assertRaises(ClientError):
+            self._copy(3 * S3_MIN_PART_SIZE)
+
+        self.mock_s3.abort_multipart_upload.assert_called_once()
+        self.mock_s3.complete_multipart_upload.assert_not_called()
+        stats = transfer_metrics.snapshot()["multipart_copy"].values()
+        self.assertEqual(sum(size_class["failures"] for size_class in stats), 1)
+
+    def test_givenNonRetryableError_whenRun_thenShouldNotRetry(self, mock_sleep):
+        self.mock_s3.upload_part_copy.side_effect = ClientError(
+            {"Error": {"Code": "AccessDenied"}}, "upload_part_copy"
+        )
+
+        with self.assertRaises(ClientError):
+            self._copy(3 * S3_MIN_PART_SIZE)
+
+        mock_sleep.assert_not_called()
+
+    def test_givenHugeObject_whenRun_thenShouldStayUnder10000Parts(self, mock_sleep):
+        self._copy(10001 * S3_MIN_PART_SIZE)
+
+        self.assertLessEqual(self.mock_s3.upload_part_copy.call_count, 10000)
+
+
+@patch("core.interface.aws.AWS_BUCKET_NAME", TEST_AWS_BUCKET_NAME)
+@patch("core.interface.aws.AWS_REGION", TEST_AWS_REGION)
+class TestAwsPhotoSaverBatchOperations(SimpleTestCase):
+
+    def setUp(self):
+        self.mock_s3 = MagicMock()
+        self.aws_saver = AwsPhotoSaver()
+        self.aws_saver._s3_client = self.mock_s3
+        self.prefix = (
+            f"https://{TEST_AWS_BUCKET_NAME}.s3.{TEST_AWS_REGION}.amazonaws.com/"
+        )
+
+    def _url(self, key):
+        return f"{self.prefix}{key}"
+
+    def test_givenManyUrls_whenDeleteMany_thenShouldSendChunksOf1000Keys(self):
+        self.mock_s3.delete_objects.return_value = {}
+        urls = [self._url(f"1/photo_{i}.jpg") for i in range(2500)]
+
+        failed = self.aws_saver.delete_many(urls)
+
+        self.assertEqual(failed, [])
+        chunks = [
+            call[1]["Delete"]["Objects"]
+            for call in self.mock_s3.delete_objects.call_args_list
+        ]
+        self.assertEqual([len(chunk) for chunk in chunks], [1000, 1000, 500])
+        self.assertEqual(chunks[0][0], {"Key": "1/photo_0.jpg"})
+        self.mock_s3.delete_object.assert_not_called()
+
+    def test_givenPartialErrors_whenDeleteMany_thenShouldReturnFailedUrls(self):
+        self.mock_s3.delete_objects.return_value = {
+            "Errors": [{"Key": "1/b.jpg", "Code": "AccessDenied"}]
+        }
+
+        failed = self.aws_saver.delete_many(
+            [self._url("1/a.jpg"), self._url("1/b.jpg"), None]
+        )
+
+        self.assertEqual(failed, [self._url("1/b.jpg")])
+
+    def test_givenRequestFailure_whenDeleteMany_thenShouldReturnWholeChunk(self):
+        self.mock_s3.delete_objects.side_effect = ClientError(
+            {"Error": {"Code": "500"}}, "delete_objects"
+        )
+        urls = [self._url("1/a.jpg"), self._url("1/b.jpg")]
+
+        self.assertEqual(self.aws_saver.delete_many(urls), urls)
+
+    @patch("core.interface.aws.DEBUG", False)
+    def test_givenFailingCopy_whenCopyMany_thenShouldReturnNoneForIt(self):
+        def copy_object(CopySource, **kwargs):
+            if CopySource["Key"] == "1/b.jpg":
+                raise ClientError({"Error": {"Code": "500"}}, "copy_object")
+
+        self.mock_s3.head_object.return_value = {"ContentLength": 1}
+        self.mock_s3.copy_object.side_effect = copy_object
+
+        new_urls = self.aws_saver.copy_many(
+            [self._url("1/a.jpg"), self._url("1/b.jpg")], 2
+        )
+
+        self.assertTrue(new_urls[0].startswith(self._url("2/")))
+        self.assertIsNone(new_urls[1])
+
+    def test_givenUrls_whenExistsMany_thenShouldHeadEachObject(self):
+        def head_object(Bucket, Key):
+            if Key == "1/missing.jpg":
+                raise ClientError({"Error": {"Code": "404"}}, "head_object")
+            return {"ContentLength": 1}
+
+        self.mock_s3.head_object.side_effect = head_object
+        urls = [self._url("1/a.jpg"), self._url("1/missing.jpg")]
+
+        self.assertEqual(
+            self.aws_saver.exists_many(urls), {urls[0]: True, urls[1]: False}
+        )
+
+    def test_givenRange_whenOpenStream_thenShouldRequestByteRange(self):
+        body = MagicMock()
+        self.mock_s3.get_object.return_value = {"Body": body}
+
+        self.assertIs(self.aws_saver.open_stream(self._url("1/a.jpg"), 0, 99), body)
+        self.aws_saver.open_stream(self._url("1/a.jpg"))
+
+        first, second = self.mock_s3.get_object.call_args_list
+        self.assertEqual(first[1]["Range"], "bytes=0-99")
+        self.assertEqual(first[1]["Key"], "1/a.jpg")
+        self.assertNotIn("Range", second[1])
+
+    def test_givenMissingObject_whenOpenStream_thenShouldRaiseNotFound(self):
+        self.mock_s3.get_object.side_effect = ClientError(
+            {"Error": {"Code": "NoSuchKey"}}, "get_object"
+        )
+
+        with self.assertRaises(ResourceNotFound):
+            self.aws_saver.open_stream(self._url("1/a.jpg"))
+
+    def test_givenPrefix_whenListPrefix_thenShouldYieldPages(self):
+        self.mock_s3.get_paginator.return_value.paginate.return_value = [
+            {"Contents": [{"Key": "1/a.jpg", "Size": 3, "LastModified": "t1"}]},
+            {},
+        ]
+
+        pages = list(self.aws_saver.list_prefix("1/", page_size=10))
+
+        self.assertEqual(
+            pages,
+            [
+                [
+                    {
+                        "key": "1/a.jpg",
+                        "url": self._url("1/a.jpg"),
+                        "size": 3,
+                        "last_modified": "t1",
+                    }
+                ],
+                [],
+            ],
+        )
+        self.mock_s3.get_paginator.assert_called_once_with("list_objects_v2")
+        paginate_kwargs = self.mock_s3.get_paginator.return_value.paginate.call_args[1]
+        self.assertEqual(paginate_kwargs["Prefix"], "1/")
+        self.assertEqual(paginate_kwargs["PaginationConfig"], {"PageSize": 10})
+
+    def test_givenDebugMode_whenFolderPrefix_thenShouldMatchSavedKeys(self):
+        with patch("core.interface.aws.DEBUG", True):
+            self.assertEqual(self.aws_saver.folder_prefix(3), "debug_3/")
+        with patch("core.interface.aws.DEBUG", False):
+            self.assertEqual(self.aws_saver.folder_prefix(3), "3/")
+
+    def test_givenAsyncVariant_whenAwaited_thenShouldRunBlockingCall(self):
+        self.mock_s3.delete_objects.return_value = {}
+
+        failed = async_to_sync(self.aws_saver.adelete_many)([self._url("1/a.jpg")])
+
+        self.assertEqual(failed, [])
+        self.mock_s3.delete_objects.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,214 @@
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from core.exceptions import (
+    CloudUploadError,
+    ResourceNotFound,
+    StorageOperationNotSupported,
+)
+from core.interface.local import LocalPhotoSaver
+from pathlib import Path
+from unittest.mock import patch
+import errno
+import tempfile
+
+BASE_URL = "http://localhost:8000/api/media/"
+
+
+class TestLocalPhotoSaver(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.settings_override = override_settings(
+            PHOTO_LOCAL_ROOT=self.tmpdir.name, PHOTO_LOCAL_BASE_URL=BASE_URL
+        )
+        self.settings_override.enable()
+        self.saver = LocalPhotoSaver()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.tmpdir.cleanup()
+
+    def _path(self, url):
+        return self.root / self.saver.relative_path_for_key(url[len(BASE_URL) :])
+
+    def _leftovers(self):
+        return [p for p in self.root.rglob(".*") if p.is_file()]
+
+    def test_save_within_folder_writes_sharded_file(self):
+        file = SimpleUploadedFile("photo.jpg", b"data", content_type="image/jpeg")
+
+        url = self.saver.save_within_folder(file, 12)
+
+        self.assertTrue(url.startswith(f"{BASE_URL}12/"))
+        self.assertTrue(url.endswith("_photo.jpg"))
+        path = self._path(url)
+        self.assertEqual(path.read_bytes(), b"data")
+        relative = path.relative_to(self.root).parts
+        self.assertEqual(relative[0], "12")
+        self.assertEqual([len(part) for part in relative[1:3]], [2, 2])
+        self.assertEqual(self._leftovers(), [])
+
+    def test_save_without_folder_uses_root_folder(self):
+        url = self.saver.save(SimpleUploadedFile("cover.jpg", b"cover"))
+
+        self.assertEqual(self._path(url).relative_to(self.root).parts[0], "_root")
+        self.assertEqual(self._path(url).read_bytes(), b"cover")
+
+    def test_save_derivative_is_named_after_source(self):
+        source = self.saver.save_within_folder(SimpleUploadedFile("a.jpg", b"a"), 3)
+
+        url = self.saver.save_derivative(
+            SimpleUploadedFile("d.webp", b"small"), source, 320, "webp"
+        )
+
+        folder, _, name = source.rpartition("/")
+        self.assertEqual(url, f"{folder}/_w320_{name}.webp")
+        self.assertEqual(self._path(url).read_bytes(), b"small")
+
+    def test_upload_stream_is_atomic(self):
+        stream = self.saver.open_upload_stream("photo.jpg", 1)
+        stream.write(b"first ")
+        stream.write(b"second")
+        self.assertFalse(stream.path.exists())
+
+        url = stream.complete()
+
+        self.assertEqual(self._path(url).read_bytes(), b"first second")
+        self.assertEqual(self._leftovers(), [])
+
+    def test_upload_stream_abort_removes_temp_file(self):
+        stream = self.saver.open_upload_stream("photo.jpg", 1)
+        stream.write(b"partial")
+
+        stream.abort()
+        stream.abort()
+
+        self.assertFalse(stream.path.exists())
+        self.assertEqual(self._leftovers(), [])
+
+    def test_copy_file_hard_links_source(self):
+        source = self.saver.save_within_folder(SimpleUploadedFile("a.jpg", b"a"), 1)
+
+        copy = self.saver.copy_file(source, 2)
+
+        self.assertTrue(copy.startswith(f"{BASE_URL}2/"))
+        self.assertTrue(copy.endswith("_a.jpg"))
+        self.assertEqual(
+            self._path(copy).stat().st_ino, self._path(source).stat().st_ino
+        )
+
+    def test_copy_file_falls_back_to_copy_across_devices(self):
+        source = self.saver.save_within_folder(SimpleUploadedFile("a.jpg", b"a"), 1)
+
+        with patch(
+            "core.interface.local.os.link", side_effect=OSError(errno.EXDEV, "")
+        ):
+            copy = self.saver.copy_file(source, 2)
+
+        self.assertEqual(self._path(copy).read_bytes(), b"a")
+        self.assertNotEqual(
+            self._path(copy).stat().st_ino, self._path(source).stat().st_ino
+        )
+        self.assertEqual(self._leftovers(), [])
+
+    def test_copy_missing_file_raises(self):
+        with self.assertRaises(CloudUploadError):
+            self.saver.copy_file(f"{BASE_URL}1/missing.jpg", 2)
+
+    def test_delete_removes_file_and_ignores_missing(self):
+        url = self.saver.save_within_folder(SimpleUploadedFile("a.jpg", b"a"), 1)
+
+        self.assertTrue(self.saver.delete(url))
+        self.assertFalse(self._path(url).exists())
+        self.assertTrue(self.saver.delete(url))
+        self.assertTrue(self.saver.delete(""))
+
+    def test_delete_keeps_hard_linked_copy(self):
+        source = self.saver.save_within_folder(SimpleUploadedFile("a.jpg", b"a"), 1)
+        copy = self.saver.copy_file(source, 2)
+
+        self.saver.delete(source)
+
+        self.assertEqual(self._path(copy).read_bytes(), b"a")
+
+    def test_stat(self):
+        url = self.saver.save_within_folder(SimpleUploadedFile("a.png", b"1234"), 1)
+
+        self.assertEqual(self.saver.stat(url), {"size": 4, "content_type": "image/png"})
+        self.assertIsNone(self.saver.stat(f"{BASE_URL}1/missing.png"))
+
+    def test_presigned_upload_not_supported(self):
+        with self.assertRaises(StorageOperationNotSupported):
+            self.saver.create_presigned_upload("a.jpg", 1, "image/jpeg", 10)
+
+    def test_rejects_path_traversal(self):
+        for key in ["../a.jpg", "1/../a.jpg", "1/", "1/..", "./a.jpg"]:
+            with self.subTest(key=key), self.assertRaises(ValueError):
+                self.saver.relative_path_for_key(key)
+
+    def test_path_of_stays_under_root(self):
+        path = self.saver.path_of(Path("1", "ab", "cd", "a.jpg"))
+
+        self.assertEqual(path, self.root.resolve() / "1" / "ab" / "cd" / "a.jpg")
+        for relative_path in [Path("..", "a.jpg"), Path("1", "..", ".."), Path("/a")]:
+            with self.subTest(path=relative_path), self.assertRaises(ValueError):
+                self.saver.path_of(relative_path)
+
+    def test_open_stream_reads_whole_file_or_range(self):
+        url = self.saver.save_within_folder(
+            SimpleUploadedFile("a.jpg", b"0123456789"), 1
+        )
+
+        with self.saver.open_stream(url) as stream:
+            self.assertEqual(stream.read(), b"0123456789")
+        with self.saver.open_stream(url, 2, 5) as stream:
+            self.assertEqual(stream.read(), b"2345")
+
+    def test_open_stream_missing_file_raises(self):
+        with self.assertRaises(ResourceNotFound):
+            self.saver.open_stream(f"{BASE_URL}1/missing.jpg")
+
+    def test_list_prefix_pages_files_of_folder(self):
+        urls = {
+            self.saver.save_within_folder(SimpleUploadedFile(f"{i}.jpg", b"x"), 1)
+            for i in range(3)
+        }
+        self.saver.save_within_folder(SimpleUploadedFile("other.jpg", b"x"), 2)
+        self.saver.open_upload_stream("pending.jpg", 1).write(b"partial")
+
+        pages = list(self.saver.list_prefix("1/", page_size=2))
+
+        self.assertEqual([len(page) for page in pages], [2, 1])
+        self.assertEqual({item["url"] for page in pages for item in page}, urls)
+        self.assertEqual(pages[0][0]["size"], 1)
+
+    def test_list_prefix_includes_root_keys(self):
+        cover = self.saver.save(SimpleUploadedFile("cover.jpg", b"x"))
+        self.saver.save_within_folder(SimpleUploadedFile("a.jpg", b"x"), 1)
+
+        items = [item for page in self.saver.list_prefix("") for item in page]
+
+        self.assertEqual(len(items), 2)
+        self.assertIn(cover, [item["url"] for item in items])
+
+    def test_batch_operations_default_to_single_calls(self):
+        url = self.saver.save_within_folder(SimpleUploadedFile("a.jpg", b"a"), 1)
+        missing = f"{BASE_URL}1/missing.jpg"
+
+        self.assertEqual(
+            self.saver.exists_many([url, missing]), {url: True, missing: False}
+        )
+        copies = self.saver.copy_many([url, missing], 2)
+        self.assertTrue(copies[0].startswith(f"{BASE_URL}2/"))
+        self.assertIsNone(copies[1])
+        self.assertEqual(self.saver.delete_many([url, copies[0]]), [])
+        self.assertFalse(self.saver.exists_many([url])[url])
+
+    def test_async_list_prefix(self):
+        self.saver.save_within_folder(SimpleUploadedFile("a.jpg", b"a"), 1)
+
+        async def collect():
+            return [page async for page in self.saver.alist_prefix("1/")]
+
+        self.assertEqual(len(async_to_sync(collect)()[0]), 1)
@@ -0,0 +1,42 @@
+import unittest
+from core.interface.transfer_metrics import ByteCounter, TransferMetrics, MB
+
+
+class TestTransferMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = TransferMetrics()
+
+    def test_givenTransfers_whenSnapshot_thenShouldGroupByOperationAndSizeClass(self):
+        self.metrics.record("upload", 2 * MB, 1.0)
+        self.metrics.record("upload", 4 * MB, 1.0)
+        self.metrics.record("upload", 500, 0.1)
+        self.metrics.record("copy", 200 * MB, 2.0)
+
+        snapshot = self.metrics.snapshot()
+
+        self.assertEqual(snapshot["upload"]["1-10MB"]["count"], 2)
+        self.assertEqual(snapshot["upload"]["1-10MB"]["throughput_mb_s"], 3.0)
+        self.assertEqual(snapshot["upload"]["<1MB"]["count"], 1)
+        self.assertEqual(snapshot["copy"][">=100MB"]["throughput_mb_s"], 100.0)
+
+    def test_givenFailedTransfer_whenMeasure_thenShouldCountFailureAndReraise(self):
+        with self.assertRaises(RuntimeError):
+            with self.metrics.measure("upload", ByteCounter()) as counter:
+                counter(1024)
+                raise RuntimeError("boom")
+
+        stats = self.metrics.snapshot()["upload"]["<1MB"]
+        self.assertEqual(stats["failures"], 1)
+        self.assertEqual(stats["bytes"], 0)
+
+    def test_givenCallbackBytes_whenMeasure_thenShouldRecordTransferredBytes(self):
+        with self.metrics.measure("copy", ByteCounter()) as counter:
+            counter(MB)
+            counter(MB)
+
+        self.assertEqual(self.metrics.snapshot()["copy"]["1-10MB"]["bytes"], 2 * MB)
+
+
+if __name__ == "__main__":
+    unittest.main()
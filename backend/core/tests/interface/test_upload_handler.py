@@ -0,0 +1,102 @@
+import hashlib
+import unittest
+from unittest.mock import MagicMock, patch
+from django.core.files.uploadhandler import StopFutureHandlers
+from core.interface.upload_handler import StreamingUploadHandler, StreamedUploadedFile
+
+TEST_ALBUM_ID = 1
+TEST_FILE_NAME = "photo.jpg"
+TEST_CONTENT_TYPE = "image/jpeg"
+TEST_STORED_URL = "https://bucket.s3.amazonaws.com/1/uuid_photo.jpg"
+
+
+class TestStreamingUploadHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_stream = MagicMock()
+        self.mock_stream.complete.return_value = TEST_STORED_URL
+        self.mock_repository = MagicMock()
+        self.mock_repository.open_upload_stream.return_value = self.mock_stream
+        self.handler = StreamingUploadHandler(
+            MagicMock(),
+            repository=self.mock_repository,
+            folder_album_id=TEST_ALBUM_ID,
+        )
+
+    def _start_image(self):
+        with self.assertRaises(StopFutureHandlers):
+            self.handler.new_file(
+                "image", TEST_FILE_NAME, TEST_CONTENT_TYPE, None, None, None
+            )
+
+    def test_givenImageField_whenNewFile_thenShouldOpenStreamInAlbumFolder(self):
+        self._start_image()
+
+        self.mock_repository.open_upload_stream.assert_called_once_with(
+            TEST_FILE_NAME, TEST_ALBUM_ID, content_type=TEST_CONTENT_TYPE
+        )
+
+    def test_givenOtherField_whenReceiveChunk_thenShouldPassChunkThrough(self):
+        self.handler.new_file("other", TEST_FILE_NAME, TEST_CONTENT_TYPE, None)
+
+        result = self.handler.receive_data_chunk(b"data", 0)
+
+        self.assertEqual(result, b"data")
+        self.assertIsNone(self.handler.file_complete(4))
+        self.mock_repository.open_upload_stream.assert_not_called()
+
+    def test_givenImageField_whenReceiveChunk_thenShouldWriteToStream(self):
+        self._start_image()
+
+        result = self.handler.receive_data_chunk(b"data", 0)
+
+        self.assertIsNone(result)
+        self.mock_stream.write.assert_called_once_with(b"data")
+
+    def test_givenImageField_whenFileComplete_thenShouldReturnStoredUrl(self):
+        self._start_image()
+
+        uploaded = self.handler.file_complete(4)
+
+        self.assertIsInstance(uploaded, StreamedUploadedFile)
+        self.assertEqual(uploaded.url, TEST_STORED_URL)
+        self.assertEqual(uploaded.name, TEST_FILE_NAME)
+        self.assertEqual(uploaded.size, 4)
+
+    def test_givenImageChunks_whenFileComplete_thenShouldHashContent(self):
+        self._start_image()
+        self.handler.receive_data_chunk(b"da", 0)
+        self.handler.receive_data_chunk(b"ta", 2)
+
+        uploaded = self.handler.file_complete(4)
+
+        self.assertEqual(uploaded.sha256, hashlib.sha256(b"data").hexdigest())
+
+    @patch("core.interface.upload_handler.METADATA_HEADER_SIZE", 3)
+    def test_givenImageChunks_whenFileComplete_thenShouldKeepHeaderBytes(self):
+        self._start_image()
+        self.handler.receive_data_chunk(b"da", 0)
+        self.handler.receive_data_chunk(b"ta", 2)
+
+        uploaded = self.handler.file_complete(4)
+
+        self.assertEqual(uploaded.header, b"dat")
+
+    def test_givenOpenStream_whenUploadInterrupted_thenShouldAbortStream(self):
+        self._start_image()
+
+        self.handler.upload_interrupted()
+
+        self.mock_stream.abort.assert_called_once()
+
+    def test_givenCompletedFile_whenUploadComplete_thenShouldNotAbort(self):
+        self._start_image()
+        self.handler.file_complete(4)
+
+        self.handler.upload_complete()
+
+        self.mock_stream.abort.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
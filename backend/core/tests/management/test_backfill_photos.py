@@ -0,0 +1,44 @@
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+
+
+@patch("core.management.commands.backfill_photos.BackfillService")
+class TestBackfillPhotosCommand(SimpleTestCase):
+
+    def test_runs_task_with_options(self, mock_service):
+        checkpoint = MagicMock(processed=5, updated=4, failed=1, last_id=9)
+
+        def run(name, progress, **options):
+            progress(checkpoint)
+            return checkpoint
+
+        mock_service.run.side_effect = run
+        out = StringIO()
+
+        call_command(
+            "backfill_photos",
+            "metadata",
+            "--workers",
+            "2",
+            "--rate-limit",
+            "10",
+            "--restart",
+            stdout=out,
+        )
+
+        options = mock_service.run.call_args.kwargs
+        self.assertEqual(mock_service.run.call_args.args, ("metadata",))
+        self.assertEqual(
+            (options["workers"], options["rate_limit"], options["restart"]),
+            (2, 10.0, True),
+        )
+        self.assertIn("5 rows processed, 1 failed (up to id 9)", out.getvalue())
+        self.assertIn("metadata: 5 rows processed, 4 updated", out.getvalue())
+
+    def test_rejects_unknown_task(self, mock_service):
+        with self.assertRaises(CommandError):
+            call_command("backfill_photos", "unknown")
+        mock_service.run.assert_not_called()
@@ -0,0 +1,49 @@
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+STATS = {"scanned": 3, "orphans": 2, "deleted": 2, "failed": 0}
+
+
+@patch("core.management.commands.collect_storage_garbage.StorageGcService")
+class TestCollectStorageGarbageCommand(SimpleTestCase):
+
+    def test_runs_once_with_options(self, mock_service):
+        mock_service.collect.return_value = STATS
+        out = StringIO()
+
+        call_command(
+            "collect_storage_garbage",
+            "--prefix",
+            "1/",
+            "--grace-period",
+            "60",
+            "--dry-run",
+            stdout=out,
+        )
+
+        mock_service.collect.assert_called_once_with(
+            prefixes=["1/"], grace_period=60, dry_run=True
+        )
+        self.assertIn("would delete 2", out.getvalue())
+
+    def test_all_scans_whole_storage(self, mock_service):
+        mock_service.collect.return_value = STATS
+
+        call_command("collect_storage_garbage", "--all", stdout=StringIO())
+
+        self.assertEqual(mock_service.collect.call_args[1]["prefixes"], [""])
+
+    @patch("core.management.commands.collect_storage_garbage.time.sleep")
+    def test_interval_runs_periodically(self, mock_sleep, mock_service):
+        mock_service.collect.return_value = STATS
+        mock_sleep.side_effect = [None, KeyboardInterrupt]
+
+        with self.assertRaises(KeyboardInterrupt):
+            call_command(
+                "collect_storage_garbage", "--interval", "3600", stdout=StringIO()
+            )
+
+        self.assertEqual(mock_service.collect.call_count, 2)
+        mock_sleep.assert_called_with(3600)
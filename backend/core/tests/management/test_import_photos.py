@@ -0,0 +1,46 @@
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+from rest_framework.exceptions import NotFound
+
+
+@patch("core.management.commands.import_photos.PhotoImportService")
+class TestImportPhotosCommand(SimpleTestCase):
+
+    def test_imports_and_prints_progress(self, mock_service):
+        def run(source, progress, **options):
+            stats = {
+                "files": 4,
+                "bytes": 4_000_000,
+                "processed": 2,
+                "processed_bytes": 2_000_000,
+                "imported": 3,
+                "skipped": 1,
+                "failed": 0,
+            }
+            progress(stats)
+            return {**stats, "processed": 4, "album_ids": [1, 2]}
+
+        mock_service.run.side_effect = run
+        out = StringIO()
+
+        call_command(
+            "import_photos", "/photos", "--album", "3", "--workers", "2", stdout=out
+        )
+
+        self.assertEqual(mock_service.run.call_args.args, ("/photos",))
+        options = mock_service.run.call_args.kwargs
+        self.assertEqual(
+            (options["album_id"], options["workers"], options["batch_size"]),
+            (3, 2, 100),
+        )
+        self.assertRegex(out.getvalue(), r"2/4 files, [\d.]+ files/s, [\d.]+ MB/s, ETA")
+        self.assertIn("3 imported, 1 skipped, 0 failed (2 albums)", out.getvalue())
+
+    def test_reports_errors(self, mock_service):
+        mock_service.run.side_effect = NotFound("Album with id 3 not found")
+
+        with self.assertRaisesMessage(CommandError, "Album with id 3 not found"):
+            call_command("import_photos", "/photos", "--album", "3")
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+from core.imaging import render_all
+
+COMMAND = "core.management.commands.process_image_jobs"
+
+
+@patch(f"{COMMAND}.create", ThreadPoolExecutor)
+@patch(f"{COMMAND}.ImageJobService")
+class TestProcessImageJobsCommand(SimpleTestCase):
+
+    def test_once_runs_due_jobs_then_exits(self, mock_service):
+        jobs = [MagicMock(), MagicMock()]
+        mock_service.claim.side_effect = [jobs, [], []]
+        mock_service.run.side_effect = [[{"url": "u"}], None]
+        out = StringIO()
+
+        call_command("process_image_jobs", "--once", "--processes", "2", stdout=out)
+
+        mock_service.claim.assert_any_call(2)
+        self.assertEqual(mock_service.run.call_count, 2)
+        self.assertIn("1 jobs done, 1 failed", out.getvalue())
+
+    @patch(f"{COMMAND}.render_all")
+    def test_rendering_goes_through_process_pool(self, mock_render, mock_service):
+        mock_render.return_value = ["variant"]
+        mock_service.claim.side_effect = [[MagicMock()], []]
+        rendered = []
+        mock_service.run.side_effect = lambda job, render: rendered.append(
+            render(b"data")
+        )
+
+        call_command(
+            "process_image_jobs", "--once", "--processes", "1", stdout=StringIO()
+        )
+
+        mock_render.assert_called_once_with(b"data")
+        self.assertEqual(rendered, [["variant"]])
+
+    @patch(f"{COMMAND}.render_all")
+    def test_exits_when_a_process_dies(self, mock_render, mock_service):
+        mock_render.side_effect = BrokenProcessPool()
+        mock_service.claim.side_effect = [[MagicMock()], []]
+
+        def run(job, render):
+            try:
+                render(b"data")
+            except Exception:
+                return None
+
+        mock_service.run.side_effect = run
+
+        with self.assertRaises(CommandError):
+            call_command("process_image_jobs", "--processes", "1", stdout=StringIO())
+
+    def test_render_all_is_importable_by_worker_processes(self, mock_service):
+        # Spawned processes import the renderer by name
+        self.assertEqual(render_all.__module__, "core.imaging")
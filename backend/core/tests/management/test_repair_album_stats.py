@@ -0,0 +1,17 @@
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+
+@patch("core.management.commands.repair_album_stats.AlbumStatsService")
+class TestRepairAlbumStatsCommand(SimpleTestCase):
+
+    def test_repairs_and_reports(self, mock_service):
+        mock_service.repair.return_value = {"albums": 12, "repaired": 2}
+        out = StringIO()
+
+        call_command("repair_album_stats", "--batch-size", "50", stdout=out)
+
+        mock_service.repair.assert_called_once_with(batch_size=50)
+        self.assertIn("12 albums checked, 2 repaired", out.getvalue())
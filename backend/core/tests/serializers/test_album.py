@@ -18,30 +18,14 @@ class TestAlbumSerializer(unittest.TestCase):
         self.context = {"request": self.mock_request}
         self.album_serializer = AlbumSerializer(context=self.context)
 
-    @patch("core.serializers.album.Photo")
-    def test_givenAlbumInstance_whenGetNbPhotos_thenShouldFilterPhotosByAlbum(
-        self, mock_photo_model
-    ):
-        mock_album = MagicMock(spec=Album)
-        mock_qs = MagicMock()
-        mock_photo_model.objects.filter.return_value = mock_qs
-
-        self.album_serializer.get_nb_photos(mock_album)
-
-        mock_photo_model.objects.filter.assert_called_once_with(album=mock_album)
-
-    @patch("core.serializers.album.Photo")
-    def test_givenAlbumInstance_whenGetNbPhotos_thenShouldReturnCount(
-        self, mock_photo_model
-    ):
-        mock_album = MagicMock(spec=Album)
-        mock_qs = MagicMock()
-        mock_photo_model.objects.filter.return_value = mock_qs
-        mock_qs.count.return_value = TEST_NB_PHOTOS
+    def test_givenAlbumInstance_whenSerialize_thenNbPhotosShouldBeStoredCount(self):
+        album = Album(id=1, title="Album", photo_count=TEST_NB_PHOTOS, total_bytes=10)
 
-        result = self.album_serializer.get_nb_photos(mock_album)
+        data = AlbumSerializer(instance=album).data
 
-        self.assertEqual(result, TEST_NB_PHOTOS)
+        self.assertEqual(data["nb_photos"], TEST_NB_PHOTOS)
+        self.assertEqual(data["total_bytes"], 10)
+        self.assertIsNone(data["last_photo_at"])
 
     def test_givenUnauthenticatedUser_whenCreate_thenShouldReturnNone(self):
         self.mock_user.is_authenticated = False
@@ -27,10 +27,7 @@ class TestPhotoSerializer(unittest.TestCase):
         self.context = {"request": self.mock_request, "album": self.mock_album}
         self.serializer = PhotoSerializer(context=self.context)
 
-    @patch("core.serializers.album.Photo")
-    def test_givenPhotoInstance_whenSerialize_thenShouldContainExpectedFields(
-        self, mock_album_photo
-    ):
+    def test_givenPhotoInstance_whenSerialize_thenShouldContainExpectedFields(self):
         mock_photo = MagicMock(spec=Photo)
         mock_photo.id = TEST_PHOTO_ID
         mock_photo.image_url = TEST_IMAGE_URL
@@ -40,8 +37,6 @@ class TestPhotoSerializer(unittest.TestCase):
         mock_photo.updated_at = "2023-01-02"
         mock_photo.album = self.mock_album
 
-        mock_album_photo.objects.filter.return_value.count.return_value = 0
-
         serializer = PhotoSerializer(instance=mock_photo)
         data = serializer.data
 
@@ -74,6 +69,16 @@ class TestPhotoSerializer(unittest.TestCase):
 
         mock_create.assert_called_once_with(album=self.mock_album, **TEST_VALID_DATA)
 
+    @patch("core.serializers.photo.Photo.objects.create")
+    def test_givenAlbumPassedToSave_whenCreate_thenShouldNotPassAlbumTwice(
+        self, mock_create
+    ):
+        self.mock_user.is_authenticated = True
+
+        self.serializer.create({**TEST_VALID_DATA, "album": self.mock_album})
+
+        mock_create.assert_called_once_with(album=self.mock_album, **TEST_VALID_DATA)
+
     @patch("core.serializers.photo.Photo.objects.create")
     def test_givenAuthenticatedUserAndAlbum_whenCreate_thenShouldReturnCreatedInstance(
         self, mock_create
@@ -87,5 +92,61 @@ class TestPhotoSerializer(unittest.TestCase):
         self.assertEqual(result, mock_instance)
 
 
+class TestPhotoSerializerSrcset(unittest.TestCase):
+
+    def test_givenDerivatives_whenSerialize_thenShouldGroupSrcsetByType(self):
+        photo = Photo(
+            id=TEST_PHOTO_ID,
+            image_url=TEST_IMAGE_URL,
+            album=Album(id=1, title="Album"),
+            derivatives=[
+                {
+                    "url": "https://example.com/a.w640.jpg",
+                    "width": 640,
+                    "format": "jpeg",
+                },
+                {
+                    "url": "https://example.com/a.w320.webp",
+                    "width": 320,
+                    "format": "webp",
+                },
+                {
+                    "url": "https://example.com/a.w320.jpg",
+                    "width": 320,
+                    "format": "jpeg",
+                },
+            ],
+        )
+
+        data = PhotoSerializer(instance=photo).data
+
+        self.assertEqual(
+            data["srcset"],
+            {
+                "image/webp": "https://example.com/a.w320.webp 320w",
+                "image/jpeg": "https://example.com/a.w320.jpg 320w, "
+                "https://example.com/a.w640.jpg 640w",
+            },
+        )
+        self.assertEqual(data["album"]["cover_srcset"], {})
+
+    def test_givenPlaceholders_whenSerialize_thenShouldExposeThem(self):
+        photo = Photo(
+            id=TEST_PHOTO_ID,
+            image_url=TEST_IMAGE_URL,
+            placeholder="data:image/webp;base64,AA",
+            album=Album(
+                id=1, title="Album", cover_placeholder="data:image/jpeg;base64,BB"
+            ),
+        )
+
+        data = PhotoSerializer(instance=photo).data
+
+        self.assertEqual(data["placeholder"], "data:image/webp;base64,AA")
+        self.assertEqual(
+            data["album"]["cover_placeholder"], "data:image/jpeg;base64,BB"
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
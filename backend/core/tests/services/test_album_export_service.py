@@ -0,0 +1,134 @@
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.exceptions import NotFound
+from unittest.mock import patch
+from core.models import Album, Photo
+from core.services.album_export_service import AlbumExportService
+import io
+import zipfile
+
+BASE_URL = "https://bucket.s3.amazonaws.com/1/"
+
+
+class TestAlbumExportService(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.album = Album.objects.create(title="Été à Paris")
+        self.files = {
+            f"{BASE_URL}uuid1_beach.jpg": b"a" * 3000,
+            f"{BASE_URL}uuid2_beach.jpg": b"b" * 10,
+            f"{BASE_URL}uuid3_empty.jpg": b"",
+            f"{BASE_URL}uuid4_city.jpg": bytes(range(256)) * 20,
+        }
+        for url, data in self.files.items():
+            Photo.objects.create(album=self.album, image_url=url, bytes=len(data))
+
+        patcher = patch("core.services.album_export_service.photo_repository")
+        self.mock_repo = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.reads = []
+
+        def open_stream(url, first=0, last=None):
+            self.reads.append((url, first, last))
+            data = self.files[url]
+            return io.BytesIO(data[first : None if last is None else last + 1])
+
+        self.mock_repo.open_stream.side_effect = open_stream
+
+    def _archive(self, start=0, end=None):
+        export = AlbumExportService.layout(self.album.pk)
+        layout = export["layout"]
+        end = layout.size - 1 if end is None else end
+        return export, b"".join(AlbumExportService.stream(layout, start, end))
+
+    def test_streams_a_stored_zip_of_the_album(self):
+        export, archive = self._archive()
+
+        self.assertEqual(len(archive), export["layout"].size)
+        self.assertEqual(export["filename"], "ete-a-paris.zip")
+        with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            names = zip_file.namelist()
+            self.assertEqual(
+                [zip_file.read(name) for name in names], list(self.files.values())
+            )
+            self.assertEqual(
+                names[:2], ["beach.jpg", f"{names[1].split('_')[0]}_beach.jpg"]
+            )
+            self.assertEqual(
+                {info.compress_type for info in zip_file.infolist()},
+                {zipfile.ZIP_STORED},
+            )
+
+    def test_ranges_resume_without_reading_sent_files_again(self):
+        _, archive = self._archive()
+        self.reads.clear()
+        middle = len(archive) - 1000
+
+        _, tail = self._archive(start=middle)
+
+        self.assertEqual(tail, archive[middle:])
+        # Only the rest of the last file: the CRC-32s of the others are cached
+        [(url, first, last)] = self.reads
+        self.assertEqual((url, last), (f"{BASE_URL}uuid4_city.jpg", 5119))
+        self.assertGreater(first, 0)
+
+    def test_ranges_compute_missing_checksums(self):
+        _, archive = self._archive()
+        cache.clear()
+
+        for start in range(0, len(archive), 997):
+            _, part = self._archive(start=start, end=start + 1500)
+            self.assertEqual(part, archive[start : start + 1501])
+
+    def test_large_entries_use_zip64(self):
+        with patch("core.zipstream.ZIP64_LIMIT", 2000):
+            _, archive = self._archive()
+
+        with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(zip_file.read("beach.jpg"), b"a" * 3000)
+
+    def test_async_stream_matches_sync_stream(self):
+        _, archive = self._archive()
+        layout = AlbumExportService.layout(self.album.pk)["layout"]
+
+        async def collect():
+            return [
+                chunk
+                async for chunk in AlbumExportService.astream(
+                    layout, 0, layout.size - 1
+                )
+            ]
+
+        self.assertEqual(b"".join(async_to_sync(collect)()), archive)
+
+    @override_settings(ALBUM_EXPORT_PREFETCH=0)
+    def test_async_stream_closed_early_stops_reading(self):
+        layout = AlbumExportService.layout(self.album.pk)["layout"]
+
+        async def first_chunk():
+            chunks = AlbumExportService.astream(layout, 0, layout.size - 1)
+            chunk = await anext(chunks)
+            await chunks.aclose()
+            return chunk
+
+        self.assertTrue(async_to_sync(first_chunk)())
+        self.assertLess(len(self.reads), len(self.files))
+
+    def test_parse_range(self):
+        parse = AlbumExportService.parse_range
+        self.assertEqual(parse("bytes=10-19", 100), (10, 19))
+        self.assertEqual(parse("bytes=90-", 100), (90, 99))
+        self.assertEqual(parse("bytes=90-200", 100), (90, 99))
+        self.assertEqual(parse("bytes=-30", 100), (70, 99))
+        self.assertEqual(parse("bytes=100-", 100)[0], 100)
+        self.assertIsNone(parse("", 100))
+        self.assertIsNone(parse("bytes=0-1,5-6", 100))
+        self.assertIsNone(parse("bytes=9-2", 100))
+
+    def test_missing_album(self):
+        with self.assertRaises(NotFound):
+            AlbumExportService.layout(self.album.pk + 1)
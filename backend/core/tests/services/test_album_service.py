@@ -1,8 +1,15 @@
 import unittest
 from unittest.mock import MagicMock, patch
+from django.http import Http404
 from rest_framework.exceptions import ValidationError, NotFound
 
+from django.contrib.auth.models import User
+from django.test import TestCase
+from core.models import Album, Photo, PhotoBlob
+from core.serializers import AlbumSerializer
 from core.services.album_service import AlbumService
+from core.services.album_stats_service import AlbumStatsService
+from core.websocket.messages import WebSocketMessageType
 
 TEST_ALBUM_ID = 1
 TEST_ALBUM_TITLE = "Summer Vacation"
@@ -38,6 +45,34 @@ class TestAlbumServiceGetAll(unittest.TestCase):
         self.assertEqual(result, empty_queryset)
 
 
+class TestAlbumServiceGetAllQueries(TestCase):
+    """The album list costs one query, however many albums and photos."""
+
+    def add_albums(self, count: int) -> None:
+        for index in range(count):
+            album = Album.objects.create(title=f"Album {index}")
+            photos = Photo.objects.bulk_create(
+                [Photo(album=album, image_url=TEST_COVER_IMAGE_URL)] * index
+            )
+            AlbumStatsService.add(photos)
+
+    def test_getAll_serializes_in_one_query_per_list(self):
+        for count in (1, 5):
+            with self.subTest(albums=count):
+                self.add_albums(count)
+
+                with self.assertNumQueries(1):
+                    data = AlbumSerializer(AlbumService.getAll(), many=True).data
+
+                self.assertEqual(
+                    [album["nb_photos"] for album in data],
+                    [
+                        Photo.objects.filter(album_id=album["id"]).count()
+                        for album in data
+                    ],
+                )
+
+
 class TestAlbumServiceCreateAlbum(unittest.TestCase):
     """Tests for AlbumService.createAlbum method."""
 
@@ -59,6 +94,11 @@ class TestAlbumServiceCreateAlbum(unittest.TestCase):
             "nb_photos": 0,
         }
 
+        # Derivatives are generated after commit, outside these mocked tests
+        patcher = patch("core.services.album_service.DerivativeService")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @patch("core.services.album_service.AlbumSerializer")
     @patch("core.services.album_service.photo_repository")
     def test_createAlbum_with_image_uploads_to_s3(
@@ -140,6 +180,24 @@ class TestAlbumServiceCreateAlbum(unittest.TestCase):
 
         mock_serializer.save.assert_called_once()
 
+    @patch("core.services.album_service.PhotoMetadataService")
+    @patch("core.services.album_service.AlbumSerializer")
+    @patch("core.services.album_service.photo_repository")
+    def test_createAlbum_saves_cover_metadata(
+        self, mock_photo_repo, mock_serializer_class, mock_metadata
+    ):
+
+        mock_photo_repo.save.return_value = TEST_COVER_IMAGE_URL
+        mock_metadata.for_cover.return_value = {"cover_width": 640}
+        mock_serializer = MagicMock()
+        mock_serializer.is_valid.return_value = True
+        mock_serializer_class.return_value = mock_serializer
+
+        AlbumService.createAlbum(self.raw_data, self.file_dict)
+
+        mock_metadata.for_cover.assert_called_once_with(self.mock_file)
+        mock_serializer.save.assert_called_once_with(cover_width=640)
+
     @patch("core.services.album_service.AlbumSerializer")
     def test_createAlbum_with_invalid_data_raises_validation_error(
         self, mock_serializer_class
@@ -179,6 +237,11 @@ class TestAlbumServiceModifyAlbum(unittest.TestCase):
             "cover_image": TEST_NEW_COVER_IMAGE_URL,
         }
 
+        # Derivatives are generated after commit, outside these mocked tests
+        patcher = patch("core.services.album_service.DerivativeService")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @patch("core.services.album_service.AlbumSerializer")
     @patch("core.services.album_service.photo_repository")
     @patch("core.services.album_service.get_object_or_404")
@@ -332,6 +395,22 @@ class TestAlbumServiceReplaceCoverImage(unittest.TestCase):
 
         self.assertEqual(result["cover_image"], TEST_NEW_COVER_IMAGE_URL)
 
+    @patch("core.services.album_service.PhotoMetadataService")
+    @patch("core.services.album_service.photo_repository")
+    def test_replace_cover_image_resets_cover_previews_and_metadata(
+        self, mock_photo_repo, mock_metadata
+    ):
+
+        mock_album = MagicMock()
+        mock_album.cover_image = TEST_COVER_IMAGE_URL
+        mock_metadata.for_cover.return_value = {"cover_width": 640}
+
+        AlbumService._replace_cover_image(self.data, mock_album, self.file_dict)
+
+        self.assertEqual(mock_album.cover_width, 640)
+        self.assertEqual(mock_album.cover_derivatives, [])
+        self.assertEqual(mock_album.cover_placeholder, "")
+
     @patch("core.services.album_service.photo_repository")
     def test_replace_cover_image_when_no_existing_cover_does_not_delete(
         self, mock_photo_repo
@@ -363,5 +442,116 @@ class TestAlbumServiceReplaceCoverImage(unittest.TestCase):
         self.assertEqual(result, self.data)
 
 
+@patch("core.services.album_service.send_ws_message_to_user")
+@patch("core.services.photo_blob_service.photo_repository")
+@patch("core.services.album_service.photo_repository")
+class TestAlbumServiceDeleteAlbum(TestCase):
+    """Tests for AlbumService.deleteAlbum method."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="user", password="pass")
+        self.album = Album.objects.create(
+            title=TEST_ALBUM_TITLE,
+            cover_image=TEST_COVER_IMAGE_URL,
+            cover_derivatives=[{"url": "cover-w320", "width": 320, "format": "webp"}],
+        )
+        self.legacy_url = "https://bucket.s3.amazonaws.com/1/legacy.jpg"
+        Photo.objects.create(
+            album=self.album,
+            image_url=self.legacy_url,
+            derivatives=[{"url": "legacy-w320", "width": 320, "format": "webp"}],
+        )
+
+        self.shared = PhotoBlob.objects.create(
+            sha256="a" * 64, url="https://bucket.s3.amazonaws.com/1/a.jpg", size=1
+        )
+        self.own = PhotoBlob.objects.create(
+            sha256="b" * 64,
+            url="https://bucket.s3.amazonaws.com/1/b.jpg",
+            size=1,
+            derivatives=[{"url": "b-w320", "width": 320, "format": "webp"}],
+        )
+        other_album = Album.objects.create(title="Other")
+        for album, blob in [
+            (self.album, self.shared),
+            (self.album, self.own),
+            (self.album, self.own),
+            (other_album, self.shared),
+        ]:
+            Photo.objects.create(album=album, image_url=blob.url, blob=blob)
+        PhotoBlob.objects.filter(pk=self.shared.pk).update(ref_count=2)
+        PhotoBlob.objects.filter(pk=self.own.pk).update(ref_count=2)
+
+    def _delete(self, album_id):
+        with self.captureOnCommitCallbacks(execute=True):
+            AlbumService.deleteAlbum(album_id)
+
+    def test_deleteAlbum_removes_album_and_photos(self, mock_repo, mock_blob_repo, _):
+        mock_repo.delete_many.return_value = []
+        mock_blob_repo.delete_many.return_value = []
+
+        self._delete(self.album.id)
+
+        self.assertFalse(Album.objects.filter(pk=self.album.id).exists())
+        self.assertFalse(Photo.objects.filter(album_id=self.album.id).exists())
+        self.assertEqual(Photo.objects.count(), 1)
+
+    def test_deleteAlbum_deletes_own_files_in_one_batch(
+        self, mock_repo, mock_blob_repo, _
+    ):
+        mock_repo.delete_many.return_value = []
+        mock_blob_repo.delete_many.return_value = []
+
+        self._delete(self.album.id)
+
+        mock_repo.delete_many.assert_called_once_with(
+            [self.legacy_url, "legacy-w320", TEST_COVER_IMAGE_URL, "cover-w320"]
+        )
+        mock_repo.delete.assert_not_called()
+
+    def test_deleteAlbum_releases_blobs_and_keeps_shared_ones(
+        self, mock_repo, mock_blob_repo, _
+    ):
+        mock_repo.delete_many.return_value = []
+        mock_blob_repo.delete_many.return_value = []
+
+        self._delete(self.album.id)
+
+        self.assertEqual(PhotoBlob.objects.get(pk=self.shared.pk).ref_count, 1)
+        self.assertFalse(PhotoBlob.objects.filter(pk=self.own.pk).exists())
+        mock_blob_repo.delete_many.assert_called_once_with([self.own.url, "b-w320"])
+
+    def test_deleteAlbum_broadcasts_single_event(
+        self, mock_repo, mock_blob_repo, mock_ws
+    ):
+        mock_repo.delete_many.return_value = []
+        mock_blob_repo.delete_many.return_value = []
+
+        self._delete(self.album.id)
+
+        mock_ws.assert_called_once_with(
+            self.user.id, WebSocketMessageType.ALBUM_DELETED, {"id": self.album.id}
+        )
+
+    def test_deleteAlbum_storage_failure_keeps_rows_deleted(
+        self, mock_repo, mock_blob_repo, _
+    ):
+        mock_repo.delete_many.side_effect = Exception("S3 down")
+        mock_blob_repo.delete_many.return_value = []
+
+        self._delete(self.album.id)
+
+        self.assertFalse(Album.objects.filter(pk=self.album.id).exists())
+
+    def test_deleteAlbum_when_not_found_raises_404(
+        self, mock_repo, mock_blob_repo, mock_ws
+    ):
+        with self.assertRaises(Http404):
+            AlbumService.deleteAlbum(999)
+
+        mock_repo.delete_many.assert_not_called()
+        mock_ws.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
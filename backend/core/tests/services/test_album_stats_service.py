@@ -0,0 +1,66 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from core.models import Album, Photo
+from core.services.album_stats_service import AlbumStatsService
+
+PHOTO_URL = "https://bucket.s3.amazonaws.com/1/uuid_photo.jpg"
+
+
+class TestAlbumStatsService(TestCase):
+
+    def setUp(self):
+        self.album = Album.objects.create(title="Album")
+        self.other = Album.objects.create(title="Other")
+
+    def photo(self, album, size=None) -> Photo:
+        return Photo.objects.create(album=album, image_url=PHOTO_URL, bytes=size)
+
+    def stats(self, album) -> tuple:
+        album.refresh_from_db()
+        return album.photo_count, album.total_bytes, album.last_photo_at
+
+    def test_add_counts_photos_per_album_and_keeps_latest_date(self):
+        first = self.photo(self.album, 10)
+        second = self.photo(self.album)
+        other = self.photo(self.other, 5)
+
+        AlbumStatsService.add([first, second, other])
+        # An older photo never moves the latest date back
+        first.created_at -= timedelta(days=1)
+        AlbumStatsService.add([first])
+
+        self.assertEqual(self.stats(self.album), (3, 20, second.created_at))
+        self.assertEqual(self.stats(self.other), (1, 5, other.created_at))
+
+    def test_remove_never_goes_below_zero(self):
+        photo = self.photo(self.album, 10)
+        photo.delete()
+
+        AlbumStatsService.remove([photo])
+
+        self.assertEqual(self.stats(self.album), (0, 0, None))
+
+    def test_resize_counts_size_changes_never_below_zero(self):
+        grown, shrunk = self.photo(self.album, 30), self.photo(self.other, 4)
+        Album.objects.filter(pk=self.album.pk).update(total_bytes=10)
+        Album.objects.filter(pk=self.other.pk).update(total_bytes=8)
+
+        AlbumStatsService.resize([(grown, 10), (shrunk, 20)])
+
+        self.assertEqual(self.stats(self.album)[1], 30)
+        self.assertEqual(self.stats(self.other)[1], 0)
+
+    def test_repair_fixes_drifted_albums_only(self):
+        photos = [self.photo(self.album, 10), self.photo(self.album, 30)]
+        Album.objects.filter(pk=self.other.pk).update(
+            photo_count=4, total_bytes=1, last_photo_at=timezone.now()
+        )
+
+        with self.assertLogs("core.services.album_stats_service", "WARNING"):
+            stats = AlbumStatsService.repair()
+
+        self.assertEqual(stats, {"albums": 2, "repaired": 2})
+        self.assertEqual(self.stats(self.album), (2, 40, photos[1].created_at))
+        self.assertEqual(self.stats(self.other), (0, 0, None))
+        self.assertEqual(AlbumStatsService.repair()["repaired"], 0)
@@ -0,0 +1,222 @@
+from django.db.models import Q
+from django.test import TestCase
+from PIL import Image
+from unittest.mock import patch
+from core.imaging import METADATA_HEADER_SIZE, perceptual_hash
+from core.models import Album, BackfillCheckpoint, Photo
+from core.services.backfill_service import (
+    BackfillService,
+    BackfillTask,
+    RateLimiter,
+)
+import io
+
+PHOTO_URL = "https://bucket.s3.amazonaws.com/1/uuid_{}.jpg"
+COVER_URL = "https://bucket.s3.amazonaws.com/uuid_cover.jpg"
+
+
+def _jpeg(width=300, height=200):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class TestRateLimiter(TestCase):
+
+    def test_spaces_calls_out(self):
+        now = [100.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(4, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            limiter.wait()
+
+        self.assertEqual(sleeps, [0.25, 0.25])
+
+    def test_no_rate_never_sleeps(self):
+        limiter = RateLimiter(None, sleep=self.fail)
+
+        limiter.wait()
+
+
+class TestBackfillService(TestCase):
+
+    def setUp(self):
+        self.album = album = Album.objects.create(title="Album")
+        self.photos = [
+            Photo.objects.create(album=album, image_url=PHOTO_URL.format(name))
+            for name in ["a", "b", "b", "c", "d"]
+        ]
+        self.computed = []
+
+        def compute(photo):
+            self.computed.append(photo.image_url)
+            if photo.image_url.endswith("c.jpg"):
+                raise OSError("unreadable")
+            return {"caption": f"seen {photo.image_url[-5]}"}
+
+        tasks = {"caption": BackfillTask(Q(caption__isnull=True), compute, ["caption"])}
+        patcher = patch.dict("core.services.backfill_service.BACKFILL_TASKS", tasks)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fills_photos_computing_each_file_once(self):
+        batches = []
+
+        with self.assertLogs("core.services.backfill_service", "WARNING"):
+            checkpoint = BackfillService.run(
+                "caption",
+                batch_size=3,
+                workers=2,
+                progress=lambda checkpoint: batches.append(checkpoint.last_id),
+            )
+
+        self.assertEqual(len(self.computed), 4)
+        self.assertEqual(batches, [self.photos[2].pk, self.photos[4].pk])
+        self.assertEqual(
+            (checkpoint.processed, checkpoint.updated, checkpoint.failed), (5, 4, 1)
+        )
+        self.assertIsNotNone(checkpoint.finished_at)
+        self.assertEqual(
+            list(Photo.objects.order_by("pk").values_list("caption", flat=True)),
+            ["seen a", "seen b", "seen b", None, "seen d"],
+        )
+
+    def test_resumes_after_the_last_saved_batch(self):
+        BackfillCheckpoint.objects.create(
+            task="caption",
+            last_id=self.photos[2].pk,
+            processed=3,
+            updated=3,
+            started_at="2026-01-01T00:00:00Z",
+        )
+
+        with self.assertLogs("core.services.backfill_service", "WARNING"):
+            checkpoint = BackfillService.run("caption")
+
+        self.assertEqual(self.computed, [PHOTO_URL.format("c"), PHOTO_URL.format("d")])
+        self.assertEqual((checkpoint.processed, checkpoint.failed), (5, 1))
+
+    def test_finished_or_restarted_runs_start_over(self):
+        BackfillCheckpoint.objects.create(
+            task="caption",
+            last_id=self.photos[4].pk,
+            started_at="2026-01-01T00:00:00Z",
+            finished_at="2026-01-02T00:00:00Z",
+        )
+
+        with self.assertLogs("core.services.backfill_service", "WARNING"):
+            checkpoint = BackfillService.run("caption")
+
+        self.assertEqual(checkpoint.processed, 5)
+
+    def test_measured_sizes_count_in_album_totals(self):
+        Photo.objects.filter(pk=self.photos[0].pk).update(bytes=4)
+        self.album.total_bytes = 4
+        self.album.save()
+        tasks = {
+            "size": BackfillTask(
+                Q(mime__isnull=True), lambda photo: {"bytes": 10}, ["bytes"]
+            )
+        }
+
+        with patch.dict("core.services.backfill_service.BACKFILL_TASKS", tasks):
+            BackfillService.run("size", batch_size=2)
+
+        self.album.refresh_from_db()
+        self.assertEqual(self.album.total_bytes, 50)
+
+
+@patch("core.services.backfill_service.photo_repository")
+@patch("core.services.derivative_service.photo_repository")
+@patch("core.services.photo_metadata_service.photo_repository")
+class TestBackfillTasks(TestCase):
+
+    def setUp(self):
+        self.album = Album.objects.create(title="Album", cover_image=COVER_URL)
+        self.photos = [
+            Photo.objects.create(album=self.album, image_url=PHOTO_URL.format(name))
+            for name in ["a", "a", "b"]
+        ]
+        self.data = _jpeg()
+
+    def _open(self, url, *range):
+        if url.endswith("b.jpg"):
+            raise OSError("unreadable")
+        return io.BytesIO(self.data)
+
+    def test_metadata_reads_first_bytes_of_each_file(self, mock_repo, *_):
+        mock_repo.open_stream.side_effect = self._open
+        mock_repo.stat.return_value = {"size": len(self.data)}
+
+        with self.assertLogs("core.services.backfill_service", "WARNING"):
+            checkpoint = BackfillService.run("metadata")
+
+        self.assertEqual((checkpoint.updated, checkpoint.failed), (2, 1))
+        mock_repo.open_stream.assert_any_call(
+            PHOTO_URL.format("a"), 0, METADATA_HEADER_SIZE - 1
+        )
+        self.assertEqual(mock_repo.open_stream.call_count, 2)
+        self.assertEqual(Photo.objects.filter(width=300, mime="image/jpeg").count(), 2)
+        self.album.refresh_from_db()
+        self.assertEqual(self.album.total_bytes, 2 * len(self.data))
+
+    def test_cover_metadata_fills_albums_with_a_cover(self, mock_repo, *_):
+        Album.objects.create(title="No cover")
+        mock_repo.open_stream.side_effect = self._open
+        mock_repo.stat.return_value = {"size": 12345}
+
+        checkpoint = BackfillService.run("cover_metadata")
+
+        self.assertEqual((checkpoint.processed, checkpoint.updated), (1, 1))
+        self.album.refresh_from_db()
+        self.assertEqual(
+            (self.album.cover_width, self.album.cover_bytes, self.album.cover_mime),
+            (300, 12345, "image/jpeg"),
+        )
+
+    def test_previews_come_from_the_smallest_derivative(
+        self, _, mock_derivative_repo, mock_backfill_repo
+    ):
+        small = [{"url": f"{COVER_URL}.w100.jpg", "width": 100, "format": "jpeg"}]
+        Photo.objects.update(derivatives=small)
+        Album.objects.update(cover_derivatives=small)
+        mock_derivative_repo.open_stream.side_effect = self._open
+
+        BackfillService.run("previews")
+        BackfillService.run("cover_previews")
+
+        mock_derivative_repo.open_stream.assert_called_with(f"{COVER_URL}.w100.jpg")
+        # Once per file: two photo files and the cover
+        self.assertEqual(mock_derivative_repo.open_stream.call_count, 3)
+        mock_backfill_repo.open_stream.assert_not_called()
+        self.album.refresh_from_db()
+        self.assertTrue(self.album.cover_placeholder.startswith("data:image/"))
+        self.assertFalse(Photo.objects.filter(placeholder="").exists())
+        self.assertEqual(
+            set(Photo.objects.values_list("phash", flat=True)),
+            {perceptual_hash(self.data)},
+        )
+
+    def test_phash_hashes_unprocessed_photos_from_the_original(
+        self, _, mock_derivative_repo, mock_backfill_repo
+    ):
+        Photo.objects.filter(pk=self.photos[2].pk).update(mime="video/mp4")
+        mock_backfill_repo.open_stream.side_effect = self._open
+        before = Photo.objects.get(pk=self.photos[0].pk).updated_at
+
+        checkpoint = BackfillService.run("phash")
+
+        self.assertEqual((checkpoint.processed, checkpoint.updated), (2, 2))
+        mock_backfill_repo.open_stream.assert_called_once_with(PHOTO_URL.format("a"))
+        mock_derivative_repo.open_stream.assert_not_called()
+        self.assertEqual(
+            list(Photo.objects.order_by("pk").values_list("phash", flat=True)),
+            [perceptual_hash(self.data)] * 2 + [None],
+        )
+        # The duplicate trees see the new hashes
+        self.assertGreater(Photo.objects.get(pk=self.photos[0].pk).updated_at, before)
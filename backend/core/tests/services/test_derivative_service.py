@@ -0,0 +1,270 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+from unittest.mock import patch
+from core.imaging import (
+    derivative_key,
+    perceptual_hash,
+    placeholder,
+    render_derivatives,
+)
+from core.models import Album, ImageJob, Photo, PhotoBlob
+from core.services.album_service import AlbumService
+from core.services.derivative_service import DerivativeService, source_url_of
+import base64
+import io
+
+PHOTO_URL = "https://bucket.s3.amazonaws.com/1/uuid_photo.jpg"
+COVER_URL = "https://bucket.s3.amazonaws.com/uuid_cover.jpg"
+
+
+def _jpeg(width, height, orientation=None):
+    image = Image.new("RGB", (width, height), "red")
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+@override_settings(
+    PHOTO_DERIVATIVE_WIDTHS=[100, 200, 400],
+    PHOTO_DERIVATIVE_FORMATS=["webp", "jpeg"],
+)
+class TestRenderDerivatives(TestCase):
+
+    def _render(self, data):
+        return [
+            (width, actual, format, Image.open(io.BytesIO(content)))
+            for width, actual, format, content in render_derivatives(data)
+        ]
+
+    def test_renders_each_width_and_format(self):
+        variants = self._render(_jpeg(300, 150))
+
+        self.assertEqual(
+            [(width, actual, format) for width, actual, format, _ in variants],
+            [
+                (100, 100, "webp"),
+                (100, 100, "jpeg"),
+                (200, 200, "webp"),
+                (200, 200, "jpeg"),
+                # Never upscaled: the largest width keeps the original size
+                (400, 300, "webp"),
+                (400, 300, "jpeg"),
+            ],
+        )
+        self.assertEqual(variants[0][3].format, "WEBP")
+        self.assertEqual(variants[0][3].size, (100, 50))
+
+    def test_applies_exif_orientation_and_strips_metadata(self):
+        # Stored landscape, displayed portrait
+        variants = self._render(_jpeg(300, 150, orientation=6))
+
+        image = variants[1][3]
+        self.assertEqual(image.size, (100, 200))
+        self.assertEqual(dict(image.getexif()), {})
+
+    def test_keeps_transparency_except_for_jpeg(self):
+        buffer = io.BytesIO()
+        Image.new("RGBA", (50, 50), (0, 0, 0, 0)).save(buffer, "PNG")
+
+        variants = self._render(buffer.getvalue())
+
+        self.assertEqual(variants[0][3].mode, "RGBA")
+        self.assertEqual(variants[1][3].mode, "RGB")
+
+    def test_placeholder_is_a_tiny_oriented_data_uri(self):
+        uri = placeholder(_jpeg(300, 150, orientation=6))
+
+        header, _, encoded = uri.partition(",")
+        self.assertEqual(header, "data:image/webp;base64")
+        self.assertLess(len(uri), 400)
+        image = Image.open(io.BytesIO(base64.b64decode(encoded)))
+        self.assertEqual(image.size, (8, 16))
+
+
+@override_settings(
+    PHOTO_DERIVATIVE_WIDTHS=[100, 200],
+    PHOTO_DERIVATIVE_FORMATS=["webp", "jpeg"],
+)
+@patch("core.services.derivative_service.photo_repository")
+class TestDerivativeService(TestCase):
+
+    def setUp(self):
+        self.album = Album.objects.create(title="Album", cover_image=PHOTO_URL)
+        self.photo = Photo.objects.create(album=self.album, image_url=PHOTO_URL)
+        self.copy = Photo.objects.create(album=self.album, image_url=PHOTO_URL)
+
+    def _stored(self, mock_repo, data):
+        mock_repo.open_stream.return_value = io.BytesIO(data)
+        mock_repo.save_derivative.side_effect = (
+            lambda file, url, width, format: derivative_key(url, width, format)
+        )
+
+    def test_generate_stores_derivatives_next_to_original(self, mock_repo):
+        self._stored(mock_repo, _jpeg(150, 100))
+
+        derivatives = DerivativeService.generate(PHOTO_URL)
+
+        self.assertEqual(
+            [call.args[2:] for call in mock_repo.save_derivative.call_args_list],
+            [(100, "webp"), (100, "jpeg"), (200, "webp"), (200, "jpeg")],
+        )
+        self.assertEqual(
+            derivatives[0],
+            {
+                "url": "https://bucket.s3.amazonaws.com/1/_w100_uuid_photo.jpg.webp",
+                "width": 100,
+                "format": "webp",
+            },
+        )
+        self.assertEqual(derivatives[-1]["width"], 150)
+
+    def test_generate_records_derivatives_on_every_user_of_the_file(self, mock_repo):
+        self._stored(mock_repo, _jpeg(150, 100))
+
+        derivatives = DerivativeService.generate(PHOTO_URL)
+
+        self.photo.refresh_from_db()
+        self.copy.refresh_from_db()
+        self.album.refresh_from_db()
+        self.assertEqual(self.photo.derivatives, derivatives)
+        self.assertEqual(self.copy.derivatives, derivatives)
+        self.assertEqual(self.album.cover_derivatives, derivatives)
+
+    def test_generate_records_derivatives_on_the_blob(self, mock_repo):
+        self._stored(mock_repo, _jpeg(150, 100))
+        blob = PhotoBlob.objects.create(sha256="a" * 64, url=PHOTO_URL, size=10)
+
+        derivatives = DerivativeService.generate(PHOTO_URL)
+
+        blob.refresh_from_db()
+        self.assertEqual(blob.derivatives, derivatives)
+
+    def test_generate_reuses_known_derivatives(self, mock_repo):
+        known = [{"url": f"{PHOTO_URL}.w100.webp", "width": 100, "format": "webp"}]
+        Photo.objects.filter(pk=self.photo.pk).update(
+            derivatives=known, phash=-5, placeholder="data:image/webp;base64,AA"
+        )
+
+        DerivativeService.generate(PHOTO_URL)
+
+        mock_repo.open_stream.assert_not_called()
+        self.copy.refresh_from_db()
+        self.assertEqual(self.copy.derivatives, known)
+        self.assertEqual(self.copy.phash, -5)
+        self.assertEqual(self.copy.placeholder, "data:image/webp;base64,AA")
+
+    def test_generate_records_perceptual_hash(self, mock_repo):
+        data = _jpeg(150, 100)
+        self._stored(mock_repo, data)
+
+        DerivativeService.generate(PHOTO_URL)
+
+        self.copy.refresh_from_db()
+        self.assertIsNotNone(self.copy.phash)
+
+    def test_generate_records_placeholders(self, mock_repo):
+        self._stored(mock_repo, _jpeg(150, 100))
+
+        DerivativeService.generate(PHOTO_URL)
+
+        self.copy.refresh_from_db()
+        self.album.refresh_from_db()
+        self.assertTrue(self.copy.placeholder.startswith("data:image/"))
+        self.assertEqual(self.album.cover_placeholder, self.copy.placeholder)
+
+    def test_generate_hashes_smallest_known_derivative(self, mock_repo):
+        known = [
+            {"url": f"{PHOTO_URL}.w200.jpg", "width": 200, "format": "jpeg"},
+            {"url": f"{PHOTO_URL}.w100.jpg", "width": 100, "format": "jpeg"},
+        ]
+        Photo.objects.filter(pk=self.photo.pk).update(derivatives=known)
+        self._stored(mock_repo, _jpeg(100, 50))
+
+        DerivativeService.generate(PHOTO_URL)
+
+        mock_repo.open_stream.assert_called_once_with(f"{PHOTO_URL}.w100.jpg")
+        self.photo.refresh_from_db()
+        self.assertEqual(self.photo.phash, perceptual_hash(_jpeg(100, 50)))
+
+    def test_generate_skips_videos(self, mock_repo):
+        self.assertEqual(DerivativeService.generate(f"{PHOTO_URL}.mp4"), [])
+
+        mock_repo.open_stream.assert_not_called()
+
+    def test_generate_uses_given_renderer(self, mock_repo):
+        self._stored(mock_repo, b"original")
+
+        derivatives = DerivativeService.generate(
+            PHOTO_URL, lambda data: [(100, 90, "jpeg", data)]
+        )
+
+        self.assertEqual(
+            derivatives,
+            [
+                {
+                    "url": derivative_key(PHOTO_URL, 100, "jpeg"),
+                    "width": 90,
+                    "format": "jpeg",
+                }
+            ],
+        )
+        self.assertEqual(mock_repo.save_derivative.call_args[0][0].read(), b"original")
+
+    def test_schedule_queues_one_job_per_file(self, mock_repo):
+        DerivativeService.schedule([PHOTO_URL, PHOTO_URL, None])
+        DerivativeService.schedule([PHOTO_URL, COVER_URL])
+
+        self.assertEqual(
+            sorted(ImageJob.objects.values_list("source_url", flat=True)),
+            [PHOTO_URL, COVER_URL],
+        )
+        mock_repo.open_stream.assert_not_called()
+
+    def test_with_derivatives_lists_the_stored_derivatives(self, mock_repo):
+        known = [{"url": f"{PHOTO_URL}.w100.jpg", "width": 100, "format": "jpeg"}]
+
+        urls = DerivativeService.with_derivatives([(PHOTO_URL, known), ("", [])])
+
+        self.assertEqual(urls, [PHOTO_URL, f"{PHOTO_URL}.w100.jpg"])
+
+    def test_derivative_names_map_back_to_source(self, mock_repo):
+        url = derivative_key(PHOTO_URL, 200, "avif")
+
+        self.assertEqual(
+            url, "https://bucket.s3.amazonaws.com/1/_w200_uuid_photo.jpg.avif"
+        )
+        self.assertEqual(source_url_of(url), PHOTO_URL)
+        self.assertEqual(source_url_of(PHOTO_URL), PHOTO_URL)
+
+    def test_original_named_like_derivative_is_an_original(self, mock_repo):
+        url = "https://bucket.s3.amazonaws.com/1/uuid_IMG.w640.jpg"
+
+        self.assertEqual(source_url_of(url), url)
+        self.assertEqual(source_url_of(derivative_key(url, 100, "webp")), url)
+
+
+@patch("core.services.album_service.photo_repository")
+class TestAlbumCoverDerivatives(TestCase):
+
+    def test_new_cover_resets_derivatives(self, mock_repo):
+        album = Album.objects.create(
+            title="Album",
+            cover_image=COVER_URL,
+            cover_derivatives=[{"url": "old", "width": 1, "format": "jpeg"}],
+        )
+        mock_repo.save.return_value = f"{COVER_URL}.new.jpg"
+
+        with patch.object(DerivativeService, "schedule") as mock_schedule:
+            AlbumService.modifyAlbum(
+                album.id, {}, {"image": SimpleUploadedFile("c.jpg", b"x")}
+            )
+
+        album.refresh_from_db()
+        self.assertEqual(album.cover_derivatives, [])
+        mock_repo.delete_many.assert_called_once_with(["old"])
+        mock_schedule.assert_called_once_with([f"{COVER_URL}.new.jpg"])
@@ -0,0 +1,143 @@
+from django.test import TestCase
+from django.utils import timezone
+from unittest.mock import patch
+from PIL import Image, ImageDraw
+from rest_framework.exceptions import NotFound
+from core.imaging import perceptual_hash
+from core.models import Album, Photo
+from core.services.duplicate_service import BKTree, DuplicateService, hamming
+import io
+import random
+
+
+def _picture(seed, size=(320, 240), quality=90):
+    rng = random.Random(seed)
+    image = Image.new("RGB", (320, 240), "white")
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        x, y = rng.randrange(320), rng.randrange(240)
+        draw.ellipse(
+            (x, y, x + 100, y + 80), fill=tuple(rng.randrange(256) for _ in range(3))
+        )
+    buffer = io.BytesIO()
+    image.resize(size).save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+class TestPerceptualHash(TestCase):
+
+    def test_resized_copy_is_close_and_other_picture_far(self):
+        original = perceptual_hash(_picture(1))
+        resized = perceptual_hash(_picture(1, size=(160, 120), quality=40))
+        other = perceptual_hash(_picture(2))
+
+        self.assertLessEqual(hamming(original, resized), 6)
+        self.assertGreater(hamming(original, other), 12)
+        self.assertTrue(-(1 << 63) <= original < 1 << 63)
+
+
+class TestBKTree(TestCase):
+
+    def test_search_matches_linear_scan(self):
+        rng = random.Random(0)
+        values = [rng.getrandbits(64) - (1 << 63) for _ in range(300)]
+        # Near copies of some values
+        values += [value ^ (1 << rng.randrange(64)) for value in values[:50]]
+        tree = BKTree()
+        for index, value in enumerate(values):
+            tree.add(value, index)
+
+        for query in values[:20] + [rng.getrandbits(64)]:
+            for radius in (0, 3, 10):
+                expected = {
+                    index
+                    for index, value in enumerate(values)
+                    if hamming(query, value) <= radius
+                }
+                self.assertEqual(set(tree.search(query, radius)), expected)
+
+    def test_identical_hashes_share_a_node(self):
+        tree = BKTree()
+        tree.add(7, "a")
+        tree.add(7, "b")
+
+        self.assertEqual(sorted(tree.search(7, 0)), ["a", "b"])
+        self.assertEqual(tree.size, 2)
+
+
+class TestDuplicateService(TestCase):
+
+    def setUp(self):
+        DuplicateService._trees.clear()
+        self.album = Album.objects.create(title="Bursts")
+
+    def _photo(self, phash, album=None):
+        return Photo.objects.create(
+            album=album or self.album, image_url="https://x/p.jpg", phash=phash
+        )
+
+    def test_clusters_chain_close_photos(self):
+        a = self._photo(0b0000)
+        b = self._photo(0b0011)
+        c = self._photo(0b1111)
+        d = self._photo(-1)
+        self._photo(None)
+        self._photo(0, album=Album.objects.create(title="Other"))
+
+        clusters = DuplicateService.find_clusters(self.album.id, 2)
+
+        self.assertEqual(clusters, [[a.id, b.id, c.id]])
+        self.assertEqual(DuplicateService.find_clusters(self.album.id, 0), [])
+        self.assertNotIn(d.id, sum(clusters, []))
+
+    def test_tree_is_rebuilt_when_photos_change(self):
+        a = self._photo(0)
+        DuplicateService.find_clusters(self.album.id, 2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(DuplicateService.find_clusters(self.album.id, 2), [])
+
+        b = self._photo(1)
+        self.assertEqual(
+            DuplicateService.find_clusters(self.album.id, 2), [[a.id, b.id]]
+        )
+        b.delete()
+        self.assertEqual(DuplicateService.find_clusters(self.album.id, 2), [])
+
+    def test_tree_is_rebuilt_when_a_hash_is_written_again(self):
+        a = self._photo(0)
+        b = self._photo(0b1111)
+        self.assertEqual(DuplicateService.find_clusters(self.album.id, 2), [])
+
+        # As the hash writers do, which update() without auto_now
+        Photo.objects.filter(pk=b.pk).update(phash=1, updated_at=timezone.now())
+
+        self.assertEqual(
+            DuplicateService.find_clusters(self.album.id, 2), [[a.id, b.id]]
+        )
+
+    def test_least_recently_used_trees_are_dropped(self):
+        albums = [Album.objects.create(title=f"Album {i}") for i in range(3)]
+        with patch("core.services.duplicate_service.CACHED_TREES", 2):
+            for album in albums:
+                DuplicateService.find_clusters(album.id, 2)
+            DuplicateService.find_clusters(albums[1].id, 2)
+            DuplicateService.find_clusters(self.album.id, 2)
+
+        self.assertEqual(list(DuplicateService._trees), [albums[1].id, self.album.id])
+
+    def test_get_duplicates_serializes_clusters(self):
+        a = self._photo(0)
+        b = self._photo(1)
+
+        duplicates = DuplicateService.get_duplicates(self.album.id, 3)
+
+        self.assertEqual(duplicates["distance"], 3)
+        self.assertEqual(
+            [[photo["id"] for photo in cluster] for cluster in duplicates["clusters"]],
+            [[a.id, b.id]],
+        )
+
+    def test_get_duplicates_of_unknown_album(self):
+        with self.assertRaises(NotFound):
+            DuplicateService.get_duplicates(9999, 3)
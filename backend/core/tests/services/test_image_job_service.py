@@ -0,0 +1,114 @@
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from unittest.mock import patch
+from core.models import Album, ImageJob, Photo
+from core.services.image_job_service import ImageJobService
+from core.websocket.messages import WebSocketMessageType
+
+PHOTO_URL = "https://bucket.s3.amazonaws.com/1/uuid_photo.jpg"
+DERIVATIVES = [{"url": f"{PHOTO_URL}.w100.webp", "width": 100, "format": "webp"}]
+
+
+@override_settings(
+    IMAGE_JOB_MAX_ATTEMPTS=2, IMAGE_JOB_RETRY_DELAY=10, IMAGE_JOB_TIMEOUT=60
+)
+class TestImageJobService(TestCase):
+
+    def test_claim_marks_due_jobs_as_running(self):
+        due = ImageJob.objects.create(source_url=PHOTO_URL)
+        ImageJob.objects.create(
+            source_url=PHOTO_URL, available_at=timezone.now() + timedelta(hours=1)
+        )
+        ImageJob.objects.create(source_url=PHOTO_URL, status=ImageJob.FAILED)
+
+        jobs = ImageJobService.claim(10)
+
+        self.assertEqual([job.pk for job in jobs], [due.pk])
+        due.refresh_from_db()
+        self.assertEqual(due.status, ImageJob.RUNNING)
+        self.assertEqual(due.attempts, 1)
+        self.assertEqual(ImageJobService.claim(10), [])
+
+    def test_claim_respects_limit_and_order(self):
+        now = timezone.now()
+        late = ImageJob.objects.create(source_url=PHOTO_URL, available_at=now)
+        early = ImageJob.objects.create(
+            source_url=PHOTO_URL, available_at=now - timedelta(minutes=1)
+        )
+
+        self.assertEqual([job.pk for job in ImageJobService.claim(1)], [early.pk])
+        self.assertEqual([job.pk for job in ImageJobService.claim(1)], [late.pk])
+
+    def test_claim_takes_back_abandoned_jobs(self):
+        job = ImageJob.objects.create(
+            source_url=PHOTO_URL,
+            status=ImageJob.RUNNING,
+            attempts=1,
+            locked_at=timezone.now() - timedelta(minutes=5),
+        )
+
+        self.assertEqual([claimed.pk for claimed in ImageJobService.claim(1)], [job.pk])
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, 2)
+
+    @patch("core.services.image_job_service.send_ws_message_to_user")
+    @patch("core.services.image_job_service.DerivativeService")
+    def test_run_deletes_job_and_announces_derivatives(self, mock_service, mock_send):
+        user = User.objects.create_user(username="user", password="password")
+        album = Album.objects.create(title="Album", cover_image=PHOTO_URL)
+        photo = Photo.objects.create(album=album, image_url=PHOTO_URL)
+        mock_service.generate.return_value = DERIVATIVES
+        ImageJob.objects.create(source_url=PHOTO_URL)
+        [job] = ImageJobService.claim(1)
+        render = object()
+
+        self.assertEqual(ImageJobService.run(job, render), DERIVATIVES)
+
+        mock_service.generate.assert_called_once_with(PHOTO_URL, render)
+        self.assertFalse(ImageJob.objects.exists())
+        mock_send.assert_called_once_with(
+            user.id,
+            WebSocketMessageType.PHOTO_DERIVATIVES_READY,
+            {
+                "image_url": PHOTO_URL,
+                "srcset": {"image/webp": f"{PHOTO_URL}.w100.webp 100w"},
+                "photo_ids": [photo.id],
+                "album_ids": [album.id],
+            },
+        )
+
+    @patch("core.services.image_job_service.send_ws_message_to_user")
+    @patch("core.services.image_job_service.DerivativeService")
+    def test_run_without_derivatives_announces_nothing(self, mock_service, mock_send):
+        mock_service.generate.return_value = []
+        job = ImageJob.objects.create(source_url=f"{PHOTO_URL}.mp4")
+
+        self.assertEqual(ImageJobService.run(job), [])
+
+        self.assertFalse(ImageJob.objects.exists())
+        mock_send.assert_not_called()
+
+    @patch("core.services.image_job_service.DerivativeService")
+    def test_failed_job_is_retried_later_then_kept_as_failed(self, mock_service):
+        mock_service.generate.side_effect = Exception("S3 down")
+        ImageJob.objects.create(source_url=PHOTO_URL)
+
+        with self.assertLogs("core.services.image_job_service", "ERROR"):
+            [job] = ImageJobService.claim(1)
+            self.assertIsNone(ImageJobService.run(job))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.PENDING)
+        self.assertEqual(job.last_error, "S3 down")
+        self.assertGreater(job.available_at, timezone.now() + timedelta(seconds=5))
+
+        ImageJob.objects.filter(pk=job.pk).update(available_at=timezone.now())
+        with self.assertLogs("core.services.image_job_service", "ERROR"):
+            [job] = ImageJobService.claim(1)
+            ImageJobService.run(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.FAILED)
+        self.assertEqual(ImageJobService.claim(1), [])
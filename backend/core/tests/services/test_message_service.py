@@ -1,7 +1,11 @@
 import unittest
 from unittest.mock import MagicMock, patch
+from django.contrib.auth.models import User
+from django.test import TestCase
 from rest_framework.exceptions import ValidationError
 
+from core.models import Message
+from core.serializers import MessageSerializer
 from core.services.message_service import MessageService
 from core.websocket.messages import WebSocketMessageType
 
@@ -13,6 +17,23 @@ TEST_USER_EMAIL = "testuser@example.com"
 TEST_USER_USERNAME = "testuser"
 
 
+class TestMessageServiceGetAllQueries(TestCase):
+    """Messages are listed with their author in a single query."""
+
+    def test_getAll_serializes_in_one_query(self):
+        for count in (1, 10):
+            with self.subTest(messages=count):
+                for index in range(count):
+                    user = User.objects.create_user(f"user-{count}-{index}")
+                    Message.objects.create(user=user, message=TEST_MESSAGE_CONTENT)
+
+                with self.assertNumQueries(1):
+                    data = MessageSerializer(MessageService.getAll(), many=True).data
+
+                self.assertEqual(len(data), Message.objects.count())
+                self.assertTrue(all(message["user"]["username"] for message in data))
+
+
 class TestMessageServiceCreateMessage(unittest.TestCase):
     """Tests for MessageService.create_message method."""
 
@@ -0,0 +1,120 @@
+from unittest.mock import patch
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from core.models import Album, Photo, PhotoBlob
+from core.services.photo_blob_service import PhotoBlobService
+import hashlib
+import io
+
+DIGEST = "a" * 64
+BLOB_URL = "https://bucket.s3.amazonaws.com/1/uuid_photo.jpg"
+DUPLICATE_URL = "https://bucket.s3.amazonaws.com/2/uuid_photo.jpg"
+
+
+@patch("core.services.photo_blob_service.photo_repository")
+class TestPhotoBlobService(TestCase):
+
+    def test_hash_file_returns_digest_and_size_and_rewinds(self, mock_repo):
+        for file in [SimpleUploadedFile("a.jpg", b"content"), io.BytesIO(b"content")]:
+            with self.subTest(file=type(file).__name__):
+                digest, size = PhotoBlobService.hash_file(file)
+
+                self.assertEqual(digest, hashlib.sha256(b"content").hexdigest())
+                self.assertEqual(size, 7)
+                self.assertEqual(file.read(), b"content")
+
+    def test_acquire_creates_blob(self, mock_repo):
+        blob = PhotoBlobService.acquire(DIGEST, BLOB_URL, 10)
+
+        self.assertEqual(blob.url, BLOB_URL)
+        self.assertEqual(PhotoBlob.objects.get(sha256=DIGEST).ref_count, 1)
+        mock_repo.delete.assert_not_called()
+
+    def test_acquire_existing_content_keeps_blob_and_deletes_duplicate(self, mock_repo):
+        PhotoBlob.objects.create(sha256=DIGEST, url=BLOB_URL, size=10, ref_count=1)
+
+        blob = PhotoBlobService.acquire(DIGEST, DUPLICATE_URL, 10, count=2)
+
+        self.assertEqual(blob.url, BLOB_URL)
+        self.assertEqual(PhotoBlob.objects.get(sha256=DIGEST).ref_count, 3)
+        mock_repo.delete.assert_called_once_with(DUPLICATE_URL)
+
+    def test_add_reference(self, mock_repo):
+        PhotoBlob.objects.create(sha256=DIGEST, url=BLOB_URL, size=10, ref_count=1)
+
+        self.assertEqual(PhotoBlobService.add_reference(DIGEST).url, BLOB_URL)
+        self.assertIsNone(PhotoBlobService.add_reference("b" * 64))
+        self.assertEqual(PhotoBlob.objects.get(sha256=DIGEST).ref_count, 2)
+
+    def test_release_decrements_reference(self, mock_repo):
+        blob = PhotoBlob.objects.create(
+            sha256=DIGEST, url=BLOB_URL, size=10, ref_count=2
+        )
+
+        PhotoBlobService.release(blob.id)
+
+        self.assertEqual(PhotoBlob.objects.get(pk=blob.id).ref_count, 1)
+        mock_repo.delete.assert_not_called()
+
+    def test_release_last_reference_deletes_object_after_commit(self, mock_repo):
+        blob = PhotoBlob.objects.create(
+            sha256=DIGEST,
+            url=BLOB_URL,
+            size=10,
+            ref_count=1,
+            derivatives=[{"url": "w320", "width": 320, "format": "webp"}],
+        )
+
+        mock_repo.delete_many.return_value = []
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PhotoBlobService.release(blob.id)
+            mock_repo.delete_many.assert_not_called()
+
+        self.assertFalse(PhotoBlob.objects.filter(pk=blob.id).exists())
+        mock_repo.delete_many.assert_called_once_with([BLOB_URL, "w320"])
+
+    def test_release_keeps_blob_still_referenced_by_photos(self, mock_repo):
+        blob = PhotoBlob.objects.create(
+            sha256=DIGEST, url=BLOB_URL, size=10, ref_count=1
+        )
+        album = Album.objects.create(title="Album")
+        for _ in range(2):
+            Photo.objects.create(album=album, image_url=BLOB_URL, blob=blob)
+
+        PhotoBlobService.release(blob.id)
+
+        self.assertEqual(PhotoBlob.objects.get(pk=blob.id).ref_count, 2)
+        mock_repo.delete_many.assert_not_called()
+
+    def test_release_many_deletes_unused_objects_in_one_call(self, mock_repo):
+        mock_repo.delete_many.return_value = []
+        shared = PhotoBlob.objects.create(
+            sha256=DIGEST, url=BLOB_URL, size=10, ref_count=3
+        )
+        unused = [
+            PhotoBlob.objects.create(
+                sha256=str(i) * 64, url=f"{DUPLICATE_URL}{i}", size=10, ref_count=1
+            )
+            for i in range(2)
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PhotoBlobService.release_many(
+                {shared.id: 2, unused[0].id: 1, unused[1].id: 1}
+            )
+
+        self.assertEqual(PhotoBlob.objects.get(pk=shared.id).ref_count, 1)
+        self.assertEqual(PhotoBlob.objects.count(), 1)
+        mock_repo.delete_many.assert_called_once()
+        self.assertCountEqual(
+            mock_repo.delete_many.call_args[0][0],
+            [f"{DUPLICATE_URL}0", f"{DUPLICATE_URL}1"],
+        )
+
+    def test_find_existing(self, mock_repo):
+        PhotoBlob.objects.create(sha256=DIGEST, url=BLOB_URL, size=10)
+
+        self.assertEqual(
+            PhotoBlobService.find_existing([DIGEST, "b" * 64, DIGEST]), [DIGEST]
+        )
@@ -0,0 +1,169 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.exceptions import NotFound, ValidationError
+from core.models import Album, ImageJob, Photo, PhotoBlob
+from core.services.photo_import_service import PhotoImportService
+from core.websocket.messages import WebSocketMessageType
+import hashlib
+import json
+import tempfile
+import zipfile
+
+STORED_URL = "https://bucket.s3.amazonaws.com/{}/uuid_{}"
+
+TAKEOUT_SIDECAR = {
+    "title": "beach.jpg",
+    "description": "Sunset",
+    "photoTakenTime": {"timestamp": "1500000000"},
+    "geoData": {"latitude": 43.5, "longitude": 7.1},
+}
+
+
+@patch("core.services.photo_import_service.send_ws_message_to_user")
+@patch("core.services.photo_import_service.photo_repository")
+class TestPhotoImportService(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.root = Path(self.directory.name)
+        self.user = User.objects.create_user("viewer")
+
+    def write(self, path: str, content: bytes) -> None:
+        path = self.root / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+    def repository(self, mock_repo) -> list:
+        uploads = []
+
+        def save_within_folder(file, folder_album_id):
+            uploads.append(file.read())
+            return STORED_URL.format(folder_album_id, file.name)
+
+        mock_repo.save_within_folder.side_effect = save_within_folder
+        return uploads
+
+    def test_imports_folders_into_albums_uploading_each_content_once(
+        self, mock_repo, mock_send
+    ):
+        uploads = self.repository(mock_repo)
+        existing = Album.objects.create(title="Trip")
+        self.write("Trip/a.jpg", b"photo a")
+        self.write("Trip/copy.jpg", b"photo a")
+        self.write("Trip/notes.txt", b"not a photo")
+        self.write("Home/a.jpg", b"photo a")
+        self.write("Home/b.png", b"photo b")
+        batches = []
+
+        stats = PhotoImportService.run(
+            str(self.root),
+            batch_size=2,
+            workers=2,
+            progress=lambda stats: batches.append(stats["processed"]),
+        )
+
+        home = Album.objects.get(title="Home")
+        self.assertEqual(sorted(uploads), [b"photo a", b"photo b"])
+        self.assertEqual(batches, [2, 4])
+        self.assertEqual(
+            {key: stats[key] for key in ("files", "imported", "skipped", "failed")},
+            {"files": 4, "imported": 3, "skipped": 1, "failed": 0},
+        )
+        self.assertEqual(stats["album_ids"], sorted([existing.pk, home.pk]))
+        self.assertEqual(Photo.objects.filter(album=existing).count(), 1)
+        self.assertEqual(Photo.objects.filter(album=home).count(), 2)
+        digest = hashlib.sha256(b"photo a").hexdigest()
+        self.assertEqual(PhotoBlob.objects.get(sha256=digest).ref_count, 2)
+        self.assertEqual(ImageJob.objects.count(), 2)
+        photo = Photo.objects.get(album=home, blob__sha256=digest)
+        self.assertEqual((photo.bytes, photo.mime), (7, "image/jpeg"))
+
+        mock_send.assert_called_with(
+            self.user.pk,
+            WebSocketMessageType.PHOTOS_IMPORTED,
+            {
+                "album_ids": stats["album_ids"],
+                "imported": 3,
+                "skipped": 1,
+                "failed": 0,
+            },
+        )
+        sent = {call.args[1] for call in mock_send.call_args_list}
+        self.assertEqual(sent, {WebSocketMessageType.PHOTOS_IMPORTED})
+
+    def test_running_again_skips_what_albums_hold(self, mock_repo, mock_send):
+        uploads = self.repository(mock_repo)
+        self.write("Trip/a.jpg", b"photo a")
+        PhotoImportService.run(str(self.root))
+        self.write("Trip/b.jpg", b"photo b")
+
+        stats = PhotoImportService.run(str(self.root))
+
+        self.assertEqual((stats["imported"], stats["skipped"]), (1, 1))
+        self.assertEqual(uploads, [b"photo a", b"photo b"])
+        self.assertEqual(Album.objects.count(), 1)
+        self.assertEqual(Photo.objects.count(), 2)
+
+    def test_reads_takeout_archive_with_sidecars(self, mock_repo, mock_send):
+        self.repository(mock_repo)
+        archive = self.root / "takeout.zip"
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("Takeout/Google Photos/Holidays/beach.jpg", b"beach")
+            zf.writestr(
+                "Takeout/Google Photos/Holidays/beach.jpg.json",
+                json.dumps(TAKEOUT_SIDECAR),
+            )
+            zf.writestr("Takeout/Google Photos/Holidays/metadata.json", "{}")
+
+        stats = PhotoImportService.run(str(archive))
+
+        photo = Photo.objects.get()
+        self.assertEqual(stats["imported"], 1)
+        self.assertEqual(photo.album.title, "Holidays")
+        self.assertEqual(photo.caption, "Sunset")
+        self.assertEqual(
+            photo.taken_at, datetime.fromtimestamp(1500000000, timezone.utc)
+        )
+        self.assertEqual((photo.lat, photo.lon), (43.5, 7.1))
+
+    def test_imports_into_given_album(self, mock_repo, mock_send):
+        self.repository(mock_repo)
+        album = Album.objects.create(title="Everything")
+        self.write("Trip/a.jpg", b"photo a")
+        self.write("b.jpg", b"photo b")
+
+        stats = PhotoImportService.run(str(self.root), album_id=album.pk)
+
+        self.assertEqual(stats["album_ids"], [album.pk])
+        self.assertEqual(Photo.objects.filter(album=album).count(), 2)
+        self.assertEqual(Album.objects.count(), 1)
+
+    def test_failed_upload_is_counted_and_not_inserted(self, mock_repo, mock_send):
+        mock_repo.save_within_folder.side_effect = OSError("storage down")
+        self.write("Trip/a.jpg", b"photo a")
+
+        with self.assertLogs("core.services.photo_import_service", "WARNING"):
+            stats = PhotoImportService.run(str(self.root))
+
+        self.assertEqual((stats["imported"], stats["failed"]), (0, 1))
+        self.assertFalse(Photo.objects.exists())
+        self.assertFalse(PhotoBlob.objects.exists())
+        mock_send.assert_not_called()
+
+    def test_rejects_unknown_album_and_source(self, mock_repo, mock_send):
+        with self.assertRaises(NotFound):
+            PhotoImportService.run(str(self.root), album_id=999)
+        self.write("file.txt", b"text")
+        with self.assertRaises(ValidationError):
+            PhotoImportService.run(str(self.root / "file.txt"))
+
+    def test_read_sidecar_ignores_unknown_place(self, mock_repo, mock_send):
+        values = PhotoImportService.read_sidecar(
+            json.dumps({"geoData": {"latitude": 0.0, "longitude": 0.0}})
+        )
+
+        self.assertEqual(values, {})
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import ExifTags, Image
+from unittest.mock import patch
+from core.imaging import read_metadata
+from core.interface.upload_handler import StreamedUploadedFile
+from core.models import Album, Photo, PhotoBlob
+from core.services.photo_metadata_service import PhotoMetadataService
+import io
+
+PHOTO_URL = "https://bucket.s3.amazonaws.com/1/uuid_photo.jpg"
+VIDEO_URL = "https://bucket.s3.amazonaws.com/1/uuid_clip.mp4"
+
+
+def _jpeg(width=300, height=200, orientation=None, taken_at=None, offset=None):
+    exif = Image.Exif()
+    if orientation:
+        exif[ExifTags.Base.Orientation] = orientation
+    details = exif.get_ifd(ExifTags.IFD.Exif)
+    if taken_at:
+        details[ExifTags.Base.DateTimeOriginal] = taken_at
+    if offset:
+        details[ExifTags.Base.OffsetTimeOriginal] = offset
+    gps = exif.get_ifd(ExifTags.IFD.GPSInfo)
+    gps[ExifTags.GPS.GPSLatitudeRef] = "N"
+    gps[ExifTags.GPS.GPSLatitude] = (45.0, 45.0, 36.0)
+    gps[ExifTags.GPS.GPSLongitudeRef] = "W"
+    gps[ExifTags.GPS.GPSLongitude] = (4.0, 51.0, 0.0)
+    buffer = io.BytesIO()
+    Image.effect_noise((width, height), 64).convert("RGB").save(
+        buffer, "JPEG", exif=exif
+    )
+    return buffer.getvalue()
+
+
+class TestReadMetadata(TestCase):
+
+    def test_reads_exif_from_header_only(self):
+        data = _jpeg(taken_at="2023:06:14 10:20:30", offset="+02:00")
+
+        metadata = read_metadata(data[:2048])
+
+        self.assertEqual((metadata["width"], metadata["height"]), (300, 200))
+        self.assertEqual(metadata["mime"], "image/jpeg")
+        self.assertEqual(
+            metadata["taken_at"],
+            datetime(2023, 6, 14, 8, 20, 30, tzinfo=timezone.utc),
+        )
+        self.assertAlmostEqual(metadata["lat"], 45.76)
+        self.assertAlmostEqual(metadata["lon"], -4.85)
+
+    @override_settings(TIME_ZONE="Europe/Paris")
+    def test_capture_time_without_offset_is_local(self):
+        metadata = read_metadata(_jpeg(taken_at="2023:06:14 10:20:30"))
+
+        self.assertEqual(metadata["taken_at"].utcoffset(), timedelta(hours=2))
+
+    def test_dimensions_follow_orientation(self):
+        metadata = read_metadata(_jpeg(orientation=6))
+
+        self.assertEqual((metadata["width"], metadata["height"]), (200, 300))
+
+    def test_unknown_content(self):
+        self.assertEqual(read_metadata(b"\x00\x00\x00\x18ftypmp42"), {})
+
+
+@patch("core.services.photo_metadata_service.photo_repository")
+class TestPhotoMetadataService(TestCase):
+
+    def test_from_upload_reads_file_and_rewinds(self, mock_repo):
+        file = SimpleUploadedFile("photo.jpg", _jpeg())
+
+        metadata = PhotoMetadataService.from_upload(file)
+
+        self.assertEqual(metadata["width"], 300)
+        self.assertEqual(metadata["bytes"], file.size)
+        self.assertEqual(file.tell(), 0)
+
+    def test_from_upload_uses_streamed_header(self, mock_repo):
+        file = StreamedUploadedFile(
+            PHOTO_URL, "photo.jpg", 123456, "image/jpeg", header=_jpeg()[:4096]
+        )
+
+        metadata = PhotoMetadataService.from_upload(file)
+
+        self.assertEqual((metadata["height"], metadata["bytes"]), (200, 123456))
+
+    def test_from_storage_fetches_first_bytes_only(self, mock_repo):
+        mock_repo.open_stream.return_value = io.BytesIO(b"not an image")
+
+        metadata = PhotoMetadataService.from_storage(VIDEO_URL, 42)
+
+        mock_repo.open_stream.assert_called_once_with(VIDEO_URL, 0, 128 * 1024 - 1)
+        self.assertEqual(metadata["mime"], "video/mp4")
+        self.assertEqual(metadata["bytes"], 42)
+        self.assertIsNone(metadata["width"])
+
+    def test_for_blob_reuses_metadata_of_other_photos(self, mock_repo):
+        blob = PhotoBlob.objects.create(sha256="a" * 64, url=PHOTO_URL, size=10)
+        album = Album.objects.create(title="Album")
+        Photo.objects.create(
+            album=album, image_url=PHOTO_URL, blob=blob, mime="image/jpeg", width=9
+        )
+
+        metadata = PhotoMetadataService.for_blob(blob)
+
+        self.assertEqual((metadata["mime"], metadata["width"]), ("image/jpeg", 9))
+        mock_repo.open_stream.assert_not_called()
+
+    def test_for_cover_keeps_layout_and_size_fields(self, mock_repo):
+        upload = SimpleUploadedFile("cover.jpg", _jpeg(taken_at="2024:01:02 03:04:05"))
+
+        cover = PhotoMetadataService.for_cover(upload)
+
+        self.assertEqual(
+            cover,
+            {
+                "cover_width": 300,
+                "cover_height": 200,
+                "cover_bytes": upload.size,
+                "cover_mime": "image/jpeg",
+            },
+        )
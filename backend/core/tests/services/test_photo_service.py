@@ -1,7 +1,22 @@
+import hashlib
+import io
 import unittest
 from unittest.mock import MagicMock, patch
-
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.exceptions import NotFound, ValidationError
+
+from core.exceptions import CloudUploadError
+from core.models import Album, Photo, PhotoBlob
+from core.services.album_stats_service import AlbumStatsService
 from core.services.photo_service import PhotoService
+from core.services.photo_metadata_service import PhotoMetadataService
+from core.websocket.messages import WebSocketMessageType
+from core.interface.upload_handler import StreamedUploadedFile, StreamingUploadHandler
 
 TEST_ALBUM_ID = 1
 TEST_PHOTO_ID = 1
@@ -11,6 +26,14 @@ TEST_PHOTO_LOCATION = "Paris, France"
 TEST_FILE_NAME = "sunset.jpg"
 
 
+def patch_album_stats(test):
+    """Album statistics are updated in the database, outside mocked tests."""
+    for name in ("AlbumStatsService", "transaction"):
+        patcher = patch(f"core.services.photo_service.{name}")
+        patcher.start()
+        test.addCleanup(patcher.stop)
+
+
 class TestPhotoServiceGetPhotosByAlbumId(unittest.TestCase):
     """Tests for PhotoService.get_photos_by_album_id method."""
 
@@ -38,7 +61,9 @@ class TestPhotoServiceGetPhotosByAlbumId(unittest.TestCase):
     ):
 
         mock_queryset = MagicMock()
-        mock_photo_model.objects.filter.return_value = mock_queryset
+        mock_photo_model.objects.filter.return_value.select_related.return_value = (
+            mock_queryset
+        )
         mock_serializer_class.return_value.data = self.serialized_photos
 
         PhotoService.get_photos_by_album_id(TEST_ALBUM_ID)
@@ -52,7 +77,9 @@ class TestPhotoServiceGetPhotosByAlbumId(unittest.TestCase):
     ):
 
         mock_queryset = MagicMock()
-        mock_photo_model.objects.filter.return_value = mock_queryset
+        mock_photo_model.objects.filter.return_value.select_related.return_value = (
+            mock_queryset
+        )
         mock_serializer_class.return_value.data = self.serialized_photos
 
         result = PhotoService.get_photos_by_album_id(TEST_ALBUM_ID)
@@ -66,7 +93,9 @@ class TestPhotoServiceGetPhotosByAlbumId(unittest.TestCase):
     ):
 
         mock_queryset = MagicMock()
-        mock_photo_model.objects.filter.return_value = mock_queryset
+        mock_photo_model.objects.filter.return_value.select_related.return_value = (
+            mock_queryset
+        )
         mock_serializer_class.return_value.data = self.serialized_photos
 
         PhotoService.get_photos_by_album_id(TEST_ALBUM_ID)
@@ -80,7 +109,9 @@ class TestPhotoServiceGetPhotosByAlbumId(unittest.TestCase):
     ):
 
         mock_queryset = MagicMock()
-        mock_photo_model.objects.filter.return_value = mock_queryset
+        mock_photo_model.objects.filter.return_value.select_related.return_value = (
+            mock_queryset
+        )
         mock_serializer_class.return_value.data = []
 
         result = PhotoService.get_photos_by_album_id(TEST_ALBUM_ID)
@@ -88,11 +119,35 @@ class TestPhotoServiceGetPhotosByAlbumId(unittest.TestCase):
         self.assertEqual(result, [])
 
 
+class TestPhotoServiceGetPhotosByAlbumIdQueries(TestCase):
+    """Photos nest their album: it must not be loaded once per photo."""
+
+    def test_query_count_does_not_grow_with_photos(self):
+        album = Album.objects.create(title="Album")
+        for count in (1, 20):
+            with self.subTest(photos=count):
+                AlbumStatsService.add(
+                    Photo.objects.bulk_create(
+                        [Photo(album=album, image_url=TEST_PHOTO_URL)] * count
+                    )
+                )
+                total = Photo.objects.filter(album=album).count()
+
+                with self.assertNumQueries(1):
+                    photos = PhotoService.get_photos_by_album_id(album.id)
+
+                self.assertEqual(len(photos), total)
+                self.assertEqual(
+                    {photo["album"]["nb_photos"] for photo in photos}, {total}
+                )
+
+
 class TestPhotoServiceSavePhoto(unittest.TestCase):
     """Tests for PhotoService.save_photo method."""
 
     def setUp(self):
         """Set up test fixtures."""
+        patch_album_stats(self)
         self.mock_file = MagicMock()
         self.mock_file.name = TEST_FILE_NAME
 
@@ -114,6 +169,21 @@ class TestPhotoServiceSavePhoto(unittest.TestCase):
             "location": TEST_PHOTO_LOCATION,
         }
 
+        # New content: nothing to deduplicate against
+        patcher = patch("core.services.photo_service.PhotoBlobService")
+        self.mock_blob_service = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_blob_service.hash_file.return_value = ("a" * 64, 1024)
+        self.mock_blob_service.add_reference.return_value = None
+        self.mock_blob_service.acquire.side_effect = lambda digest, url, size: (
+            MagicMock(id=1, url=url)
+        )
+
+        # Derivatives are generated after commit, outside these mocked tests
+        patcher = patch("core.services.photo_service.DerivativeService")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @patch("core.services.photo_service.send_ws_message_to_user")
     @patch("core.services.photo_service.User")
     @patch("core.services.photo_service.PhotoSerializer")
@@ -142,6 +212,51 @@ class TestPhotoServiceSavePhoto(unittest.TestCase):
             self.mock_file, folder_album_id=TEST_ALBUM_ID
         )
 
+    @patch("core.services.photo_service.send_ws_message_to_user")
+    @patch("core.services.photo_service.User")
+    @patch("core.services.photo_service.PhotoSerializer")
+    @patch("core.services.photo_service.Album")
+    @patch("core.services.photo_service.photo_repository")
+    def test_save_photo_uses_url_of_streamed_upload(
+        self,
+        mock_photo_repo,
+        mock_album_model,
+        mock_serializer_class,
+        mock_user,
+        mock_ws_send,
+    ):
+        streamed_file = StreamedUploadedFile(
+            TEST_PHOTO_URL, TEST_FILE_NAME, 1024, "image/jpeg"
+        )
+        self.mock_request.FILES = {"image": streamed_file}
+        mock_album_model.objects.get.return_value = self.mock_album
+        mock_serializer = MagicMock()
+        mock_serializer.data = self.serialized_photo
+        mock_serializer_class.return_value = mock_serializer
+        mock_user.objects.all.return_value.values_list.return_value = [1]
+
+        PhotoService.save_photo(TEST_ALBUM_ID, self.mock_request)
+
+        mock_photo_repo.save_within_folder.assert_not_called()
+        data = mock_serializer_class.call_args_list[0][1]["data"]
+        self.assertEqual(data["image_url"], TEST_PHOTO_URL)
+
+    @patch("core.services.photo_service.Album")
+    @patch("core.services.photo_service.photo_repository")
+    def test_save_photo_installs_streaming_handler_first(
+        self, mock_photo_repo, mock_album_model
+    ):
+        mock_album_model.objects.get.return_value = self.mock_album
+        self.mock_request.upload_handlers = []
+        self.mock_request.data.copy.side_effect = RuntimeError("stop after setup")
+
+        with self.assertRaises(RuntimeError):
+            PhotoService.save_photo(TEST_ALBUM_ID, self.mock_request)
+
+        handler = self.mock_request.upload_handlers[0]
+        self.assertIsInstance(handler, StreamingUploadHandler)
+        self.assertEqual(handler.folder_album_id, TEST_ALBUM_ID)
+
     @patch("core.services.photo_service.send_ws_message_to_user")
     @patch("core.services.photo_service.User")
     @patch("core.services.photo_service.PhotoSerializer")
@@ -340,8 +455,10 @@ class TestPhotoServiceDeletePhoto(unittest.TestCase):
 
     def setUp(self):
         """Set up test fixtures."""
+        patch_album_stats(self)
         self.mock_photo = MagicMock()
         self.mock_photo.id = TEST_PHOTO_ID
+        self.mock_photo.blob_id = None
 
     @patch("core.services.photo_service.send_ws_message_to_user")
     @patch("core.services.photo_service.User")
@@ -453,6 +570,13 @@ class TestPhotoServiceUpdatePhoto(unittest.TestCase):
 class TestPhotoServiceWebSocketBroadcast(unittest.TestCase):
     """Tests for PhotoService WebSocket broadcast functionality."""
 
+    def setUp(self):
+        patch_album_stats(self)
+        # Derivatives are generated after commit, outside these mocked tests
+        patcher = patch("core.services.photo_service.DerivativeService")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @patch("core.services.photo_service.send_ws_message_to_user")
     @patch("core.services.photo_service.User")
     @patch("core.services.photo_service.PhotoSerializer")
@@ -493,6 +617,7 @@ class TestPhotoServiceMovePhoto(unittest.TestCase):
     """Tests for PhotoService.move_photo_to_album method."""
 
     def setUp(self):
+        patch_album_stats(self)
         self.mock_photo = MagicMock()
         self.mock_photo.id = TEST_PHOTO_ID
         self.mock_photo.album_id = TEST_ALBUM_ID
@@ -610,12 +735,15 @@ class TestPhotoServiceCopyPhoto(unittest.TestCase):
     """Tests for PhotoService.copy_photo_to_album method."""
 
     def setUp(self):
+        patch_album_stats(self)
         self.mock_photo = MagicMock()
         self.mock_photo.id = TEST_PHOTO_ID
         self.mock_photo.album_id = TEST_ALBUM_ID
         self.mock_photo.image_url = TEST_PHOTO_URL
         self.mock_photo.caption = TEST_PHOTO_CAPTION
         self.mock_photo.location = TEST_PHOTO_LOCATION
+        # Stored before deduplication: copied in S3
+        self.mock_photo.blob_id = None
 
         self.mock_target_album = MagicMock()
         self.mock_target_album.id = 2
@@ -630,6 +758,11 @@ class TestPhotoServiceCopyPhoto(unittest.TestCase):
             "location": TEST_PHOTO_LOCATION,
         }
 
+        # Derivatives are generated after commit, outside these mocked tests
+        patcher = patch("core.services.photo_service.DerivativeService")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @patch("core.services.photo_service.send_ws_message_to_user")
     @patch("core.services.photo_service.User")
     @patch("core.services.photo_service.PhotoSerializer")
@@ -675,8 +808,11 @@ class TestPhotoServiceCopyPhoto(unittest.TestCase):
         mock_photo_model.objects.create.assert_called_once_with(
             album=self.mock_target_album,
             image_url=self.new_photo_url,
+            blob_id=None,
             caption=TEST_PHOTO_CAPTION,
             location=TEST_PHOTO_LOCATION,
+            derivatives=[],
+            **PhotoMetadataService.of(self.mock_photo),
         )
 
     @patch("core.services.photo_service.send_ws_message_to_user")
@@ -767,6 +903,7 @@ class TestPhotoServiceUpdatePhotoAlbumChange(unittest.TestCase):
     """Tests for PhotoService.update_photo with target_album_id (move via edit)."""
 
     def setUp(self):
+        patch_album_stats(self)
         self.mock_photo = MagicMock()
         self.mock_photo.id = TEST_PHOTO_ID
         self.mock_photo.image_url = TEST_PHOTO_URL
@@ -888,6 +1025,14 @@ class TestPhotoServicePatchDescription(unittest.TestCase):
 class TestPhotoServiceBulkUpload(unittest.TestCase):
     """Tests simulating sequential bulk upload of multiple photos."""
 
+    def setUp(self):
+        patch_album_stats(self)
+        # Derivatives are generated after commit, outside these mocked tests
+        patcher = patch("core.services.photo_service.DerivativeService")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("core.services.photo_service.PhotoBlobService")
     @patch("core.services.photo_service.send_ws_message_to_user")
     @patch("core.services.photo_service.User")
     @patch("core.services.photo_service.PhotoSerializer")
@@ -895,8 +1040,12 @@ class TestPhotoServiceBulkUpload(unittest.TestCase):
     @patch("core.services.photo_service.photo_repository")
     def test_bulk_upload_three_photos_creates_three_entries(
         self, mock_photo_repo, mock_album_model, mock_serializer_class,
-        mock_user_model, mock_ws_send,
+        mock_user_model, mock_ws_send, mock_blob_service,
     ):
+        mock_blob_service.hash_file.side_effect = [
+            ("a" * 64, 1), ("b" * 64, 1), ("c" * 64, 1)
+        ]
+        mock_blob_service.add_reference.return_value = None
         mock_album = MagicMock()
         mock_album.id = TEST_ALBUM_ID
         mock_album_model.objects.get.return_value = mock_album
@@ -927,5 +1076,676 @@ class TestPhotoServiceBulkUpload(unittest.TestCase):
         self.assertEqual(mock_ws_send.call_count, 3)
 
 
+class TestPhotoServicePresignedUpload(unittest.TestCase):
+    """Tests for the presigned direct-to-storage upload flow."""
+
+    def setUp(self):
+        patch_album_stats(self)
+        self.presigned = {
+            "url": "https://bucket.s3.amazonaws.com/",
+            "fields": {"key": "1/uuid_photo.jpg"},
+            "image_url": TEST_PHOTO_URL,
+        }
+        self.mock_request = MagicMock()
+        self.mock_album = MagicMock()
+        self.mock_album.id = TEST_ALBUM_ID
+
+        # Derivatives are generated after commit, outside these mocked tests
+        patcher = patch("core.services.photo_service.DerivativeService")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _token(self, album_id=TEST_ALBUM_ID):
+        from django.core import signing
+        from core.services.photo_service import UPLOAD_TOKEN_SALT
+
+        return signing.dumps(
+            {"album_id": album_id, "image_url": TEST_PHOTO_URL},
+            salt=UPLOAD_TOKEN_SALT,
+        )
+
+    @patch("core.services.photo_service.Album")
+    @patch("core.services.photo_service.photo_repository")
+    def test_create_presigned_upload_targets_album_folder(
+        self, mock_photo_repo, mock_album_model
+    ):
+        mock_album_model.objects.filter.return_value.exists.return_value = True
+        mock_photo_repo.create_presigned_upload.return_value = self.presigned
+
+        result = PhotoService.create_presigned_upload(
+            TEST_ALBUM_ID, {"file_name": TEST_FILE_NAME, "content_type": "image/jpeg"}
+        )
+
+        args, kwargs = mock_photo_repo.create_presigned_upload.call_args
+        self.assertEqual(args[0], TEST_FILE_NAME)
+        self.assertEqual(kwargs["folder_album_id"], TEST_ALBUM_ID)
+        self.assertEqual(kwargs["content_type"], "image/jpeg")
+        self.assertEqual(result["fields"], self.presigned["fields"])
+        self.assertIn("upload_token", result)
+
+    @patch("core.services.photo_service.photo_repository")
+    def test_create_presigned_upload_rejects_unsupported_content_type(
+        self, mock_photo_repo
+    ):
+        from rest_framework.exceptions import ValidationError
+
+        with self.assertRaises(ValidationError):
+            PhotoService.create_presigned_upload(
+                TEST_ALBUM_ID,
+                {"file_name": "script.sh", "content_type": "text/x-shellscript"},
+            )
+
+        mock_photo_repo.create_presigned_upload.assert_not_called()
+
+    @patch("core.services.photo_service.send_ws_message_to_user")
+    @patch("core.services.photo_service.User")
+    @patch("core.services.photo_service.PhotoSerializer")
+    @patch("core.services.photo_service.Photo")
+    @patch("core.services.photo_service.Album")
+    @patch("core.services.photo_service.photo_repository")
+    def test_confirm_upload_creates_photo_and_broadcasts(
+        self,
+        mock_photo_repo,
+        mock_album_model,
+        mock_photo_model,
+        mock_serializer_class,
+        mock_user,
+        mock_ws_send,
+    ):
+        from core.websocket.messages import WebSocketMessageType
+
+        mock_album_model.objects.get.return_value = self.mock_album
+        mock_photo_model.objects.filter.return_value.first.return_value = None
+        mock_photo_repo.stat.return_value = {"size": 1024, "content_type": "image/jpeg"}
+        mock_serializer_class.return_value.data = {"id": TEST_PHOTO_ID}
+        mock_user.objects.all.return_value.values_list.return_value = [1]
+        self.mock_request.data = {"upload_token": self._token(), "caption": "Hi"}
+
+        PhotoService.confirm_upload(TEST_ALBUM_ID, self.mock_request)
+
+        mock_photo_repo.stat.assert_called_once_with(TEST_PHOTO_URL)
+        data = mock_serializer_class.call_args_list[0][1]["data"]
+        self.assertEqual(data["image_url"], TEST_PHOTO_URL)
+        self.assertEqual(data["caption"], "Hi")
+        self.assertEqual(
+            mock_ws_send.call_args[0][1], WebSocketMessageType.PHOTO_UPLOADED
+        )
+
+    @patch("core.services.photo_service.Photo")
+    @patch("core.services.photo_service.Album")
+    @patch("core.services.photo_service.photo_repository")
+    def test_confirm_upload_raises_when_object_missing(
+        self, mock_photo_repo, mock_album_model, mock_photo_model
+    ):
+        from rest_framework.exceptions import ValidationError
+
+        mock_album_model.objects.get.return_value = self.mock_album
+        mock_photo_model.objects.filter.return_value.first.return_value = None
+        mock_photo_repo.stat.return_value = None
+        self.mock_request.data = {"upload_token": self._token()}
+
+        with self.assertRaises(ValidationError):
+            PhotoService.confirm_upload(TEST_ALBUM_ID, self.mock_request)
+
+    @patch("core.services.photo_service.photo_repository")
+    def test_confirm_upload_rejects_token_of_another_album(self, mock_photo_repo):
+        from rest_framework.exceptions import ValidationError
+
+        self.mock_request.data = {"upload_token": self._token(album_id=99)}
+
+        with self.assertRaises(ValidationError):
+            PhotoService.confirm_upload(TEST_ALBUM_ID, self.mock_request)
+
+        mock_photo_repo.stat.assert_not_called()
+
+    @patch("core.services.photo_service.photo_repository")
+    def test_confirm_upload_rejects_tampered_token(self, mock_photo_repo):
+        from rest_framework.exceptions import ValidationError
+
+        self.mock_request.data = {"upload_token": self._token() + "x"}
+
+        with self.assertRaises(ValidationError):
+            PhotoService.confirm_upload(TEST_ALBUM_ID, self.mock_request)
+
+
+class TestPhotoServiceSavePhotosBatch(TestCase):
+    """Tests for PhotoService.save_photos_batch (real DB, mocked storage)."""
+
+    def setUp(self):
+        self.album = Album.objects.create(title="Batch")
+        User.objects.create_user(username="viewer", password="password")
+        self.mock_request = MagicMock()
+        self.mock_request.data = {"location": TEST_PHOTO_LOCATION}
+        self.files = [
+            SimpleUploadedFile(f"photo_{i}.jpg", f"content {i}".encode())
+            for i in range(3)
+        ]
+        self.mock_request.FILES.getlist.return_value = self.files
+
+    @staticmethod
+    def _fake_save(file, folder_album_id):
+        if file.name == "photo_1.jpg":
+            raise CloudUploadError("boom")
+        return f"https://bucket.s3.amazonaws.com/{folder_album_id}/{file.name}"
+
+    @patch("core.services.photo_service.send_ws_message_to_user")
+    @patch("core.services.photo_service.photo_repository")
+    def test_save_photos_batch_reports_each_file(self, mock_photo_repo, mock_ws_send):
+        mock_photo_repo.save_within_folder.side_effect = self._fake_save
+
+        result = PhotoService.save_photos_batch(self.album.id, self.mock_request)
+
+        self.assertEqual(result["uploaded"], 2)
+        self.assertEqual(result["failed"], 1)
+        self.assertEqual(
+            [r["status"] for r in result["results"]],
+            ["uploaded", "failed", "uploaded"],
+        )
+        self.assertEqual(result["results"][2]["photo"]["location"], TEST_PHOTO_LOCATION)
+
+    @patch("core.services.photo_service.send_ws_message_to_user")
+    @patch("core.services.photo_service.photo_repository")
+    def test_save_photos_batch_inserts_rows_in_one_query(
+        self, mock_photo_repo, mock_ws_send
+    ):
+        mock_photo_repo.save_within_folder.side_effect = self._fake_save
+
+        with CaptureQueriesContext(connection) as queries:
+            PhotoService.save_photos_batch(self.album.id, self.mock_request)
+
+        inserts = [
+            q for q in queries if q["sql"].startswith('INSERT INTO "core_photo"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Photo.objects.filter(album=self.album).count(), 2)
+
+    @patch("core.services.photo_service.send_ws_message_to_user")
+    @patch("core.services.photo_service.photo_repository")
+    def test_save_photos_batch_broadcasts_one_aggregated_event(
+        self, mock_photo_repo, mock_ws_send
+    ):
+        mock_photo_repo.save_within_folder.side_effect = self._fake_save
+
+        PhotoService.save_photos_batch(self.album.id, self.mock_request)
+
+        self.assertEqual(mock_ws_send.call_count, User.objects.count())
+        _, event_type, payload = mock_ws_send.call_args[0]
+        self.assertEqual(event_type, WebSocketMessageType.PHOTOS_UPLOADED)
+        self.assertEqual(len(payload["data"]), 2)
+
+    @patch("core.services.photo_service.send_ws_message_to_user")
+    @patch("core.services.photo_service.photo_repository")
+    def test_save_photos_batch_records_file_metadata(
+        self, mock_photo_repo, mock_ws_send
+    ):
+        buffer = io.BytesIO()
+        Image.new("RGB", (30, 20)).save(buffer, "PNG")
+        self.files[0] = SimpleUploadedFile("photo_0.png", buffer.getvalue())
+        mock_photo_repo.save_within_folder.side_effect = self._fake_save
+
+        result = PhotoService.save_photos_batch(self.album.id, self.mock_request)
+
+        photo = Photo.objects.get(pk=result["results"][0]["photo"]["id"])
+        self.assertEqual((photo.width, photo.height), (30, 20))
+        self.assertEqual(photo.mime, "image/png")
+        self.assertEqual(photo.bytes, len(buffer.getvalue()))
+        self.assertEqual(result["results"][2]["photo"]["mime"], "image/jpeg")
+        self.assertNotIn("metadata", result["results"][1])
+
+    @patch("core.services.photo_service.photo_repository")
+    def test_save_photos_batch_without_files_raises_validation_error(
+        self, mock_photo_repo
+    ):
+        self.mock_request.FILES.getlist.return_value = []
+
+        with self.assertRaises(ValidationError):
+            PhotoService.save_photos_batch(self.album.id, self.mock_request)
+
+
 if __name__ == "__main__":
     unittest.main()
+
+
+@patch("core.services.photo_blob_service.photo_repository")
+@patch("core.services.photo_service.photo_repository")
+@patch("core.services.photo_service.send_ws_message_to_user")
+class TestPhotoServiceDeduplication(TestCase):
+    """Content deduplication across uploads, copies and deletions."""
+
+    def setUp(self):
+        self.album = Album.objects.create(title="Source")
+        self.other_album = Album.objects.create(title="Target")
+        self.digest = hashlib.sha256(b"same bytes").hexdigest()
+
+    def _request(self, files=None, data=None):
+        request = MagicMock()
+        request.upload_handlers = []
+        request.data = data or {}
+        request.FILES = files or {}
+        return request
+
+    def _upload(self, album):
+        request = self._request({"image": SimpleUploadedFile("a.jpg", b"same bytes")})
+        return PhotoService.save_photo(album.id, request)
+
+    def test_identical_upload_reuses_stored_object(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        mock_photo_repo.save_within_folder.return_value = TEST_PHOTO_URL
+
+        first = self._upload(self.album)
+        second = self._upload(self.other_album)
+
+        mock_photo_repo.save_within_folder.assert_called_once()
+        self.assertEqual(first["image_url"], second["image_url"])
+        blob = PhotoBlob.objects.get(sha256=self.digest)
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(Photo.objects.filter(blob=blob).count(), 2)
+
+    def test_streamed_duplicate_is_removed_from_storage(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        mock_photo_repo.save_within_folder.return_value = TEST_PHOTO_URL
+        self._upload(self.album)
+        streamed = StreamedUploadedFile(
+            "https://bucket.s3.amazonaws.com/2/dup.jpg",
+            "a.jpg",
+            10,
+            "image/jpeg",
+            sha256=self.digest,
+        )
+
+        photo = PhotoService.save_photo(
+            self.other_album.id, self._request({"image": streamed})
+        )
+
+        self.assertEqual(photo["image_url"], TEST_PHOTO_URL)
+        mock_blob_repo.delete.assert_called_once_with(
+            "https://bucket.s3.amazonaws.com/2/dup.jpg"
+        )
+
+    def test_save_photo_from_known_hash_skips_upload(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        mock_photo_repo.save_within_folder.return_value = TEST_PHOTO_URL
+        self._upload(self.album)
+
+        photo = PhotoService.save_photo(
+            self.other_album.id, self._request(data={"sha256": self.digest})
+        )
+
+        self.assertEqual(photo["image_url"], TEST_PHOTO_URL)
+        mock_photo_repo.save_within_folder.assert_called_once()
+        self.assertEqual(PhotoBlob.objects.get(sha256=self.digest).ref_count, 2)
+
+    def test_save_photo_from_unknown_hash_raises_validation_error(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        with self.assertRaises(ValidationError):
+            PhotoService.save_photo(
+                self.album.id, self._request(data={"sha256": self.digest})
+            )
+
+    def test_invalid_photo_releases_reference(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        mock_photo_repo.save_within_folder.return_value = TEST_PHOTO_URL
+        self._upload(self.album)
+        request = self._request(
+            {"image": SimpleUploadedFile("a.jpg", b"same bytes")},
+            {"caption": "x" * 300},
+        )
+
+        with self.assertRaises(ValidationError):
+            PhotoService.save_photo(self.other_album.id, request)
+
+        self.assertEqual(PhotoBlob.objects.get(sha256=self.digest).ref_count, 1)
+
+    def test_uploaded_photo_nests_updated_album_statistics(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        mock_photo_repo.save_within_folder.return_value = TEST_PHOTO_URL
+
+        photo = self._upload(self.album)
+
+        self.assertEqual(photo["album"]["nb_photos"], 1)
+
+    def test_copy_adds_reference_without_storage_copy(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        mock_photo_repo.save_within_folder.return_value = TEST_PHOTO_URL
+        photo = self._upload(self.album)
+
+        copy = PhotoService.copy_photo_to_album(photo["id"], self.other_album.id, None)
+
+        mock_photo_repo.copy_file.assert_not_called()
+        self.assertEqual(copy["image_url"], TEST_PHOTO_URL)
+        self.assertEqual(PhotoBlob.objects.get(sha256=self.digest).ref_count, 2)
+
+    def test_deleting_last_reference_deletes_object(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        mock_photo_repo.save_within_folder.return_value = TEST_PHOTO_URL
+        mock_blob_repo.delete_many.return_value = []
+        photo = self._upload(self.album)
+        copy = PhotoService.copy_photo_to_album(photo["id"], self.other_album.id, None)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PhotoService.delete_photo(photo["id"], self.album.id)
+        mock_blob_repo.delete_many.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PhotoService.delete_photo(copy["id"], self.other_album.id)
+        mock_blob_repo.delete_many.assert_called_once_with([TEST_PHOTO_URL])
+        self.assertFalse(PhotoBlob.objects.exists())
+
+    def test_batch_uploads_identical_files_once(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        mock_photo_repo.save_within_folder.return_value = TEST_PHOTO_URL
+        request = self._request()
+        request.FILES = MagicMock()
+        request.FILES.getlist.return_value = [
+            SimpleUploadedFile("a.jpg", b"same bytes"),
+            SimpleUploadedFile("b.jpg", b"same bytes"),
+        ]
+
+        result = PhotoService.save_photos_batch(self.album.id, request)
+
+        self.assertEqual(result["uploaded"], 2)
+        mock_photo_repo.save_within_folder.assert_called_once()
+        self.assertEqual(PhotoBlob.objects.get(sha256=self.digest).ref_count, 2)
+
+    def test_check_hashes(self, mock_ws_send, mock_photo_repo, mock_blob_repo):
+        PhotoBlob.objects.create(sha256=self.digest, url=TEST_PHOTO_URL, size=10)
+        unknown = "b" * 64
+
+        result = PhotoService.check_hashes({"hashes": [self.digest, unknown]})
+
+        self.assertEqual(result, {"existing": [self.digest], "missing": [unknown]})
+
+    def test_check_hashes_rejects_invalid_digest(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        with self.assertRaises(ValidationError):
+            PhotoService.check_hashes({"hashes": ["not-a-hash"]})
+
+
+@patch("core.services.photo_blob_service.photo_repository")
+@patch("core.services.photo_service.photo_repository")
+@patch("core.services.photo_service.send_ws_message_to_user")
+class TestPhotoServiceBulkTransfer(TestCase):
+    """Bulk move and copy of photos to another album."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="user", password="pass")
+        self.source = Album.objects.create(title="Source")
+        self.target = Album.objects.create(title="Target")
+        self.blob = PhotoBlob.objects.create(
+            sha256="a" * 64, url=TEST_PHOTO_URL, size=1, ref_count=1
+        )
+        self.deduplicated = Photo.objects.create(
+            album=self.source, image_url=TEST_PHOTO_URL, blob=self.blob
+        )
+        self.legacy = Photo.objects.create(
+            album=self.source,
+            image_url="https://bucket.s3.amazonaws.com/1/legacy.jpg",
+            caption=TEST_PHOTO_CAPTION,
+        )
+        self.in_target = Photo.objects.create(
+            album=self.target, image_url="https://bucket.s3.amazonaws.com/2/t.jpg"
+        )
+
+    def test_move_updates_photos_in_one_query(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        ids = [self.deduplicated.id, self.legacy.id]
+
+        with CaptureQueriesContext(connection) as queries:
+            result = PhotoService.move_photos_to_album(ids, self.target.id, self.user)
+
+        updates = [q for q in queries if q["sql"].startswith('UPDATE "core_photo"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(result["moved"], 2)
+        self.assertEqual(
+            Photo.objects.filter(pk__in=ids, album=self.target).count(), 2
+        )
+
+    def test_move_reports_per_item_failures(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        ids = [self.legacy.id, 999, self.in_target.id, self.legacy.id]
+
+        result = PhotoService.move_photos_to_album(ids, self.target.id, self.user)
+
+        self.assertEqual(result["moved"], 1)
+        self.assertEqual(result["failed"], 2)
+        self.assertEqual(
+            [item["status"] for item in result["results"]],
+            ["moved", "failed", "failed"],
+        )
+        self.assertEqual(result["results"][0]["photo"]["id"], self.legacy.id)
+
+    def test_move_broadcasts_single_event(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        ids = [self.deduplicated.id, self.legacy.id]
+
+        PhotoService.move_photos_to_album(ids, self.target.id, self.user)
+
+        mock_ws_send.assert_called_once()
+        _, message_type, payload = mock_ws_send.call_args.args
+        self.assertEqual(message_type, WebSocketMessageType.PHOTOS_MOVED)
+        self.assertEqual(len(payload["data"]), 2)
+        self.assertEqual(payload["source_album_ids"], [self.source.id])
+        self.assertEqual(payload["target_album_id"], self.target.id)
+
+    def test_move_to_unknown_album_raises_not_found(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        with self.assertRaises(NotFound):
+            PhotoService.move_photos_to_album([self.legacy.id], 999, self.user)
+
+    def test_copy_shares_blobs_and_copies_legacy_files(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        copied_url = "https://bucket.s3.amazonaws.com/2/legacy.jpg"
+        mock_photo_repo.copy_many.return_value = [copied_url]
+        ids = [self.deduplicated.id, self.legacy.id]
+
+        result = PhotoService.copy_photos_to_album(ids, self.target.id, self.user)
+
+        mock_photo_repo.copy_many.assert_called_once_with(
+            [self.legacy.image_url], self.target.id
+        )
+        self.assertEqual(result["copied"], 2)
+        self.assertEqual(PhotoBlob.objects.get(pk=self.blob.pk).ref_count, 2)
+        copies = Photo.objects.filter(album=self.target).exclude(pk=self.in_target.pk)
+        self.assertEqual(
+            {photo.image_url for photo in copies}, {TEST_PHOTO_URL, copied_url}
+        )
+        self.assertEqual(
+            copies.get(image_url=copied_url).caption, TEST_PHOTO_CAPTION
+        )
+        self.assertEqual(
+            [item["photo"]["image_url"] for item in result["results"]],
+            [TEST_PHOTO_URL, copied_url],
+        )
+
+    def test_copies_sharing_file_keep_its_previews(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        derivatives = [
+            {"url": "https://bucket/1/d.webp", "width": 100, "format": "webp"}
+        ]
+        Photo.objects.filter(pk=self.deduplicated.pk).update(
+            derivatives=derivatives, placeholder="data:image/webp;base64,AA", phash=42
+        )
+        Photo.objects.filter(pk=self.legacy.pk).update(placeholder="x", phash=7)
+        mock_photo_repo.copy_many.return_value = ["https://bucket/2/legacy.jpg"]
+
+        single = PhotoService.copy_photo_to_album(
+            self.deduplicated.id, self.target.id, self.user
+        )
+        PhotoService.copy_photos_to_album(
+            [self.deduplicated.id, self.legacy.id], self.target.id, self.user
+        )
+
+        copies = Photo.objects.filter(album=self.target).exclude(pk=self.in_target.pk)
+        self.assertEqual(Photo.objects.get(pk=single["id"]).phash, 42)
+        shared = copies.filter(image_url=TEST_PHOTO_URL)
+        self.assertEqual(
+            [(photo.placeholder, photo.phash) for photo in shared],
+            [("data:image/webp;base64,AA", 42)] * 2,
+        )
+        # A copied file gets its own from the image job
+        legacy = copies.get(image_url="https://bucket/2/legacy.jpg")
+        self.assertEqual((legacy.placeholder, legacy.phash), ("", None))
+
+    def test_copy_inserts_photos_in_one_query(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        mock_photo_repo.copy_many.return_value = ["https://bucket/2/a.jpg"]
+        ids = [self.deduplicated.id, self.legacy.id]
+
+        with CaptureQueriesContext(connection) as queries:
+            PhotoService.copy_photos_to_album(ids, self.target.id, self.user)
+
+        inserts = [
+            q for q in queries if q["sql"].startswith('INSERT INTO "core_photo"')
+        ]
+        self.assertEqual(len(inserts), 1)
+
+    def test_copy_reports_failed_storage_copy(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        mock_photo_repo.copy_many.return_value = [None]
+        ids = [self.legacy.id, self.deduplicated.id]
+
+        result = PhotoService.copy_photos_to_album(ids, self.target.id, self.user)
+
+        self.assertEqual(result["copied"], 1)
+        self.assertEqual(result["results"][0]["status"], "failed")
+        self.assertEqual(result["results"][1]["status"], "copied")
+        mock_ws_send.assert_called_once()
+        _, message_type, payload = mock_ws_send.call_args.args
+        self.assertEqual(message_type, WebSocketMessageType.PHOTOS_COPIED)
+        self.assertEqual(len(payload["data"]), 1)
+
+    def test_copy_with_nothing_copyable_sends_no_event(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        mock_photo_repo.copy_many.return_value = []
+
+        result = PhotoService.copy_photos_to_album(
+            [self.in_target.id], self.target.id, self.user
+        )
+
+        self.assertEqual(result["failed"], 1)
+        mock_ws_send.assert_not_called()
+
+
+@patch("core.services.photo_blob_service.photo_repository")
+@patch("core.services.photo_service.photo_repository")
+@patch("core.services.photo_service.send_ws_message_to_user")
+class TestPhotoServiceAlbumStats(TestCase):
+    """Every write path keeps the album statistics exact."""
+
+    def setUp(self):
+        self.source = Album.objects.create(title="Source")
+        self.target = Album.objects.create(title="Target")
+        self.photos = [
+            Photo.objects.create(
+                album=self.source,
+                image_url=f"https://bucket.s3.amazonaws.com/1/{index}.jpg",
+                bytes=100 * (index + 1),
+            )
+            for index in range(3)
+        ]
+        AlbumStatsService.repair()
+
+    def assertStatsExact(self):
+        self.assertEqual(AlbumStatsService.repair()["repaired"], 0)
+
+    def stats(self, album):
+        album.refresh_from_db()
+        return album.photo_count, album.total_bytes, album.last_photo_at
+
+    def nested(self, photo_data):
+        """Statistics of the album a serialized photo nests."""
+        return photo_data["album"]["nb_photos"], photo_data["album"]["total_bytes"]
+
+    def test_delete_takes_latest_date_from_remaining_photos(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        PhotoService.delete_photo(self.photos[2].id, self.source.id)
+
+        self.assertEqual(
+            self.stats(self.source), (2, 300, self.photos[1].created_at)
+        )
+        self.assertStatsExact()
+
+    def test_moves_shift_statistics_between_albums(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        moved = PhotoService.move_photo_to_album(
+            self.photos[0].id, self.target.id, None
+        )
+        self.assertEqual(self.nested(moved), (1, 100))
+        PhotoService.move_photos_to_album(
+            [self.photos[1].id, self.photos[2].id], self.target.id, None
+        )
+
+        self.assertEqual(self.stats(self.source), (0, 0, None))
+        self.assertEqual(
+            self.stats(self.target), (3, 600, self.photos[2].created_at)
+        )
+        self.assertStatsExact()
+
+    def test_update_with_target_album_moves_statistics(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        updated = PhotoService.update_photo(
+            self.photos[0].id, self.source.id, {"target_album_id": self.target.id}
+        )
+
+        self.assertEqual(self.stats(self.target)[:2], (1, 100))
+        self.assertEqual(self.nested(updated), (1, 100))
+        self.assertStatsExact()
+
+    def test_copies_add_to_target(self, mock_ws_send, mock_photo_repo, mock_blob_repo):
+        mock_photo_repo.copy_file.return_value = "https://bucket.s3.amazonaws.com/2/c"
+        mock_photo_repo.copy_many.side_effect = lambda urls, album_id: [
+            f"https://bucket.s3.amazonaws.com/{album_id}/{index}"
+            for index in range(len(urls))
+        ]
+
+        copy = PhotoService.copy_photo_to_album(self.photos[0].id, self.target.id, None)
+        result = PhotoService.copy_photos_to_album(
+            [self.photos[1].id, self.photos[2].id], self.target.id, None
+        )
+
+        self.assertEqual(self.nested(copy), (1, 100))
+        self.assertEqual(self.nested(result["results"][0]["photo"]), (3, 600))
+        self.assertEqual(self.stats(self.target)[:2], (3, 600))
+        self.assertEqual(self.stats(self.source)[:2], (3, 600))
+        self.assertStatsExact()
+
+    def test_batch_upload_adds_uploaded_photos(
+        self, mock_ws_send, mock_photo_repo, mock_blob_repo
+    ):
+        mock_photo_repo.save_within_folder.side_effect = (
+            lambda file, folder_album_id: f"https://bucket.s3.amazonaws.com/{file.name}"
+        )
+        request = MagicMock()
+        request.data = {}
+        request.FILES.getlist.return_value = [
+            SimpleUploadedFile(f"new_{index}.jpg", f"new {index}".encode())
+            for index in range(2)
+        ]
+
+        result = PhotoService.save_photos_batch(self.target.id, request)
+
+        self.assertEqual(self.nested(result["results"][0]["photo"]), (2, 10))
+        self.assertEqual(self.stats(self.target)[:2], (2, 10))
+        self.assertStatsExact()
@@ -0,0 +1,140 @@
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.exceptions import NotFound, ValidationError
+from unittest.mock import patch
+from core.models import Album, Photo
+from core.services.render_service import RenderCache, RenderService
+import io
+import os
+import tempfile
+import threading
+import time
+
+PHOTO_URL = "https://bucket.s3.amazonaws.com/1/uuid_photo.jpg"
+
+
+def _jpeg(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "blue").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class TestRenderCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache = RenderCache(self.directory.name, max_bytes=250)
+
+    def _put(self, key, age):
+        path = self.cache.path(key, "jpg")
+        self.cache.put(path, b"x" * 100)
+        os.utime(path, (time.time() - age, time.time() - age))
+        return path
+
+    def test_evicts_least_recently_used_files_past_the_bound(self):
+        first = self._put("aa1", age=30)
+        second = self._put("bb2", age=20)
+        # Reading the first file makes it the most recently used
+        self.cache.open(first).close()
+
+        third = self._put("cc3", age=0)
+
+        self.assertTrue(first.exists())
+        self.assertFalse(second.exists())
+        self.assertTrue(third.exists())
+
+
+@override_settings(PHOTO_RENDER_CACHE_MAX_BYTES=10 * 1024 * 1024)
+@patch("core.services.render_service.photo_repository")
+class TestRenderService(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(PHOTO_RENDER_CACHE_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        album = Album.objects.create(title="Album")
+        self.photo = Photo.objects.create(
+            album=album, image_url=PHOTO_URL, width=300, height=150
+        )
+
+    def _stored(self, mock_repo, data):
+        mock_repo.open_stream.side_effect = lambda url: io.BytesIO(data)
+
+    def _variant(self, width, format="webp"):
+        return RenderService.variant(self.photo.album_id, self.photo.pk, width, format)
+
+    def test_renders_once_then_serves_cache(self, mock_repo):
+        self._stored(mock_repo, _jpeg(300, 150))
+        variant = self._variant(100)
+
+        first = RenderService.open(variant).read()
+        second = RenderService.open(variant).read()
+
+        self.assertEqual(first, second)
+        mock_repo.open_stream.assert_called_once_with(PHOTO_URL)
+        image = Image.open(io.BytesIO(first))
+        self.assertEqual((image.format, image.size), ("WEBP", (100, 50)))
+
+    def test_variant_is_never_upscaled(self, mock_repo):
+        wide = self._variant(2000)
+
+        self.assertEqual(wide["width"], 300)
+        self.assertEqual(wide["etag"], self._variant(300)["etag"])
+        self.assertNotEqual(wide["etag"], self._variant(300, "jpeg")["etag"])
+
+    def test_concurrent_requests_render_once(self, mock_repo):
+        variant = self._variant(100)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def render(variant):
+            calls.append(variant["key"])
+            started.set()
+            release.wait(5)
+            return b"rendered"
+
+        results = []
+        with patch.object(RenderService, "_render", side_effect=render):
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(RenderService.open(variant).read())
+                )
+                for _ in range(4)
+            ]
+            threads[0].start()
+            started.wait(5)
+            for thread in threads[1:]:
+                thread.start()
+            time.sleep(0.05)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [b"rendered"] * 4)
+
+    def test_missing_photo_and_non_images_are_rejected(self, mock_repo):
+        with self.assertRaises(NotFound):
+            RenderService.variant(self.photo.album_id, self.photo.pk + 1, 100, "jpeg")
+
+        Photo.objects.filter(pk=self.photo.pk).update(image_url=f"{PHOTO_URL}.mp4")
+        with self.assertRaises(ValidationError):
+            self._variant(100)
+
+    def test_negotiates_best_accepted_format(self, mock_repo):
+        with patch("core.services.render_service.features.check", return_value=True):
+            self.assertEqual(
+                RenderService.negotiate("image/avif,image/webp,*/*;q=0.8"), "avif"
+            )
+            self.assertEqual(RenderService.negotiate("image/webp;q=0.9"), "webp")
+            self.assertEqual(RenderService.negotiate("*/*"), "jpeg")
+            self.assertEqual(RenderService.negotiate("image/avif", "jpeg"), "jpeg")
+        with patch("core.services.render_service.features.check", return_value=False):
+            self.assertEqual(RenderService.negotiate("image/avif"), "jpeg")
+            with self.assertRaises(ValidationError):
+                RenderService.negotiate("", "avif")
@@ -0,0 +1,126 @@
+from datetime import timedelta
+from unittest.mock import patch
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from core.models import Album, Photo, PhotoBlob
+from core.services.storage_gc_service import StorageGcService
+
+BUCKET_URL = "https://bucket.s3.amazonaws.com/"
+
+
+def _item(key, age_hours=48):
+    return {
+        "key": key,
+        "url": f"{BUCKET_URL}{key}",
+        "size": 1,
+        "last_modified": timezone.now() - timedelta(hours=age_hours),
+    }
+
+
+@override_settings(STORAGE_GC_GRACE_PERIOD=3600, PHOTO_PRESIGNED_UPLOAD_EXPIRES=900)
+@patch("core.services.storage_gc_service.photo_repository")
+class TestStorageGcService(TestCase):
+
+    def setUp(self):
+        self.album = Album.objects.create(
+            title="Album", cover_image=f"{BUCKET_URL}cover.jpg"
+        )
+        Photo.objects.create(album=self.album, image_url=f"{BUCKET_URL}1/kept.jpg")
+        PhotoBlob.objects.create(sha256="a" * 64, url=f"{BUCKET_URL}1/blob.jpg", size=1)
+
+    def _listing(self, mock_repo, pages):
+        mock_repo.list_prefix.side_effect = lambda prefix, page_size: iter(pages)
+        mock_repo.delete_many.return_value = []
+
+    def test_deletes_only_unreferenced_files(self, mock_repo):
+        self._listing(
+            mock_repo,
+            [
+                [_item("1/kept.jpg"), _item("1/orphan.jpg")],
+                [_item("1/blob.jpg"), _item("cover.jpg"), _item("1/orphan2.jpg")],
+            ],
+        )
+
+        stats = StorageGcService.collect(prefixes=["1/"])
+
+        mock_repo.delete_many.assert_called_once_with(
+            [f"{BUCKET_URL}1/orphan.jpg", f"{BUCKET_URL}1/orphan2.jpg"]
+        )
+        self.assertEqual(stats, {"scanned": 5, "orphans": 2, "deleted": 2, "failed": 0})
+
+    def test_derivatives_follow_their_original(self, mock_repo):
+        self._listing(
+            mock_repo,
+            [[_item("1/_w320_kept.jpg.webp"), _item("1/_w320_orphan.jpg.webp")]],
+        )
+
+        StorageGcService.collect(prefixes=["1/"])
+
+        mock_repo.delete_many.assert_called_once_with(
+            [f"{BUCKET_URL}1/_w320_orphan.jpg.webp"]
+        )
+
+    def test_keeps_original_named_like_a_derivative(self, mock_repo):
+        url = f"{BUCKET_URL}1/uuid_IMG.w640.jpg"
+        Photo.objects.create(album=self.album, image_url=url)
+        self._listing(
+            mock_repo,
+            [[_item("1/uuid_IMG.w640.jpg"), _item("1/_w320_uuid_IMG.w640.jpg.webp")]],
+        )
+
+        stats = StorageGcService.collect(prefixes=["1/"])
+
+        self.assertEqual(StorageGcService._referenced([url]), {url})
+        self.assertEqual(stats["orphans"], 0)
+        mock_repo.delete_many.assert_not_called()
+
+    def test_keeps_recent_files(self, mock_repo):
+        self._listing(mock_repo, [[_item("1/new.jpg", age_hours=0.5)]])
+
+        stats = StorageGcService.collect(prefixes=["1/"])
+
+        self.assertEqual(stats["orphans"], 0)
+        mock_repo.delete_many.assert_not_called()
+
+    def test_grace_period_covers_presigned_upload_lifetime(self, mock_repo):
+        self._listing(mock_repo, [[_item("1/presigned.jpg", age_hours=0.25)]])
+
+        stats = StorageGcService.collect(prefixes=["1/"], grace_period=0)
+
+        self.assertEqual(stats["orphans"], 0)
+
+    def test_deletes_in_bounded_batches(self, mock_repo):
+        self._listing(
+            mock_repo, [[_item(f"1/o{i}.jpg"), _item(f"1/p{i}.jpg")] for i in range(3)]
+        )
+
+        StorageGcService.collect(prefixes=["1/"], page_size=2)
+
+        batches = [call[0][0] for call in mock_repo.delete_many.call_args_list]
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 2])
+
+    def test_dry_run_does_not_delete(self, mock_repo):
+        self._listing(mock_repo, [[_item("1/orphan.jpg")]])
+
+        stats = StorageGcService.collect(prefixes=["1/"], dry_run=True)
+
+        self.assertEqual(stats["orphans"], 1)
+        mock_repo.delete_many.assert_not_called()
+
+    def test_reports_failed_deletions(self, mock_repo):
+        self._listing(mock_repo, [[_item("1/orphan.jpg")]])
+        mock_repo.delete_many.return_value = [f"{BUCKET_URL}1/orphan.jpg"]
+
+        stats = StorageGcService.collect(prefixes=["1/"])
+
+        self.assertEqual((stats["deleted"], stats["failed"]), (0, 1))
+
+    def test_scans_every_album_prefix_by_default(self, mock_repo):
+        other = Album.objects.create(title="Other")
+        mock_repo.folder_prefix.side_effect = lambda album_id: f"{album_id}/"
+        self._listing(mock_repo, [])
+
+        StorageGcService.collect()
+
+        scanned = [call[0][0] for call in mock_repo.list_prefix.call_args_list]
+        self.assertCountEqual(scanned, [f"{self.album.id}/", f"{other.id}/"])
@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock, patch
+from django.test import SimpleTestCase, override_settings
+from core import image_pool
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=False)
+class TestImagePool(SimpleTestCase):
+
+    def setUp(self):
+        patcher = patch.object(image_pool, "_pool", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(IMAGE_WORKER_PROCESSES_PER_CPU=0.5)
+    @patch("core.image_pool.os.cpu_count", return_value=8)
+    def test_default_processes_scale_with_cpus(self, _):
+        self.assertEqual(image_pool.default_processes(), 4)
+
+        with override_settings(IMAGE_WORKER_PROCESSES_PER_CPU=0.01):
+            self.assertEqual(image_pool.default_processes(), 1)
+
+    @patch("core.image_pool.create", ThreadPoolExecutor)
+    def test_runs_in_one_shared_pool(self):
+        self.assertEqual(image_pool.run(pow, 2, 10), 1024)
+        pool = image_pool._pool
+
+        self.assertEqual(image_pool.run(pow, 3, 2), 9)
+        self.assertIs(image_pool._pool, pool)
+        pool.shutdown()
+
+    def test_broken_pool_is_replaced(self):
+        broken = MagicMock()
+        broken.submit.side_effect = BrokenProcessPool()
+
+        with patch("core.image_pool.create", return_value=broken):
+            with self.assertRaises(BrokenProcessPool):
+                image_pool.run(pow, 2, 10)
+
+        self.assertIsNone(image_pool._pool)
+
+    @override_settings(BACKGROUND_TASKS_EAGER=True)
+    @patch("core.image_pool.create")
+    def test_eager_runs_inline(self, mock_create):
+        self.assertEqual(image_pool.run(pow, 2, 10), 1024)
+
+        mock_create.assert_not_called()
@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+from django.test import TestCase
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from core.models import BucketPoint
+from core.pagination import KeysetPagination
+
+START = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+
+
+class TestKeysetPagination(TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        # Seven points over five days, two pairs created at the same instant
+        self.points = []
+        for day in (0, 1, 1, 2, 3, 3, 4):
+            point = BucketPoint.objects.create(title=f"Day {day}")
+            BucketPoint.objects.filter(pk=point.pk).update(
+                created_at=START + timedelta(days=day)
+            )
+            self.points.append(point.pk)
+        # Newest first, the latest created first among ties
+        self.newest_first = [self.points[i] for i in (6, 5, 4, 3, 2, 1, 0)]
+
+    def paginate(self, url: str) -> tuple:
+        paginator = KeysetPagination()
+        request = Request(self.factory.get(url))
+        rows = paginator.paginate_queryset(BucketPoint.objects.all(), request)
+        return [row.pk for row in rows], paginator
+
+    def test_pages_forward_without_gaps_or_repeats(self):
+        seen = []
+        url = "/bucketpoints/?page_size=3"
+        while url:
+            page, paginator = self.paginate(url)
+            seen += page
+            url = paginator.next
+
+        self.assertEqual(seen, self.newest_first)
+
+    def test_pages_backward(self):
+        _, first = self.paginate("/bucketpoints/?page_size=3")
+        second, paginator = self.paginate(first.next)
+        _, paginator = self.paginate(paginator.next)
+
+        back, paginator = self.paginate(paginator.previous)
+
+        self.assertEqual(back, second)
+        self.assertIsNotNone(paginator.next)
+        page, paginator = self.paginate(paginator.previous)
+        self.assertEqual(page, self.newest_first[:3])
+        self.assertIsNone(paginator.previous)
+
+    def test_first_page_has_no_previous(self):
+        page, paginator = self.paginate("/bucketpoints/?page_size=10")
+
+        self.assertEqual(page, self.newest_first)
+        self.assertIsNone(paginator.next)
+        self.assertIsNone(paginator.previous)
+
+    def test_jumps_to_date(self):
+        page, paginator = self.paginate("/bucketpoints/?page_size=2&at=2024-05-02")
+
+        self.assertEqual(page, [self.points[2], self.points[1]])
+        self.assertNotIn("at=", paginator.next)
+        newer, _ = self.paginate(paginator.previous)
+        self.assertEqual(newer, [self.points[4], self.points[3]])
+
+    def test_jump_before_every_row_links_back_to_them(self):
+        page, paginator = self.paginate("/bucketpoints/?page_size=2&at=2024-01-01")
+
+        self.assertEqual(page, [])
+        self.assertIsNone(paginator.next)
+        newer, _ = self.paginate(paginator.previous)
+        self.assertEqual(newer, [self.points[1], self.points[0]])
+
+    def test_deep_pages_cost_one_query(self):
+        _, paginator = self.paginate("/bucketpoints/?page_size=1")
+        for _ in range(5):
+            _, paginator = self.paginate(paginator.next)
+
+        with self.assertNumQueries(1):
+            page, _ = self.paginate(paginator.next)
+
+        self.assertEqual(page, [self.points[0]])
+
+    def test_rejects_invalid_cursor_and_date(self):
+        with self.assertRaises(NotFound):
+            self.paginate("/bucketpoints/?cursor=garbage")
+        with self.assertRaises(ValidationError):
+            self.paginate("/bucketpoints/?at=yesterday")
+
+    def test_page_size_is_capped(self):
+        paginator = KeysetPagination()
+        request = Request(self.factory.get("/bucketpoints/?page_size=1000"))
+
+        self.assertEqual(paginator.get_page_size(request), paginator.max_page_size)
+        self.assertTrue(paginator.requested(request))
+        self.assertFalse(paginator.requested(Request(self.factory.get("/"))))
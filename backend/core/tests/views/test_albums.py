@@ -1,8 +1,18 @@
+import io
 import unittest
+import zipfile
 from unittest.mock import MagicMock, patch
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework import status
+from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory, force_authenticate
-from core.views.albums import AlbumView
+from core.models import Album, Photo
+from core.views.albums import AlbumExportView, AlbumView
+from core.zipstream import ZipLayout
 
 TEST_USER_ID = 1
 TEST_ALBUM_ID = 123
@@ -23,7 +33,7 @@ class TestAlbumView(unittest.TestCase):
     def test_givenAuthenticatedUser_whenGet_thenShouldCallServiceGetAll(
         self, mock_serializer, mock_service
     ):
-        request = self.factory.get("/albums/")
+        request = Request(self.factory.get("/albums/"))
         force_authenticate(request, user=self.mock_user)
         self.view.request = request
         self.view.format_kwarg = None
@@ -37,7 +47,7 @@ class TestAlbumView(unittest.TestCase):
     def test_givenServiceReturnsAlbums_whenGet_thenShouldSerializeData(
         self, mock_serializer, mock_service
     ):
-        request = self.factory.get("/albums/")
+        request = Request(self.factory.get("/albums/"))
         force_authenticate(request, user=self.mock_user)
         self.view.request = request
         self.view.format_kwarg = None
@@ -48,12 +58,34 @@ class TestAlbumView(unittest.TestCase):
 
         mock_serializer.assert_called_with(mock_albums, many=True)
 
+    @patch("core.views.albums.AlbumService")
+    @patch("core.views.albums.AlbumSerializer")
+    def test_givenPageSize_whenGet_thenShouldReturnPage(
+        self, mock_serializer, mock_service
+    ):
+        request = Request(self.factory.get("/albums/?page_size=2"))
+        force_authenticate(request, user=self.mock_user)
+        self.view.request = request
+        self.view.format_kwarg = None
+        mock_albums = [MagicMock(pk=2), MagicMock(pk=1)]
+        mock_queryset = mock_service.getAll.return_value
+        mock_queryset.order_by.return_value.__getitem__.return_value = mock_albums
+        mock_serializer.return_value.data = [{"id": 2}, {"id": 1}]
+
+        response = self.view.get(request)
+
+        mock_serializer.assert_called_once_with(mock_albums, many=True)
+        self.assertEqual(
+            response.data,
+            {"next": None, "previous": None, "results": [{"id": 2}, {"id": 1}]},
+        )
+
     @patch("core.views.albums.AlbumService")
     @patch("core.views.albums.AlbumSerializer")
     def test_givenAuthenticatedUser_whenGet_thenShouldReturn200(
         self, mock_serializer, mock_service
     ):
-        request = self.factory.get("/albums/")
+        request = Request(self.factory.get("/albums/"))
         force_authenticate(request, user=self.mock_user)
         self.view.request = request
         self.view.format_kwarg = None
@@ -116,6 +148,125 @@ class TestAlbumView(unittest.TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    @patch("core.views.albums.AlbumService")
+    def test_givenAlbumId_whenDelete_thenShouldCallServiceDeleteAlbum(
+        self, mock_service
+    ):
+        request = self.factory.delete(f"/albums/{TEST_ALBUM_ID}/")
+        force_authenticate(request, user=self.mock_user)
+        self.view.request = request
+        self.view.format_kwarg = None
+
+        response = self.view.delete(request, album_id=TEST_ALBUM_ID)
+
+        mock_service.deleteAlbum.assert_called_once_with(TEST_ALBUM_ID)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
 
 if __name__ == "__main__":
     unittest.main()
+
+
+@patch("core.views.albums.AlbumExportService")
+class TestAlbumExportView(unittest.TestCase):
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.view = AlbumExportView.as_view()
+        self.layout = ZipLayout([])
+
+    def _get(self, mock_service, **headers):
+        mock_service.layout.return_value = {
+            "layout": self.layout,
+            "filename": "vacances.zip",
+            "etag": '"abc"',
+        }
+        mock_service.stream.return_value = iter([b"zip"])
+        request = self.factory.get(f"/albums/{TEST_ALBUM_ID}/export/", headers=headers)
+        force_authenticate(request, user=MagicMock())
+        return self.view(request, album_id=TEST_ALBUM_ID)
+
+    def test_givenNoRange_whenGet_thenShouldStreamWholeArchive(self, mock_service):
+        response = self._get(mock_service)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), b"zip")
+        mock_service.stream.assert_called_once_with(self.layout, 0, 21)
+        self.assertEqual(response["Content-Length"], "22")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("vacances.zip", response["Content-Disposition"])
+
+    def test_givenRange_whenGet_thenShouldStreamPartialContent(self, mock_service):
+        mock_service.parse_range.return_value = (10, 21)
+
+        response = self._get(mock_service, range="bytes=10-", if_range='"abc"')
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        mock_service.parse_range.assert_called_once_with("bytes=10-", 22)
+        mock_service.stream.assert_called_once_with(self.layout, 10, 21)
+        self.assertEqual(response["Content-Range"], "bytes 10-21/22")
+        self.assertEqual(response["Content-Length"], "12")
+
+    def test_givenStaleIfRange_whenGet_thenShouldSendWholeArchive(self, mock_service):
+        response = self._get(mock_service, range="bytes=10-", if_range='"old"')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_service.parse_range.assert_not_called()
+
+    def test_givenRangePastEnd_whenGet_thenShouldReturn416(self, mock_service):
+        mock_service.parse_range.return_value = (22, 21)
+
+        response = self._get(mock_service, range="bytes=22-")
+
+        self.assertEqual(
+            response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        self.assertEqual(response["Content-Range"], "bytes */22")
+        mock_service.stream.assert_not_called()
+
+
+@override_settings(ALBUM_EXPORT_PREFETCH=0)
+@patch("core.services.album_export_service.photo_repository")
+class TestAlbumExportViewAsgi(TestCase):
+    """The export served through the ASGI handler, as daphne serves it."""
+
+    def setUp(self):
+        cache.clear()
+        self.album = Album.objects.create(title="Vacances")
+        self.files = {
+            f"https://bucket.s3.amazonaws.com/1/uuid{i}_p{i}.jpg": bytes([i]) * 1000
+            for i in range(4)
+        }
+        for url, data in self.files.items():
+            Photo.objects.create(album=self.album, image_url=url, bytes=len(data))
+        token = AccessToken.for_user(User.objects.create_user("viewer"))
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def test_givenAsgiServer_whenGet_thenShouldStreamChunkByChunk(
+        self, mock_repo
+    ):
+        reads = []
+
+        def open_stream(url, first=0, last=None):
+            reads.append(url)
+            return io.BytesIO(self.files[url][first : last + 1])
+
+        mock_repo.open_stream.side_effect = open_stream
+
+        response = await self.async_client.get(
+            reverse("album_export", args=[self.album.pk]), headers=self.headers
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        chunks = [await anext(response.streaming_content)]
+        # Not read whole before the first byte
+        self.assertLess(len(reads), len(self.files))
+        chunks += [chunk async for chunk in response.streaming_content]
+        archive = b"".join(chunks)
+        self.assertEqual(len(archive), int(response["Content-Length"]))
+        with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+            self.assertEqual(
+                [zip_file.read(name) for name in zip_file.namelist()],
+                list(self.files.values()),
+            )
@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import MagicMock, patch
 from rest_framework import status
+from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory, force_authenticate
 from core.views.bucketpoints import BucketPointView
 from rest_framework.exceptions import ValidationError, NotFound
@@ -28,7 +29,7 @@ class TestBucketPointView(unittest.TestCase):
     def test_givenAuthenticatedUser_whenGet_thenShouldCallServiceGetAll(
         self, mock_service
     ):
-        request = self.factory.get("/bucketpoints/")
+        request = Request(self.factory.get("/bucketpoints/"))
         force_authenticate(request, user=self.mock_user)
         self.view.request = request
         self.view.format_kwarg = None
@@ -39,7 +40,7 @@ class TestBucketPointView(unittest.TestCase):
 
     @patch("core.views.bucketpoints.BucketPointService")
     def test_givenServiceReturnsData_whenGet_thenShouldReturn200(self, mock_service):
-        request = self.factory.get("/bucketpoints/")
+        request = Request(self.factory.get("/bucketpoints/"))
         force_authenticate(request, user=self.mock_user)
         self.view.request = request
         self.view.format_kwarg = None
@@ -53,7 +54,7 @@ class TestBucketPointView(unittest.TestCase):
     def test_givenServiceReturnsData_whenGet_thenShouldReturnCorrectData(
         self, mock_service
     ):
-        request = self.factory.get("/bucketpoints/")
+        request = Request(self.factory.get("/bucketpoints/"))
         force_authenticate(request, user=self.mock_user)
         self.view.request = request
         self.view.format_kwarg = None
@@ -63,6 +64,27 @@ class TestBucketPointView(unittest.TestCase):
 
         self.assertEqual(response.data, [TEST_RETURNED_DATA])
 
+    @patch("core.views.bucketpoints.BucketPointService")
+    @patch("core.views.bucketpoints.BucketPointSerializer")
+    def test_givenCursorParam_whenGet_thenShouldReturnPage(
+        self, mock_serializer, mock_service
+    ):
+        request = Request(self.factory.get("/bucketpoints/?page_size=1"))
+        force_authenticate(request, user=self.mock_user)
+        self.view.request = request
+        self.view.format_kwarg = None
+        mock_points = [MagicMock(pk=2), MagicMock(pk=1)]
+        mock_queryset = mock_service.get_queryset.return_value
+        mock_queryset.order_by.return_value.__getitem__.return_value = mock_points
+        mock_serializer.return_value.data = [TEST_RETURNED_DATA]
+
+        response = self.view.get(request)
+
+        mock_service.get_all.assert_not_called()
+        mock_serializer.assert_called_once_with(mock_points[:1], many=True)
+        self.assertEqual(response.data["results"], [TEST_RETURNED_DATA])
+        self.assertIn("cursor=", response.data["next"])
+
     @patch("core.views.bucketpoints.BucketPointService")
     def test_givenValidData_whenPost_thenShouldCallServiceCreate(self, mock_service):
         request = self.factory.post("/bucketpoints/", TEST_BUCKETPOINT_DATA)
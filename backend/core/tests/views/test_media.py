@@ -0,0 +1,55 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import Http404
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework import status
+from core.interface.local import LocalPhotoSaver
+from core.views.media import LocalMediaView
+import tempfile
+
+BASE_URL = "http://localhost:8000/api/media/"
+
+
+class TestLocalMediaView(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(
+            PHOTO_LOCAL_ROOT=self.tmpdir.name,
+            PHOTO_LOCAL_BASE_URL=BASE_URL,
+            PHOTO_LOCAL_ACCEL_REDIRECT="",
+        )
+        self.settings_override.enable()
+        self.factory = APIRequestFactory()
+        self.view = LocalMediaView.as_view()
+        url = LocalPhotoSaver().save_within_folder(
+            SimpleUploadedFile("photo.jpg", b"jpeg"), 3
+        )
+        self.key = url[len(BASE_URL) :]
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.tmpdir.cleanup()
+
+    def test_serves_file(self):
+        response = self.view(self.factory.get("/media/"), file_key=self.key)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), b"jpeg")
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertIn("immutable", response["Cache-Control"])
+        response.close()
+
+    def test_accel_redirect(self):
+        with override_settings(PHOTO_LOCAL_ACCEL_REDIRECT="/protected-media/"):
+            response = self.view(self.factory.get("/media/"), file_key=self.key)
+
+        relative = LocalPhotoSaver().relative_path_for_key(self.key).as_posix()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{relative}")
+        self.assertEqual(response.content, b"")
+
+    def test_missing_or_invalid_key_is_404(self):
+        for key in ["3/missing.jpg", "../etc/passwd"]:
+            with self.subTest(key=key):
+                response = self.view(self.factory.get("/media/"), file_key=key)
+                self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,33 @@
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework import status
+from core.views.metrics import TransferMetricsView
+from core.interface.transfer_metrics import transfer_metrics
+from django.contrib.auth.models import User
+
+
+class TestTransferMetricsView(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.view = TransferMetricsView.as_view()
+        transfer_metrics.reset()
+
+    def test_admin_gets_snapshot(self):
+        admin = User.objects.create_superuser(username="admin", password="password")
+        transfer_metrics.record("copy", 1024, 0.5)
+        request = self.factory.get("/metrics/transfers/")
+        force_authenticate(request, user=admin)
+
+        response = self.view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["copy"]["<1MB"]["count"], 1)
+
+    def test_regular_user_is_forbidden(self):
+        user = User.objects.create_user(username="testuser", password="password")
+        request = self.factory.get("/metrics/transfers/")
+        force_authenticate(request, user=user)
+
+        response = self.view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 import unittest
 from unittest.mock import MagicMock, patch
 from rest_framework import status
@@ -27,9 +28,13 @@ class TestPaginatedMessageView(unittest.TestCase):
         self.view.request = request
         self.view.format_kwarg = None
 
-        # Mock 25 messages
-        mock_messages = [MagicMock() for _ in range(25)]
-        mock_service.getAll.return_value = mock_messages
+        # 25 messages: the first page fetches one more to know there is a next
+        mock_messages = [
+            MagicMock(pk=25 - i, created_at=datetime(2024, 5, 1, tzinfo=timezone.utc))
+            for i in range(21)
+        ]
+        mock_queryset = mock_service.getAll.return_value
+        mock_queryset.order_by.return_value.__getitem__.return_value = mock_messages
 
         # Mock serializer data
         mock_serializer_instance = MagicMock()
@@ -41,9 +46,9 @@ class TestPaginatedMessageView(unittest.TestCase):
         response = self.view.get(request)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn("count", response.data)
-        self.assertIn("next", response.data)
-        self.assertIn("previous", response.data)
-        self.assertIn("results", response.data)
-        self.assertEqual(response.data["count"], 25)
+        self.assertNotIn("count", response.data)
+        self.assertIn("cursor=", response.data["next"])
+        self.assertIsNone(response.data["previous"])
         self.assertEqual(len(response.data["results"]), 20)
+        mock_queryset.order_by.assert_called_once_with("-created_at", "-pk")
+        mock_serializer.assert_called_once_with(mock_messages[:20], many=True)
@@ -2,8 +2,20 @@ from django.test import TestCase
 from unittest.mock import patch
 from rest_framework.test import APIRequestFactory, force_authenticate
 from rest_framework import status
-from core.views.photos import PhotoDetailView
+from core.views.photos import (
+    PhotoDetailView,
+    PhotoBatchView,
+    PhotoHashCheckView,
+    PhotoBulkMoveView,
+    PhotoBulkCopyView,
+    PhotoDuplicatesView,
+    PhotoRenderView,
+    PhotoView,
+)
 from django.contrib.auth.models import User
+from django.test import override_settings
+from core.models import Album, Photo
+import io
 
 
 class TestPhotoDetailView(TestCase):
@@ -35,3 +47,251 @@ class TestPhotoDetailView(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["photo"]["caption"], "Updated Caption")
         mock_update.assert_called_once_with(photo_id=1, album_id=1, data=data)
+
+
+class TestPhotoView(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.view = PhotoView.as_view()
+        self.album = Album.objects.create(title="Trip")
+        self.photos = [
+            Photo.objects.create(album=self.album, image_url=f"https://host/{i}.jpg")
+            for i in range(3)
+        ]
+
+    def _get(self, url: str):
+        request = self.factory.get(url)
+        force_authenticate(request, user=self.user)
+        return self.view(request, album_id=self.album.pk)
+
+    def test_returns_every_photo_without_page_params(self):
+        response = self._get(f"/photos/{self.album.pk}/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["photos"]), 3)
+
+    def test_pages_newest_first_with_cursor(self):
+        response = self._get(f"/photos/{self.album.pk}/?page_size=2")
+
+        self.assertEqual(
+            [photo["id"] for photo in response.data["results"]],
+            [self.photos[2].pk, self.photos[1].pk],
+        )
+        self.assertIsNone(response.data["previous"])
+        response = self._get(response.data["next"])
+        self.assertEqual(
+            [photo["id"] for photo in response.data["results"]], [self.photos[0].pk]
+        )
+        self.assertIsNone(response.data["next"])
+
+
+class TestPhotoBatchView(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.view = PhotoBatchView.as_view()
+
+    def _post(self):
+        request = self.factory.post("/photos/1/batch/")
+        force_authenticate(request, user=self.user)
+        return self.view(request, album_id=1)
+
+    @patch("core.services.PhotoService.save_photos_batch")
+    def test_batch_all_uploaded_returns_201(self, mock_batch):
+        mock_batch.return_value = {"uploaded": 2, "failed": 0, "results": []}
+
+        response = self._post()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @patch("core.services.PhotoService.save_photos_batch")
+    def test_batch_partial_failure_returns_207(self, mock_batch):
+        mock_batch.return_value = {"uploaded": 1, "failed": 1, "results": []}
+
+        response = self._post()
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+
+
+class TestPhotoHashCheckView(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.view = PhotoHashCheckView.as_view()
+
+    @patch("core.services.PhotoService.check_hashes")
+    def test_check_hashes(self, mock_check):
+        mock_check.return_value = {"existing": ["a" * 64], "missing": []}
+        request = self.factory.post(
+            "/photos/hashes/check/", {"hashes": ["a" * 64]}, format="json"
+        )
+        force_authenticate(request, user=self.user)
+
+        response = self.view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["existing"], ["a" * 64])
+        mock_check.assert_called_once_with({"hashes": ["a" * 64]})
+
+    def test_requires_authentication(self):
+        request = self.factory.post("/photos/hashes/check/", {}, format="json")
+
+        response = self.view(request)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TestPhotoBulkViews(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="testuser", password="password")
+
+    def _post(self, view, path, data):
+        request = self.factory.post(path, data, format="json")
+        force_authenticate(request, user=self.user)
+        return view.as_view()(request)
+
+    @patch("core.services.PhotoService.move_photos_to_album")
+    def test_bulk_move_returns_200(self, mock_move):
+        mock_move.return_value = {"moved": 2, "failed": 0, "results": []}
+
+        response = self._post(
+            PhotoBulkMoveView,
+            "/photos/bulk/move/",
+            {"photo_ids": [1, 2], "target_album_id": 3},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_move.assert_called_once_with(
+            photo_ids=[1, 2], target_album_id=3, user=self.user
+        )
+
+    @patch("core.services.PhotoService.copy_photos_to_album")
+    def test_bulk_copy_returns_201(self, mock_copy):
+        mock_copy.return_value = {"copied": 2, "failed": 0, "results": []}
+
+        response = self._post(
+            PhotoBulkCopyView,
+            "/photos/bulk/copy/",
+            {"photo_ids": [1, 2], "target_album_id": 3},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    @patch("core.services.PhotoService.copy_photos_to_album")
+    def test_bulk_partial_failure_returns_207(self, mock_copy):
+        mock_copy.return_value = {"copied": 1, "failed": 1, "results": []}
+
+        response = self._post(
+            PhotoBulkCopyView,
+            "/photos/bulk/copy/",
+            {"photo_ids": [1, 2], "target_album_id": 3},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+
+    def test_bulk_move_requires_photo_ids(self):
+        response = self._post(
+            PhotoBulkMoveView,
+            "/photos/bulk/move/",
+            {"photo_ids": [], "target_album_id": 3},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestPhotoDuplicatesView(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.view = PhotoDuplicatesView.as_view()
+
+    def _get(self, query=""):
+        request = self.factory.get(f"/photos/1/duplicates/{query}")
+        force_authenticate(request, user=self.user)
+        return self.view(request, album_id=1)
+
+    @override_settings(PHOTO_DUPLICATE_DISTANCE=5)
+    @patch("core.services.DuplicateService.get_duplicates")
+    def test_default_distance(self, mock_duplicates):
+        mock_duplicates.return_value = {"clusters": []}
+
+        response = self._get()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_duplicates.assert_called_once_with(1, 5)
+
+    @patch("core.services.DuplicateService.get_duplicates")
+    def test_distance_is_validated(self, mock_duplicates):
+        self.assertEqual(self._get("?distance=65").status_code, 400)
+
+        self._get("?distance=2")
+        mock_duplicates.assert_called_once_with(1, 2)
+
+
+class TestPhotoRenderView(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = User.objects.create_user(username="testuser", password="password")
+        self.view = PhotoRenderView.as_view()
+        self.variant = {
+            "etag": '"abc"',
+            "content_type": "image/webp",
+        }
+
+    def _get(self, query, **headers):
+        request = self.factory.get(f"/photos/1/2/render{query}", headers=headers)
+        force_authenticate(request, user=self.user)
+        return self.view(request, album_id=1, photo_id=2)
+
+    @patch("core.services.RenderService.open")
+    @patch("core.services.RenderService.variant")
+    def test_negotiates_format_and_sets_cache_headers(self, mock_variant, mock_open):
+        mock_variant.return_value = self.variant
+        mock_open.return_value = io.BytesIO(b"webp")
+
+        with patch("core.services.render_service.features.check", return_value=True):
+            response = self._get("?w=320", accept="image/webp,*/*")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), b"webp")
+        mock_variant.assert_called_once_with(1, 2, 320, "webp")
+        self.assertEqual(response["ETag"], '"abc"')
+        self.assertIn("max-age=31536000", response["Cache-Control"])
+        self.assertEqual(response["Vary"], "Accept")
+
+    @patch("core.services.RenderService.open")
+    @patch("core.services.RenderService.variant")
+    def test_matching_etag_is_not_modified(self, mock_variant, mock_open):
+        mock_variant.return_value = self.variant
+
+        response = self._get("?w=320&fmt=jpeg", if_none_match='"abc"')
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        mock_variant.assert_called_once_with(1, 2, 320, "jpeg")
+        mock_open.assert_not_called()
+
+    @patch("core.services.RenderService.open")
+    @patch("core.services.RenderService.variant")
+    def test_if_none_match_lists_are_parsed(self, mock_variant, mock_open):
+        mock_variant.return_value = self.variant
+        mock_open.side_effect = lambda variant: io.BytesIO(b"jpeg")
+
+        for header, expected in [
+            ('"x", W/"abc"', status.HTTP_304_NOT_MODIFIED),
+            ("*", status.HTTP_304_NOT_MODIFIED),
+            ('"abcd"', status.HTTP_200_OK),
+            ('"xabc"', status.HTTP_200_OK),
+        ]:
+            with self.subTest(header=header):
+                response = self._get("?w=320&fmt=jpeg", if_none_match=header)
+                self.assertEqual(response.status_code, expected)
+
+    @override_settings(PHOTO_RENDER_MAX_WIDTH=1000)
+    @patch("core.services.RenderService.variant")
+    def test_width_is_validated(self, mock_variant):
+        self.assertEqual(self._get("").status_code, 400)
+        self.assertEqual(self._get("?w=1001").status_code, 400)
+        self.assertEqual(self._get("?w=100&fmt=gif").status_code, 400)
+        mock_variant.assert_not_called()
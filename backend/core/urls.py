@@ -6,10 +6,21 @@ from .views import (
     BucketPointView,
     PresenceIndicatorView,
     AlbumView,
+    AlbumExportView,
     PhotoView,
+    PhotoBatchView,
+    PhotoPresignView,
+    PhotoConfirmView,
+    PhotoHashCheckView,
     PhotoDetailView,
     PhotoMoveView,
     PhotoCopyView,
+    PhotoBulkMoveView,
+    PhotoBulkCopyView,
+    PhotoDuplicatesView,
+    PhotoRenderView,
+    TransferMetricsView,
+    LocalMediaView,
 )
 
 urlpatterns = [
@@ -26,7 +37,39 @@ urlpatterns = [
     path("presence/", PresenceIndicatorView.as_view(), name="presence_indicator"),
     path("albums/", AlbumView.as_view(), name="albums"),
     path("albums/<int:album_id>/", AlbumView.as_view(), name="album_edition"),
+    path(
+        "albums/<int:album_id>/export/",
+        AlbumExportView.as_view(),
+        name="album_export",
+    ),
     path("photos/<int:album_id>/", PhotoView.as_view(), name="photo_view"),
+    path(
+        "photos/hashes/check/",
+        PhotoHashCheckView.as_view(),
+        name="photo_hash_check",
+    ),
+    path("photos/bulk/move/", PhotoBulkMoveView.as_view(), name="photo_bulk_move"),
+    path("photos/bulk/copy/", PhotoBulkCopyView.as_view(), name="photo_bulk_copy"),
+    path(
+        "photos/<int:album_id>/batch/",
+        PhotoBatchView.as_view(),
+        name="photo_batch",
+    ),
+    path(
+        "photos/<int:album_id>/duplicates/",
+        PhotoDuplicatesView.as_view(),
+        name="photo_duplicates",
+    ),
+    path(
+        "photos/<int:album_id>/presign/",
+        PhotoPresignView.as_view(),
+        name="photo_presign",
+    ),
+    path(
+        "photos/<int:album_id>/confirm/",
+        PhotoConfirmView.as_view(),
+        name="photo_confirm",
+    ),
     path(
         "photos/<int:album_id>/<int:photo_id>/",
         PhotoDetailView.as_view(),
@@ -42,4 +85,15 @@ urlpatterns = [
         PhotoCopyView.as_view(),
         name="photo_copy",
     ),
+    path(
+        "photos/<int:album_id>/<int:photo_id>/render",
+        PhotoRenderView.as_view(),
+        name="photo_render",
+    ),
+    path(
+        "metrics/transfers/",
+        TransferMetricsView.as_view(),
+        name="transfer_metrics",
+    ),
+    path("media/<path:file_key>", LocalMediaView.as_view(), name="local_media"),
 ]
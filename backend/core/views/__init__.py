@@ -1,5 +1,20 @@
 from .users import ProfileView, PresenceIndicatorView
 from .messages import MessageView, PaginatedMessageView
 from .bucketpoints import BucketPointView
-from .albums import AlbumView
-from .photos import PhotoView, PhotoDetailView, PhotoMoveView, PhotoCopyView
+from .albums import AlbumView, AlbumExportView
+from .metrics import TransferMetricsView
+from .media import LocalMediaView
+from .photos import (
+    PhotoView,
+    PhotoBatchView,
+    PhotoPresignView,
+    PhotoConfirmView,
+    PhotoHashCheckView,
+    PhotoDetailView,
+    PhotoMoveView,
+    PhotoCopyView,
+    PhotoBulkMoveView,
+    PhotoBulkCopyView,
+    PhotoDuplicatesView,
+    PhotoRenderView,
+)
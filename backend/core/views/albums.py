@@ -1,4 +1,6 @@
-from core.services import AlbumService
+from core.pagination import KeysetPagination
+from core.services import AlbumExportService, AlbumService
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -8,11 +10,23 @@ from ..serializers import (
 )
 
 
+class AlbumPagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 100
+
+
 class AlbumView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, _):
+    def get(self, request):
         albums = AlbumService.getAll()
+        # Every album unless a page is asked for
+        paginator = AlbumPagination()
+        if paginator.requested(request):
+            page = paginator.paginate_queryset(albums, request, view=self)
+            return paginator.get_paginated_response(
+                AlbumSerializer(page, many=True).data
+            )
         serializer = AlbumSerializer(albums, many=True)
         return Response(serializer.data)
 
@@ -26,7 +40,55 @@ class AlbumView(APIView):
         )
         return Response(serialized_data)
 
-    def delete(self, request):
-        # TODO: Implement delete album functionality
-        # maybe delete all photos in the album too ?
-        pass
+    def delete(self, _, album_id):
+        AlbumService.deleteAlbum(album_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AlbumExportView(APIView):
+    """The photos of an album as a ZIP archive, resumable with ``Range``."""
+
+    permission_classes = [IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # Download managers send any Accept; errors are still JSON
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, album_id):
+        export = AlbumExportService.layout(album_id)
+        size = export["layout"].size
+
+        byte_range = None
+        range_header = request.headers.get("Range")
+        # A stale If-Range means the archive changed: it is sent again whole
+        etag = export["etag"]
+        if range_header and request.headers.get("If-Range", etag) == etag:
+            byte_range = AlbumExportService.parse_range(range_header, size)
+        if byte_range is not None and byte_range[0] >= size:
+            response = HttpResponse(
+                status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+            )
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        start, end = byte_range or (0, size - 1)
+        # Each server streams its own kind of iterator: Django reads any
+        # other whole before sending the first byte. Only WSGI sets wsgi.input
+        if "wsgi.input" not in request.META:
+            content = AlbumExportService.astream(export["layout"], start, end)
+        else:
+            content = AlbumExportService.stream(export["layout"], start, end)
+        response = StreamingHttpResponse(
+            content,
+            status=(
+                status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK
+            ),
+            content_type="application/zip",
+        )
+        if byte_range:
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = end - start + 1
+        response["Accept-Ranges"] = "bytes"
+        response["ETag"] = etag
+        response["Content-Disposition"] = f'attachment; filename="{export["filename"]}"'
+        return response
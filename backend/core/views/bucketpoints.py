@@ -3,13 +3,29 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
+from core.pagination import KeysetPagination
+from core.serializers import BucketPointSerializer
 from core.services import BucketPointService
 
 
+class BucketPointPagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 100
+
+
 class BucketPointView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, _):
+    def get(self, request):
+        # Every bucket point unless a page is asked for
+        paginator = BucketPointPagination()
+        if paginator.requested(request):
+            page = paginator.paginate_queryset(
+                BucketPointService.get_queryset(), request, view=self
+            )
+            return paginator.get_paginated_response(
+                BucketPointSerializer(page, many=True).data
+            )
         data = BucketPointService.get_all()
         return Response(data)
 
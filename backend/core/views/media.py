@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from rest_framework.views import APIView
+from rest_framework.permissions import AllowAny
+from core.interface.local import LocalPhotoSaver
+
+# Stored keys embed a uuid, so a given URL never changes content
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class LocalMediaView(APIView):
+    """Serve photos stored by ``LocalPhotoSaver``.
+
+    Photo URLs are public like the S3 ones, so no authentication is required.
+    """
+
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, _, file_key):
+        saver = LocalPhotoSaver()
+        try:
+            relative_path = saver.relative_path_for_key(file_key)
+            path = saver.path_of(relative_path)
+        except ValueError:
+            raise Http404
+        if not path.is_file():
+            raise Http404
+
+        content_type = saver._get_content_type(file_key)
+        accel_prefix = settings.PHOTO_LOCAL_ACCEL_REDIRECT
+        if accel_prefix:
+            response = HttpResponse(content_type=content_type)
+            response["X-Accel-Redirect"] = f"{accel_prefix}{relative_path.as_posix()}"
+        else:
+            # FileResponse hands the file to the server's sendfile when available
+            response = FileResponse(open(path, "rb"), content_type=content_type)
+        response["Cache-Control"] = MEDIA_CACHE_CONTROL
+        return response
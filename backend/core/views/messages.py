@@ -32,12 +32,11 @@ class MessageView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-from rest_framework.pagination import PageNumberPagination
+from core.pagination import KeysetPagination
 
 
-class MessagePagination(PageNumberPagination):
+class MessagePagination(KeysetPagination):
     page_size = 20
-    page_size_query_param = "page_size"
     max_page_size = 100
 
 
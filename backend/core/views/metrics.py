@@ -0,0 +1,12 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAdminUser
+from rest_framework import status
+from core.interface.transfer_metrics import transfer_metrics
+
+
+class TransferMetricsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, _):
+        return Response(transfer_metrics.snapshot(), status=status.HTTP_200_OK)
@@ -1,15 +1,42 @@
-from core.services import PhotoService
-from core.serializers import TargetAlbumSerializer
+from core.pagination import KeysetPagination
+from core.services import DuplicateService, PhotoService, RenderService
+from core.serializers import (
+    BulkTargetAlbumSerializer,
+    DuplicateQuerySerializer,
+    PhotoSerializer,
+    RenderQuerySerializer,
+    TargetAlbumSerializer,
+)
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
+# Variants never change, but photos are private to the logged-in users
+RENDER_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+class PhotoPagination(KeysetPagination):
+    page_size = 60
+    max_page_size = 200
+
 
 class PhotoView(APIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, _, album_id):
+    def get(self, request, album_id):
+        # Every photo of the album unless a page is asked for
+        paginator = PhotoPagination()
+        if paginator.requested(request):
+            page = paginator.paginate_queryset(
+                PhotoService.get_photos_queryset(album_id), request, view=self
+            )
+            return paginator.get_paginated_response(
+                PhotoSerializer(page, many=True).data
+            )
         photos = PhotoService.get_photos_by_album_id(album_id)
         return Response(
             {"photos": photos, "album_id": album_id},
@@ -21,6 +48,45 @@ class PhotoView(APIView):
         return Response({"photo": photo_data}, status=status.HTTP_201_CREATED)
 
 
+class PhotoBatchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, album_id):
+        batch = PhotoService.save_photos_batch(album_id, request)
+        if batch["uploaded"] == 0:
+            response_status = status.HTTP_502_BAD_GATEWAY
+        elif batch["failed"]:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response(batch, status=response_status)
+
+
+class PhotoPresignView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, album_id):
+        presigned = PhotoService.create_presigned_upload(album_id, request.data)
+        return Response(presigned, status=status.HTTP_200_OK)
+
+
+class PhotoConfirmView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, album_id):
+        photo_data = PhotoService.confirm_upload(album_id, request)
+        return Response({"photo": photo_data}, status=status.HTTP_201_CREATED)
+
+
+class PhotoHashCheckView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response(
+            PhotoService.check_hashes(request.data), status=status.HTTP_200_OK
+        )
+
+
 class PhotoDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -65,3 +131,85 @@ class PhotoCopyView(APIView):
             user=request.user,
         )
         return Response({"photo": photo_data}, status=status.HTTP_201_CREATED)
+
+
+class PhotoBulkMoveView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = BulkTargetAlbumSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = PhotoService.move_photos_to_album(
+            photo_ids=serializer.validated_data["photo_ids"],
+            target_album_id=serializer.validated_data["target_album_id"],
+            user=request.user,
+        )
+        if result["failed"]:
+            return Response(result, status=status.HTTP_207_MULTI_STATUS)
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class PhotoBulkCopyView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = BulkTargetAlbumSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        result = PhotoService.copy_photos_to_album(
+            photo_ids=serializer.validated_data["photo_ids"],
+            target_album_id=serializer.validated_data["target_album_id"],
+            user=request.user,
+        )
+        if result["failed"]:
+            return Response(result, status=status.HTTP_207_MULTI_STATUS)
+        return Response(result, status=status.HTTP_201_CREATED)
+
+
+class PhotoDuplicatesView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, album_id):
+        serializer = DuplicateQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        duplicates = DuplicateService.get_duplicates(
+            album_id,
+            serializer.validated_data.get(
+                "distance", settings.PHOTO_DUPLICATE_DISTANCE
+            ),
+        )
+        return Response(duplicates, status=status.HTTP_200_OK)
+
+
+class PhotoRenderView(APIView):
+    """A photo ``w`` pixels wide, in ``fmt`` or the best format accepted."""
+
+    permission_classes = [IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # Accept lists image types, that the JSON renderers (errors) lack
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, album_id, photo_id):
+        serializer = RenderQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        format = RenderService.negotiate(
+            request.headers.get("Accept", ""), serializer.validated_data.get("fmt")
+        )
+        variant = RenderService.variant(
+            album_id, photo_id, serializer.validated_data["w"], format
+        )
+
+        # If-None-Match compared as RFC 9110 requires: weakly, "*" included
+        response = get_conditional_response(request, etag=variant["etag"])
+        if response is None:
+            response = FileResponse(
+                RenderService.open(variant), content_type=variant["content_type"]
+            )
+        response["ETag"] = variant["etag"]
+        # APIView adds "Vary: Accept", the format depending on it
+        response["Cache-Control"] = RENDER_CACHE_CONTROL
+        return response
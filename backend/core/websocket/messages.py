@@ -28,6 +28,11 @@ class WebSocketMessageType(str, Enum):
     PHOTO_UPDATED = "PHOTO_UPDATED"
     PHOTO_MOVED = "PHOTO_MOVED"
     PHOTO_COPIED = "PHOTO_COPIED"
+    PHOTOS_UPLOADED = "PHOTOS_UPLOADED"
+    PHOTOS_MOVED = "PHOTOS_MOVED"
+    PHOTOS_COPIED = "PHOTOS_COPIED"
+    PHOTOS_IMPORTED = "PHOTOS_IMPORTED"
+    PHOTO_DERIVATIVES_READY = "PHOTO_DERIVATIVES_READY"
 
     # Album events
     ALBUM_CREATED = "ALBUM_CREATED"
@@ -0,0 +1,227 @@
+from datetime import datetime
+import struct
+
+# ZIP archives of stored (uncompressed) entries, produced as a byte stream
+# whose layout is known upfront: entries whose size is known are placed
+# before any byte is read, so the archive size is known and any byte range
+# of it can be produced without the preceding ones. The CRC-32 of an entry
+# is only needed after its data, in a data descriptor (flag bit 3) and in
+# the central directory. Kept free of Django like ``imaging``.
+
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+DATA_DESCRIPTOR = struct.Struct("<IIII")
+DATA_DESCRIPTOR_ZIP64 = struct.Struct("<IIQQ")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+END_OF_CENTRAL_DIRECTORY = struct.Struct("<IHHHHIIH")
+ZIP64_END_OF_CENTRAL_DIRECTORY = struct.Struct("<IQHHIIQQQQ")
+ZIP64_LOCATOR = struct.Struct("<IIQI")
+
+# Sizes and offsets from ZIP64_LIMIT on are moved to a ZIP64 extra field,
+# leaving ZIP64_MARKER in their 32-bit field
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_MARKER = 0xFFFFFFFF
+ZIP64_EXTRA_TAG = 0x0001
+# Version 4.5: ZIP64; stored entries alone would only need 1.0
+ZIP64_VERSION = 45
+STORED_VERSION = 10
+# Bit 3: CRC-32 in a data descriptor after the data; bit 11: UTF-8 names
+FLAGS = 0x0008 | 0x0800
+# Unix permissions rw-r--r-- in the upper half of the external attributes
+EXTERNAL_ATTRIBUTES = 0o100644 << 16
+
+
+def _dos_time(modified: datetime) -> tuple:
+    # DOS dates start in 1980
+    modified = max(modified, datetime(1980, 1, 1, tzinfo=modified.tzinfo))
+    time = modified.hour << 11 | modified.minute << 5 | modified.second // 2
+    date = (modified.year - 1980) << 9 | modified.month << 5 | modified.day
+    return time, date
+
+
+class ZipEntry:
+    """A file of the archive: ``size`` bytes stored under ``name``."""
+
+    def __init__(self, name: str, size: int, modified: datetime, source=None):
+        self.name = name.encode()
+        self.size = size
+        self.modified = modified
+        # What the data is read from, for the caller
+        self.source = source
+        self.offset = None
+        self.crc = 0 if size == 0 else None
+
+    @property
+    def zip64(self) -> bool:
+        return self.size >= ZIP64_LIMIT
+
+    def local_header(self) -> bytes:
+        extra = b""
+        size = self.size
+        if self.zip64:
+            extra = struct.pack("<HHQQ", ZIP64_EXTRA_TAG, 16, self.size, self.size)
+            size = ZIP64_MARKER
+        return (
+            LOCAL_HEADER.pack(
+                0x04034B50,
+                ZIP64_VERSION if self.zip64 else STORED_VERSION,
+                FLAGS,
+                0,  # stored
+                *_dos_time(self.modified),
+                0,  # CRC-32 in the data descriptor
+                size,
+                size,
+                len(self.name),
+                len(extra),
+            )
+            + self.name
+            + extra
+        )
+
+    def descriptor_size(self) -> int:
+        if self.zip64:
+            return DATA_DESCRIPTOR_ZIP64.size
+        return DATA_DESCRIPTOR.size
+
+    def descriptor(self) -> bytes:
+        if self.zip64:
+            return DATA_DESCRIPTOR_ZIP64.pack(
+                0x08074B50, self.crc, self.size, self.size
+            )
+        return DATA_DESCRIPTOR.pack(0x08074B50, self.crc, self.size, self.size)
+
+    def central_header(self, crc: int = 0) -> bytes:
+        values = []
+        size = self.size
+        offset = self.offset
+        if self.zip64:
+            values += [self.size, self.size]
+            size = ZIP64_MARKER
+        if self.offset >= ZIP64_LIMIT:
+            values.append(self.offset)
+            offset = ZIP64_MARKER
+        extra = b""
+        if values:
+            extra = struct.pack(
+                f"<HH{len(values)}Q", ZIP64_EXTRA_TAG, 8 * len(values), *values
+            )
+        version = ZIP64_VERSION if values else STORED_VERSION
+        return (
+            CENTRAL_HEADER.pack(
+                0x02014B50,
+                3 << 8 | ZIP64_VERSION,  # made by Unix
+                version,
+                FLAGS,
+                0,
+                *_dos_time(self.modified),
+                crc,
+                size,
+                size,
+                len(self.name),
+                len(extra),
+                0,  # comment
+                0,  # disk
+                0,  # internal attributes
+                EXTERNAL_ATTRIBUTES,
+                offset,
+            )
+            + self.name
+            + extra
+        )
+
+
+class ZipLayout:
+    """Offsets of every part of the archive of ``entries``, in order."""
+
+    def __init__(self, entries: list):
+        self.entries = entries
+        offset = 0
+        for entry in entries:
+            entry.offset = offset
+            offset += len(entry.local_header()) + entry.size + entry.descriptor_size()
+        self.central_directory_offset = offset
+        self.central_directory_size = sum(
+            len(entry.central_header()) for entry in entries
+        )
+        self.size = offset + self.central_directory_size + len(self._end())
+
+    def _end(self) -> bytes:
+        count = len(self.entries)
+        offset = self.central_directory_offset
+        size = self.central_directory_size
+        end = b""
+        if count >= 0xFFFF or offset >= ZIP64_LIMIT or size >= ZIP64_LIMIT:
+            end = ZIP64_END_OF_CENTRAL_DIRECTORY.pack(
+                0x06064B50,
+                ZIP64_END_OF_CENTRAL_DIRECTORY.size - 12,
+                3 << 8 | ZIP64_VERSION,
+                ZIP64_VERSION,
+                0,
+                0,
+                count,
+                count,
+                size,
+                offset,
+            ) + ZIP64_LOCATOR.pack(0x07064B50, 0, offset + size, 1)
+            count = min(count, 0xFFFF)
+            offset = ZIP64_MARKER if offset >= ZIP64_LIMIT else offset
+            size = ZIP64_MARKER if size >= ZIP64_LIMIT else size
+        return end + END_OF_CENTRAL_DIRECTORY.pack(
+            0x06054B50, 0, 0, count, count, size, offset, 0
+        )
+
+    def data_ranges(self, start: int, end: int) -> list:
+        """``(entry, first, last)`` data bytes within archive bytes start..end."""
+        ranges = []
+        for entry in self.entries:
+            data_start = entry.offset + len(entry.local_header())
+            first = max(start - data_start, 0)
+            last = min(end - data_start, entry.size - 1)
+            if first <= last:
+                ranges.append((entry, first, last))
+        return ranges
+
+    def iter_bytes(self, start: int, end: int, read_data, crc_of):
+        """Yield the archive bytes ``start`` to ``end`` (inclusive).
+
+        ``read_data(entry, first, last)`` yields the data bytes first..last of
+        an entry, in the order of ``data_ranges``. ``crc_of(entry)`` returns
+        the CRC-32 of an entry, needed after its data.
+        """
+
+        def part(content: bytes, offset: int):
+            if offset <= end and offset + len(content) > start:
+                yield content[max(start - offset, 0) : end - offset + 1]
+
+        def crc(entry):
+            if entry.crc is None:
+                entry.crc = crc_of(entry)
+            return entry.crc
+
+        for entry in self.entries:
+            if entry.offset > end:
+                return
+            header = entry.local_header()
+            yield from part(header, entry.offset)
+
+            data_start = entry.offset + len(header)
+            first = max(start - data_start, 0)
+            last = min(end - data_start, entry.size - 1)
+            if first <= last:
+                yield from read_data(entry, first, last)
+
+            descriptor_start = data_start + entry.size
+            if descriptor_start <= end and (
+                descriptor_start + entry.descriptor_size() > start
+            ):
+                crc(entry)
+                yield from part(entry.descriptor(), descriptor_start)
+
+        offset = self.central_directory_offset
+        for entry in self.entries:
+            if offset > end:
+                return
+            size = len(entry.central_header())
+            if offset + size > start:
+                yield from part(entry.central_header(crc(entry)), offset)
+            offset += size
+        yield from part(self._end(), offset)
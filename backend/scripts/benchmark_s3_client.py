@@ -0,0 +1,147 @@
+"""
+Measure per-operation S3 latency of AwsPhotoSaver against a local S3 stand-in.
+
+Compares the saver as it was before the shared client, which built a boto3
+client with the default configuration for every call and uploaded with the
+default transfer settings, with the current saver. The stand-in is a keep-alive HTTP server answering every
+S3 call with an empty 200; ``--handshake-ms`` delays each new connection to
+mimic a TLS handshake to a remote endpoint.
+
+Usage: python backend/scripts/benchmark_s3_client.py [--ops 200] [--handshake-ms 20]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+class S3StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    handshake_delay = 0.0
+
+    def setup(self):
+        super().setup()
+        time.sleep(self.handshake_delay)
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("ETag", '"stand-in"')
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_PUT = _reply
+    do_POST = _reply
+    do_DELETE = _reply
+    do_HEAD = _reply
+    do_GET = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in(handshake_ms: float) -> ThreadingHTTPServer:
+    S3StandInHandler.handshake_delay = handshake_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), S3StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def configure(endpoint_url: str):
+    os.environ.update(
+        {
+            "AWS_ACCESS_KEY": "benchmark",
+            "AWS_ACCESS_SECRET": "benchmark",
+            "AWS_BUCKET_NAME": "benchmark",
+            "AWS_S3_ENDPOINT_URL": endpoint_url,
+            "USE_LOCAL_DB": "True",
+        }
+    )
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings_test")
+
+    import django
+
+    django.setup()
+
+
+def run(saver, ops: int) -> list[float]:
+    payload = b"x" * 64 * 1024
+    timings = []
+    for _ in range(ops):
+        file = io.BytesIO(payload)
+        file.name = "benchmark.jpg"
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            url = saver.save_within_folder(file, "benchmark")
+            saver.delete(url)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list[float]):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<22} mean {statistics.mean(timings):7.2f} ms   "
+        f"p50 {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = start_stand_in(args.handshake_ms)
+    configure(f"http://127.0.0.1:{server.server_port}")
+
+    import boto3
+    from core.interface import aws
+
+    class BaselineSaver(aws.AwsPhotoSaver):
+        """The client and upload of the saver before the shared client.
+
+        Only ``endpoint_url`` is added, to reach the stand-in.
+        """
+
+        def _get_s3_client(self):
+            return boto3.client(
+                "s3",
+                aws_access_key_id=aws.AWS_ACCESS_KEY,
+                aws_secret_access_key=aws.AWS_SECRET_KEY,
+                region_name=aws.AWS_REGION,
+                endpoint_url=aws.AWS_S3_ENDPOINT_URL,
+            )
+
+        def _upload_to_s3(self, file, file_key):
+            self._get_s3_client().upload_fileobj(
+                file,
+                aws.AWS_BUCKET_NAME,
+                file_key,
+                ExtraArgs={
+                    "ContentType": self._get_content_type(file.name),
+                    "ContentDisposition": "inline",
+                },
+            )
+
+    print(f"{args.ops} x (upload 64 KiB + delete), handshake {args.handshake_ms} ms")
+    report("baseline saver", run(BaselineSaver(), args.ops))
+    report("shared pooled client", run(aws.AwsPhotoSaver(), args.ops))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import HideImageIcon from "@mui/icons-material/HideImage"
 import { Album } from "../types/album"
 import AlbumEditModal from "./UpdateAlbumModal"
 import { useNavigate } from "react-router-dom"
+import { pickSrcSet } from "../utils/utils"
 
 function AlbumCard({ album }: { album: Album }) {
     const navigate = useNavigate()
@@ -38,8 +39,17 @@ function AlbumCard({ album }: { album: Album }) {
                             component="img"
                             height="180"
                             image={album.cover_image}
+                            srcSet={pickSrcSet(album.cover_srcset)}
+                            sizes="(max-width: 600px) 100vw, 33vw"
                             alt={`Couverture de l'album ${album.title}`}
-                            sx={{ objectFit: "cover", height: "100%" }}
+                            sx={{
+                                objectFit: "cover",
+                                height: "100%",
+                                backgroundImage: album.cover_placeholder
+                                    ? `url(${album.cover_placeholder})`
+                                    : undefined,
+                                backgroundSize: "cover",
+                            }}
                         />
                     ) : (
                         <Box
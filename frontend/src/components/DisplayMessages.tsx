@@ -35,7 +35,6 @@ function DisplayAllMessages() {
                     newPages[0] = {
                         ...newPages[0],
                         results: [data.message, ...newPages[0].results],
-                        count: newPages[0].count + 1,
                     }
                     return { ...oldData, pages: newPages }
                 }
@@ -33,6 +33,7 @@ import {
     useCopyPhotoMutation,
 } from "../queries/photos"
 import SelectAlbumModal from "./SelectAlbumModal"
+import { pickSrcSet } from "../utils/utils"
 import EditPhotoModal from "./EditPhotoModal"
 
 interface PhotoCardProps {
@@ -165,6 +166,8 @@ const PhotoCard = ({ photo, albumId }: PhotoCardProps) => {
                     <CardMedia
                         component="img"
                         image={photo.image_url}
+                        srcSet={pickSrcSet(photo.srcset)}
+                        sizes="(max-width: 600px) 100vw, (max-width: 1200px) 50vw, 33vw"
                         alt={photo.caption || "Photo"}
                         sx={{
                             width: "100%",
@@ -172,6 +175,10 @@ const PhotoCard = ({ photo, albumId }: PhotoCardProps) => {
                             objectFit: "cover",
                             opacity: isDeleting ? 0.5 : 1,
                             transition: "opacity 0.3s",
+                            backgroundImage: photo.placeholder
+                                ? `url(${photo.placeholder})`
+                                : undefined,
+                            backgroundSize: "cover",
                         }}
                     />
                 ) : (
@@ -515,6 +522,11 @@ const PhotoCard = ({ photo, albumId }: PhotoCardProps) => {
                             sx={{
                                 width: "100%",
                                 height: "auto",
+                                // Known from the upload: no layout jump while loading
+                                aspectRatio:
+                                    photo.width && photo.height
+                                        ? `${photo.width} / ${photo.height}`
+                                        : undefined,
                                 objectFit: "contain",
                                 maxHeight: "calc(80vh - 48px)",
                                 backgroundColor: "black",
@@ -2,7 +2,16 @@ import { useEffect, useState, useCallback } from "react"
 import { useGetPhotos } from "../queries/photos"
 import { useWebSocketContext } from "../contexts/WebSocketProvider"
 import { WebSocketMessageType } from "../types/websockets"
-import { PhotoUploaded, PhotoDeleted, PhotoUpdated } from "../types/websocket-interfaces"
+import {
+    PhotoUploaded,
+    PhotoDeleted,
+    PhotoUpdated,
+    PhotosUploaded,
+    PhotosMoved,
+    PhotosCopied,
+    PhotosImported,
+    PhotoDerivativesReady,
+} from "../types/websocket-interfaces"
 import { Photo } from "../types/photo"
 
 interface UsePhotosWithWebSocketResult {
@@ -14,7 +23,10 @@ interface UsePhotosWithWebSocketResult {
 
 /**
  * Hook that combines react-query photo fetching with WebSocket real-time updates.
- * Automatically updates the photo list when photos are added, deleted, or updated.
+ * Automatically updates the photo list when photos are added, deleted, or updated,
+ * and when the resized copies of a photo become available. Batch uploads and
+ * bulk moves or copies send one event for all their photos. A bulk import only
+ * sends a summary, so the list is fetched again when it touched the album.
  */
 export function usePhotosWithWebSocket(albumId: string): UsePhotosWithWebSocketResult {
     const { data, isLoading, isError, refetch } = useGetPhotos(albumId)
@@ -81,18 +93,113 @@ export function usePhotosWithWebSocket(albumId: string): UsePhotosWithWebSocketR
         [albumId]
     )
 
+    // Add photos from a batch event, skipping those already listed
+    const addPhotos = useCallback((added: Photo[]) => {
+        setPhotos((prev) => {
+            const known = new Set(prev.map((photo) => photo.id))
+            const fresh = added.filter((photo) => !known.has(photo.id))
+            return fresh.length ? [...fresh, ...prev] : prev
+        })
+    }, [])
+
+    // Handle a batch upload
+    const handlePhotosUploaded = useCallback(
+        (payload: PhotosUploaded) => {
+            if (String(payload.album_id) !== String(albumId)) {
+                return
+            }
+
+            console.debug("Photos uploaded via WebSocket:", payload.data.length)
+            addPhotos(payload.data)
+        },
+        [albumId, addPhotos]
+    )
+
+    // Handle a bulk move, into or out of the current album
+    const handlePhotosMoved = useCallback(
+        (payload: PhotosMoved) => {
+            if (String(payload.target_album_id) === String(albumId)) {
+                console.debug("Photos moved in via WebSocket:", payload.data.length)
+                addPhotos(payload.data)
+            } else if (payload.source_album_ids.some((id) => String(id) === String(albumId))) {
+                console.debug("Photos moved out via WebSocket:", payload.data.length)
+                const moved = new Set(payload.data.map((photo) => photo.id))
+                setPhotos((prev) => prev.filter((photo) => !moved.has(photo.id)))
+            }
+        },
+        [albumId, addPhotos]
+    )
+
+    // Handle a bulk copy
+    const handlePhotosCopied = useCallback(
+        (payload: PhotosCopied) => {
+            if (String(payload.album_id) !== String(albumId)) {
+                return
+            }
+
+            console.debug("Photos copied via WebSocket:", payload.data.length)
+            addPhotos(payload.data)
+        },
+        [albumId, addPhotos]
+    )
+
+    // Handle a bulk import summary
+    const handlePhotosImported = useCallback(
+        (payload: PhotosImported) => {
+            if (!payload.album_ids.some((id) => String(id) === String(albumId))) {
+                return
+            }
+
+            console.debug("Photos imported via WebSocket:", payload.imported)
+            refetch()
+        },
+        [albumId, refetch]
+    )
+
+    // Handle derivatives generated by the image worker
+    const handlePhotoDerivativesReady = useCallback((payload: PhotoDerivativesReady) => {
+        setPhotos((prev) =>
+            prev.map((photo) =>
+                payload.photo_ids.includes(photo.id) ? { ...photo, srcset: payload.srcset } : photo
+            )
+        )
+    }, [])
+
     // Subscribe to WebSocket events
     useEffect(() => {
         websocket.bind(WebSocketMessageType.PhotoUploaded, handlePhotoUploaded)
         websocket.bind(WebSocketMessageType.PhotoDeleted, handlePhotoDeleted)
         websocket.bind(WebSocketMessageType.PhotoUpdated, handlePhotoUpdated)
+        websocket.bind(WebSocketMessageType.PhotosUploaded, handlePhotosUploaded)
+        websocket.bind(WebSocketMessageType.PhotosMoved, handlePhotosMoved)
+        websocket.bind(WebSocketMessageType.PhotosCopied, handlePhotosCopied)
+        websocket.bind(WebSocketMessageType.PhotosImported, handlePhotosImported)
+        websocket.bind(WebSocketMessageType.PhotoDerivativesReady, handlePhotoDerivativesReady)
 
         return () => {
             websocket.unbind(WebSocketMessageType.PhotoUploaded, handlePhotoUploaded)
             websocket.unbind(WebSocketMessageType.PhotoDeleted, handlePhotoDeleted)
             websocket.unbind(WebSocketMessageType.PhotoUpdated, handlePhotoUpdated)
+            websocket.unbind(WebSocketMessageType.PhotosUploaded, handlePhotosUploaded)
+            websocket.unbind(WebSocketMessageType.PhotosMoved, handlePhotosMoved)
+            websocket.unbind(WebSocketMessageType.PhotosCopied, handlePhotosCopied)
+            websocket.unbind(WebSocketMessageType.PhotosImported, handlePhotosImported)
+            websocket.unbind(
+                WebSocketMessageType.PhotoDerivativesReady,
+                handlePhotoDerivativesReady
+            )
         }
-    }, [websocket, handlePhotoUploaded, handlePhotoDeleted, handlePhotoUpdated])
+    }, [
+        websocket,
+        handlePhotoUploaded,
+        handlePhotoDeleted,
+        handlePhotoUpdated,
+        handlePhotosUploaded,
+        handlePhotosMoved,
+        handlePhotosCopied,
+        handlePhotosImported,
+        handlePhotoDerivativesReady,
+    ])
 
     return {
         photos,
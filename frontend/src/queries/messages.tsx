@@ -49,11 +49,12 @@ const useGetPaginatedMessages = () => {
     const { axiosInstance } = useAuth()
 
     return useInfiniteQuery({
-        initialPageParam: 1,
+        initialPageParam: null as string | null,
         queryKey: ["messages", "paginated"],
-        queryFn: async ({ pageParam = 1 }) => {
+        queryFn: async ({ pageParam }) => {
+            const query = pageParam ? `?cursor=${encodeURIComponent(pageParam)}` : ""
             const response = await axiosInstance.get<PaginatedResponse<Imessage>>(
-                `/messages/paginated/?page=${pageParam}`
+                `/messages/paginated/${query}`
             )
             return response.data
         },
@@ -61,8 +62,7 @@ const useGetPaginatedMessages = () => {
             if (lastPage.next) {
                 try {
                     const url = new URL(lastPage.next, window.location.origin)
-                    const page = url.searchParams.get("page")
-                    return page ? Number(page) : undefined
+                    return url.searchParams.get("cursor") ?? undefined
                 } catch (e) {
                     console.error("Error parsing next page URL:", e)
                     return undefined
@@ -1,11 +1,24 @@
+import { Srcset } from "./photo"
+
 export interface IAlbum {
     id: number
     title: string
     description: string
     cover_image: string
+    cover_srcset?: Srcset
+    // Tiny blurred preview (data URI) shown while the cover loads
+    cover_placeholder?: string
+    // Read from the cover file at upload, null when unknown
+    cover_width?: number | null
+    cover_height?: number | null
+    cover_bytes?: number | null
+    cover_mime?: string | null
     created_at: string
     updated_at: string
     nb_photos: number
+    // Sum of the photo sizes, and creation date of the latest photo
+    total_bytes?: number
+    last_photo_at?: string | null
 }
 
 export interface AddAlbumInput {
@@ -18,7 +31,18 @@ export interface Album {
     title: string
     description: string
     cover_image?: string
+    cover_srcset?: Srcset
+    // Tiny blurred preview (data URI) shown while the cover loads
+    cover_placeholder?: string
+    // Read from the cover file at upload, null when unknown
+    cover_width?: number | null
+    cover_height?: number | null
+    cover_bytes?: number | null
+    cover_mime?: string | null
     created_at: string
     updated_at: string
     nb_photos: number
+    // Sum of the photo sizes, and creation date of the latest photo
+    total_bytes?: number
+    last_photo_at?: string | null
 }
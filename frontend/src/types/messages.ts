@@ -1,5 +1,4 @@
 export interface PaginatedResponse<T> {
-    count: number
     next: string | null
     previous: string | null
     results: T[]
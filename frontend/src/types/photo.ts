@@ -1,11 +1,25 @@
+export type Srcset = Partial<Record<"image/avif" | "image/webp" | "image/jpeg", string>>
+
 export interface Photo {
     id: number
     album: string
     image_url: string
+    // Resized copies, one srcset string per MIME type
+    srcset?: Srcset
+    // Tiny blurred preview (data URI) shown while the image loads
+    placeholder?: string
     caption: string
     created_at: string
     updated_at: string
     location: string
+    // Read from the file at upload, null when unknown
+    taken_at?: string | null
+    lat?: number | null
+    lon?: number | null
+    width?: number | null
+    height?: number | null
+    bytes?: number | null
+    mime?: string | null
 }
 
 export interface AddPhotoInput {
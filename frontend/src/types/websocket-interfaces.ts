@@ -1,6 +1,6 @@
 import IMessage from "./messages"
 import IBucketPoint from "./bucketspoints"
-import { Photo } from "./photo"
+import { Photo, Srcset } from "./photo"
 
 // Message interfaces
 export interface MessageViewed {
@@ -73,6 +73,38 @@ export interface PhotoCopied {
     album_id: number
 }
 
+export interface PhotosUploaded {
+    data: Photo[]
+    album_id: number
+}
+
+export interface PhotosMoved {
+    data: Photo[]
+    source_album_ids: number[]
+    target_album_id: number
+}
+
+export interface PhotosCopied {
+    data: Photo[]
+    album_id: number
+}
+
+// Summary of a bulk import, which sends no event per photo
+export interface PhotosImported {
+    album_ids: number[]
+    imported: number
+    skipped: number
+    failed: number
+}
+
+export interface PhotoDerivativesReady {
+    image_url: string
+    srcset: Srcset
+    // Photos showing the image, and albums using it as cover
+    photo_ids: number[]
+    album_ids: number[]
+}
+
 // Album interfaces
 export interface Album {
     id: number
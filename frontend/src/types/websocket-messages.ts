@@ -12,6 +12,11 @@ import {
     PhotoUpdated,
     PhotoMoved,
     PhotoCopied,
+    PhotosUploaded,
+    PhotosMoved,
+    PhotosCopied,
+    PhotosImported,
+    PhotoDerivativesReady,
     AlbumCreated,
     AlbumDeleted,
     AlbumUpdated,
@@ -39,6 +44,11 @@ export interface WebSocketMessageTable {
     [WebSocketMessageType.PhotoUpdated]: PhotoUpdated
     [WebSocketMessageType.PhotoMoved]: PhotoMoved
     [WebSocketMessageType.PhotoCopied]: PhotoCopied
+    [WebSocketMessageType.PhotosUploaded]: PhotosUploaded
+    [WebSocketMessageType.PhotosMoved]: PhotosMoved
+    [WebSocketMessageType.PhotosCopied]: PhotosCopied
+    [WebSocketMessageType.PhotosImported]: PhotosImported
+    [WebSocketMessageType.PhotoDerivativesReady]: PhotoDerivativesReady
 
     // Album types
     [WebSocketMessageType.AlbumCreated]: AlbumCreated
@@ -19,6 +19,11 @@ export enum WebSocketMessageType {
     PhotoUpdated = "PHOTO_UPDATED",
     PhotoMoved = "PHOTO_MOVED",
     PhotoCopied = "PHOTO_COPIED",
+    PhotosUploaded = "PHOTOS_UPLOADED",
+    PhotosMoved = "PHOTOS_MOVED",
+    PhotosCopied = "PHOTOS_COPIED",
+    PhotosImported = "PHOTOS_IMPORTED",
+    PhotoDerivativesReady = "PHOTO_DERIVATIVES_READY",
 
     // Album events
     AlbumCreated = "ALBUM_CREATED",
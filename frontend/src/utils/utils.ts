@@ -1,3 +1,10 @@
+import { Srcset } from "../types/photo"
+
+// A plain <img> takes a single srcset: WebP is supported by every target browser
+export function pickSrcSet(srcset?: Srcset): string | undefined {
+    return srcset?.["image/webp"] ?? srcset?.["image/jpeg"]
+}
+
 export default function getBaseURL() {
     const { protocol, hostname, port } = window.location
     return `${protocol}//${hostname}${port ? `:${port}` : ""}`